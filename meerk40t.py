@@ -1,11 +1,14 @@
 #!/usr/bin/env python
 
 
+import multiprocessing
 import re
 import sys
 
 from meerk40t import main
 
 if __name__ == "__main__":
+    # Frozen builds need this for the planner worker processes.
+    multiprocessing.freeze_support()
     sys.argv[0] = re.sub(r"(-script\.pyw|\.exe)?$", "", sys.argv[0])
     sys.exit(main.run())
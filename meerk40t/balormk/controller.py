@@ -10,6 +10,7 @@ import threading
 import time
 from copy import copy
 
+import numpy as np
 from usb.core import NoBackendError
 
 from meerk40t.balormk.mock_connection import MockConnection
@@ -23,6 +24,18 @@ DRIVER_STATE_RAW = 3
 nop = [0x02, 0x80, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
 empty = bytearray(nop * 0x100)
 
+# List command record, six little-endian words. A list packet holds 0x100 records, 0xC00 bytes.
+list_record = np.dtype(
+    [
+        ("command", "<u2"),
+        ("v1", "<u2"),
+        ("v2", "<u2"),
+        ("v3", "<u2"),
+        ("v4", "<u2"),
+        ("v5", "<u2"),
+    ]
+)
+
 listJumpTo = 0x8001
 listEndOfList = 0x8002
 listLaserOnPoint = 0x8003
@@ -606,16 +619,36 @@ class GalvoController:
                 remainder = f"{v1} {v2} {v3} {v4} {v5}"
                 while remainder.endswith(" 0"):
                     remainder = remainder[:-2]
-                packet = struct.pack(
-                    "<6H", int(command), int(v1), int(v2), int(v3), int(v4), int(v5)
-                )
-                hexstr = " ".join(f"{x:02X}" for x in packet)
+                hexstr = " ".join(f"{x:02X}" for x in msg)
                 self.usb_log(f"> {hexstr} -- {cmdstr} {remainder}")
-            self._active_list[index : index + 12] = struct.pack(
-                "<6H", int(command), int(v1), int(v2), int(v3), int(v4), int(v5)
-            )
+            self._active_list[index : index + 12] = msg
             self._active_index += 12
 
+    def _list_write_records(self, records):
+        """
+        Appends list records, a list_record array, filling the active list and sending every full list.
+
+        @param records: list_record array
+        @return:
+        """
+        data = records.tobytes()
+        with self._list_lock:
+            position = 0
+            while position < len(data):
+                if self._active_index >= 0xC00:
+                    self._list_end()
+                if self._active_list is None:
+                    self._list_new()
+                index = self._active_index
+                length = min(0xC00 - index, len(data) - position)
+                self._active_list[index : index + length] = data[
+                    position : position + length
+                ]
+                self._active_index += length
+                position += length
+            if self.DEBUG and len(records):
+                self.usb_log(f"> {len(records)} list records -- batch")
+
     def _command(self, command, v1=0, v2=0, v3=0, v4=0, v5=0, read=True):
         cmd = struct.pack(
             "<6H", int(command), int(v1), int(v2), int(v3), int(v4), int(v5)
@@ -1205,6 +1238,74 @@ class GalvoController:
         self._last_x = x
         self._last_y = y
 
+    def list_mark_batch(self, points, jumps=None, angle=0):
+        """
+        Marks along the points, jumping to the points where jumps is set. The list records are the same as calling
+        goto() for the jumps and mark() for the marks point by point: points out of range and points at the current
+        position are skipped. The records are computed and packed for all points at once.
+
+        @param points: complex array, or sequence of complex or (x, y)
+        @param jumps: optional bool array, True where the point is jumped to rather than marked
+        @param angle: mark angle word
+        @return:
+        """
+        points = np.asarray(points)
+        if points.ndim == 2:
+            points = points[:, 0] + 1j * points[:, 1]
+        points = points.astype(complex).ravel()
+        if jumps is None:
+            jumps = np.zeros(len(points), dtype=bool)
+        else:
+            jumps = np.asarray(jumps, dtype=bool).ravel()
+        if self._mark_speed is not None or self._goto_speed is not None:
+            # Speed changes are interleaved with the moves, write point by point.
+            for p, jump in zip(points, jumps):
+                if jump:
+                    self.goto(p.real, p.imag)
+                else:
+                    self.mark(p.real, p.imag)
+            return
+        x = points.real
+        y = points.imag
+        in_range = (x >= 0) & (x <= 0xFFFF) & (y >= 0) & (y <= 0xFFFF)
+        x = x[in_range]
+        y = y[in_range]
+        jumps = jumps[in_range]
+        ix = x.astype(np.int64)
+        iy = y.astype(np.int64)
+        # The position before each point, a skipped point equals the position it is skipped at.
+        last_x = np.empty_like(ix)
+        last_y = np.empty_like(iy)
+        if len(ix):
+            last_x[0] = self._last_x
+            last_y[0] = self._last_y
+            last_x[1:] = ix[:-1]
+            last_y[1:] = iy[:-1]
+        moved = (x != last_x) | (y != last_y)
+        if not moved.any():
+            return
+        distance = np.hypot(x - last_x, y - last_y)[moved].astype(np.int64)
+        records = np.zeros(int(moved.sum()), dtype=list_record)
+        records["command"] = np.where(jumps[moved], listJumpTo, listMarkTo)
+        records["v1"] = ix[moved]
+        records["v2"] = iy[moved]
+        records["v3"] = np.where(jumps[moved], 0, angle)
+        records["v4"] = np.minimum(distance, 0xFFFF)
+        self._list_write_records(records)
+
+        x = int(records["v1"][-1])
+        y = int(records["v2"][-1])
+        if self.service.signal_updates:
+            view = self.service.view
+            l_x, l_y = view.iposition(self._last_x, self._last_y)
+            n_x, n_y = view.iposition(x, y)
+            self.service.signal(
+                "driver;position",
+                (l_x, l_y, n_x, n_y),
+            )
+        self._last_x = x
+        self._last_y = y
+
     def list_jump_speed(self, speed):
         if self._travel_speed == speed:
             return
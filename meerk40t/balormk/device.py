@@ -1217,3 +1217,20 @@ class BalorDevice(Service, Status):
         ps_settings = self.get_operation_power_speed_defaults(op_type)
         settings.update(ps_settings)
         return settings
+
+
+def motion_model(service):
+    """
+    Motion model of the galvo controller for job time estimates. The mirrors do not accelerate noticeably,
+    the time is spent moving at the mark and jump speeds and waiting for the delays (µs).
+    """
+    from meerk40t.core.estimator import MotionModel
+
+    return MotionModel(
+        laser_on_delay=service.delay_laser_on / 1e6,
+        laser_off_delay=service.delay_laser_off / 1e6,
+        polygon_delay=service.delay_polygon / 1e6,
+        jump_delay=service.delay_jump_short / 1e6,
+        long_jump_delay=service.delay_jump_long / 1e6,
+        long_jump_distance=Length(service.delay_distance_long).mm,
+    )
@@ -218,7 +218,16 @@ class BalorDriver:
         self.start_pedal_polling(origin="geometry start of plot")
         self._list_bits = con._port_bits
         g = Geomstr()
+        # Moves of consecutive shapes with the same settings, written as one batch.
+        moves = []
+        jumps = []
+        moves_settings = None
         for segment_type, start, c1, c2, end, sets in geom.as_lines():
+            if moves and (
+                sets is not moves_settings
+                or segment_type not in ("line", "quad", "cubic", "arc")
+            ):
+                self._write_moves(moves, jumps)
             con.set_settings(sets)
             # LOOP CHECKS
             if self._abort_mission():
@@ -226,61 +235,27 @@ class BalorDriver:
             while self.paused:
                 time.sleep(0.05)
             if segment_type == "line":
-                last_x, last_y = con.get_last_xy()
-                x, y = start.real, start.imag
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                con.mark(end.real, end.imag)
+                moves_settings = sets
+                moves.extend((start, end))
+                jumps.extend((True, False))
             elif segment_type == "end":
                 pass
-            elif segment_type == "quad":
-                last_x, last_y = con.get_last_xy()
-                x, y = start.real, start.imag
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                interp = self.service.interp
-
-                g.clear()
-                g.quad(start, c1, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._abort_mission():
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
-            elif segment_type == "cubic":
-                last_x, last_y = con.get_last_xy()
-                x, y = start.real, start.imag
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                interp = self.service.interp
-
-                g.clear()
-                g.cubic(start, c1, c2, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._abort_mission():
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
-            elif segment_type == "arc":
-                last_x, last_y = con.get_last_xy()
-                x, y = start.real, start.imag
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
+            elif segment_type in ("quad", "cubic", "arc"):
+                moves_settings = sets
                 interp = self.service.interp
 
                 g.clear()
-                g.arc(start, c1, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._abort_mission():
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
+                if segment_type == "quad":
+                    g.quad(start, c1, end)
+                elif segment_type == "cubic":
+                    g.cubic(start, c1, c2, end)
+                else:
+                    g.arc(start, c1, end)
+                points = list(g.as_equal_interpolated_points(distance=interp))[1:]
+                moves.append(start)
+                moves.extend(points)
+                jumps.append(True)
+                jumps.extend([False] * len(points))
             elif segment_type == "point":
                 function = sets.get("function")
                 if function == "dwell":
@@ -327,6 +302,9 @@ class BalorDriver:
                 elif function == "output":
                     con.port_set(sets.get("output_mask"), sets.get("output_value"))
                     con.list_write_port()
+            if len(moves) >= 0x10000:
+                self._write_moves(moves, jumps)
+        self._write_moves(moves, jumps)
         con.list_delay_time(int(self.service.delay_end / 10.0))
         self._list_bits = None
         con.rapid_mode()
@@ -339,6 +317,15 @@ class BalorDriver:
             con.light_off()
             con.write_port()
 
+    def _write_moves(self, moves, jumps):
+        """
+        Writes the collected jumps and marks as one batch of list commands and clears them.
+        """
+        if moves:
+            self.connection.list_mark_batch(moves, jumps)
+            moves.clear()
+            jumps.clear()
+
     def plot(self, plot):
         """
         This command is called with bits of cutcode as they are processed through the spooler. This should be optimized
@@ -397,10 +384,19 @@ class BalorDriver:
         self.queue = list()
         total = len(queue)
         current = 0
+        # Moves of consecutive cuts with the same settings, written as one batch.
+        moves = []
+        jumps = []
+        moves_settings = None
         for q in queue:
             current += 1
             self._set_queue_status(current, total)
             settings = q.settings
+            if moves and (
+                settings is not moves_settings
+                or not isinstance(q, (LineCut, QuadCut, CubicCut))
+            ):
+                self._write_moves(moves, jumps)
             penbox = settings.get("penbox_value")
             if penbox is not None:
                 try:
@@ -414,48 +410,28 @@ class BalorDriver:
             while self.paused:
                 time.sleep(0.05)
             if isinstance(q, LineCut):
-                last_x, last_y = con.get_last_xy()
-                x, y = q.start
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                con.mark(*q.end)
-            elif isinstance(q, QuadCut):
-                last_x, last_y = con.get_last_xy()
-                x, y = q.start
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
-                interp = self.service.interp
-
-                g = Geomstr()
-                g.quad(complex(*q.start), complex(*q.c()), complex(*q.end))
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._abort_mission():
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
-            elif isinstance(q, CubicCut):
-                last_x, last_y = con.get_last_xy()
-                x, y = q.start
-                if last_x != x or last_y != y:
-                    con.goto(x, y)
+                moves_settings = settings
+                moves.extend((complex(*q.start), complex(*q.end)))
+                jumps.extend((True, False))
+            elif isinstance(q, (QuadCut, CubicCut)):
+                moves_settings = settings
                 interp = self.service.interp
 
                 g = Geomstr()
-                g.cubic(
-                    complex(*q.start),
-                    complex(*q.c1()),
-                    complex(*q.c2()),
-                    complex(*q.end),
-                )
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._abort_mission():
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
+                if isinstance(q, QuadCut):
+                    g.quad(complex(*q.start), complex(*q.c()), complex(*q.end))
+                else:
+                    g.cubic(
+                        complex(*q.start),
+                        complex(*q.c1()),
+                        complex(*q.c2()),
+                        complex(*q.end),
+                    )
+                points = list(g.as_equal_interpolated_points(distance=interp))[1:]
+                moves.append(complex(*q.start))
+                moves.extend(points)
+                jumps.append(True)
+                jumps.extend([False] * len(points))
             elif isinstance(q, PlotCut):
                 last_x, last_y = con.get_last_xy()
                 x, y = q.start
@@ -595,6 +571,9 @@ class BalorDriver:
                                 )
                                 con.power(percent_power * on)
                         con.mark(x, y)
+            if len(moves) >= 0x10000:
+                self._write_moves(moves, jumps)
+        self._write_moves(moves, jumps)
         con.list_delay_time(int(self.service.delay_end / 10.0))
         self._list_bits = None
         con.rapid_mode()
@@ -19,9 +19,10 @@ def plugin(kernel, lifecycle):
             print("Galvo plugin could not load because pyusb is not installed.")
             return True
     if lifecycle == "register":
-        from meerk40t.balormk.device import BalorDevice
+        from meerk40t.balormk.device import BalorDevice, motion_model
 
         kernel.register("provider/device/balor", BalorDevice)
+        kernel.register("estimator/balor", motion_model)
         kernel.register("provider/friendly/balor", ("Fibre-Laser", 3))
         _ = kernel.translation
         kernel.register(
@@ -0,0 +1,295 @@
+"""
+Headless job compiler.
+
+Compiles design files into the output of a device driver, without a gui:
+
+    meerk40t compile -d grbl -o out design1.svg design2.dxf
+
+Every file is compiled by its own kernel holding the internal plugins without the gui
+plugin, so wxPython is never imported. The stages are those of the console:
+
+    start       kernel and device startup
+    load        load <file>, the loaders classify the new elements
+    classify    classify the elements the loader left unassigned
+    copy        plan copy
+    preprocess  plan preprocess validate blob
+    optimize    plan preopt optimize
+    save        plan save_job <output>, the driver writes to its mock connection
+    shutdown    kernel shutdown
+
+Files are compiled in parallel worker processes with --jobs, see meerk40t.core.parallel.
+The elapsed time of each stage is reported per file.
+"""
+
+import argparse
+import os
+import time
+
+STAGES = (
+    "start",
+    "load",
+    "classify",
+    "copy",
+    "preprocess",
+    "optimize",
+    "save",
+    "shutdown",
+)
+
+DEVICE_EXTENSIONS = {
+    "balor": "txt",
+    "grbl": "gcode",
+    "lhystudios": "egv",
+    "moshi": "mos",
+    "newly": "hpgl",
+    "ruida": "rd",
+}
+
+
+def pair(value):
+    rv = value.split("=", 1)
+    if len(rv) != 2:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {value}")
+    return rv
+
+
+parser = argparse.ArgumentParser(
+    prog="meerk40t compile",
+    description="Compile design files into device output without a gui.",
+)
+parser.add_argument("input", nargs="+", help="files to compile")
+parser.add_argument(
+    "-d",
+    "--device",
+    choices=sorted(DEVICE_EXTENSIONS),
+    default="grbl",
+    help="device type to compile for",
+)
+parser.add_argument(
+    "-o",
+    "--output",
+    type=str,
+    default=None,
+    help="output directory, next to the input files if not given",
+)
+parser.add_argument(
+    "-x",
+    "--extension",
+    type=str,
+    default=None,
+    help="extension of the output files, defaults to the device type",
+)
+parser.add_argument(
+    "-s",
+    "--set",
+    action="append",
+    type=pair,
+    metavar="key=value",
+    help="set a device variable",
+)
+parser.add_argument(
+    "-j",
+    "--jobs",
+    type=int,
+    default=1,
+    help="number of worker processes (0 = all processors)",
+)
+parser.add_argument(
+    "-v", "--verbose", action="store_true", help="display the console output"
+)
+
+
+def output_filename(filename, device, directory=None, extension=None):
+    """
+    @param filename: input file
+    @param device: device type
+    @param directory: output directory, the directory of the input file if None
+    @param extension: output extension, the default of the device if None
+    @return: name of the output file
+    """
+    if extension is None:
+        extension = DEVICE_EXTENSIONS[device]
+    base = os.path.splitext(os.path.basename(filename))[0]
+    if directory is None:
+        directory = os.path.dirname(os.path.abspath(filename))
+    return os.path.join(directory, f"{base}.{extension.lstrip('.')}")
+
+
+def compile_plugins(kernel, lifecycle):
+    """
+    The internal plugins without the gui plugin.
+    """
+    if lifecycle == "plugins":
+        from meerk40t.internal_plugins import LAZY_PLUGINS, PLUGINS
+        from meerk40t.kernel import LazyPlugin
+
+        plugins = list()
+        for name in PLUGINS:
+            if name.startswith("meerk40t.gui."):
+                continue
+            if name in LAZY_PLUGINS:
+                plugins.append(LazyPlugin(name, **LAZY_PLUGINS[name]))
+            else:
+                plugins.append(kernel.import_plugin(name))
+        return plugins
+
+
+def compile_file(task):
+    """
+    Compiles a single file, in a kernel of its own. Module level, to be sent to worker
+    processes.
+
+    @param task: tuple of input file, output file, device type and device settings
+    @return: dict with the input and output, the stage times, the console lines and
+        an error message or None
+    """
+    from meerk40t.kernel import Kernel
+    from meerk40t.main import APPLICATION_NAME, APPLICATION_VERSION
+
+    filename, output, device, settings = task
+    result = {
+        "input": filename,
+        "output": output,
+        "times": {},
+        "lines": [],
+        "error": None,
+    }
+    times = result["times"]
+    t = time.perf_counter()
+    kernel = Kernel(
+        APPLICATION_NAME,
+        APPLICATION_VERSION,
+        f"{APPLICATION_NAME}_COMPILE",
+        ansi=False,
+        ignore_settings=True,
+    )
+    # Workers run in parallel, none of them may read or write the settings, the
+    # operations or the pens of the user.
+    kernel.prevent_persisting = True
+    # The device boot starts the preferred device, only the requested one is started.
+    kernel.write_persistent("/", "preferred_device", device)
+    kernel.add_plugin(compile_plugins)
+    try:
+        kernel(partial=True)
+        kernel.channel("console").watch(result["lines"].append)
+        service = getattr(kernel, "device", None)
+        if (
+            service is None
+            or service.registered_path != f"provider/device/{device}"
+        ):
+            result["error"] = f"Device type not available: {device}"
+            return result
+        for key, value in settings:
+            current = getattr(service, key, None)
+            if isinstance(current, bool):
+                value = value.lower() in ("1", "true", "yes", "on")
+            elif isinstance(current, (int, float)):
+                value = type(current)(value)
+            setattr(service, key, value)
+        elements = kernel.elements
+        # Every file starts from the same operations.
+        elements.load_default(performclassify=False)
+
+        def stage(name, command=None, function=None):
+            nonlocal t
+            if command is not None:
+                kernel.console(command)
+            if function is not None:
+                function()
+            now = time.perf_counter()
+            times[name] = now - t
+            t = now
+
+        stage("start")
+        if not elements.load(os.path.realpath(filename)):
+            stage("load")
+            result["error"] = f"Could not load: {filename}"
+            return result
+        stage("load")
+
+        def classify():
+            unassigned = list(elements.unassigned_elements())
+            if unassigned:
+                elements.classify(unassigned)
+
+        stage("classify", function=classify)
+        stage("copy", "plan copy\n")
+        stage("preprocess", "plan preprocess validate blob\n")
+        stage("optimize", "plan preopt optimize\n")
+        if os.path.exists(output):
+            os.remove(output)
+        stage("save", f'plan save_job "{output}"\n')
+        if not os.path.exists(output):
+            result["error"] = f"No output written: {output}"
+    except Exception as e:
+        result["error"] = f"{e.__class__.__name__}: {e}"
+    finally:
+        t = time.perf_counter()
+        kernel()
+        times["shutdown"] = time.perf_counter() - t
+    return result
+
+
+def format_result(result):
+    """
+    @param result: result of compile_file
+    @return: report line for the result
+    """
+    times = " ".join(
+        f"{name} {result['times'][name]:.3f}s"
+        for name in STAGES
+        if name in result["times"]
+    )
+    total = sum(result["times"].values())
+    if result["error"] is not None:
+        return f"FAILED {result['input']}: {result['error']} ({times})"
+    return f"{result['input']} -> {result['output']}: {times}, total {total:.3f}s"
+
+
+def run(argv=None):
+    """
+    Entry point of `meerk40t compile`.
+
+    @param argv: command line arguments after `compile`
+    @return: exit code, 1 if any file failed
+    """
+    from meerk40t.core.parallel import parallel_map, resolve_jobs, shutdown
+
+    args = parser.parse_args(argv)
+    if args.output is not None:
+        os.makedirs(args.output, exist_ok=True)
+    tasks = [
+        (
+            filename,
+            output_filename(filename, args.device, args.output, args.extension),
+            args.device,
+            args.set or [],
+        )
+        for filename in args.input
+    ]
+    t0 = time.perf_counter()
+    try:
+        results = parallel_map(compile_file, tasks, jobs=args.jobs, channel=print)
+    finally:
+        shutdown()
+    elapsed = time.perf_counter() - t0
+    failed = 0
+    totals = dict()
+    for result in results:
+        if args.verbose:
+            for line in result["lines"]:
+                print(line)
+        print(format_result(result))
+        if result["error"] is not None:
+            failed += 1
+        for name, value in result["times"].items():
+            totals[name] = totals.get(name, 0) + value
+    print(
+        ", ".join(f"{name} {totals[name]:.3f}s" for name in STAGES if name in totals)
+    )
+    workers = min(resolve_jobs(args.jobs), len(tasks))
+    print(
+        f"Compiled {len(results) - failed}/{len(results)} files "
+        f"in {elapsed:.3f}s with {workers} worker(s)"
+    )
+    return 1 if failed else 0
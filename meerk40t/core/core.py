@@ -2,10 +2,26 @@
 This plugin registers the other major plugins found in core.
 """
 
+from meerk40t.kernel import merge_nodes
+
+# Coalescing of signals sent in storms during bulk edits, see Kernel.signal_policy.
+SIGNAL_POLICIES = {
+    # Nodes changed within one tick are delivered as one list.
+    "element_property_update": {"merge": merge_nodes},
+    "element_property_reload": {"merge": merge_nodes},
+    # Expensive listeners, at most one delivery per interval.
+    "refresh_scene": {"interval": 0.05},
+    "tree_changed": {"interval": 0.1},
+}
+
 
 def plugin(kernel, lifecycle=None):
     _ = kernel.translation
 
+    if lifecycle == "register":
+        for code, policy in SIGNAL_POLICIES.items():
+            kernel.signal_policy(code, **policy)
+
     # Install color caching as early as possible
     if lifecycle == "preregister":
         from .color_cache import install_color_cache
@@ -89,97 +89,31 @@ class CutCode(CutGroup):
             yield "plot", cutobject
         yield "plot_start"
 
-    def provide_statistics(self, include_start=False):
-        result = []
-        cutcode = list(self.flat())
-        if len(cutcode) == 0:
-            item = {
-                "type": "",
-                "total_distance_travel": 0,
-                "total_distance_cut": 0,
-                "total_time_extra": 0,
-                "total_time_travel": 0,
-                "total_time_cut": 0,
-                "time_at_start": 0,
-                "time_at_end_of_travel": 0,
-                "time_at_end_of_burn": 0,
-                "total_internal_travel": 0,
-            }
-            result.append(item)
-            return result
-        stop_at = len(cutcode)
-        total_distance_travel = 0
-        total_distance_cut = 0
-        total_extra = 0
-        total_duration_cut = 0
-        total_duration_travel = 0
-        total_internal_travel = 0
-        if include_start:
-            if self.start is not None:
-                total_distance_travel += abs(
-                    complex(*self.start) - complex(*cutcode[0].start)
-                )
-            else:
-                total_distance_travel += abs(0 - complex(*cutcode[0].start))
-        previous_total_time = 0
-        for i in range(0, stop_at):
-            duration_of_this_travel = 0
-            duration_of_this_burn = 0
-            length_of_previous_travel = 0
-            current = cutcode[i]
-            if i > 0:
-                prev = cutcode[i - 1]
-                length_of_previous_travel = Point.distance(prev.end, current.start)
-                total_distance_travel += length_of_previous_travel
-            rapid_speed = self._native_speed(cutcode)
-            if rapid_speed is not None and rapid_speed != 0:
-                total_duration_travel = total_distance_travel / rapid_speed
-                duration_of_this_travel = length_of_previous_travel / rapid_speed
+    def as_array(self):
+        """
+        Packed, columnar form of the flat cutcode sequence.
 
-            cut_type = type(current).__name__
-            current_length = current.internal_length()
-            current_travel = current.internal_travel()
-            total_internal_travel += current_travel
-            total_distance_cut += current_length + current_travel
-            current_extra = current.extra()
-            total_extra += current_extra
-            cs = current.settings
-            # Speed is in mm/sec while native_speed and distance need to be in native units!
-            native_mm = cs.get("native_mm", 39.3701)
-            default_speed = cs.get("speed", 0) * native_mm
-            native_speed = cs.get("native_speed", default_speed)
-            native_speed *= 0.91
-            default_speed *= 0.91
-            if native_speed != 0:
-                duration_of_this_burn = (current_length + current_travel) / native_speed
-                total_duration_cut += duration_of_this_burn
+        @return: CutCodeArray
+        """
+        from .cutcodearray import CutCodeArray
 
-            end_of_this_travel = previous_total_time + duration_of_this_travel
-            end_of_this_burn = (
-                previous_total_time
-                + duration_of_this_travel
-                + current_extra
-                + duration_of_this_burn
-            )
-            item = {
-                "type": cut_type,
-                "total_distance_travel": total_distance_travel,
-                "total_distance_cut": total_distance_cut,
-                "total_time_extra": total_extra,
-                "total_time_travel": total_duration_travel,
-                "total_time_cut": total_duration_cut,
-                "time_at_start": previous_total_time,
-                "time_at_end_of_travel": end_of_this_travel,
-                "time_at_end_of_burn": end_of_this_burn,
-                "total_internal_travel": total_internal_travel,
-            }
-            # print (item)
-            result.append(item)
-            previous_total_time = (
-                total_duration_cut + total_duration_travel + total_extra
-            )
+        return CutCodeArray.from_cutcode(self)
 
-        return result
+    def provide_statistics(self, include_start=False, estimator=None):
+        """
+        Provides the accumulated travel, cut and time values for every
+        cut in the flat cutcode sequence. These are calculated vectorized
+        on the packed form of the cutcode.
+
+        @param include_start: should the distance include the start
+        @param estimator: motion model for the times, nominal speeds if None
+        @return: list of dicts, one per cut
+        """
+        return self.as_array().provide_statistics(
+            include_start=include_start,
+            default_settings=self.settings,
+            estimator=estimator,
+        )
 
     def length_travel(self, include_start=False, stop_at=-1):
         """
@@ -189,6 +123,7 @@ class CutCode(CutGroup):
         @param stop_at: stop position
         @return:
         """
+        # Only the end points are needed, walking them is cheaper than packing.
         cutcode = list(self.flat())
         if len(cutcode) == 0:
             return 0
@@ -0,0 +1,307 @@
+"""
+CutCodeArray is a packed, columnar form of a flat cutcode sequence.
+
+Rather than one Python object per cut, every cut occupies a row in a set of
+contiguous numpy arrays: the start, control and end points as complex numbers like
+Geomstr, the type of cut and an index into a list of settings. Cuts which are not
+plain vectors (plots, rasters, dwells, waits, etc.) are kept and only their start/end
+and length values are mirrored in the arrays.
+
+Lengths, travel distances and the statistics of CutCode.provide_statistics and the
+time estimator are calculated with vectorized operations on this form.
+"""
+
+
+import numpy as np
+
+from .cubiccut import CubicCut
+from .linecut import LineCut
+from .quadcut import QuadCut
+
+CUT_LINE = 0
+CUT_QUAD = 1
+CUT_CUBIC = 2
+CUT_OBJECT = 3
+
+CUT_TYPE_NAMES = {
+    CUT_LINE: "LineCut",
+    CUT_QUAD: "QuadCut",
+    CUT_CUBIC: "CubicCut",
+}
+
+# Factor applied to burn speeds by CutCode.provide_statistics
+SPEED_FACTOR = 0.91
+
+
+class CutCodeArray:
+    """
+    Packed cutcode, the rows are the cuts in their current direction.
+    """
+
+    def __init__(self, cuts=(), start_position=None):
+        """
+        @param cuts: sequence of CutObjects
+        @param start_position: start position of the cutcode
+        """
+        self.settings = []
+        self.start_position = start_position
+        self.objects = list(cuts)
+        self.index = len(self.objects)
+        kind = []
+        start = []
+        control1 = []
+        control2 = []
+        end = []
+        settings_index = []
+        object_length = []
+        object_travel = []
+        object_extra = []
+        settings_lookup = dict()
+        for cut in self.objects:
+            sx, sy = cut.start
+            ex, ey = cut.end
+            start.append(complex(sx, sy))
+            end.append(complex(ex, ey))
+            cut_type = type(cut)
+            if cut_type is LineCut:
+                kind.append(CUT_LINE)
+                control1.append(0j)
+                control2.append(0j)
+                object_length.append(0.0)
+                object_travel.append(0.0)
+                object_extra.append(0.0)
+            elif cut_type is QuadCut:
+                kind.append(CUT_QUAD)
+                c = cut.c()
+                control1.append(complex(c[0], c[1]))
+                control2.append(0j)
+                object_length.append(0.0)
+                object_travel.append(0.0)
+                object_extra.append(0.0)
+            elif cut_type is CubicCut:
+                kind.append(CUT_CUBIC)
+                c1 = cut.c1()
+                c2 = cut.c2()
+                control1.append(complex(c1[0], c1[1]))
+                control2.append(complex(c2[0], c2[1]))
+                object_length.append(0.0)
+                object_travel.append(0.0)
+                object_extra.append(0.0)
+            else:
+                kind.append(CUT_OBJECT)
+                control1.append(0j)
+                control2.append(0j)
+                object_length.append(cut.internal_length())
+                object_travel.append(cut.internal_travel())
+                object_extra.append(cut.extra())
+            settings = cut.settings
+            if settings is None:
+                settings = dict()
+            idx = settings_lookup.get(id(settings))
+            if idx is None:
+                idx = len(self.settings)
+                self.settings.append(settings)
+                settings_lookup[id(settings)] = idx
+            settings_index.append(idx)
+        self.kind = np.array(kind, dtype=np.int8)
+        self.start = np.array(start, dtype=complex)
+        self.control1 = np.array(control1, dtype=complex)
+        self.control2 = np.array(control2, dtype=complex)
+        self.end = np.array(end, dtype=complex)
+        self.settings_index = np.array(settings_index, dtype=np.int32)
+        # Values of CUT_OBJECT rows, taken from the objects.
+        self.object_length = np.array(object_length, dtype=float)
+        self.object_travel = np.array(object_travel, dtype=float)
+        self.object_extra = np.array(object_extra, dtype=float)
+
+    def __len__(self):
+        return self.index
+
+    def __str__(self):
+        return f"CutCodeArray({self.index} cuts)"
+
+    @classmethod
+    def from_cutcode(cls, cutcode):
+        """
+        Packs the flat sequence of a CutCode (or CutGroup) into arrays.
+
+        @param cutcode: CutGroup to pack
+        @return: CutCodeArray
+        """
+        return cls(list(cutcode.flat()), start_position=cutcode.start)
+
+    def lengths(self):
+        """
+        Length of each cut as calculated by the individual CutObjects.
+
+        @return: float array
+        """
+        n = self.index
+        kind = self.kind[:n]
+        start = self.start[:n]
+        end = self.end[:n]
+        c1 = self.control1[:n]
+        c2 = self.control2[:n]
+        lengths = np.abs(end - start)
+        quads = kind == CUT_QUAD
+        lengths[quads] = np.abs(c1[quads] - start[quads]) + np.abs(
+            end[quads] - c1[quads]
+        )
+        cubics = kind == CUT_CUBIC
+        lengths[cubics] = (
+            np.abs(c1[cubics] - start[cubics])
+            + np.abs(c2[cubics] - c1[cubics])
+            + np.abs(end[cubics] - c2[cubics])
+        )
+        objects = kind == CUT_OBJECT
+        lengths[objects] = self.object_length[:n][objects]
+        return lengths
+
+    def travel_distances(self, include_start=False):
+        """
+        Distance travelled before each cut.
+
+        @param include_start: include travel from the start position to the first cut.
+        @return: float array
+        """
+        n = self.index
+        travel = np.zeros(n, dtype=float)
+        if n == 0:
+            return travel
+        travel[1:] = np.abs(self.start[1:] - self.end[:-1])
+        if include_start:
+            if self.start_position is not None:
+                origin = complex(*self.start_position)
+            else:
+                origin = 0j
+            travel[0] = abs(origin - self.start[0])
+        return travel
+
+    def rapid_speed(self, default_settings=None):
+        """
+        Native rapid speed as used by CutCode: the first cut whose settings
+        provide a native (rapid) speed, otherwise the given default settings.
+        """
+        n = self.index
+        if n:
+            used, first = np.unique(self.settings_index[:n], return_index=True)
+            for idx in used[np.argsort(first)]:
+                cs = self.settings[idx]
+                speed = cs.get("native_rapid_speed", cs.get("native_speed", None))
+                if speed is not None:
+                    return speed
+        if default_settings is None:
+            return None
+        return default_settings.get(
+            "native_rapid_speed", default_settings.get("native_speed", None)
+        )
+
+    def native_speeds(self):
+        """
+        @return: burn speed in native units for every settings entry.
+        """
+        speeds = np.zeros(len(self.settings), dtype=float)
+        for idx, cs in enumerate(self.settings):
+            native_mm = cs.get("native_mm", 39.3701)
+            default_speed = cs.get("speed", 0) * native_mm
+            speeds[idx] = cs.get("native_speed", default_speed)
+        return speeds
+
+    def type_names(self):
+        names = []
+        objects = self.objects
+        for i, kind in enumerate(self.kind[: self.index].tolist()):
+            obj = objects[i]
+            if obj is not None:
+                names.append(type(obj).__name__)
+            else:
+                names.append(CUT_TYPE_NAMES[kind])
+        return names
+
+    def provide_statistics(self, include_start=False, default_settings=None, estimator=None):
+        """
+        Vectorized equivalent of CutCode.provide_statistics.
+
+        @param include_start: include travel from the start position.
+        @param default_settings: settings to look up the rapid speed if no cut provides one.
+        @param estimator: motion model (see core.estimator) for the times, nominal speeds if None.
+        @return: list of dicts, one per cut.
+        """
+        n = self.index
+        if n == 0:
+            return [
+                {
+                    "type": "",
+                    "total_distance_travel": 0,
+                    "total_distance_cut": 0,
+                    "total_time_extra": 0,
+                    "total_time_travel": 0,
+                    "total_time_cut": 0,
+                    "time_at_start": 0,
+                    "time_at_end_of_travel": 0,
+                    "time_at_end_of_burn": 0,
+                    "total_internal_travel": 0,
+                }
+            ]
+        objects = self.kind[:n] == CUT_OBJECT
+        travel = self.travel_distances(include_start)
+        total_distance_travel = np.cumsum(travel)
+        internal_travel = np.where(objects, self.object_travel[:n], 0.0)
+        burn_distance = self.lengths() + internal_travel
+        if estimator is not None:
+            duration_travel, duration_burn, extra = estimator.durations(
+                self, include_start=include_start, default_settings=default_settings
+            )
+            total_time_travel = np.cumsum(duration_travel)
+            duration_travel[0] = 0
+        else:
+            # The initial travel only counts for the totals, not for the first duration.
+            travel[0] = 0
+            rapid_speed = self.rapid_speed(default_settings)
+            if rapid_speed is not None and rapid_speed != 0:
+                total_time_travel = total_distance_travel / rapid_speed
+                duration_travel = travel / rapid_speed
+            else:
+                total_time_travel = np.zeros(n, dtype=float)
+                duration_travel = np.zeros(n, dtype=float)
+            extra = np.where(objects, self.object_extra[:n], 0.0)
+            speed = self.native_speeds()[self.settings_index[:n]] * SPEED_FACTOR
+            duration_burn = np.zeros(n, dtype=float)
+            moving = speed != 0
+            duration_burn[moving] = burn_distance[moving] / speed[moving]
+
+        total_distance_cut = np.cumsum(burn_distance)
+        total_internal_travel = np.cumsum(internal_travel)
+        total_extra = np.cumsum(extra)
+        total_time_cut = np.cumsum(duration_burn)
+        time_at_start = np.zeros(n, dtype=float)
+        time_at_start[1:] = (total_time_cut + total_time_travel + total_extra)[:-1]
+        end_of_travel = time_at_start + duration_travel
+        end_of_burn = end_of_travel + extra + duration_burn
+
+        return [
+            {
+                "type": t,
+                "total_distance_travel": a,
+                "total_distance_cut": b,
+                "total_time_extra": c,
+                "total_time_travel": d,
+                "total_time_cut": e,
+                "time_at_start": f,
+                "time_at_end_of_travel": g,
+                "time_at_end_of_burn": h,
+                "total_internal_travel": k,
+            }
+            for t, a, b, c, d, e, f, g, h, k in zip(
+                self.type_names(),
+                total_distance_travel.tolist(),
+                total_distance_cut.tolist(),
+                total_extra.tolist(),
+                total_time_travel.tolist(),
+                total_time_cut.tolist(),
+                time_at_start.tolist(),
+                end_of_travel.tolist(),
+                end_of_burn.tolist(),
+                total_internal_travel.tolist(),
+            )
+        ]
@@ -83,6 +83,7 @@ class RasterCut(CutObject):
             filter=post_filter,
             laserspot=laserspot,
             special=special,
+            pixels=image,
         )
 
     def reversible(self):
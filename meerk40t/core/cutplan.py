@@ -31,7 +31,15 @@ from .cutcode.cutobject import CutObject
 from .cutcode.rastercut import RasterCut
 from .elements.element_types import op_vector_nodes
 from .node.node import Node
+from .node.nutils import link_cutgroup, sources_to_cutobjects
 from .node.util_console import ConsoleOperation
+from .parallel import parallel_map, resolve_jobs
+from .plancache import (
+    CACHED_OPERATIONS,
+    combined_fingerprint,
+    operation_fingerprint,
+)
+from .spatial import PointGrid
 from .units import Length
 
 """
@@ -49,6 +57,10 @@ except Exception as e:
 """
 
 
+# Above this number of groups, inner-first ordering finds the closest group with a PointGrid.
+INDEXED_GROUP_THRESHOLD = 100
+
+
 class CutPlanningFailedError(Exception):
     pass
 
@@ -82,6 +94,11 @@ class CutPlan:
         self.channel = self.context.channel("optimize", timestamp=True)
         self.outline = None
         self._previous_bounds = None
+        # Worker processes for conversions, None uses the planner setting.
+        self.jobs = None
+        self._prepared = {}
+        self._fingerprints = {}
+        self._optimized_key = None
 
     def __str__(self):
         parts = [self.name]
@@ -426,24 +443,153 @@ class CutPlan:
                 ):
                     yield op
                     continue
-                passes = op.implicit_passes
-                if context.opt_merge_passes and (
-                    context.opt_nearest_neighbor or context.opt_inner_first
+                copies, passes = self._blob_copies(op)
+                yield from self._blob_convert(op, copies=copies, passes=passes)
+
+    def _blob_copies(self, op):
+        """
+        Number of cutcode copies and the passes of each copy for the given op.
+
+        @param op:
+        @return: copies, passes
+        """
+        context = self.context
+        passes = op.implicit_passes
+        if context.opt_merge_passes and (
+            context.opt_nearest_neighbor or context.opt_inner_first
+        ):
+            # Providing we do some sort of post-processing of blobs,
+            # then merge passes is handled by the greedy or inner_first algorithms
+
+            # So, we only need 1 copy and to set the passes.
+            return 1, passes
+        # We do passes by making copies of the cutcode.
+        return passes, 1
+
+    def _prepare_cutobjects(self, grouped_plan, jobs):
+        """
+        Converts the paths of all vector operations into cutobjects using worker
+        processes. The results are kept for _blob_convert, one for every copy of
+        the cutcode that will be requested.
+
+        Only the conversion from paths to cutobjects is done in the workers, the
+        paths are still gathered from the nodes in this process.
+
+        @param grouped_plan:
+        @param jobs: number of worker processes
+        @return:
+        """
+        closed_distance = self.context.opt_closed_distance
+        requests = []
+        for plan in grouped_plan:
+            for op in plan:
+                if not hasattr(op, "cutobject_sources"):
+                    continue
+                copies, passes = self._blob_copies(op)
+                if self._is_cached(op, copies, passes):
+                    continue
+                sources = list(
+                    op.cutobject_sources(
+                        closed_distance=closed_distance, passes=passes
+                    )
+                )
+                if not sources or any(
+                    source.get("offset_routine") is not None for _, source in sources
                 ):
-                    # Providing we do some sort of post-processing of blobs,
-                    # then merge passes is handled by the greedy or inner_first algorithms
+                    # Offset routines are bound to the node and cannot be pickled.
+                    continue
+                for idx in range(copies):
+                    requests.append((op, passes, sources))
+        total = sum(len(sources) for op, passes, sources in requests)
+        if total == 0:
+            return
+        # Several chunks per worker to even out differently sized operations.
+        chunk_size = max(1, total // (4 * jobs))
+        tasks = []
+        layout = []
+        for op, passes, sources in requests:
+            chunks = 0
+            for i in range(0, len(sources), chunk_size):
+                tasks.append([source for _, source in sources[i : i + chunk_size]])
+                chunks += 1
+            layout.append(chunks)
+        t0 = perf_counter()
+        results = iter(
+            parallel_map(sources_to_cutobjects, tasks, jobs=jobs, channel=self.channel)
+        )
+        for (op, passes, sources), chunks in zip(requests, layout):
+            groups = []
+            sources = iter(sources)
+            for c in range(chunks):
+                for source_groups in next(results):
+                    # Colors stay in this process, settings are shared again.
+                    color, source = next(sources)
+                    settings = source["settings"]
+                    for group in source_groups:
+                        group.color = color
+                        group.settings = settings
+                        for cut in group:
+                            cut.color = color
+                            cut.settings = settings
+                        link_cutgroup(group)
+                        groups.append(group)
+            self._prepared.setdefault((id(op), passes), []).append(groups)
+        if self.channel:
+            self.channel(
+                f"Converted {total} paths of {len(requests)} operations with {jobs} workers in {perf_counter() - t0:.3f}s"
+            )
 
-                    # So, we only need 1 copy and to set the passes.
-                    yield from self._blob_convert(op, copies=1, passes=passes)
-                else:
-                    # We do passes by making copies of the cutcode.
-                    yield from self._blob_convert(op, copies=passes, passes=1)
+    def plan_cache(self):
+        """
+        The planner's plan cache, None if caching is disabled.
+        """
+        cache = getattr(self.context, "plan_cache", None)
+        if cache is None:
+            return None
+        max_cuts = self.context.setting(int, "opt_plan_cache_size", 250000)
+        if cache.max_cuts != max_cuts:
+            cache.max_cuts = max_cuts
+            cache.trim()
+        return cache if cache.enabled else None
+
+    def _operation_fingerprint(self, op):
+        """
+        Fingerprint of the op, None if the cutcode of this op is not cached.
+        Fingerprints are computed once per blob stage.
+        """
+        if getattr(op, "type", None) not in CACHED_OPERATIONS:
+            return None
+        if self.plan_cache() is None:
+            return None
+        try:
+            return self._fingerprints[id(op)]
+        except KeyError:
+            pass
+        fingerprint = operation_fingerprint(op)
+        self._fingerprints[id(op)] = fingerprint
+        return fingerprint
+
+    def _cache_key(self, fingerprint, passes, pass_idx):
+        return fingerprint, passes, pass_idx, self.context.opt_closed_distance
+
+    def _is_cached(self, op, copies, passes):
+        fingerprint = self._operation_fingerprint(op)
+        if fingerprint is None:
+            return False
+        cache = self.plan_cache()
+        return all(
+            self._cache_key(fingerprint, passes, pass_idx) in cache
+            for pass_idx in range(copies)
+        )
 
     def _blob_convert(self, op, copies, passes, force_idx=None):
         """
         Converts the given op into cutcode. Provides `copies` copies of that cutcode, sets
         the passes to passes for each cutcode object.
 
+        The cutcode of ops that were converted before with identical settings and
+        children is taken from the plan cache.
+
         @param op:
         @param copies:
         @param passes:
@@ -451,6 +597,8 @@ class CutPlan:
         @return:
         """
         context = self.context
+        cache = self.plan_cache()
+        fingerprint = self._operation_fingerprint(op)
         for pass_idx in range(copies):
             # if the settings dictionary doesn't exist we use the defined instance dictionary
             try:
@@ -461,19 +609,36 @@ class CutPlan:
             settings = (
                 settings_dict if op.implicit_passes == passes else dict(settings_dict)
             )
-            cutcode = CutCode(
-                op.as_cutobjects(
-                    closed_distance=context.opt_closed_distance,
-                    passes=passes,
-                ),
-                settings=settings,
-            )
+            cutcode = None
+            key = None
+            if fingerprint is not None:
+                key = self._cache_key(fingerprint, passes, pass_idx)
+                cached = cache.get(key, settings)
+                if cached is not None:
+                    cutcode = cached[0]
+            if cutcode is None:
+                prepared = self._prepared.get((id(op), passes))
+                if prepared:
+                    cutobjects = prepared.pop(0)
+                else:
+                    cutobjects = op.as_cutobjects(
+                        closed_distance=context.opt_closed_distance,
+                        passes=passes,
+                    )
+                cutcode = CutCode(cutobjects, settings=settings)
+                if key is not None and len(cutcode):
+                    cache.put(key, [cutcode])
             if len(cutcode) == 0:
                 break
             op_type = getattr(op, "type", "")
             cutcode.constrained = op_type == "op cut" and context.opt_inner_first
             cutcode.pass_index = pass_idx if force_idx is None else force_idx
             cutcode.original_op = op_type
+            cutcode.fingerprint = (
+                None
+                if key is None
+                else combined_fingerprint(fingerprint, repr((key[1:], force_idx)))
+            )
             yield cutcode
 
     def _to_merged_plan(self, blob_plan):
@@ -499,6 +664,10 @@ class CutPlan:
                 if blob.constrained:
                     # if any merged object is constrained, then combined blob is also constrained.
                     last_item.constrained = True
+                last_item.fingerprint = combined_fingerprint(
+                    getattr(last_item, "fingerprint", None),
+                    getattr(blob, "fingerprint", None),
+                )
                 last_item.extend(blob)
 
             else:
@@ -607,6 +776,7 @@ class CutPlan:
 
         plan = list(self.plan)
         self.plan.clear()
+        images = iter(self._image_geometries(plan))
         g = Geomstr()
         settings_index = 0
         for c in plan:
@@ -638,12 +808,8 @@ class CutPlan:
                 for elem in c.children:
                     if hasattr(elem, "as_image"):
                         settings["raster"] = True
-                        image, box = elem.as_image()
-                        m = elem.matrix
                         start_index = g.index
-                        image_geom = Geomstr.image(image)
-                        image_geom.transform(m)
-                        g.append(image_geom)
+                        g.append(next(images))
                         end_index = g.index
                         g.flag_settings(settings_index, start_index, end_index)
             else:
@@ -654,6 +820,34 @@ class CutPlan:
         if g:
             self.plan.append(g)
 
+    def parallel_jobs(self):
+        """
+        Number of worker processes to use for the conversion stages. Set by
+        `plan --jobs`, otherwise given by the planner setting.
+        """
+        jobs = self.jobs
+        if jobs is None:
+            jobs = self.context.setting(int, "opt_parallel_jobs", 1)
+        return resolve_jobs(jobs)
+
+    def _image_geometries(self, plan):
+        """
+        Converts all images of raster and image operations within the plan into
+        geometry, in plan order. Runs in parallel if parallel jobs are set.
+        """
+        tasks = []
+        for c in plan:
+            c_type = getattr(c, "type", None)
+            if c_type not in ("op raster", "op image"):
+                continue
+            for elem in c.children:
+                if hasattr(elem, "as_image"):
+                    image, box = elem.as_image()
+                    tasks.append((image, elem.matrix))
+        return parallel_map(
+            image_to_geometry, tasks, jobs=self.parallel_jobs(), channel=self.channel
+        )
+
     def blob(self):
         """
         Blob converts User operations to CutCode objects.
@@ -672,10 +866,15 @@ class CutPlan:
         context = self.context
         grouped_plan = list(self._to_grouped_plan(self.plan))
         t1 = perf_counter()
+        jobs = self.parallel_jobs()
+        if jobs > 1:
+            self._prepare_cutobjects(grouped_plan, jobs)
         if context.opt_merge_ops and not context.opt_merge_passes:
             blob_plan = list(self._to_blob_plan_passes_first(grouped_plan))
         else:
             blob_plan = list(self._to_blob_plan(grouped_plan))
+        self._prepared.clear()
+        self._fingerprints.clear()
         t2 = perf_counter()
         self.plan.clear()
         self.plan.extend(self._to_merged_plan(blob_plan))
@@ -719,6 +918,16 @@ class CutPlan:
         if not has_cutcode:
             return
 
+        self._optimized_key = self._optimization_key()
+        if self._optimized_key is not None:
+            cached = self.plan_cache().get(self._optimized_key)
+            if cached is not None:
+                self.plan.clear()
+                self.plan.extend(cached)
+                if self.channel:
+                    self.channel("Optimized plan taken from plan cache")
+                return
+
         if context.opt_effect_combine:
             self.commands.append(self.combine_effects)
         if self.channel:
@@ -747,6 +956,50 @@ class CutPlan:
             # Fallback: ensure burns_done logic is handled even when optimization is disabled
             self.commands.append(self.basic_cutcode_sequencing)
         self.commands.append(self.merge_cutcode)
+        if self._optimized_key is not None:
+            self.commands.append(self.cache_optimized)
+
+    def _optimization_key(self):
+        """
+        Key of the optimized plan within the plan cache, None if the plan
+        cannot be cached. The key covers the fingerprints of all cutcode in
+        the plan, the optimization settings and the device position and scale.
+        """
+        if self.plan_cache() is None:
+            return None
+        fingerprints = []
+        for item in self.plan:
+            fingerprint = getattr(item, "fingerprint", None)
+            if not isinstance(item, CutCode) or fingerprint is None:
+                return None
+            fingerprints.append(fingerprint)
+        context = self.context
+        options = sorted(
+            (key, value)
+            for key, value in context.__dict__.items()
+            if key.startswith("opt_")
+            and key not in ("opt_parallel_jobs", "opt_plan_cache_size")
+        )
+        try:
+            device = (
+                context.device.native,
+                context.device.view.native_scale_x,
+                context.device.view.native_scale_y,
+            )
+        except AttributeError:
+            device = None
+        return combined_fingerprint(*fingerprints), repr(options), repr(device)
+
+    def cache_optimized(self):
+        """
+        Stores the optimized plan in the plan cache.
+        """
+        key = self._optimized_key
+        self._optimized_key = None
+        if key is None:
+            return
+        if all(isinstance(item, CutCode) for item in self.plan):
+            self.plan_cache().put(key, self.plan)
 
     def combine_effects(self):
         """
@@ -1828,6 +2081,7 @@ class CutPlan:
 
     def clear(self):
         self._previous_bounds = None
+        self._optimized_key = None
         self.plan.clear()
         self.commands.clear()
 
@@ -1948,6 +2202,19 @@ class CutPlan:
             )
 
 
+def image_to_geometry(task):
+    """
+    Worker function converting an image and its matrix into geometry.
+
+    @param task: image, matrix
+    @return: Geomstr
+    """
+    image, matrix = task
+    image_geom = Geomstr.image(image)
+    image_geom.transform(matrix)
+    return image_geom
+
+
 def is_inside(inner, outer, tolerance=0, debug=False):
     """
     Test that path1 is inside path2.
@@ -2535,32 +2802,13 @@ def _sequence_skip_groups(unordered, hatch_optimize, kernel=None, channel=None):
     return ordered_skip, unordered
 
 
-def short_travel_cutcode_legacy(
-    context: CutCode,
-    kernel=None,
-    channel=None,
-    complete_path: Optional[bool] = False,
-    grouped_inner: Optional[bool] = False,
-    hatch_optimize: Optional[bool] = False,
-):
+def _extract_skip_groups(context, hatch_optimize, channel=None):
     """
-    Selects cutcode from candidate cutcode (burns_done < passes in this CutCode),
-    optimizing with greedy/brute for shortest distances optimizations.
+    Removes the skip-marked groups (hatches) from context, for the greedy
+    short-travel optimizations.
 
-    For paths starting at exactly the same point forward paths are preferred over reverse paths
-
-    We start at either 0,0 or the value given in `context.start`
-
-    This is time-intense hyper-optimized code, so it contains several seemingly redundant
-    checks.
+    @return: list of removed skip groups, sequenced separately afterwards
     """
-    if channel:
-        start_length = context.length_travel(True)
-        start_time = time()
-        start_times = times()
-        channel("Executing Greedy Short-Travel optimization")
-        channel(f"Length at start: {start_length:.0f} steps")
-    
     # CRITICAL FIX FOR HATCHED GEOMETRIES:
     # When hatch_optimize=True, extract skip groups for separate travel optimization.
     # When hatch_optimize=False, extract skip groups for unoptimized processing.
@@ -2605,6 +2853,157 @@ def short_travel_cutcode_legacy(
             unordered = skip_groups
             context.clear()
     # else: No skip groups, keep context as-is
+    return unordered
+
+
+def _start_short_travel(context, channel, message):
+    """
+    Reports the start of a short-travel optimization.
+
+    @return: values needed by _finish_short_travel to report the result
+    """
+    if not channel:
+        return None
+    start_length = context.length_travel(True)
+    channel(message)
+    channel(f"Length at start: {start_length:.0f} steps")
+    return start_length, time(), times()
+
+
+def _path_continuation(ordered, curr):
+    """
+    Continuation of the subpath of the last ordered cut: the next segment in the
+    direction the path is burned, or the last cut again in reverse if the path
+    cannot be continued and it needs more burns.
+
+    @param ordered: cuts ordered so far
+    @param curr: current position, complex
+    @return: closest, backwards, distance. closest is None if there is no continuation.
+    """
+    closest = None
+    backwards = False
+    distance = float("inf")
+
+    try:
+        last_segment = ordered[-1]
+    except IndexError:
+        pass
+    else:
+        if last_segment.normal:
+            # Attempt to initialize value to next segment in subpath
+            cut = last_segment.next
+            if cut and cut.burns_done < cut.passes:
+                closest = cut
+                backwards = False
+                start = closest.start
+                distance = abs(complex(start[0], start[1]) - curr)
+        else:
+            # Attempt to initialize value to previous segment in subpath
+            cut = last_segment.previous
+            if cut and cut.burns_done < cut.passes:
+                closest = cut
+                backwards = True
+                end = closest.end
+                distance = abs(complex(end[0], end[1]) - curr)
+        # Gap or continuing on path not permitted, try reversing
+        if (
+            distance > 5  # Fixed: 1/20" = ~5 pixels, not 50
+            and last_segment.burns_done < last_segment.passes
+            and last_segment.reversible()
+            and last_segment.next is not None
+        ):
+            # last_segment is a copy, so we need to get original
+            closest = last_segment.next.previous
+            backwards = last_segment.normal
+            distance = 0  # By definition since we are reversing and reburning
+    return closest, backwards, distance
+
+
+def _coincident_direction(closest, backwards):
+    """
+    Change direction if other direction is coincident and has more burns remaining
+
+    @return: closest, backwards
+    """
+    if backwards:
+        if (
+            closest.next
+            and closest.next.burns_done <= closest.burns_done
+            and closest.next.start == closest.end
+        ):
+            closest = closest.next
+            backwards = False
+    elif closest.reversible():
+        if (
+            closest.previous
+            and closest.previous is not closest
+            and closest.previous.burns_done < closest.burns_done
+            and closest.previous.end == closest.start
+        ):
+            closest = closest.previous
+            backwards = True
+    return closest, backwards
+
+
+def _finish_short_travel(
+    ordered, unordered, context, hatch_optimize, kernel, channel, start_report
+):
+    """
+    Appends the separately sequenced skip groups to ordered, sets its start and
+    reports the result of a short-travel optimization.
+    """
+    if unordered:
+        # Sequence skip groups using helper function
+        ordered_skip_groups, unordered = _sequence_skip_groups(
+            unordered, hatch_optimize, kernel=kernel, channel=channel
+        )
+        # As these are reversed, we reverse again...
+        ordered.extend(reversed(unordered))
+        ordered.extend(ordered_skip_groups)
+    if context.start is not None:
+        ordered._start_x, ordered._start_y = context.start
+    else:
+        ordered._start_x = 0
+        ordered._start_y = 0
+    if channel and start_report is not None:
+        start_length, start_time, start_times = start_report
+        end_times = times()
+        end_length = ordered.length_travel(True)
+        try:
+            delta = (end_length - start_length) / start_length
+        except ZeroDivisionError:
+            delta = 0
+        channel(
+            f"Length at end: {end_length:.0f} steps "
+            f"({delta:+.0%}), "
+            f"optimized in {time() - start_time:.3f} "
+            f"elapsed seconds using {end_times[0] - start_times[0]:.3f} seconds CPU"
+        )
+
+
+def short_travel_cutcode_legacy(
+    context: CutCode,
+    kernel=None,
+    channel=None,
+    complete_path: Optional[bool] = False,
+    grouped_inner: Optional[bool] = False,
+    hatch_optimize: Optional[bool] = False,
+):
+    """
+    Selects cutcode from candidate cutcode (burns_done < passes in this CutCode),
+    optimizing with greedy/brute for shortest distances optimizations.
+
+    For paths starting at exactly the same point forward paths are preferred over reverse paths
+
+    We start at either 0,0 or the value given in `context.start`
+
+    This is time-intense hyper-optimized code, so it contains several seemingly redundant
+    checks.
+    """
+    start_report = _start_short_travel(
+        context, channel, "Executing Greedy Short-Travel optimization"
+    )
+    unordered = _extract_skip_groups(context, hatch_optimize, channel)
 
     curr = context.start
     curr = 0 if curr is None else complex(curr[0], curr[1])
@@ -2633,42 +3032,7 @@ def short_travel_cutcode_legacy(
             )
             busy.change(msg=message, keep=2)
             busy.show()
-        closest = None
-        backwards = False
-        distance = float("inf")
-
-        try:
-            last_segment = ordered[-1]
-        except IndexError:
-            pass
-        else:
-            if last_segment.normal:
-                # Attempt to initialize value to next segment in subpath
-                cut = last_segment.next
-                if cut and cut.burns_done < cut.passes:
-                    closest = cut
-                    backwards = False
-                    start = closest.start
-                    distance = abs(complex(start[0], start[1]) - curr)
-            else:
-                # Attempt to initialize value to previous segment in subpath
-                cut = last_segment.previous
-                if cut and cut.burns_done < cut.passes:
-                    closest = cut
-                    backwards = True
-                    end = closest.end
-                    distance = abs(complex(end[0], end[1]) - curr)
-            # Gap or continuing on path not permitted, try reversing
-            if (
-                distance > 5  # Fixed: 1/20" = ~5 pixels, not 50
-                and last_segment.burns_done < last_segment.passes
-                and last_segment.reversible()
-                and last_segment.next is not None
-            ):
-                # last_segment is a copy, so we need to get original
-                closest = last_segment.next.previous
-                backwards = last_segment.normal
-                distance = 0  # By definition since we are reversing and reburning
+        closest, backwards, distance = _path_continuation(ordered, curr)
 
         # Stay on path in same direction if gap <= 1/20" i.e. path not quite closed
         # Travel only if path is completely burned or gap > 1/20"
@@ -2710,24 +3074,7 @@ def short_travel_cutcode_legacy(
         if closest is None:
             break
 
-        # Change direction if other direction is coincident and has more burns remaining
-        if backwards:
-            if (
-                closest.next
-                and closest.next.burns_done <= closest.burns_done
-                and closest.next.start == closest.end
-            ):
-                closest = closest.next
-                backwards = False
-        elif closest.reversible():
-            if (
-                closest.previous
-                and closest.previous is not closest
-                and closest.previous.burns_done < closest.burns_done
-                and closest.previous.end == closest.start
-            ):
-                closest = closest.previous
-                backwards = True
+        closest, backwards = _coincident_direction(closest, backwards)
 
         closest.burns_done += 1
         c = copy(closest)
@@ -2736,36 +3083,116 @@ def short_travel_cutcode_legacy(
         end = c.end
         curr = complex(end[0], end[1])
         ordered.append(c)
-    # print (f"Now we have {len(ordered)} items in list")
-    if unordered:
-        # Sequence skip groups using helper function
-        ordered_skip_groups, unordered = _sequence_skip_groups(
-            unordered, hatch_optimize, kernel=kernel, channel=channel
+    _finish_short_travel(
+        ordered, unordered, context, hatch_optimize, kernel, channel, start_report
+    )
+    return ordered
+
+
+def short_travel_cutcode_indexed(
+    context: CutCode,
+    kernel=None,
+    channel=None,
+    complete_path: Optional[bool] = False,
+    grouped_inner: Optional[bool] = False,
+    hatch_optimize: Optional[bool] = False,
+):
+    """
+    Greedy short-travel optimization making the same choices as
+    short_travel_cutcode_legacy, without scanning all candidates for every cut.
+
+    The start points of all candidate cuts, and the end points of reversible ones,
+    are kept in a PointGrid. Points of a cut are removed once all its passes are
+    burned, so every nearest query only sees the remaining cuts. Ties are resolved
+    in candidate order, start points before end points, as the legacy scan does.
+    """
+    start_report = _start_short_travel(
+        context, channel, "Executing indexed Short-Travel optimization"
+    )
+    unordered = _extract_skip_groups(context, hatch_optimize, channel)
+
+    curr = context.start
+    curr = 0 if curr is None else complex(curr[0], curr[1])
+
+    cutcode_len = 0
+    for c in context.flat():
+        cutcode_len += 1
+        c.burns_done = 0
+
+    # Points of cut i have the keys 2 * i (start) and 2 * i + 1 (end).
+    candidates = []
+    index_of = {}
+    for cut in context.candidate(
+        complete_path=complete_path, grouped_inner=grouped_inner
+    ):
+        if id(cut) not in index_of:
+            index_of[id(cut)] = len(candidates)
+            candidates.append(cut)
+    points = []
+    for i, cut in enumerate(candidates):
+        always = (
+            not complete_path
+            or cut.closed
+            or cut.original_op in ("op cut", "op engrave")
         )
-        # As these are reversed, we reverse again...
-        ordered.extend(reversed(unordered))
-        ordered.extend(ordered_skip_groups)
-    # print (f"And after extension {len(ordered)} items in list")
-    # for c in ordered:
-    #     print (f"{type(c).__name__} - {len(c) if isinstance(c, (list, tuple)) else '-childless-'}")
-    if context.start is not None:
-        ordered._start_x, ordered._start_y = context.start
+        if always or cut.first:
+            points.append((2 * i, cut.start))
+        if cut.reversible() and (always or cut.last):
+            points.append((2 * i + 1, cut.end))
+    grid = PointGrid.for_points(p for key, p in points)
+    for key, (x, y) in points:
+        grid.insert(key, x, y)
+
+    ordered = CutCode()
+    current_pass = 0
+    if kernel:
+        busy = kernel.busyinfo
+        _ = kernel.translation
     else:
-        ordered._start_x = 0
-        ordered._start_y = 0
-    if channel:
-        end_times = times()
-        end_length = ordered.length_travel(True)
-        try:
-            delta = (end_length - start_length) / start_length
-        except ZeroDivisionError:
-            delta = 0
-        channel(
-            f"Length at end: {end_length:.0f} steps "
-            f"({delta:+.0%}), "
-            f"optimized in {time() - start_time:.3f} "
-            f"elapsed seconds using {end_times[0] - start_times[0]:.3f} seconds CPU"
-        )
+        busy = None
+    while True:
+        current_pass += 1
+        if current_pass % 50 == 0 and busy and busy.shown:
+            message = _("Pass {cpass}/{tpass}").format(
+                cpass=current_pass, tpass=cutcode_len
+            )
+            busy.change(msg=message, keep=2)
+            busy.show()
+
+        closest, backwards, distance = _path_continuation(ordered, curr)
+
+        # Stay on path in same direction if gap <= 1/20" i.e. path not quite closed
+        # Travel only if path is completely burned or gap > 1/20"
+        if distance > 5:
+            found = grid.nearest(curr.real, curr.imag)
+            if found is not None:
+                index, is_end = divmod(found[1], 2)
+                cut = candidates[index]
+                p = cut.end if is_end else cut.start
+                if abs(complex(p[0], p[1]) - curr) < distance:
+                    closest = cut
+                    backwards = bool(is_end)
+
+        if closest is None:
+            break
+
+        closest, backwards = _coincident_direction(closest, backwards)
+
+        closest.burns_done += 1
+        if closest.burns_done >= closest.passes:
+            index = index_of.get(id(closest))
+            if index is not None:
+                grid.remove(2 * index)
+                grid.remove(2 * index + 1)
+        c = copy(closest)
+        if backwards:
+            c.reverse()
+        end = c.end
+        curr = complex(end[0], end[1])
+        ordered.append(c)
+    _finish_short_travel(
+        ordered, unordered, context, hatch_optimize, kernel, channel, start_report
+    )
     return ordered
 
 
@@ -2938,6 +3365,8 @@ def short_travel_cutcode_optimized(
         # Use group-preserving optimization that respects inner-first without grouping pieces
         if channel:
             channel("Using group-preserving optimization for inner-first hierarchy")
+        if len(context) > INDEXED_GROUP_THRESHOLD:
+            return _indexed_group_preserving_selection(context, complete_path, channel)
         return _group_preserving_selection(context, complete_path, channel)
     
     # Use standard travel optimization on individual cuts
@@ -2962,10 +3391,10 @@ def short_travel_cutcode_optimized(
         ordered_cuts = _spatial_optimized_selection(all_candidates, start_pos)
 
     else:
-        # Very large dataset: Use legacy algorithm
+        # Very large dataset: Use the legacy choices, with a spatial index
         if channel:
-            channel("Using legacy algorithm for very large dataset")
-        return short_travel_cutcode_legacy(
+            channel("Using indexed algorithm for very large dataset")
+        return short_travel_cutcode_indexed(
             context=context,
             kernel=kernel,
             channel=channel,
@@ -3441,6 +3870,142 @@ def _group_preserving_selection(context, complete_path, channel):
     return ordered
 
 
+def _indexed_group_preserving_selection(context, complete_path, channel):
+    """
+    Group-preserving travel optimization making the same choices as
+    _group_preserving_selection, for many groups.
+
+    Groups become ready once all the groups they contain are processed. The
+    candidate cuts of all ready groups are kept in a PointGrid, so the closest
+    ready group is found with one nearest query rather than by measuring every
+    cut of every ready group for every group processed.
+
+    Args:
+        context: CutCode containing CutGroups with containment relationships
+        complete_path: Path completion requirement
+        channel: Optional logging channel
+
+    Returns:
+        CutCode with optimized individual cuts maintaining inner-first hierarchy
+    """
+    if channel:
+        channel(
+            f"Indexed group-preserving optimization: {len(context)} groups with inner-first constraints"
+        )
+
+    candidate_groups = list(context)
+    for group in candidate_groups:
+        for cut in group.flat():
+            cut.burns_done = 0
+
+    def group_candidates(group):
+        if isinstance(group, CutGroup):
+            return list(
+                group.candidate(complete_path=complete_path, grouped_inner=False)
+            )
+        return [group] if group.burns_done < group.passes else []
+
+    # Number of unprocessed inner groups, and the outer groups waiting on each group.
+    pending = [0] * len(candidate_groups)
+    waiting = {}
+    for idx, group in enumerate(candidate_groups):
+        contains = getattr(group, "contains", None)
+        if contains:
+            inner_ids = {id(inner) for inner in contains}
+            pending[idx] = len(inner_ids)
+            for inner_id in inner_ids:
+                waiting.setdefault(inner_id, []).append(idx)
+
+    # Keys (group index, 2 * cut index [+ 1 for the end point]) resolve ties in group order.
+    grid = PointGrid.for_points(
+        cut.start for group in candidate_groups for cut in group.flat()
+    )
+    group_cuts = {}
+    ready = set()
+
+    def make_ready(idx):
+        ready.add(idx)
+        cuts = group_candidates(candidate_groups[idx])
+        group_cuts[idx] = cuts
+        for j, cut in enumerate(cuts):
+            x, y = cut.start
+            grid.insert((idx, 2 * j), x, y)
+            if hasattr(cut, "reversible") and cut.reversible():
+                x, y = cut.end
+                grid.insert((idx, 2 * j + 1), x, y)
+
+    for idx in range(len(candidate_groups)):
+        if pending[idx] == 0:
+            make_ready(idx)
+
+    ordered_cuts = []
+    processed = [False] * len(candidate_groups)
+    remaining = len(candidate_groups)
+    curr_x, curr_y = context.start or (0, 0)
+    while remaining:
+        if len(ready) == 1:
+            idx = next(iter(ready))
+        elif ready:
+            found = grid.nearest(curr_x, curr_y)
+            idx = min(ready) if found is None else found[1][0]
+        else:
+            # Safety break - choose among all remaining groups
+            unprocessed = [i for i, done in enumerate(processed) if not done]
+            if channel:
+                channel(
+                    f"Warning: Breaking inner-first loop, added {len(unprocessed)} remaining groups"
+                )
+            idx = unprocessed[0]
+            best_distance = float("inf")
+            if len(unprocessed) > 1:
+                for i in unprocessed:
+                    for cut in group_candidates(candidate_groups[i]):
+                        points = [cut.start]
+                        if hasattr(cut, "reversible") and cut.reversible():
+                            points.append(cut.end)
+                        for x, y in points:
+                            distance = (x - curr_x) ** 2 + (y - curr_y) ** 2
+                            if distance < best_distance:
+                                best_distance = distance
+                                idx = i
+
+        group = candidate_groups[idx]
+        cuts = group_cuts.pop(idx, None)
+        if cuts is None:
+            cuts = group_candidates(group)
+        else:
+            ready.discard(idx)
+            for j, cut in enumerate(cuts):
+                grid.remove((idx, 2 * j))
+                grid.remove((idx, 2 * j + 1))
+
+        group_ordered = _simple_greedy_selection(cuts, (curr_x, curr_y))
+        ordered_cuts.extend(group_ordered)
+        if group_ordered:
+            curr_x, curr_y = group_ordered[-1].end
+
+        processed[idx] = True
+        remaining -= 1
+        for outer in waiting.get(id(group), ()):
+            pending[outer] -= 1
+            if pending[outer] == 0 and not processed[outer]:
+                make_ready(outer)
+
+    ordered = CutCode()
+    ordered.extend(ordered_cuts)
+    if context.start is not None:
+        ordered._start_x, ordered._start_y = context.start
+    else:
+        ordered._start_x = 0
+        ordered._start_y = 0
+
+    if channel:
+        channel(
+            f"Indexed group-preserving optimization: {len(candidate_groups)} groups, {len(ordered_cuts)} cuts optimized"
+        )
+    return ordered
+
+
 def _simple_greedy_selection(
     all_candidates, start_position, early_termination_threshold=25
 ):
@@ -0,0 +1,245 @@
+"""
+Classification index for Elemental.classify.
+
+Classification asks every operation whether it would classify every element. For the
+built-in operations the answer depends only on the element class and type and on the
+stroke and fill colors the operation looks at. The index resolves the answer once per
+operation and unique combination and reuses it for every element sharing it.
+
+Fuzzy matches use the redmean distance of Color.distance. The distances of all unique
+element colors to a reference color (operation colors, black, white, ...) are computed
+as one numpy column, with the same integer arithmetic, so the results are identical.
+"""
+
+import numpy as np
+
+from meerk40t.core.node.op_cut import CutOpNode
+from meerk40t.core.node.op_dots import DotsOpNode
+from meerk40t.core.node.op_engrave import EngraveOpNode
+from meerk40t.core.node.op_image import ImageOpNode
+from meerk40t.core.node.op_raster import RasterOpNode
+from meerk40t.svgelements import Color
+
+# Operations whose would_classify depends on the element type and colors only.
+INDEXED_OPERATIONS = (CutOpNode, DotsOpNode, EngraveOpNode, ImageOpNode, RasterOpNode)
+
+COLOR_ATTRIBUTES = ("stroke", "fill")
+
+_MISSING = object()
+
+
+def color_distance_matrix(rows, columns):
+    """
+    Redmean distances between two sets of colors, identical to Color.distance.
+
+    @param rows: sequence of 0xRRGGBB values
+    @param columns: sequence of 0xRRGGBB values
+    @return: float array of shape (len(rows), len(columns))
+    """
+    c1 = np.asarray(rows, dtype=np.int64).reshape(-1, 1)
+    c2 = np.asarray(columns, dtype=np.int64).reshape(1, -1)
+    red1 = (c1 >> 16) & 0xFF
+    red2 = (c2 >> 16) & 0xFF
+    red_mean = (red1 + red2) >> 1
+    r = red1 - red2
+    g = ((c1 >> 8) & 0xFF) - ((c2 >> 8) & 0xFF)
+    b = (c1 & 0xFF) - (c2 & 0xFF)
+    distance_sq = (
+        (((512 + red_mean) * r * r) >> 8)
+        + (4 * g * g)
+        + (((767 - red_mean) * b * b) >> 8)
+    )
+    return np.sqrt(distance_sq)
+
+
+def _valid_color(color):
+    try:
+        return color is not None and color.argb is not None
+    except AttributeError:
+        return False
+
+
+class ClassifyIndex:
+    """
+    Index over the elements of a single classify call. Operations must not change their
+    color or classification attributes while the index is in use; references are only
+    added after the classification, so the children of an operation stay fixed too.
+    """
+
+    def __init__(self, elements, references=()):
+        """
+        @param elements: elements to classify
+        @param references: colors the element colors will be compared to
+        """
+        rows = dict()
+        for node in elements:
+            for attribute in COLOR_ATTRIBUTES:
+                color = getattr(node, attribute, None)
+                if _valid_color(color) and color.rgb not in rows:
+                    rows[color.rgb] = len(rows)
+        self._rows = rows
+        self._row_colors = list(rows)
+        self._columns = dict()
+        self._results = dict()
+        self._ops = dict()
+        self._black = dict()
+        self._node = None
+        self._node_colors = None
+        self._node_keys = None
+        self.lookups = 0
+        self.evaluations = 0
+        columns = list()
+        for color in references:
+            if isinstance(color, str):
+                color = Color(color)
+            if _valid_color(color) and color.rgb not in columns:
+                columns.append(color.rgb)
+        self._add_columns(columns)
+
+    def _add_columns(self, columns):
+        columns = [c for c in columns if c not in self._columns]
+        if not columns:
+            return
+        if not self._row_colors:
+            for c in columns:
+                self._columns[c] = []
+            return
+        matrix = color_distance_matrix(self._row_colors, columns)
+        for i, c in enumerate(columns):
+            self._columns[c] = matrix[:, i].tolist()
+
+    def distance(self, c1, c2):
+        """
+        Color.distance, looked up in the distance matrix where c1 or c2 is an element
+        color.
+        """
+        if isinstance(c1, str):
+            c1 = Color(c1)
+        if isinstance(c2, str):
+            c2 = Color(c2)
+        k1 = c1.rgb
+        k2 = c2.rgb
+        row = self._rows.get(k1)
+        if row is None:
+            row = self._rows.get(k2)
+            if row is None:
+                return Color.distance(c1, c2)
+            k2 = k1
+        column = self._columns.get(k2)
+        if column is None:
+            self._add_columns((k2,))
+            column = self._columns[k2]
+        return column[row]
+
+    def is_black(self, color, fuzzy, fuzzydistance):
+        """
+        Whether the color is black or white, fuzzy within the color distance.
+        """
+        key = (color.value, fuzzy)
+        try:
+            return self._black[key]
+        except KeyError:
+            pass
+        if fuzzy:
+            result = (
+                self.distance(color, "black") <= fuzzydistance
+                or self.distance(color, "white") <= fuzzydistance
+            )
+        else:
+            result = Color("black") == color or Color("white") == color
+        self._black[key] = result
+        return result
+
+    def _op_entry(self, op):
+        """
+        Color attributes the classification of op depends on, None if op is not indexed,
+        and the ids of the nodes op references.
+        """
+        try:
+            return self._ops[id(op)]
+        except KeyError:
+            pass
+        attributes = None
+        if type(op) in INDEXED_OPERATIONS:
+            if not op.has_attributes():
+                attributes = (0, 1)
+            elif all(a in COLOR_ATTRIBUTES for a in op.allowed_attributes):
+                attributes = tuple(
+                    i
+                    for i, a in enumerate(COLOR_ATTRIBUTES)
+                    if a in op.allowed_attributes
+                )
+        referenced = set()
+        for e in op.children:
+            referenced.add(id(e))
+            if hasattr(e, "node"):
+                referenced.add(id(e.node))
+        # The op is kept, so its id is not reused while the index exists.
+        entry = (attributes, referenced, op)
+        self._ops[id(op)] = entry
+        return entry
+
+    def is_referenced(self, op, node):
+        return id(node) in self._op_entry(op)[1]
+
+    def _node_key(self, node, attributes):
+        if node is not self._node:
+            colors = list()
+            for attribute in COLOR_ATTRIBUTES:
+                color = getattr(node, attribute, _MISSING)
+                if isinstance(color, Color):
+                    color = (color.value,)
+                elif color is not _MISSING and color is not None:
+                    # Not a color, evaluated for every operation.
+                    colors = None
+                    break
+                colors.append(color)
+            self._node = node
+            self._node_colors = colors
+            self._node_keys = dict()
+        try:
+            return self._node_keys[attributes]
+        except KeyError:
+            pass
+        colors = self._node_colors
+        if colors is None:
+            return None
+        key = (type(node), node.type) + tuple(colors[i] for i in attributes)
+        self._node_keys[attributes] = key
+        return key
+
+    def would_classify(self, op, node, fuzzy=False, fuzzydistance=100, usedefault=False):
+        """
+        op.would_classify(node, ...), evaluated once per operation and unique element
+        class, type and colors.
+        """
+        attributes, referenced, _ = self._op_entry(op)
+        if attributes is None:
+            return op.would_classify(
+                node, fuzzy=fuzzy, fuzzydistance=fuzzydistance, usedefault=usedefault
+            )
+        if id(node) in referenced:
+            return False, False, None
+        node_key = self._node_key(node, attributes)
+        if node_key is None:
+            return op.would_classify(
+                node, fuzzy=fuzzy, fuzzydistance=fuzzydistance, usedefault=usedefault
+            )
+        key = (
+            id(op),
+            node_key,
+            fuzzy,
+            fuzzydistance,
+            usedefault,
+        )
+        self.lookups += 1
+        try:
+            return self._results[key]
+        except KeyError:
+            pass
+        self.evaluations += 1
+        result = op.would_classify(
+            node, fuzzy=fuzzy, fuzzydistance=fuzzydistance, usedefault=usedefault
+        )
+        self._results[key] = result
+        return result
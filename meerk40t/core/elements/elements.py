@@ -15,6 +15,7 @@ import contextlib
 import os.path
 import threading
 from copy import copy
+from math import sqrt
 from time import time
 
 from meerk40t.core.exceptions import BadFileError
@@ -25,6 +26,7 @@ from meerk40t.core.node.op_engrave import EngraveOpNode
 from meerk40t.core.node.op_image import ImageOpNode
 from meerk40t.core.node.op_raster import RasterOpNode
 from meerk40t.core.node.rootnode import RootNode
+from meerk40t.core.spatial import BoxTree
 from meerk40t.core.undos import Undo
 from meerk40t.core.units import Length
 from meerk40t.core.wordlist import Wordlist
@@ -32,6 +34,7 @@ from meerk40t.kernel import ConsoleFunction, Service, Settings
 from meerk40t.svgelements import Color, Path, Point, SVGElement
 
 from . import offset_clpr, offset_mk
+from .classify_index import ClassifyIndex
 from .element_types import elem_group_nodes, elem_nodes, op_parent_nodes, place_nodes
 
 
@@ -669,6 +672,14 @@ class Elemental(Service):
         self._emphasized_cache = None  # Cached list of emphasized elements only
         self._selected_cache = None  # Cached list of selected elements only
         self._targeted_cache = None  # Cached list of targeted elements only
+        # Spatial index of the bounds of elems_nodes(), built on the first query and
+        # rebuilt after structural changes. Nodes reported as modified, translated,
+        # scaled or altered are updated in the index before the next query.
+        self._spatial = None
+        self._spatial_nodes = None  # elems_nodes() list, the keys of the index are positions in it
+        self._spatial_slots = None  # id(node): position
+        self._spatial_unbounded = None  # positions of nodes without bounds
+        self._spatial_changed = {}  # id(node): node
 
         # Notification tracking for performance debugging
         self._notification_stats = {
@@ -761,16 +772,23 @@ class Elemental(Service):
         self.setting(bool, "classify_black_as_raster", True)
         self.setting(bool, "classify_on_color", True)
 
+        # A kernel which does not persist neither reads nor writes the operations.
+        transient = self.kernel.prevent_persisting
         self.op_data = Settings(
-            self.kernel.name, "operations.cfg", create_backup=True
+            self.kernel.name,
+            "operations.cfg",
+            ignore_settings=transient,
+            create_backup=True,
         )  # keep backup
+        self.op_data.prevent_persisting = transient
 
         self.wordlists = {"version": [1, self.kernel.version]}
 
         direct = os.path.dirname(self.op_data._config_file)
         self.mywordlist = Wordlist(self.kernel.version, direct)
         with self.undofree():
-            self.load_persistent_operations("previous")
+            if not transient:
+                self.load_persistent_operations("previous")
 
             ops = list(self.ops())
             if len(ops) == 0 and not self.operation_default_empty:
@@ -1523,7 +1541,8 @@ class Elemental(Service):
 
     def shutdown(self, *args, **kwargs):
         # No need for an opinfo dict
-        self.save_persistent_operations("previous")
+        if not self.op_data.prevent_persisting:
+            self.save_persistent_operations("previous")
         self.op_data.write_configuration()
         for e in self.flat():
             e.unregister()
@@ -1625,7 +1644,7 @@ class Elemental(Service):
             #     pass
         if not flush:
             return
-        settings.write_configuration()
+        self._write_operations(settings)
         if inform and name.startswith("_default"):
             self.signal("default_operations")
 
@@ -1644,7 +1663,17 @@ class Elemental(Service):
             settings.clear_persistent(section)
         if not flush:
             return
-        settings.write_configuration()
+        self._write_operations(settings)
+
+    def _write_operations(self, settings):
+        """
+        Writes the operation settings. The own op_data is written in the background, edits
+        within a second are written together and never wait for the disk.
+        """
+        if settings is self.op_data:
+            settings.write_configuration_later()
+        else:
+            settings.write_configuration()
 
     def load_persistent_op_info(self, name, use_settings=None):
         name = self.safe_section_name(name)
@@ -2055,6 +2084,7 @@ class Elemental(Service):
         # Hint for translate check: _("Element altered")
         self.prepare_undo("Element altered")
         self.test_for_keyholes(node, "altered")
+        self._spatial_node_changed(node)
 
     def modified(self, node=None, *args):
         self._notification_stats['modified'] += 1
@@ -2064,6 +2094,7 @@ class Elemental(Service):
         # Hint for translate check: _("Element modified")
         self.prepare_undo("Element modified")
         self.test_for_keyholes(node, "modified")
+        self._spatial_node_changed(node)
 
     def translated(self, node=None, dx=0, dy=0, interim=False, *args):
         # It's safer to just recompute the selection area
@@ -2079,6 +2110,7 @@ class Elemental(Service):
         # Hint for translate check: _("Element shifted")
         self.prepare_undo("Element shifted")
         self.test_for_keyholes(node, "translated")
+        self._spatial_node_changed(node)
 
     def scaled(self, node=None, sx=1, sy=1, ox=0, oy=0, interim=False, *args):
         # It's safer to just recompute the selection area
@@ -2091,6 +2123,7 @@ class Elemental(Service):
         # Hint for translate check: _("Element scaled")
         self.prepare_undo("Element scaled")
         self.test_for_keyholes(node, "scaled")
+        self._spatial_node_changed(node)
 
     def print_notification_stats(self, channel=None):
         """Print formatted notification statistics as a table."""
@@ -2557,6 +2590,8 @@ class Elemental(Service):
         self._emphasized_cache = None
         self._selected_cache = None
         self._targeted_cache = None
+        self._spatial = None
+        self._spatial_changed = {}
 
     def _invalidate_ops_cache(self, *args, **kwargs):
         """Invalidate operation caches when tree structure changes."""
@@ -2626,6 +2661,129 @@ class Elemental(Service):
         elements = self.elem_branch
         yield from elements.flat(types=elem_group_nodes, depth=depth, cascade_criteria=cascade_criteria, **kwargs)
 
+    # Spatial index
+
+    @staticmethod
+    def _spatial_bounds(node):
+        try:
+            return node.bounds
+        except AttributeError:
+            return None
+
+    def _spatial_node_changed(self, node):
+        if self._spatial is not None and node is not None:
+            self._spatial_changed[id(node)] = node
+
+    def _spatial_index(self):
+        """
+        Returns the spatial index of elems_nodes(), building it or updating the
+        changed nodes first.
+        """
+        with self.node_lock:
+            if self._spatial is None:
+                nodes = list(self.elems_nodes())
+                keys = []
+                boxes = []
+                unbounded = set()
+                for slot, node in enumerate(nodes):
+                    bounds = self._spatial_bounds(node)
+                    if bounds is None:
+                        unbounded.add(slot)
+                    else:
+                        keys.append(slot)
+                        boxes.append(bounds)
+                tree = BoxTree()
+                tree.build(keys, boxes)
+                self._spatial_nodes = nodes
+                self._spatial_slots = {id(node): slot for slot, node in enumerate(nodes)}
+                self._spatial_unbounded = unbounded
+                self._spatial_changed = {}
+                self._spatial = tree
+                return tree
+            tree = self._spatial
+            if not self._spatial_changed and not self._spatial_unbounded:
+                return tree
+            slots = self._spatial_slots
+            # Nodes without bounds may have gained them unnoticed.
+            update = set(self._spatial_unbounded)
+            for node in self._spatial_changed.values():
+                # Bounds of groups follow their descendants.
+                for changed in node.flat():
+                    slot = slots.get(id(changed))
+                    if slot is not None:
+                        update.add(slot)
+                parent = node._parent
+                while parent is not None:
+                    slot = slots.get(id(parent))
+                    if slot is not None:
+                        update.add(slot)
+                    parent = parent._parent
+            self._spatial_changed = {}
+            nodes = self._spatial_nodes
+            for slot in update:
+                bounds = self._spatial_bounds(nodes[slot])
+                if bounds is None:
+                    tree.remove(slot)
+                    self._spatial_unbounded.add(slot)
+                else:
+                    tree.insert(slot, bounds)
+                    self._spatial_unbounded.discard(slot)
+            return tree
+
+    def query_rect(self, box, contained=False, types=None, unbounded=False):
+        """
+        Element nodes, groups, effects and files as given by elems_nodes(), whose
+        bounds intersect the box. Uses the spatial index instead of testing the
+        bounds of every node.
+
+        @param box: (x0, y0, x1, y1)
+        @param contained: only nodes whose bounds lie within the box
+        @param types: node types to return, all if None
+        @param unbounded: also return the nodes without bounds
+        @return: list of nodes in the order of elems_nodes()
+        """
+        tree = self._spatial_index()
+        slots = tree.query(*box, contained=contained).tolist()
+        if unbounded and self._spatial_unbounded:
+            slots = sorted(set(slots) | self._spatial_unbounded)
+        nodes = self._spatial_nodes
+        if types is None:
+            return [nodes[slot] for slot in slots]
+        return [nodes[slot] for slot in slots if nodes[slot].type in types]
+
+    def query_point(self, position, types=None):
+        """
+        Nodes of elems_nodes() whose bounds contain the position, edges included.
+
+        @param position: (x, y)
+        @param types: node types to return, all if None
+        @return: list of nodes in the order of elems_nodes()
+        """
+        x, y = position[0], position[1]
+        return self.query_rect((x, y, x, y), types=types)
+
+    def nearest(self, position, types=None):
+        """
+        Node of elems_nodes() whose bounds are closest to the position, nodes
+        containing the position have distance 0.
+
+        @param position: (x, y)
+        @param types: node types to consider, all if None
+        @return: (distance, node), None if there is no such node
+        """
+        tree = self._spatial_index()
+        nodes = self._spatial_nodes
+        accept = None
+        if types is not None:
+            def accept(slot):
+                return nodes[slot].type in types
+
+        found = tree.nearest(position[0], position[1], accept=accept)
+        if found is None:
+            return None
+        distance, slot = found
+        return sqrt(distance), nodes[slot]
+
     def regmarks(self, **kwargs):
         elements = self.reg_branch
         yield from elements.flat(types=elem_nodes, **kwargs)
@@ -3206,7 +3364,10 @@ class Elemental(Service):
         if keep_old_selection:
             for node in self.elems(emphasized=True):
                 e_list.append(node)
-        for node in self.elems_nodes(emphasized=False):
+        # Candidates found by the spatial index, in the order of elems_nodes.
+        for node in self.query_point(position):
+            if node.emphasized:
+                continue
             if not force_filenodes_too and node.type == "file":
                 continue
             try:
@@ -3337,7 +3498,7 @@ class Elemental(Service):
                         pass
             return auto_raster_count + 1
 
-        def _select_raster_candidate(operations, node, fuzzydistance):
+        def _select_raster_candidate(operations, node, fuzzydistance, index):
             candidate = None
             candidate_dist = float("inf")
             for cand_op in operations:
@@ -3347,7 +3508,7 @@ class Elemental(Service):
                     node.fill
                 ):
                     continue
-                col_d = Color.distance(cand_op.color, abs(node.fill))
+                col_d = index.distance(abs(node.fill), cand_op.color)
                 if col_d > fuzzydistance:
                     continue
                 if candidate is None or col_d < candidate_dist:
@@ -3399,6 +3560,7 @@ class Elemental(Service):
         fuzzydistance = self.classify_fuzzydistance
         usedefault = self.classify_default
         autogen = self.classify_autogenerate
+        elements = list(elements)
         if reverse:
             elements = reversed(elements)
         if operations is None:
@@ -3406,15 +3568,23 @@ class Elemental(Service):
         if add_op_function is None:
             # add_op_function = self.add_op
             add_op_function = self.add_classify_op
+        # Resolves every unique element color only once, see classify_index.
+        index = ClassifyIndex(
+            elements,
+            [getattr(op, "color", None) for op in operations]
+            + [getattr(op, "color", None) for op in self.default_operations]
+            + ["black", "white", "red"],
+        )
         for node in elements:
-            node_desc = f"[{node.type}]{'' if node.id is None else node.id + '-'}{'<none>' if node.label is None else node.display_label()}"
-            if hasattr(node, "stroke") or hasattr(node, "fill"):
-                info = ""
-                if hasattr(node, "stroke") and node.stroke is not None:
-                    info += f"S:{node.stroke},"
-                if hasattr(node, "fill") and node.fill is not None:
-                    info += f"F:{node.fill},"
-                node_desc += f"({info})"
+            if debug:
+                node_desc = f"[{node.type}]{'' if node.id is None else node.id + '-'}{'<none>' if node.label is None else node.display_label()}"
+                if hasattr(node, "stroke") or hasattr(node, "fill"):
+                    info = ""
+                    if hasattr(node, "stroke") and node.stroke is not None:
+                        info += f"S:{node.stroke},"
+                    if hasattr(node, "fill") and node.fill is not None:
+                        info += f"F:{node.fill},"
+                    node_desc += f"({info})"
             # Following lines added to handle 0.7 special ops added to ops list
             if hasattr(node, "operation"):
                 add_op_function(node)
@@ -3429,6 +3599,16 @@ class Elemental(Service):
             fuzzy_param = (False, True) if fuzzy else (False,)
             do_stroke = True
             do_fill = True
+            # One special case: is this a rasterop and the stroke
+            # color is black and the option 'classify_black_as_raster'
+            # is not set? Then skip...
+            is_black = (
+                hasattr(node, "stroke")
+                and self._valid_color(node.stroke)
+                and node.type != "elem text"
+                # No need to distinguish tempfuzzy here
+                and index.is_black(node.stroke, fuzzy, fuzzydistance)
+            )
             for tempfuzzy in fuzzy_param:
                 if debug:
                     debug(
@@ -3438,30 +3618,11 @@ class Elemental(Service):
                 should_break = False
 
                 for op in operations:
-                    # One special case: is this a rasterop and the stroke
-                    # color is black and the option 'classify_black_as_raster'
-                    # is not set? Then skip...
                     if not do_stroke and op.type in ("op engrave", "op cut", "op dots"):
                         continue
                     if not do_fill and op.type in ("op raster", "op image"):
                         continue
-                    is_black = False
                     perform_classification = True
-                    if (
-                        hasattr(node, "stroke")
-                        and self._valid_color(node.stroke)
-                        and node.type != "elem text"
-                    ):
-                        if fuzzy:  # No need to distinguish tempfuzzy here
-                            is_black = (
-                                Color.distance("black", node.stroke) <= fuzzydistance
-                                or Color.distance("white", node.stroke) <= fuzzydistance
-                            )
-                        else:
-                            is_black = (
-                                Color("black") == node.stroke
-                                or Color("white") == node.stroke
-                            )
                     if (
                         not self.classify_black_as_raster
                         and is_black
@@ -3499,7 +3660,7 @@ class Elemental(Service):
                         # If the classify_fill flag is set, then we will use the fill attribute
                         # to look for / create a matching raster operation
                         raster_candidate = _select_raster_candidate(
-                            operations, node, fuzzydistance
+                            operations, node, fuzzydistance, index
                         )
                         if raster_candidate is None and self.classify_autogenerate:
                             # We need to create one...
@@ -3515,7 +3676,8 @@ class Elemental(Service):
 
                         if hasattr(raster_candidate, "would_classify"):
                             classified, should_break, feedback = (
-                                raster_candidate.would_classify(
+                                index.would_classify(
+                                    raster_candidate,
                                     node,
                                     fuzzy=tempfuzzy,
                                     fuzzydistance=fuzzydistance,
@@ -3544,7 +3706,8 @@ class Elemental(Service):
 
                     if not classified:
                         if has_would_classify:
-                            classified, should_break, feedback = op.would_classify(
+                            classified, should_break, feedback = index.would_classify(
+                                op,
                                 node,
                                 fuzzy=tempfuzzy,
                                 fuzzydistance=fuzzydistance,
@@ -3647,7 +3810,8 @@ class Elemental(Service):
                     )
                 for op in default_candidates:
                     if hasattr(op, "would_classify"):
-                        classified, should_break, feedback = op.would_classify(
+                        classified, should_break, feedback = index.would_classify(
+                            op,
                             node,
                             fuzzy=fuzzy,
                             fuzzydistance=fuzzydistance,
@@ -3748,9 +3912,9 @@ class Elemental(Service):
                     if self.classify_black_as_raster:
                         if fuzzy:
                             is_raster = (
-                                Color.distance("black", abs(node.stroke))
+                                index.distance(abs(node.stroke), "black")
                                 <= fuzzydistance
-                                or Color.distance("white", abs(node.stroke))
+                                or index.distance(abs(node.stroke), "white")
                                 <= fuzzydistance
                             )
                         else:
@@ -3784,7 +3948,7 @@ class Elemental(Service):
                             ) and self._valid_color(op_candidate.color):
                                 if tempfuzzy:
                                     classified = (
-                                        Color.distance(
+                                        index.distance(
                                             abs(node.stroke), abs(op_candidate.color)
                                         )
                                         <= fuzzydistance
@@ -3814,7 +3978,7 @@ class Elemental(Service):
                 ):
                     if fuzzy:
                         is_cut = (
-                            Color.distance(abs(node.stroke), "red") <= fuzzydistance
+                            index.distance(abs(node.stroke), "red") <= fuzzydistance
                         )
                     else:
                         is_cut = abs(node.stroke) == Color("red")
@@ -3845,8 +4009,8 @@ class Elemental(Service):
                         is_black = True
                     elif fuzzy:
                         is_black = (
-                            Color.distance("black", abs(node.fill)) <= fuzzydistance
-                            or Color.distance("white", abs(node.fill)) <= fuzzydistance
+                            index.distance(abs(node.fill), "black") <= fuzzydistance
+                            or index.distance(abs(node.fill), "white") <= fuzzydistance
                         )
                     else:
                         is_black = Color("black") == abs(node.fill) or Color(
@@ -3865,7 +4029,7 @@ class Elemental(Service):
                             if isinstance(op_candidate, RasterOpNode):
                                 if tempfuzzy:
                                     classified = (
-                                        Color.distance(
+                                        index.distance(
                                             node_fill, abs(op_candidate.color)
                                         )
                                         <= fuzzydistance
@@ -111,7 +111,11 @@ def index_range(index_string):
 class Penbox(Service):
     def __init__(self, kernel, *args, **kwargs):
         Service.__init__(self, kernel, "penbox")
-        self.pen_data = Settings(self.kernel.name, "penbox.cfg")
+        transient = self.kernel.prevent_persisting
+        self.pen_data = Settings(
+            self.kernel.name, "penbox.cfg", ignore_settings=transient
+        )
+        self.pen_data.prevent_persisting = transient
         self.pens = {}
         self.load_persistent_penbox()
 
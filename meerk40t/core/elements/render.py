@@ -16,6 +16,7 @@ Functions:
 from copy import copy
 from math import isinf
 
+from meerk40t.core.geomstr import Geomstr
 from meerk40t.core.node.elem_image import ImageNode
 from meerk40t.core.node.elem_path import PathNode
 from meerk40t.core.node.node import Fillrule, Linejoin, Node
@@ -34,6 +35,26 @@ def init_commands(kernel):
 
     _ = kernel.translation
 
+    choices = [
+        {
+            "attr": "trace_jobs",
+            "object": self,
+            "default": 1,
+            "type": int,
+            "label": _("Tiled tracing jobs"),
+            "tip": _(
+                "Number of worker processes used by vectorize --tiles.\n"
+                + "1 traces the tiles in the main process, 0 uses all available processors."
+            ),
+            "page": "Input/Output",
+            # Hint for translation _("Images")
+            "section": "Images",
+            "lower": 0,
+            "upper": 64,
+        },
+    ]
+    kernel.register_choices("preferences", choices)
+
     classify_new = self.post_classify
 
     @self.console_option("dpi", "d", default=500, type=float)
@@ -147,6 +168,19 @@ def init_commands(kernel):
         default=0.5,
         help=_("blacklevel?!"),
     )
+    @self.console_option(
+        "tiles",
+        "T",
+        type=int,
+        default=0,
+        help=_("trace in tiles of this many pixels, adding the paths as they are traced"),
+    )
+    @self.console_option(
+        "jobs",
+        "j",
+        type=int,
+        help=_("worker processes for tiled tracing, 0 for all cpus (default: trace_jobs)"),
+    )
     @self.console_command(
         "vectorize",
         help=_("Convert given elements to a path"),
@@ -166,6 +200,8 @@ def init_commands(kernel):
         color=None,
         invert=None,
         blacklevel=None,
+        tiles=0,
+        jobs=None,
         data=None,
         post=None,
         **kwargs,
@@ -176,7 +212,10 @@ def init_commands(kernel):
         if reverse:
             data = list(reversed(data))
         make_raster = self.lookup("render-op/make_raster")
-        make_vector = self.lookup("render-op/make_vector")
+        if tiles:
+            make_vector = self.lookup("render-op/make_vector_tiles")
+        else:
+            make_vector = self.lookup("render-op/make_vector")
         if not make_raster:
             channel(_("No renderer is registered to perform render."))
             return
@@ -239,6 +278,45 @@ def init_commands(kernel):
         except Exception:
             channel(_("Too much memory required."))
             return
+        matrix = Matrix.scale(width / new_width, height / new_height)
+        matrix.post_translate(bounds[0], bounds[1])
+        if tiles:
+            if jobs is None:
+                jobs = self.setting(int, "trace_jobs", 1)
+            with self.node_lock:
+                node = self.elem_branch.add(
+                    geometry=Geomstr(),
+                    stroke=color,
+                    fill=color,
+                    stroke_width=500,
+                    stroke_scaled=False,
+                    type="elem path",
+                    fillrule=Fillrule.FILLRULE_NONZERO,
+                    linejoin=Linejoin.JOIN_ROUND,
+                )
+            # The paths of every tile are shown as soon as they are traced.
+            for geometry in make_vector(
+                image,
+                interpolationpolicy=ipolicy,
+                invert=invert,
+                turdsize=turdsize,
+                alphamax=alphamax,
+                opticurve=opticurve,
+                opttolerance=opttolerance,
+                blacklevel=blacklevel,
+                tile_size=tiles,
+                jobs=jobs,
+                channel=channel,
+            ):
+                geometry.transform(matrix)
+                with self.node_lock:
+                    node.geometry.append(geometry)
+                    node.altered()
+                self.refresh_signal()
+            data_out = [node]
+            post.append(classify_new(data_out))
+            kernel.busyinfo.end()
+            return "elements", data_out
         path = make_vector(
             image,
             interpolationpolicy=ipolicy,
@@ -250,8 +328,6 @@ def init_commands(kernel):
             color=color,
             blacklevel=blacklevel,
         )
-        matrix = Matrix.scale(width / new_width, height / new_height)
-        matrix.post_translate(bounds[0], bounds[1])
         path.transform *= Matrix(matrix)
         with self.node_lock:
             node = self.elem_branch.add(
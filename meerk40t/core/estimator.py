@@ -0,0 +1,470 @@
+"""
+Motion models to estimate the time a device takes to run cutcode.
+
+The nominal statistics of CutCode divide the lengths by the speeds. Real controllers accelerate and
+decelerate, slow down at corners, limit the speed of each axis, reverse at every scanline of a raster and
+wait for delays. A MotionModel takes these into account, vectorized over the rows of a CutCodeArray.
+
+Devices register a factory for their model with the kernel, "estimator/<device type>" where the device type is
+the last part of the provider path of the device, eg. "estimator/grbl". The factory is called with the device
+service and returns the model for its current settings, see device_estimator().
+
+All values of a model are given in mm, mm/s, mm/s² and seconds. They are converted with the native_mm of the
+cut settings.
+"""
+
+import numpy as np
+
+from .cutcode.cutcodearray import CUT_CUBIC, CUT_LINE, CUT_OBJECT, SPEED_FACTOR
+from .cutcode.rastercut import RasterCut
+
+NATIVE_MM = 39.3701
+
+# Gaps between cuts up to this distance (native units) are no travel, the cuts are connected.
+CONNECTED_DISTANCE = 1e-3
+
+
+def device_estimator(device):
+    """
+    Motion model registered for the type of the given device.
+
+    @param device: device service
+    @return: model or None if the device type registered no estimator
+    """
+    if device is None:
+        return None
+    path = getattr(device, "registered_path", None)
+    if not isinstance(path, str) or not path:
+        return None
+    factory = device.lookup("estimator", path.split("/")[-1])
+    if factory is None:
+        return None
+    return factory(device)
+
+
+def format_duration(seconds):
+    """
+    @param seconds: duration
+    @return: duration as h:mm:ss
+    """
+    if seconds is None or not np.isfinite(seconds) or seconds < 0:
+        return "∞"
+    hours, remainder = divmod(int(round(seconds)), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def trapezoid_time(distance, speed, acceleration, entry=0.0, exit=0.0):
+    """
+    Time of moves which accelerate from the entry speed to at most speed and decelerate to the exit speed.
+
+    The speeds are given squared, the entry and exit speeds must be reachable within the distance. Moves
+    with an acceleration of 0 or inf move at speed for the whole distance. Arguments broadcast.
+
+    @param distance: distances
+    @param speed: maximum speeds
+    @param acceleration: accelerations
+    @param entry: squared entry speeds
+    @param exit: squared exit speeds
+    @return: float array of times
+    """
+    distance, speed, acceleration, entry, exit = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (distance, speed, acceleration, entry, exit))
+    )
+    time = np.zeros(distance.shape, dtype=float)
+    moving = (speed > 0) & (distance > 0)
+    constant = moving & ((acceleration <= 0) | np.isinf(acceleration))
+    time[constant] = distance[constant] / speed[constant]
+    ramp = moving & ~constant
+    d = distance[ramp]
+    v = speed[ramp]
+    a = acceleration[ramp]
+    w0 = entry[ramp]
+    w1 = exit[ramp]
+    peak = np.minimum(np.sqrt((2 * a * d + w0 + w1) / 2), v)
+    cruise = np.maximum(d - (2 * peak * peak - w0 - w1) / (2 * a), 0)
+    time[ramp] = (2 * peak - np.sqrt(w0) - np.sqrt(w1)) / a + cruise / v
+    return time
+
+
+def axis_limited(speed, direction, limit_x=None, limit_y=None):
+    """
+    Speed along the given directions such that neither axis exceeds its limit.
+
+    @param speed: speeds
+    @param direction: complex directions, 0 is not limited
+    @param limit_x: limit of the x axis or None
+    @param limit_y: limit of the y axis or None
+    @return: float array
+    """
+    speed = np.array(speed, dtype=float)
+    direction = np.asarray(direction, dtype=complex)
+    size = np.abs(direction)
+    for limit, part in ((limit_x, direction.real), (limit_y, direction.imag)):
+        if limit is None:
+            continue
+        share = np.abs(part)
+        moving = share > 0
+        bound = np.full(speed.shape, np.inf)
+        np.divide(limit * size, share, out=bound, where=moving)
+        np.minimum(speed, bound, out=speed)
+    return speed
+
+
+def raster_scanlines(cut):
+    """
+    Burned scanlines of a RasterCut, the way the raster plotter sweeps them. Blank scanlines are stepped over
+    and every scanline spans from its first to its last burned pixel.
+
+    @param cut: RasterCut
+    @return: scanline lengths including overscan and the vectors of the moves between consecutive scanlines
+        as complex numbers of (along scanline, across scanlines), in native units
+    """
+    plot = cut.plot
+    horizontal = plot.horizontal
+    if horizontal:
+        count, size, stride, step = cut.height, cut.width, cut.step_x, cut.step_y
+    else:
+        count, size, stride, step = cut.width, cut.height, cut.step_y, cut.step_x
+    stride = abs(float(stride))
+    step = abs(float(step))
+    pixels = getattr(plot, "_pixels", None)
+    if pixels is None:
+        lines = np.arange(count)
+        first = np.zeros(count, dtype=int)
+        last = np.full(count, size - 1)
+    else:
+        burned = ~plot._skipped[pixels]
+        if not horizontal:
+            burned = burned.T
+        lines = np.flatnonzero(burned.any(axis=1))
+        burned = burned[lines]
+        first = np.argmax(burned, axis=1)
+        last = size - 1 - np.argmax(burned[:, ::-1], axis=1)
+    overscan = plot.overscan
+    lengths = (last - first + 1 + overscan) * stride
+    if len(lines) < 2:
+        return lengths, np.zeros(0, dtype=complex)
+    if plot.bidirectional:
+        forward = np.arange(len(lines)) % 2 == 0
+    else:
+        forward = np.ones(len(lines), dtype=bool)
+    starts = np.where(forward, first, last)
+    ends = np.where(forward, last + overscan, first - overscan)
+    moves = (starts[1:] - ends[:-1]) * stride + 1j * np.diff(lines) * step
+    return lengths, moves
+
+
+class MotionModel:
+    """
+    Motion of a controller which plans with trapezoidal acceleration.
+
+    Connected cuts do not stop at their junction, the junction speed is limited by the junction deviation
+    like grbl does, and the acceleration then limits the speeds along the sequence of cuts. A junction
+    deviation of None does not slow down at corners, the device only ramps at the ends of connected cuts.
+
+    Galvo controllers do not accelerate noticeably (acceleration None), but wait for delays: laser on at the
+    start and laser off at the end of every mark, polygon delays at the corners of connected cuts and a
+    jump delay after every travel, the long jump delay for travel of long jump distance or more.
+
+    @param acceleration: acceleration of cuts, None for no acceleration
+    @param rapid_acceleration: acceleration of travel, defaults to the acceleration
+    @param junction_deviation: junction deviation or None
+    @param max_speed_x: limit of the speed of the x axis or None
+    @param max_speed_y: limit of the speed of the y axis or None
+    @param rapid_speed: speed of travel, None to use the rapid speed of the cut settings
+    @param rapid_speed_x: limit of the speed of the x axis during travel or None
+    @param rapid_speed_y: limit of the speed of the y axis during travel or None
+    @param turn_time: time spent reversing at every raster scanline
+    @param laser_on_delay: delay at the start of every mark
+    @param laser_off_delay: delay at the end of every mark
+    @param polygon_delay: delay at every corner of connected cuts
+    @param jump_delay: delay after every short travel
+    @param long_jump_delay: delay after every long travel, defaults to the jump delay
+    @param long_jump_distance: distance of long travel or None
+    """
+
+    def __init__(
+        self,
+        acceleration=None,
+        rapid_acceleration=None,
+        junction_deviation=None,
+        max_speed_x=None,
+        max_speed_y=None,
+        rapid_speed=None,
+        rapid_speed_x=None,
+        rapid_speed_y=None,
+        turn_time=0.0,
+        laser_on_delay=0.0,
+        laser_off_delay=0.0,
+        polygon_delay=0.0,
+        jump_delay=0.0,
+        long_jump_delay=None,
+        long_jump_distance=None,
+    ):
+        self.acceleration = acceleration
+        self.rapid_acceleration = (
+            acceleration if rapid_acceleration is None else rapid_acceleration
+        )
+        self.junction_deviation = junction_deviation
+        self.max_speed_x = max_speed_x
+        self.max_speed_y = max_speed_y
+        self.rapid_speed = rapid_speed
+        self.rapid_speed_x = rapid_speed_x
+        self.rapid_speed_y = rapid_speed_y
+        self.turn_time = turn_time
+        self.laser_on_delay = laser_on_delay
+        self.laser_off_delay = laser_off_delay
+        self.polygon_delay = polygon_delay
+        self.jump_delay = jump_delay
+        self.long_jump_delay = jump_delay if long_jump_delay is None else long_jump_delay
+        self.long_jump_distance = long_jump_distance
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(acceleration={self.acceleration}, "
+            f"junction_deviation={self.junction_deviation}, "
+            f"max_speed=({self.max_speed_x}, {self.max_speed_y}), "
+            f"rapid_speed={self.rapid_speed})"
+        )
+
+    def accelerations(self, speeds, raster=False, horizontal=True):
+        """
+        Acceleration used at the given speeds.
+
+        @param speeds: speeds in mm/s
+        @param raster: speeds of rasters
+        @param horizontal: rasters are horizontal
+        @return: float array of accelerations, 0 for no acceleration
+        """
+        speeds = np.asarray(speeds, dtype=float)
+        if self.acceleration is None:
+            return np.zeros(speeds.shape, dtype=float)
+        return np.full(speeds.shape, float(self.acceleration))
+
+    def durations(self, array, include_start=False, default_settings=None):
+        """
+        Travel, burn and extra time of every cut.
+
+        @param array: CutCodeArray
+        @param include_start: include travel from the start position to the first cut
+        @param default_settings: settings to look up the rapid speed if no cut provides one
+        @return: travel, burn and extra float arrays
+        """
+        n = array.index
+        kind = array.kind[:n]
+        settings_index = array.settings_index[:n]
+        native_mm = np.array(
+            [cs.get("native_mm", NATIVE_MM) for cs in array.settings], dtype=float
+        )
+        mm = native_mm[settings_index] if len(native_mm) else np.full(n, NATIVE_MM)
+        speed = array.native_speeds()[settings_index]
+        vectors = kind != CUT_OBJECT
+        starts = array.start[:n]
+        ends = array.end[:n]
+
+        # Travel
+        previous = np.empty(n, dtype=complex)
+        previous[1:] = ends[:-1]
+        if include_start and n:
+            previous[0] = (
+                complex(*array.start_position)
+                if array.start_position is not None
+                else 0j
+            )
+        elif n:
+            previous[0] = starts[0]
+        jump = starts - previous
+        travel_distance = np.abs(jump)
+        rapid = self._rapid_speeds(array, mm, default_settings)
+        rapid = axis_limited(rapid, jump, *self._rapid_limits(mm))
+        travel = trapezoid_time(
+            travel_distance, rapid, self._rapid_acceleration(mm)
+        )
+        travelled = travel_distance > CONNECTED_DISTANCE
+        travel += np.where(travelled, self._jump_delays(travel_distance, mm), 0.0)
+
+        # Vector cuts
+        lengths = array.lengths()
+        entry, exit = self._directions(array)
+        speed_limit = axis_limited(speed, ends - starts, *self._limits(mm))
+        acceleration = self.accelerations(speed / mm) * mm
+        connected = np.zeros(n, dtype=bool)
+        connected[1:] = vectors[1:] & vectors[:-1] & ~travelled[1:]
+        # Squared speeds at the junctions before every cut and after the last.
+        junction = np.zeros(n + 1, dtype=float)
+        junction[1:n] = np.minimum(speed_limit[:-1], speed_limit[1:]) ** 2
+        junction[1:n] = np.minimum(
+            junction[1:n], self._junction_limits(exit[:-1], entry[1:], acceleration[1:], mm[1:])
+        )
+        junction[:n][~connected] = 0
+        # Cuts without acceleration change speed at once, they carry no speed over their junctions.
+        instant = vectors & ~((acceleration > 0) & np.isfinite(acceleration))
+        junction[:n][instant] = 0
+        junction[1:][instant] = 0
+        ramps = np.where(vectors & ~instant, 2 * acceleration * lengths, 0.0)
+        # Backward and forward pass of the planner, w[k] <= w[k + 1] + 2aL and w[k + 1] <= w[k] + 2aL
+        # of the squared junction speeds w, as running minima over the accumulated 2aL.
+        reach = np.zeros(n + 1, dtype=float)
+        np.cumsum(ramps, out=reach[1:])
+        junction = np.minimum.accumulate((junction + reach)[::-1])[::-1] - reach
+        junction = np.minimum.accumulate(junction - reach) + reach
+        np.maximum(junction, 0, out=junction)
+        burn = np.where(
+            vectors,
+            trapezoid_time(lengths, speed_limit, acceleration, junction[:-1], junction[1:]),
+            0.0,
+        )
+        extra = np.zeros(n, dtype=float)
+        if n:
+            ending = np.ones(n, dtype=bool)
+            ending[:-1] = ~connected[1:]
+            extra += np.where(vectors & ~connected, self.laser_on_delay, 0.0)
+            extra += np.where(vectors & ending, self.laser_off_delay, 0.0)
+            extra += np.where(connected, self.polygon_delay, 0.0)
+
+        # Other cuts
+        objects = array.objects
+        moving = speed != 0
+        for i in np.flatnonzero(~vectors).tolist():
+            cut = objects[i]
+            if isinstance(cut, RasterCut):
+                burn[i] = self._raster_time(cut, speed[i], rapid[i], mm[i])
+            else:
+                if moving[i]:
+                    burn[i] = (array.object_length[i] + array.object_travel[i]) / (
+                        speed[i] * SPEED_FACTOR
+                    )
+                extra[i] = array.object_extra[i]
+        return travel, burn, extra
+
+    def estimate(self, cutcode, include_start=False):
+        """
+        Estimated time of the cutcode in seconds.
+
+        @param cutcode: CutCode or CutCodeArray
+        @param include_start: include travel from the start position to the first cut
+        @return: seconds
+        """
+        stats = cutcode.provide_statistics(include_start=include_start, estimator=self)
+        return stats[-1]["time_at_end_of_burn"]
+
+    def _limits(self, mm):
+        return tuple(
+            None if limit is None else limit * mm
+            for limit in (self.max_speed_x, self.max_speed_y)
+        )
+
+    def _rapid_limits(self, mm):
+        limits = []
+        for limit, rapid in (
+            (self.max_speed_x, self.rapid_speed_x),
+            (self.max_speed_y, self.rapid_speed_y),
+        ):
+            if limit is None:
+                limit = rapid
+            elif rapid is not None:
+                limit = min(limit, rapid)
+            limits.append(None if limit is None else limit * mm)
+        return tuple(limits)
+
+    def _rapid_speeds(self, array, mm, default_settings):
+        if self.rapid_speed is not None:
+            return self.rapid_speed * mm
+        rapid = array.rapid_speed(default_settings)
+        return np.full(len(mm), 0.0 if rapid is None else float(rapid))
+
+    def _rapid_acceleration(self, mm):
+        if self.rapid_acceleration is None:
+            return np.zeros(len(mm), dtype=float)
+        return self.rapid_acceleration * mm
+
+    def _jump_delays(self, distance, mm):
+        if self.long_jump_distance is None:
+            return np.full(len(distance), float(self.jump_delay))
+        return np.where(
+            distance >= self.long_jump_distance * mm,
+            self.long_jump_delay,
+            self.jump_delay,
+        )
+
+    def _junction_limits(self, exit, entry, acceleration, mm):
+        """
+        Squared junction speeds of grbl: v² = a·δ·sin(θ/2) / (1 - sin(θ/2)), θ is the angle between the
+        reversed exit of the previous cut and the entry of the next cut.
+        """
+        if self.junction_deviation is None:
+            return np.full(len(entry), np.inf)
+        size = np.abs(exit) * np.abs(entry)
+        cosine = np.zeros(len(entry), dtype=float)
+        np.divide(
+            -(exit.real * entry.real + exit.imag * entry.imag),
+            size,
+            out=cosine,
+            where=size > 0,
+        )
+        sine = np.sqrt(np.clip((1 - cosine) / 2, 0, 1))
+        limit = np.full(len(entry), np.inf)
+        bend = sine < 1 - 1e-9
+        limit[bend] = (
+            acceleration[bend]
+            * self.junction_deviation
+            * mm[bend]
+            * sine[bend]
+            / (1 - sine[bend])
+        )
+        return limit
+
+    @staticmethod
+    def _directions(array):
+        """
+        Directions the cuts start and end with, in their current orientation.
+        """
+        n = array.index
+        kind = array.kind[:n]
+        start = array.start[:n]
+        c1 = array.control1[:n]
+        c2 = array.control2[:n]
+        end = array.end[:n]
+        chord = end - start
+        lines = kind == CUT_LINE
+        cubics = kind == CUT_CUBIC
+        first = np.where(lines, chord, c1 - start)
+        first = np.where(cubics & (first == 0), c2 - start, first)
+        first = np.where(first == 0, chord, first)
+        last = np.where(lines, chord, np.where(cubics, end - c2, end - c1))
+        last = np.where(cubics & (last == 0), end - c1, last)
+        last = np.where(last == 0, chord, last)
+        return first, last
+
+    def _raster_time(self, cut, speed, rapid, mm):
+        """
+        Every scanline accelerates from rest and stops, the moves between scanlines are travel.
+        """
+        lengths, moves = raster_scanlines(cut)
+        horizontal = cut.plot.horizontal
+        limit_x, limit_y = self._limits(mm)
+        rapid_x, rapid_y = self._rapid_limits(mm)
+        if not horizontal:
+            limit_x, limit_y = limit_y, limit_x
+            rapid_x, rapid_y = rapid_y, rapid_x
+        line_speed = speed if limit_x is None else min(speed, limit_x)
+        acceleration = (
+            self.accelerations(
+                np.array([speed / mm]), raster=True, horizontal=horizontal
+            )[0]
+            * mm
+        )
+        time = float(np.sum(trapezoid_time(lengths, line_speed, acceleration)))
+        time += len(lengths) * (self.laser_on_delay + self.laser_off_delay)
+        if len(moves):
+            move_speed = axis_limited(np.full(len(moves), rapid), moves, rapid_x, rapid_y)
+            rapid_acceleration = (
+                0.0 if self.rapid_acceleration is None else self.rapid_acceleration * mm
+            )
+            time += float(
+                np.sum(trapezoid_time(np.abs(moves), move_speed, rapid_acceleration))
+            )
+            time += float(np.sum(self._jump_delays(np.abs(moves), np.full(len(moves), mm))))
+            time += len(moves) * self.turn_time
+        return time
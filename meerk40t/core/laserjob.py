@@ -11,6 +11,7 @@ import time
 from math import isinf
 
 from meerk40t.core.cutcode.cutcode import CutCode
+from meerk40t.core.estimator import device_estimator
 
 
 class LaserJob:
@@ -36,9 +37,12 @@ class LaserJob:
 
         self._estimate = 0
 
+        estimator = None
+        if any(isinstance(item, CutCode) for item in self.items):
+            estimator = device_estimator(getattr(driver, "service", None))
         for item in self.items:
             if isinstance(item, CutCode):
-                stats = item.provide_statistics()
+                stats = item.provide_statistics(estimator=estimator)
                 final_values = stats[-1]
                 self._estimate = final_values["time_at_end_of_burn"]
         self.outline = outline
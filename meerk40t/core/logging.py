@@ -20,7 +20,11 @@ class Logging(Service):
 
     def __init__(self, kernel, *args, **kwargs):
         Service.__init__(self, kernel, "logging")
-        self._setting_config = Settings(self.kernel.name, "meerk40t.log")
+        transient = self.kernel.prevent_persisting
+        self._setting_config = Settings(
+            self.kernel.name, "meerk40t.log", ignore_settings=transient
+        )
+        self._setting_config.prevent_persisting = transient
         self.logs = self._setting_config.literal_dict()
 
     def matching_events(self, prefix, **kwargs):
@@ -50,6 +50,12 @@ class ImageNode(Node, LabelDisplay, Suppressable):
     The processed matrix must be concatenated with the main matrix to be accurate.
     """
 
+    # Processed images of more pixels are processed in bands of TILE_HEIGHT rows.
+    TILE_PIXELS = 4096 * 4096
+    TILE_HEIGHT = 512
+    # Rows of error diffusion preceding each band.
+    TILE_OVERLAP = 32
+
     def __init__(self, **kwargs):
         self.image = None
         self.matrix = None
@@ -404,29 +410,32 @@ class ImageNode(Node, LabelDisplay, Suppressable):
         @param context:
         @return:
         """
-        self._needs_update = True
         if context is not None:
             self.message = "Processing..."
             context.signal("refresh_scene", "Scene")
+
+        def get_keyhole_geometry():
+            self._keyhole_geometry = None
+            self._keyhole_image = None
+            refnode = context.elements.find_node(self.id)
+            if refnode is not None and hasattr(refnode, "as_geometry"):
+                self._keyhole_geometry = refnode.as_geometry()
+
+        scheduler = None if context is None else context.lookup("image/scheduler")
+        if scheduler is not None:
+            # The shared scheduler coalesces the requests, the previous processed
+            # image is shown until it is replaced.
+            if self._keyhole_reference is not None and self._keyhole_geometry is None:
+                get_keyhole_geometry()
+            scheduler.submit(self, context)
+            return
+        self._needs_update = True
         if self._update_thread is None:
 
             def clear(result):
                 self._needs_update = False
                 self._update_thread = None
-                if context is not None:
-                    if self._process_image_failed:
-                        self.message = "Process image could not exist in memory."
-                    else:
-                        self.message = None
-                    context.signal("refresh_scene", "Scene")
-                    context.signal("image_updated", self)
-
-            def get_keyhole_geometry():
-                self._keyhole_geometry = None
-                self._keyhole_image = None
-                refnode = context.elements.find_node(self.id)
-                if refnode is not None and hasattr(refnode, "as_geometry"):
-                    self._keyhole_geometry = refnode.as_geometry()
+                self._update_finished(context)
 
             self._processed_image = None
             self._convex_hull = None
@@ -456,6 +465,15 @@ class ImageNode(Node, LabelDisplay, Suppressable):
                     thread_name=f"image_update_{self.id}_{str(time.perf_counter())}",
                 )
 
+    def _update_finished(self, context):
+        if context is not None:
+            if self._process_image_failed:
+                self.message = "Process image could not exist in memory."
+            else:
+                self.message = None
+            context.signal("refresh_scene", "Scene")
+            context.signal("image_updated", self)
+
     def _process_image_thread(self):
         """
         The function deletes the caches and processes the image until it no longer needs updating.
@@ -501,20 +519,7 @@ class ImageNode(Node, LabelDisplay, Suppressable):
         # print (f"process called with step_x={step_x}, step_y={step_y} (node: {self.step_x}, {self.step_y})")
         try:
             actualized_matrix, image = self._process_image(step_x, step_y, crop=crop)
-            inverted_main_matrix = Matrix(self.matrix).inverse()
-            self._actualized_matrix = actualized_matrix
-            self._processed_matrix = actualized_matrix * inverted_main_matrix
-            self._processed_image = image
-            self._process_image_failed = False
-            # The rendered cache reflects the *previous* processed image; once
-            # the processed image is replaced, the cache is stale and must not
-            # be reused. (Reusing it across cutplan copy + matrix-flip
-            # preprocess caused raster ops to render unflipped pixels at flipped
-            # device coords, producing a mirrored simulation.)
-            self._cache = None
-            bb = self.bbox()
-            self._bounds = bb
-            self._paint_bounds = bb
+            self._set_processed(actualized_matrix, image)
         except Exception as e:
             # Memory error if creating requires too much memory.
             # DecompressionBomb if over 272 megapixels.
@@ -525,6 +530,60 @@ class ImageNode(Node, LabelDisplay, Suppressable):
             self._processing = False
         self.updated()
 
+    def _set_processed(self, actualized_matrix, image, *script_state):
+        """
+        Sets the result of _process_image.
+
+        @param script_state: dither, dither_type, is_depthmap as set by the script, if it was
+            processed by another node (see process_image_task)
+        """
+        if image is None:
+            # Processing failed in a worker process.
+            self._process_image_failed = True
+            self.updated()
+            return
+        if script_state:
+            self.dither, self.dither_type, self.is_depthmap = script_state
+        inverted_main_matrix = Matrix(self.matrix).inverse()
+        self._actualized_matrix = actualized_matrix
+        self._processed_matrix = actualized_matrix * inverted_main_matrix
+        self._processed_image = image
+        self._convex_hull = None
+        self._process_image_failed = False
+        # The rendered cache reflects the *previous* processed image; once
+        # the processed image is replaced, the cache is stale and must not
+        # be reused. (Reusing it across cutplan copy + matrix-flip
+        # preprocess caused raster ops to render unflipped pixels at flipped
+        # device coords, producing a mirrored simulation.)
+        self._cache = None
+        bb = self.bbox()
+        self._bounds = bb
+        self._paint_bounds = bb
+        if script_state:
+            self.updated()
+
+    def _process_task(self, step_x, step_y, crop=True):
+        """
+        Picklable task of process_image_task with the state _process_image depends on.
+        """
+        return (
+            {
+                "image": self.image,
+                "matrix": Matrix(self.matrix),
+                "operations": [dict(op) for op in self.operations],
+                "invert": self.invert,
+                "dither": self.dither,
+                "dither_type": self.dither_type,
+                "red": self.red,
+                "green": self.green,
+                "blue": self.blue,
+                "lightness": self.lightness,
+            },
+            step_x,
+            step_y,
+            crop,
+        )
+
     @property
     def opaque_image(self):
         from PIL import Image
@@ -826,31 +885,13 @@ class ImageNode(Node, LabelDisplay, Suppressable):
             self.is_depthmap = False
         return image
 
-    def _process_image(self, step_x, step_y, crop=True):
+    def _transform_setup(self, step_x, step_y, crop=True):
         """
-        This core code replaces the older actualize and rasterwizard functionalities. It should convert the image to
-        a post-processed form with resulting post-process matrix.
+        Grayscale source image and the affine transform placing it on the step grid.
 
-        @param crop: Should the unneeded edges be cropped as part of this process. The need for the edge is determined
-            by the color and the state of the self.invert attribute.
-        @return:
+        @param crop: Should the unneeded edges be cropped as part of this process.
+        @return: image, transform coefficients or None, image_width, image_height, tx, ty, orgbox
         """
-        from PIL import Image, ImageOps
-
-        try:
-            from PIL.Image import Transform
-
-            AFFINE = Transform.AFFINE
-        except ImportError:
-            AFFINE = Image.AFFINE
-
-        try:
-            from PIL.Image import Resampling
-
-            BICUBIC = Resampling.BICUBIC
-        except ImportError:
-            BICUBIC = Image.BICUBIC
-        self._processing = True
         image = self.image
 
         transparent_mask = self._get_transparent_mask(image)
@@ -908,32 +949,190 @@ class ImageNode(Node, LabelDisplay, Suppressable):
             transform_matrix.reset()
 
         # Perform image transform if needed.
+        transform = None
         if (
             self.matrix.a != step_x
             or self.matrix.b != 0.0
             or self.matrix.c != 0.0
             or self.matrix.d != step_y
         ):
-            # print (f"another transform called while {image.width}x{image.height} - requested: {image_width}x{image_height}")
             if image_height <= 0:
                 image_height = 1
             if image_width <= 0:
                 image_width = 1
-            image = image.transform(
-                (image_width, image_height),
-                AFFINE,
-                (
-                    transform_matrix.a,
-                    transform_matrix.c,
-                    transform_matrix.e,
-                    transform_matrix.b,
-                    transform_matrix.d,
-                    transform_matrix.f,
-                ),
-                resample=BICUBIC,
-                fillcolor="black" if self.invert else "white",
+            transform = (
+                transform_matrix.a,
+                transform_matrix.c,
+                transform_matrix.e,
+                transform_matrix.b,
+                transform_matrix.d,
+                transform_matrix.f,
             )
-            # print (f"after transform {image.width}x{image.height}")
+        return image, transform, image_width, image_height, tx, ty, orgbox
+
+    def _transform_rows(self, image, transform, width, top, bottom):
+        """
+        Rows top to bottom of the transformed image.
+
+        @param image: grayscale image returned by _transform_setup
+        @param transform: affine coefficients or None if the image is not transformed
+        @param width: width of the transformed image
+        @return: image of the rows
+        """
+        from PIL import Image
+
+        if transform is None:
+            return image.crop((0, top, image.width, bottom))
+        try:
+            from PIL.Image import Transform
+
+            AFFINE = Transform.AFFINE
+        except ImportError:
+            AFFINE = Image.AFFINE
+
+        try:
+            from PIL.Image import Resampling
+
+            BICUBIC = Resampling.BICUBIC
+        except ImportError:
+            BICUBIC = Image.BICUBIC
+        a, b, c, d, e, f = transform
+        return image.transform(
+            (width, bottom - top),
+            AFFINE,
+            (a, b, c + b * top, d, e, f + e * top),
+            resample=BICUBIC,
+            fillcolor="black" if self.invert else "white",
+        )
+
+    def _band_margin(self):
+        """
+        Rows a band needs beyond its edges for the script to process it like the
+        whole image, or None if the script cannot be processed in bands.
+        """
+        margin = 0
+        for op in self.operations:
+            name = op.get("name")
+            if not op.get("enable") or name in ("resample", "dither", "tone", "gamma"):
+                continue
+            if name == "edge_enhance":
+                # 3x3 kernel.
+                margin += 1
+            elif name == "unsharp_mask":
+                # Gaussian blur as three box blurs.
+                try:
+                    margin += 3 * (ceil(float(op["radius"])) + 1)
+                except (KeyError, TypeError, ValueError):
+                    continue
+            elif name in ("crop", "contrast", "auto_contrast", "halftone"):
+                # Resizes the image or depends on all its pixels.
+                return None
+        return margin
+
+    def _process_bands(self, step_x, step_y, crop, setup, margin):
+        """
+        Tiled variant of _process_image. The image is transformed, processed and dithered in
+        bands of TILE_HEIGHT rows and only the final image is kept whole, so the memory
+        of the intermediate images is bounded by the band size.
+
+        Bands are extended by the rows the script filters need and start TILE_OVERLAP rows
+        early, the error diffusion of the dither runs through these rows before it reaches
+        the band. Bands start at multiples of 8 rows keeping ordered dithers aligned.
+
+        @param setup: result of _transform_setup
+        @param margin: rows required by the script, see _band_margin
+        @return: actualized matrix, image
+        """
+        from PIL import Image, ImageOps
+
+        image, transform, image_width, image_height, tx, ty, orgbox = setup
+        if transform is None:
+            width, height = image.size
+        else:
+            width, height = image_width, image_height
+        actualized_matrix = Matrix()
+        if step_y < 0:
+            actualized_matrix.post_translate(0, -image_height)
+        if step_x < 0:
+            actualized_matrix.post_translate(-image_width, 0)
+
+        left, top, right, bottom = 0, 0, width, height
+        if crop:
+            # The crop box of the transformed image, gathered band by band.
+            cbox = None
+            for y in range(0, height, self.TILE_HEIGHT):
+                rows = self._transform_rows(
+                    image, transform, width, y, min(y + self.TILE_HEIGHT, height)
+                )
+                box = self._get_crop_box(rows)
+                if box is None:
+                    continue
+                if cbox is None:
+                    cbox = [box[0], box[1] + y, box[2], box[3] + y]
+                else:
+                    cbox[0] = min(cbox[0], box[0])
+                    cbox[2] = max(cbox[2], box[2])
+                    cbox[3] = box[3] + y
+            if cbox is not None and (
+                cbox[2] - cbox[0] != width or cbox[3] - cbox[1] != height
+            ):
+                left, top, right, bottom = cbox
+                # See _process_image
+                if orgbox[0] == 0 and orgbox[1] == 0:
+                    actualized_matrix.post_translate(left, top)
+
+        actualized_matrix.post_scale(step_x, step_y)
+        actualized_matrix.post_translate(tx, ty)
+
+        above = -(-max(margin, self.TILE_OVERLAP) // 8) * 8
+        result = None
+        for y0 in range(top, bottom, self.TILE_HEIGHT):
+            y1 = min(y0 + self.TILE_HEIGHT, bottom)
+            b0 = max(y0 - above, top)
+            b1 = min(y1 + margin, bottom)
+            band = self._transform_rows(image, transform, width, b0, b1)
+            if left != 0 or right != width:
+                band = band.crop((left, 0, right, band.height))
+            if self.invert:
+                band = ImageOps.invert(band)
+            reject_mask = band.point(lambda e: 0 if e == 255 else 255)
+            band, newbounds = self._process_script(band)
+            background = Image.new("L", band.size, "white")
+            background.paste(band, mask=reject_mask)
+            band = self._apply_dither(background)
+            band = band.crop((0, y0 - b0, band.width, y1 - b0))
+            if result is None:
+                result = Image.new(band.mode, (right - left, bottom - top))
+            result.paste(band, (0, y0 - top))
+        if result is None:
+            result = Image.new("L", (right - left, bottom - top), "white")
+        return actualized_matrix, result
+
+    def _process_image(self, step_x, step_y, crop=True):
+        """
+        This core code replaces the older actualize and rasterwizard functionalities. It should convert the image to
+        a post-processed form with resulting post-process matrix.
+
+        Images of more than TILE_PIXELS pixels are processed in bands, if the script allows it.
+
+        @param crop: Should the unneeded edges be cropped as part of this process. The need for the edge is determined
+            by the color and the state of the self.invert attribute.
+        @return:
+        """
+        from PIL import Image, ImageOps
+
+        self._processing = True
+        setup = self._transform_setup(step_x, step_y, crop)
+        image, transform, image_width, image_height, tx, ty, orgbox = setup
+        margin = self._band_margin()
+        if margin is not None and image_width * image_height > self.TILE_PIXELS:
+            try:
+                return self._process_bands(step_x, step_y, crop, setup, margin)
+            finally:
+                self._processing = False
+
+        if transform is not None:
+            image = self._transform_rows(image, transform, image_width, 0, image_height)
         actualized_matrix = Matrix()
 
         if step_y < 0:
@@ -1130,3 +1329,22 @@ class ImageNode(Node, LabelDisplay, Suppressable):
         if self._convex_hull is not None:
             self._convex_hull.translate(dx, dy)
         return super().translated(dx, dy)
+
+
+def process_image_task(task):
+    """
+    Processes an image outside the node tree, typically in a worker process of the
+    image scheduler.
+
+    @param task: result of ImageNode._process_task
+    @return: actualized matrix, image, dither, dither_type, is_depthmap or None, None if the
+        image could not be processed
+    """
+    attributes, step_x, step_y, crop = task
+    node = ImageNode(comingfromcopy=True, **attributes)
+    try:
+        actualized_matrix, image = node._process_image(step_x, step_y, crop=crop)
+    except Exception:
+        # See ImageNode.process_image
+        return None, None
+    return actualized_matrix, image, node.dither, node.dither_type, node.is_depthmap
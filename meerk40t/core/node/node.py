@@ -26,6 +26,28 @@ from enum import IntEnum
 from time import time
 from typing import Tuple
 
+# Node attributes that are derived or purely structural. The undo snapshots rebuild them
+# on restore and ignore them when looking for changes, the plan cache leaves them out of
+# the fingerprints.
+TRANSIENT_ATTRIBUTES = frozenset(
+    (
+        "_parent",
+        "_root",
+        "_children",
+        "_references",
+        "_points",
+        "_points_dirty",
+        "_bounds",
+        "_bounds_dirty",
+        "_paint_bounds",
+        "_paint_bounds_dirty",
+        "_cache",
+        "_cache_matrix",
+        "_default_map",
+        "_item",
+    )
+)
+
 
 # LINEJOIN
 # Value	arcs | bevel |miter | miter-clip | round
@@ -107,12 +107,41 @@ def path_to_cutobjects(
             # Singleton Move or something. No cutobjects in generated group.
             continue
         group[0].first = True
-        for i, cut_obj in enumerate(group):
-            cut_obj.closed = closed
-            try:
-                cut_obj.next = group[i + 1]
-            except IndexError:
-                cut_obj.last = True
-                cut_obj.next = group[0]
-            cut_obj.previous = group[i - 1]
+        link_cutgroup(group)
         yield group
+
+
+def link_cutgroup(group):
+    """
+    Links the cutobjects of a group into a ring of next/previous cuts.
+    """
+    closed = group.closed
+    for i, cut_obj in enumerate(group):
+        cut_obj.closed = closed
+        try:
+            cut_obj.next = group[i + 1]
+        except IndexError:
+            cut_obj.last = True
+            cut_obj.next = group[0]
+        cut_obj.previous = group[i - 1]
+
+
+def sources_to_cutobjects(sources):
+    """
+    Worker function converting a list of path_to_cutobjects keyword dicts into
+    lists of cutgroups. This runs in a separate process, so the next/previous
+    links are removed from the result: pickling these long chains recursively
+    would exceed the recursion limit. Use link_cutgroup to restore them.
+
+    @param sources: list of keyword dicts for path_to_cutobjects
+    @return: list of lists of CutGroups, one list per source
+    """
+    results = []
+    for kwargs in sources:
+        groups = list(path_to_cutobjects(**kwargs))
+        for group in groups:
+            for cut_obj in group:
+                cut_obj.next = None
+                cut_obj.previous = None
+        results.append(groups)
+    return results
@@ -404,6 +404,15 @@ class CutOpNode(OperationMixin, Node, Parameters):
 
     def as_cutobjects(self, closed_distance=15, passes=1):
         """Generator of cutobjects for a particular operation."""
+        for color, source in self.cutobject_sources(closed_distance, passes):
+            yield from path_to_cutobjects(color=color, **source)
+
+    def cutobject_sources(self, closed_distance=15, passes=1):
+        """
+        Generator of (color, path_to_cutobjects arguments) for every path of this
+        operation. Apart from the color these arguments can be pickled, so the
+        conversion into cutobjects can be done by other processes.
+        """
 
         def get_pathlist(node, factor):
             from time import perf_counter
@@ -453,6 +462,9 @@ class CutOpNode(OperationMixin, Node, Parameters):
 
         settings = self.derive()
         factor = settings["native_mm"] / UNITS_PER_MM if "native_mm" in settings else 1
+        kerf = self.kerf * self._device_factor
+        # The offset routine is only needed (and bound to this node) for a kerf.
+        offset_routine = self.offset_routine if kerf != 0 else None
         for node in self.children:
             if (
                 hasattr(node, "hidden")
@@ -468,15 +480,14 @@ class CutOpNode(OperationMixin, Node, Parameters):
                 # ImageNode does not have a stroke.
                 stroke = None
             for origin, path in pathlist:
-                yield from path_to_cutobjects(
-                    path,
+                yield stroke, dict(
+                    path=path,
                     settings=settings,
                     closed_distance=closed_distance,
                     passes=passes,
                     original_op=self.type,
-                    color=stroke,
-                    kerf=self.kerf * self._device_factor,
-                    offset_routine=self.offset_routine,
+                    kerf=kerf,
+                    offset_routine=offset_routine,
                     origin=origin,
                 )
 
@@ -357,6 +357,15 @@ class EngraveOpNode(OperationMixin, Node, Parameters):
 
     def as_cutobjects(self, closed_distance=15, passes=1):
         """Generator of cutobjects for a particular operation."""
+        for color, source in self.cutobject_sources(closed_distance, passes):
+            yield from path_to_cutobjects(color=color, **source)
+
+    def cutobject_sources(self, closed_distance=15, passes=1):
+        """
+        Generator of (color, path_to_cutobjects arguments) for every path of this
+        operation. Apart from the color these arguments can be pickled, so the
+        conversion into cutobjects can be done by other processes.
+        """
 
         def get_pathlist(node, factor):
             from time import perf_counter
@@ -422,13 +431,12 @@ class EngraveOpNode(OperationMixin, Node, Parameters):
                 # ImageNode does not have a stroke.
                 stroke = None
             for origin, path in pathlist:
-                yield from path_to_cutobjects(
-                    path,
+                yield stroke, dict(
+                    path=path,
                     settings=settings,
                     closed_distance=closed_distance,
                     passes=passes,
                     original_op=self.type,
-                    color=stroke,
                     origin=origin,
                 )
 
@@ -0,0 +1,240 @@
+"""
+Process pool for work that can be split into independent, picklable tasks.
+
+Nodes are tied to the tree and the kernel and cannot be sent to another process.
+Callers extract the data they need (Geomstr, svgelements paths, PIL images, plain
+settings dicts) and hand a module level function plus that data to parallel_map.
+Results come back in the order of the tasks, all at once from parallel_map or one by
+one as they are done from parallel_imap.
+
+The pool is shared and kept alive between calls, since starting worker processes
+is costly. Workers are started with the `spawn` method, forking a process that
+runs several threads (scheduler, GUI) is not safe. Python 3.6 cannot choose the
+start method of a pool, there all tasks are processed serially.
+
+If a task or its result cannot be pickled, or the pool breaks, the remaining tasks
+are processed in the calling process instead. Exceptions raised by the task itself
+are raised to the caller.
+"""
+
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+# ProcessPoolExecutor takes mp_context since Python 3.7 and cancel_futures since 3.9.
+SPAWN_POOL = sys.version_info >= (3, 7)
+CANCEL_FUTURES = sys.version_info >= (3, 9)
+
+
+def available_cpus():
+    """
+    @return: number of cpus usable by this process
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def resolve_jobs(jobs):
+    """
+    Converts a jobs setting into a number of workers. Values of 0 or below
+    mean use all available cpus, None means serial.
+
+    @param jobs: requested number of workers
+    @return: number of workers, at least 1
+    """
+    if jobs is None or not SPAWN_POOL:
+        return 1
+    try:
+        jobs = int(jobs)
+    except (TypeError, ValueError):
+        return 1
+    if jobs <= 0:
+        return available_cpus()
+    return jobs
+
+
+class UnpicklableError(Exception):
+    """
+    A task or its result cannot be sent between processes.
+    """
+
+
+def _pickled(function, task):
+    try:
+        return pickle.dumps((function, task), pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        raise UnpicklableError(f"task: {e}") from e
+
+
+def _run_pickled(payload):
+    """
+    Runs a pickled function and task in a worker process, returning the pickled result.
+    Pickling is done here rather than by the pool, so that a task which cannot be sent
+    is told apart from a task which fails.
+    """
+    try:
+        function, task = pickle.loads(payload)
+    except Exception as e:
+        raise UnpicklableError(f"task: {e}") from None
+    result = function(task)
+    try:
+        return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        raise UnpicklableError(f"result: {e}") from None
+
+
+def get_executor(jobs):
+    """
+    Returns the shared process pool with at least `jobs` workers. The pool grows if more
+    workers are requested and never shrinks, a replaced pool finishes the tasks already
+    submitted to it.
+
+    @param jobs: number of workers
+    @return: ProcessPoolExecutor
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None and _executor_workers < jobs:
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=jobs,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _executor_workers = jobs
+        return _executor
+
+
+def discard_executor(executor):
+    """
+    Drops a broken pool, if it still is the shared pool.
+
+    @param executor: ProcessPoolExecutor
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+            _executor_workers = 0
+    executor.shutdown(wait=False)
+
+
+def submit(function, task, jobs):
+    """
+    Submits a single task to the shared pool.
+
+    @param function: module level function taking a single task
+    @param task: picklable task
+    @param jobs: workers the pool should have at least
+    @return: future, its result() raises UnpicklableError if the task or result cannot be
+        sent between the processes
+    """
+    payload = _pickled(function, task)
+    executor = get_executor(jobs)
+    try:
+        return _PickledFuture(executor, executor.submit(_run_pickled, payload))
+    except BrokenProcessPool:
+        discard_executor(executor)
+        raise
+
+
+class _PickledFuture:
+    """
+    Future of a submitted task, unpickling the result.
+    """
+
+    def __init__(self, executor, future):
+        self.executor = executor
+        self.future = future
+
+    def cancel(self):
+        return self.future.cancel()
+
+    def result(self, timeout=None):
+        return pickle.loads(self.future.result(timeout))
+
+
+def shutdown():
+    """
+    Stops the shared process pool, if any. Tasks not yet started are cancelled with
+    Python 3.9 and later.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            if CANCEL_FUTURES:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                _executor.shutdown(wait=False)
+        _executor = None
+        _executor_workers = 0
+
+
+def parallel_map(function, tasks, jobs=1, channel=None):
+    """
+    Applies function to every task, using up to `jobs` worker processes.
+
+    @param function: module level function taking a single task
+    @param tasks: iterable of picklable tasks
+    @param jobs: number of workers, 1 processes the tasks serially
+    @param channel: optional channel for diagnostics
+    @return: list of results, in task order
+    """
+    return list(parallel_imap(function, tasks, jobs=jobs, channel=channel))
+
+
+def parallel_imap(function, tasks, jobs=1, channel=None):
+    """
+    Like parallel_map, but yields every result as soon as it and the results of the
+    tasks before it are done. At most `jobs` tasks are in the pool at any time.
+
+    If a task or its result cannot be pickled, or the pool breaks, the remaining tasks
+    are processed serially. Exceptions raised by a task are raised here.
+
+    @param function: module level function taking a single task
+    @param tasks: iterable of picklable tasks
+    @param jobs: number of workers, 1 processes the tasks serially
+    @param channel: optional channel for diagnostics
+    @return: generator of results, in task order
+    """
+    tasks = list(tasks)
+    jobs = min(resolve_jobs(jobs), len(tasks))
+    done = 0
+    if jobs > 1:
+        pending = deque()
+        try:
+            submitted = 0
+            while done < len(tasks):
+                while submitted < len(tasks) and len(pending) < jobs:
+                    pending.append(submit(function, tasks[submitted], jobs))
+                    submitted += 1
+                result = pending[0].result()
+                pending.popleft()
+                done += 1
+                yield result
+            return
+        except BrokenProcessPool as e:
+            for executor in {future.executor for future in pending}:
+                discard_executor(executor)
+            if channel:
+                channel(f"Worker pool failed ({e}), processing serially.")
+        except UnpicklableError as e:
+            if channel:
+                channel(f"Parallel processing failed ({e}), processing serially.")
+        finally:
+            for future in pending:
+                future.cancel()
+    for task in tasks[done:]:
+        yield function(task)
@@ -0,0 +1,307 @@
+"""
+Plan cache: reuse of cutcode and optimization results between plans.
+
+Re-running the planner after a trivial change (toggling one operation off, moving a
+single element) repeats the conversion of every operation into cutcode and the full
+optimization. Each operation is fingerprinted after preprocessing, this covers its
+settings, the geometry and matrix of every child and the image processing state of
+images. If a fingerprint was seen before the cutcode is cloned from the cache rather
+than converted again. The optimization result of a whole plan is cached as well, keyed
+on the fingerprints of all its cutcode and the optimization settings.
+
+Cached cutcode is never handed out: the planner stages modify cutcode in place, so
+values are cloned when stored and again when retrieved. Cutcode containing cuts that
+cannot be cloned cheaply (rasters hold their plotter state) is not cached.
+
+The cache is a least recently used cache bounded by the number of cut objects held.
+"""
+
+import hashlib
+from collections import OrderedDict
+from copy import copy
+
+import numpy as np
+
+from ..svgelements import Color, Matrix
+from .cutcode.rastercut import RasterCut
+from .geomstr import Geomstr
+from .node.node import TRANSIENT_ATTRIBUTES, Node
+
+# Node attributes that describe user interface state, not what is burnt.
+IGNORED_ATTRIBUTES = TRANSIENT_ATTRIBUTES | frozenset(
+    (
+        "_selected",
+        "_emphasized",
+        "_emphasized_time",
+        "_highlighted",
+        "_target",
+        "_opened",
+        "_expanded",
+        "_formatter",
+        "_is_visible",
+        "lock",
+        "label",
+        "label_display",
+        "id",
+    )
+)
+
+# Operations whose cutcode is cached, rasters are cheap to convert but costly to hash.
+CACHED_OPERATIONS = ("op cut", "op engrave", "op dots")
+
+UNCACHEABLE_CUTS = (RasterCut,)
+
+
+def _feed(digest, value, seen):
+    """
+    Feeds a value into the digest. Objects without a known representation use
+    their identity, so they never match (and never reuse stale results).
+    """
+    if isinstance(value, Node):
+        _feed_node(digest, value, seen)
+    elif value is None or isinstance(value, (bool, int, float, str, bytes)):
+        digest.update(repr(value).encode())
+    elif isinstance(value, (tuple, list)):
+        digest.update(b"[")
+        for v in value:
+            _feed(digest, v, seen)
+            digest.update(b",")
+        digest.update(b"]")
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for k in sorted(value, key=str):
+            digest.update(str(k).encode())
+            _feed(digest, value[k], seen)
+        digest.update(b"}")
+    elif isinstance(value, Matrix):
+        _feed(digest, (value.a, value.b, value.c, value.d, value.e, value.f), seen)
+    elif isinstance(value, Color):
+        _feed(digest, value.value, seen)
+    elif isinstance(value, Geomstr):
+        digest.update(value.segments[: value.index].tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(value.tobytes())
+    elif hasattr(value, "tobytes") and hasattr(value, "mode"):
+        # PIL Image
+        _feed(digest, (value.mode, value.size), seen)
+        digest.update(value.tobytes())
+    elif type(value).__repr__ is not object.__repr__:
+        digest.update(type(value).__name__.encode())
+        digest.update(repr(value).encode())
+    else:
+        digest.update(f"{type(value).__name__}@{id(value)}".encode())
+
+
+def _feed_node(digest, node, seen):
+    """
+    Feeds a node, its attributes and its children into the digest. Nodes met
+    again (references, links between nodes) are fed by their position.
+    """
+    position = seen.get(id(node))
+    if position is not None:
+        digest.update(f"@{position}".encode())
+        return
+    seen[id(node)] = len(seen)
+    digest.update(b"<")
+    attributes = node.__dict__
+    for key in sorted(attributes):
+        if key in IGNORED_ATTRIBUTES or key.startswith("_can_"):
+            continue
+        digest.update(key.encode())
+        _feed(digest, attributes[key], seen)
+    for child in node.children:
+        _feed_node(digest, child, seen)
+    digest.update(b">")
+
+
+def node_fingerprint(node, digest=None):
+    """
+    Fingerprint of a node and all its descendants.
+
+    @param node: node to fingerprint
+    @param digest: hashlib digest to feed, a new one is created if None
+    @return: hex digest
+    """
+    if digest is None:
+        digest = hashlib.blake2b(digest_size=20)
+    _feed_node(digest, node, dict())
+    return digest.hexdigest()
+
+
+def operation_fingerprint(op, *extra):
+    """
+    Fingerprint of an operation with its settings and children, and any
+    extra values that influence the conversion into cutcode.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    seen = dict()
+    _feed(digest, extra, seen)
+    _feed_node(digest, op, seen)
+    return digest.hexdigest()
+
+
+def combined_fingerprint(*fingerprints):
+    """
+    Fingerprint of a sequence of fingerprints, None if any of them is None.
+    """
+    if any(f is None for f in fingerprints):
+        return None
+    digest = hashlib.blake2b(digest_size=20)
+    for f in fingerprints:
+        digest.update(f.encode())
+    return digest.hexdigest()
+
+
+def is_cacheable(cutcode):
+    for cut in cutcode.flat():
+        if isinstance(cut, UNCACHEABLE_CUTS):
+            return False
+    return True
+
+
+def clone_cutcode(cutcode, replace=None):
+    """
+    Clones cutcode with all its groups and cuts. References between the cuts
+    (parent, next, previous, inside, ...) are mapped onto the clones, a cut that
+    appears several times is cloned once. Settings dicts and geometry are copied,
+    the planner modifies them in place. Paths are shared.
+
+    @param cutcode: cutcode to clone
+    @param replace: dict of id(object) to the object used in its place
+    @return: cloned cutcode
+    """
+    memo = dict(replace) if replace else dict()
+    clones = []
+
+    def clone(obj):
+        new = memo.get(id(obj))
+        if new is not None:
+            return new
+        new = obj.__class__.__new__(obj.__class__)
+        new.__dict__.update(obj.__dict__)
+        memo[id(obj)] = new
+        clones.append(new)
+        if isinstance(obj, list):
+            list.extend(new, [clone(c) for c in obj])
+        return new
+
+    def copied(value):
+        new = memo.get(id(value))
+        if new is None:
+            new = copy(value)
+            memo[id(value)] = new
+        return new
+
+    result = clone(cutcode)
+    for new in clones:
+        attributes = new.__dict__
+        for key, value in attributes.items():
+            mapped = memo.get(id(value))
+            if mapped is not None:
+                attributes[key] = mapped
+            elif isinstance(value, (dict, Geomstr)):
+                attributes[key] = copied(value)
+            elif isinstance(value, list):
+                attributes[key] = [memo.get(id(v), v) for v in value]
+    return result
+
+
+def cut_count(cutcode):
+    return sum(1 for _ in cutcode.flat())
+
+
+class PlanCache:
+    """
+    Least recently used cache of cutcode, bounded by the number of cut objects.
+    """
+
+    def __init__(self, max_cuts=250000):
+        self.max_cuts = max_cuts
+        self._entries = OrderedDict()
+        self.cuts = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def enabled(self):
+        return self.max_cuts > 0
+
+    def get(self, key, settings=None):
+        """
+        Returns a clone of the cached cutcode list for key, None on a miss.
+
+        @param key: cache key
+        @param settings: settings used for the cloned cutcode, copies of the
+            cached settings if None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if settings is None:
+            return [clone_cutcode(c) for c in entry[0]]
+        return [clone_cutcode(c, {id(c.settings): settings}) for c in entry[0]]
+
+    def put(self, key, cutcodes):
+        """
+        Stores clones of the given cutcode list. Uncacheable cutcode is ignored.
+
+        @return: whether the value was stored
+        """
+        if not self.enabled or key is None:
+            return False
+        if not all(is_cacheable(c) for c in cutcodes):
+            return False
+        weight = sum(cut_count(c) for c in cutcodes)
+        if weight > self.max_cuts:
+            return False
+        self.discard(key)
+        self._entries[key] = ([clone_cutcode(c) for c in cutcodes], weight)
+        self.cuts += weight
+        self.stores += 1
+        self.trim()
+        return True
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.cuts -= entry[1]
+
+    def trim(self):
+        while self.cuts > self.max_cuts and self._entries:
+            key, (value, weight) = self._entries.popitem(last=False)
+            self.cuts -= weight
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.cuts = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "cuts": self.cuts,
+            "max_cuts": self.max_cuts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -6,6 +6,7 @@ from meerk40t.kernel import Service
 
 from ..core.cutcode.cutcode import CutCode
 from .cutplan import CutPlan, CutPlanningFailedError
+from .estimator import device_estimator, format_duration
 from .node.op_cut import CutOpNode
 from .node.op_dots import DotsOpNode
 from .node.op_engrave import EngraveOpNode
@@ -16,6 +17,7 @@ from .node.util_goto import GotoOperation
 from .node.util_home import HomeOperation
 from .node.util_output import OutputOperation
 from .node.util_wait import WaitOperation
+from .plancache import PlanCache
 from .units import Length
 
 """
@@ -388,6 +390,40 @@ def plugin(kernel, lifecycle=None):
                 "subsection": "_10_",
                 "conditional": (context, "opt_reduce_details"),
             },
+            {
+                "attr": "opt_parallel_jobs",
+                "object": context,
+                "default": 1,
+                "type": int,
+                "label": _("Parallel jobs"),
+                "tip": _(
+                    "Number of worker processes used to convert operations into cutcode.\n"
+                    + "1 converts everything in the main process, 0 uses all available processors."
+                )
+                + "\n"
+                + _(
+                    "Starting the workers takes time, so this is only worthwhile for large jobs."
+                ),
+                "page": "Optimisations",
+                # Hint for translation _("Performance")
+                "section": "_40_Performance",
+                "lower": 0,
+                "upper": 64,
+            },
+            {
+                "attr": "opt_plan_cache_size",
+                "object": context,
+                "default": 250000,
+                "type": int,
+                "label": _("Plan cache size"),
+                "tip": _(
+                    "Maximum number of cuts kept to reuse the conversion and optimization\n"
+                    + "of unchanged operations when planning again. 0 disables the cache."
+                ),
+                "page": "Optimisations",
+                "section": "_40_Performance",
+                "lower": 0,
+            },
         ]
         for c in choices:
             c["help"] = "optimisation"
@@ -447,6 +483,7 @@ class Planner(Service):
         self._default_plan = "0"
         # self.do_optimization = True
         self._plan_lock = threading.Lock()
+        self.plan_cache = PlanCache()
 
     @property
     def do_optimization(self):
@@ -529,6 +566,45 @@ class Planner(Service):
                 stage, info = self.get_plan_stage(plan)
                 channel(f"{i + 1}: {plan} (State: {info})")
 
+        @self.console_argument(
+            "action", type=str, help=_("clear: empty the cache and reset its statistics")
+        )
+        @self.console_command(
+            "plan-cache",
+            help=_("Statistics of the cache of converted and optimized cutcode"),
+            input_type=None,
+            output_type=None,
+        )
+        def plan_cache_stats(command, channel, _, action=None, **kwgs):
+            cache = self.plan_cache
+            if action == "clear":
+                cache.clear()
+                cache.reset_stats()
+                channel(_("Plan cache cleared."))
+                return
+            if action is not None:
+                channel(_("Unknown action: {action}").format(action=action))
+                return
+            stats = cache.stats()
+            channel(
+                _("Plan cache: {entries} entries, {cuts} of {max_cuts} cuts").format(
+                    **stats
+                )
+            )
+            channel(
+                _(
+                    "Hits: {hits}, misses: {misses}, hit rate: {rate:.1f}%, stored: {stores}, evicted: {evictions}"
+                ).format(rate=100 * stats["hit_rate"], **stats)
+            )
+
+        @self.console_option(
+            "jobs",
+            "j",
+            type=int,
+            help=_(
+                "number of worker processes converting operations (0 = all processors)"
+            ),
+        )
         @self.console_command(
             "plan",
             help="plan<?> <command> : " + _("issue a command to modify the plan"),
@@ -536,11 +612,15 @@ class Planner(Service):
             input_type=(None, "ops"),
             output_type="plan",
         )
-        def plan_base(command, channel, _, data=None, remainder=None, **kwgs):
+        def plan_base(
+            command, channel, _, data=None, remainder=None, jobs=None, **kwgs
+        ):
             if len(command) > 4:
                 self._default_plan = command[4:]
 
             cutplan = self.default_plan
+            if jobs is not None:
+                cutplan.jobs = jobs
             if data is not None:
                 # If ops data is in data, then we copy that and move on to next step.
                 for c in data:
@@ -960,6 +1040,50 @@ class Planner(Service):
             self.update_stage(data.name, STAGE_PLAN_CLEAR)
             return data_type, data
 
+        @self.console_command(
+            "estimate",
+            help="plan<?> estimate : "
+            + _("estimate the time of the plan with the motion model of the device"),
+            input_type="plan",
+            output_type="plan",
+        )
+        def plan_estimate(command, channel, _, data_type=None, data=None, **kwgs):
+            estimator = device_estimator(self.device)
+            if estimator is None:
+                channel(_("No motion model for this device, using nominal speeds."))
+            total = 0
+            nominal_total = 0
+            for i, item in enumerate(data.plan):
+                if not isinstance(item, CutCode):
+                    continue
+                nominal = item.provide_statistics()[-1]
+                stats = (
+                    nominal
+                    if estimator is None
+                    else item.provide_statistics(estimator=estimator)[-1]
+                )
+                total += stats["time_at_end_of_burn"]
+                nominal_total += nominal["time_at_end_of_burn"]
+                channel(
+                    _(
+                        "{index}: {item}: travel {travel}, cut {cut}, extra {extra}, total {total} (nominal {nominal})"
+                    ).format(
+                        index=i + 1,
+                        item=item,
+                        travel=format_duration(stats["total_time_travel"]),
+                        cut=format_duration(stats["total_time_cut"]),
+                        extra=format_duration(stats["total_time_extra"]),
+                        total=format_duration(stats["time_at_end_of_burn"]),
+                        nominal=format_duration(nominal["time_at_end_of_burn"]),
+                    )
+                )
+            channel(
+                _("Estimated time: {total} (nominal {nominal})").format(
+                    total=format_duration(total), nominal=format_duration(nominal_total)
+                )
+            )
+            return data_type, data
+
         @self.console_command(
             "finish",
             help="plan<?> finish : " + _("deem the plan to be finished"),
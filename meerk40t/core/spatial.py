@@ -1,8 +1,12 @@
 """
 Spatial helper utilities for nearest-neighbour queries.
-Provides a memory-safe nearest neighbour implementation with an optional SciPy cKDTree fallback.
+Provides a memory-safe nearest neighbour implementation with an optional SciPy cKDTree fallback,
+a point grid and an R-tree of boxes.
 """
+from heapq import heapify, heappop, heappush
+from math import floor
 from typing import Optional
+
 import numpy as np
 
 # Optional SciPy KD-tree fallback for faster nearest-neighbor queries
@@ -230,3 +234,371 @@ def shortest_distance(p1, p2, tuplemode, max_mem: Optional[int] = None):
 
 # Backwards-compatible alias
 shortest_distance_chunked = shortest_distance
+
+
+class PointGrid:
+    """
+    Uniform grid of keyed points supporting insertion, removal and nearest
+    neighbour queries.
+
+    Unlike a KD-tree the grid does not need to be rebuilt when points are removed,
+    which makes it suitable for greedy orderings that consume the points one at a
+    time. Nearest queries search rings of cells around the query point, once the
+    rings hold more cells than are occupied all occupied cells are searched
+    instead, so queries stay cheap when few points are left.
+
+    Ties are resolved in favour of the smaller key.
+    """
+
+    def __init__(self, cell_size=1.0):
+        self.cell_size = float(cell_size) if cell_size > 0 else 1.0
+        self._cells = {}
+        self._points = {}
+
+    @classmethod
+    def for_points(cls, points, per_cell=2.0):
+        """
+        Creates an empty grid with a cell size suited to the given points.
+
+        @param points: iterable of (x, y)
+        @param per_cell: average number of points per cell
+        @return: PointGrid
+        """
+        points = np.asarray(list(points), dtype=float)
+        if len(points) < 2:
+            return cls(1.0)
+        width, height = points.max(axis=0) - points.min(axis=0)
+        area = max(width, 1.0) * max(height, 1.0)
+        return cls(np.sqrt(area * per_cell / len(points)))
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def _cell(self, x, y):
+        size = self.cell_size
+        return floor(x / size), floor(y / size)
+
+    def insert(self, key, x, y):
+        if key in self._points:
+            self.remove(key)
+        cell = self._cell(x, y)
+        self._points[key] = (x, y, cell)
+        try:
+            self._cells[cell][key] = (x, y)
+        except KeyError:
+            self._cells[cell] = {key: (x, y)}
+
+    def remove(self, key):
+        """
+        Removes the point of key, if present.
+        """
+        entry = self._points.pop(key, None)
+        if entry is None:
+            return
+        cell = entry[2]
+        points = self._cells[cell]
+        del points[key]
+        if not points:
+            del self._cells[cell]
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield cx + dx, cy - r
+            yield cx + dx, cy + r
+        for dy in range(-r + 1, r):
+            yield cx - r, cy + dy
+            yield cx + r, cy + dy
+
+    def nearest(self, x, y):
+        """
+        Finds the point closest to (x, y).
+
+        @return: (squared distance, key), None if the grid is empty.
+        """
+        cells = self._cells
+        if not cells:
+            return None
+        size = self.cell_size
+        cx, cy = self._cell(x, y)
+        fx = x - cx * size
+        fy = y - cy * size
+        margin = min(fx, size - fx, fy, size - fy)
+        best = None
+        r = 0
+        while True:
+            if (2 * r + 1) ** 2 > len(cells):
+                # The rings hold more cells than are occupied.
+                search = cells.values()
+            else:
+                search = (cells[c] for c in self._ring(cx, cy, r) if c in cells)
+            for points in search:
+                for key, (px, py) in points.items():
+                    dx = px - x
+                    dy = py - y
+                    candidate = (dx * dx + dy * dy, key)
+                    if best is None or candidate < best:
+                        best = candidate
+            if search is cells.values():
+                return best
+            if best is not None:
+                # Distance from (x, y) to the nearest cell of the next ring.
+                bound = r * size + margin
+                if best[0] < bound * bound:
+                    return best
+            r += 1
+
+
+class BoxTree:
+    """
+    R-tree of keyed boxes (x0, y0, x1, y1) supporting rectangle, point and
+    nearest queries.
+
+    The tree is packed: it is bulk loaded by sort tile recursion into numpy levels
+    of parent boxes, every parent covering `capacity` consecutive entries of the
+    level below, and queries descend all levels vectorized. Updates keep the tree
+    valid without repacking it, a removed entry is marked dead and an inserted or
+    moved entry is kept in an overflow list which is searched linearly. Once the
+    overflow grows beyond a fraction of the tree the live entries are packed again.
+
+    Keys are integers, results are sorted by key.
+    """
+
+    def __init__(self, capacity=16):
+        self.capacity = max(2, int(capacity))
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._boxes = np.zeros((0, 4), dtype=float)
+        self._alive = np.zeros(0, dtype=bool)
+        # Position of the live entries of the packed tree.
+        self._slots = {}
+        self._levels = []
+        self._overflow = {}
+        self._overflow_arrays = None
+        self.rebuilds = 0
+
+    def __len__(self):
+        return len(self._slots) + len(self._overflow)
+
+    def __contains__(self, key):
+        return key in self._slots or key in self._overflow
+
+    def items(self):
+        """
+        Yields (key, box) of all entries.
+        """
+        for key, slot in self._slots.items():
+            yield key, tuple(self._boxes[slot])
+        yield from self._overflow.items()
+
+    def build(self, keys, boxes):
+        """
+        Packs the tree with the given entries, replacing all entries.
+
+        @param keys: iterable of int
+        @param boxes: iterable of (x0, y0, x1, y1)
+        """
+        keys = np.asarray(list(keys), dtype=np.int64)
+        boxes = np.asarray(list(boxes), dtype=float).reshape((-1, 4))
+        self._overflow = {}
+        self._overflow_arrays = None
+        self.rebuilds += 1
+        if len(keys) == 0:
+            self._keys = keys
+            self._boxes = boxes
+            self._alive = np.zeros(0, dtype=bool)
+            self._slots = {}
+            self._levels = []
+            return
+        order = self._str_order(boxes)
+        self._keys = keys[order]
+        self._boxes = boxes[order]
+        self._alive = np.ones(len(keys), dtype=bool)
+        self._slots = {int(key): slot for slot, key in enumerate(self._keys)}
+        levels = []
+        level = self._boxes
+        cap = self.capacity
+        while len(level) > cap:
+            count = -(-len(level) // cap)
+            padded = np.empty((count * cap, 4), dtype=float)
+            padded[: len(level)] = level
+            # Padding repeats the last box, it does not grow the parent.
+            padded[len(level) :] = level[-1]
+            padded = padded.reshape((count, cap, 4))
+            level = np.concatenate(
+                (padded[:, :, :2].min(axis=1), padded[:, :, 2:].max(axis=1)), axis=1
+            )
+            levels.append(level)
+        # Root level first.
+        self._levels = levels[::-1]
+
+    def _str_order(self, boxes):
+        """
+        Sort tile recursive order: boxes are sorted by the x of their centers into
+        vertical slices, each slice sorted by the y of the centers.
+        """
+        count = len(boxes)
+        cx = boxes[:, 0] + boxes[:, 2]
+        cy = boxes[:, 1] + boxes[:, 3]
+        leaves = -(-count // self.capacity)
+        slices = max(1, int(np.ceil(np.sqrt(leaves))))
+        per_slice = slices * self.capacity
+        by_x = np.argsort(cx, kind="stable")
+        slice_of = np.empty(count, dtype=np.int64)
+        slice_of[by_x] = np.arange(count) // per_slice
+        return np.lexsort((cy, slice_of))
+
+    def insert(self, key, box):
+        """
+        Inserts or moves the entry of key.
+        """
+        self.remove(key)
+        self._overflow[key] = tuple(float(v) for v in box)
+        self._overflow_arrays = None
+        if len(self._overflow) > max(64, len(self._slots) // 4):
+            self.build(*zip(*self.items()))
+
+    def remove(self, key):
+        """
+        Removes the entry of key, if present.
+        """
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self._alive[slot] = False
+        elif self._overflow.pop(key, None) is not None:
+            self._overflow_arrays = None
+
+    def _overflow_entries(self):
+        if self._overflow_arrays is None:
+            keys = np.fromiter(self._overflow.keys(), dtype=np.int64, count=len(self._overflow))
+            boxes = np.array(list(self._overflow.values()), dtype=float).reshape((-1, 4))
+            self._overflow_arrays = keys, boxes
+        return self._overflow_arrays
+
+    def _candidates(self, hits):
+        """
+        Descends the levels of the packed tree.
+
+        @param hits: function of a box array giving the mask of boxes to descend into
+        @return: slots of the leaf entries that are hit
+        """
+        cap = self.capacity
+        levels = self._levels
+        if not levels:
+            index = np.arange(len(self._boxes))
+        else:
+            index = np.arange(len(levels[0]))
+            for depth in range(len(levels)):
+                index = index[hits(levels[depth][index])]
+                below = levels[depth + 1] if depth + 1 < len(levels) else self._boxes
+                index = (index[:, np.newaxis] * cap + np.arange(cap)).ravel()
+                index = index[index < len(below)]
+        index = index[hits(self._boxes[index])]
+        return index[self._alive[index]]
+
+    def query(self, x0, y0, x1, y1, contained=False):
+        """
+        Keys of the boxes intersecting the rectangle, edges included.
+
+        @param contained: only boxes lying within the rectangle
+        @return: sorted int64 array of keys
+        """
+        if x0 > x1:
+            x0, x1 = x1, x0
+        if y0 > y1:
+            y0, y1 = y1, y0
+
+        def intersects(boxes):
+            return (
+                (boxes[:, 0] <= x1)
+                & (boxes[:, 2] >= x0)
+                & (boxes[:, 1] <= y1)
+                & (boxes[:, 3] >= y0)
+            )
+
+        slots = self._candidates(intersects)
+        boxes = self._boxes[slots]
+        keys = self._keys[slots]
+        if self._overflow:
+            extra_keys, extra_boxes = self._overflow_entries()
+            mask = intersects(extra_boxes)
+            keys = np.concatenate((keys, extra_keys[mask]))
+            boxes = np.concatenate((boxes, extra_boxes[mask]))
+        if contained:
+            inside = (
+                (boxes[:, 0] >= x0)
+                & (boxes[:, 2] <= x1)
+                & (boxes[:, 1] >= y0)
+                & (boxes[:, 3] <= y1)
+            )
+            keys = keys[inside]
+        return np.sort(keys)
+
+    def query_point(self, x, y):
+        """
+        Keys of the boxes containing the point, edges included.
+        """
+        return self.query(x, y, x, y)
+
+    @staticmethod
+    def _distance(boxes, x, y):
+        dx = np.maximum(np.maximum(boxes[:, 0] - x, x - boxes[:, 2]), 0.0)
+        dy = np.maximum(np.maximum(boxes[:, 1] - y, y - boxes[:, 3]), 0.0)
+        return dx * dx + dy * dy
+
+    def nearest(self, x, y, accept=None):
+        """
+        Finds the box closest to (x, y), boxes containing the point have distance 0.
+        Ties are resolved in favour of the smaller key.
+
+        @param accept: optional function of a key, False skips the entry
+        @return: (squared distance, key), None if there is no such entry.
+        """
+        best = None
+        if self._overflow:
+            keys, boxes = self._overflow_entries()
+            distances = self._distance(boxes, x, y)
+            for i in np.lexsort((keys, distances)):
+                if accept is None or accept(int(keys[i])):
+                    best = (float(distances[i]), int(keys[i]))
+                    break
+        if not self._slots:
+            return best
+        cap = self.capacity
+        levels = self._levels
+        depth_count = len(levels)
+        # Best first search over (distance, depth, index) of the tree nodes.
+        if depth_count == 0:
+            heap = [(0.0, 0, -1)]
+        else:
+            distances = self._distance(levels[0], x, y)
+            heap = [(float(d), 1, i) for i, d in enumerate(distances)]
+            heapify(heap)
+        while heap:
+            distance, depth, index = heappop(heap)
+            if best is not None and distance > best[0]:
+                break
+            if depth > depth_count:
+                key = int(self._keys[index])
+                if accept is not None and not accept(key):
+                    continue
+                candidate = (distance, key)
+                if best is None or candidate < best:
+                    best = candidate
+                continue
+            below = levels[depth] if depth < depth_count else self._boxes
+            if index < 0:
+                children = np.arange(len(below))
+            else:
+                children = np.arange(index * cap, min((index + 1) * cap, len(below)))
+            if depth == depth_count:
+                children = children[self._alive[children]]
+            for child, d in zip(children, self._distance(below[children], x, y)):
+                d = float(d)
+                if best is None or d <= best[0]:
+                    heappush(heap, (d, depth + 1, int(child)))
+        return best
@@ -2,6 +2,7 @@ import time
 from math import isinf
 from threading import Condition
 
+from meerk40t.core.estimator import format_duration
 from meerk40t.core.laserjob import LaserJob
 from meerk40t.core.planner import STAGE_PLAN_BLOB
 from meerk40t.core.units import Length
@@ -120,7 +121,11 @@ def plugin(kernel, lifecycle):
                 _("Spooler on device {name}:").format(name=str(kernel.device.label))
             )
             for s, op_name in enumerate(spooler.queue):
-                channel(f"{s}: {op_name}")
+                if hasattr(op_name, "estimate_time"):
+                    estimate = format_duration(op_name.estimate_time())
+                    channel(f"{s}: {op_name} ({_('estimate')}: {estimate})")
+                else:
+                    channel(f"{s}: {op_name}")
             channel(_("----------"))
             return data_type, spooler
 
@@ -127,6 +127,21 @@ def plugin(kernel, lifecycle=None):
                 # Hint for translation _("Input")
                 "section": "Input",
             },
+            {
+                "attr": "svg_stream_load",
+                "object": kernel.elements,
+                "default": True,
+                "type": bool,
+                "label": _("Stream plain SVG files"),
+                "tip": _(
+                    "Ticked: Files consisting of plain paths, polylines, rectangles and lines are read without building the full SVG document first, which is faster and needs less memory for large files."
+                )
+                + "\n"
+                + _("Other files are always loaded completely."),
+                "page": "Input/Output",
+                # Hint for translation _("Input")
+                "section": "Input",
+            },
         ]
         kernel.register_choices("preferences", choices)
         # The order is relevant as both loaders support SVG
@@ -1958,6 +1973,23 @@ class SVGLoader:
             else:
                 width = None
                 height = None
+            reuse = elements_service.reuse_operations_on_load
+            to_regmarks = elements_service.load_hidden_to_regmarks
+            replace_ops = kwargs.get("replace_ops", False)
+            if elements_service.svg_stream_load and SVGLoader.stream(
+                elements_service,
+                source,
+                pathname,
+                ppi,
+                width,
+                height,
+                scale_factor,
+                load_operations=True,
+                reuse_operations=reuse,
+                load_hidden_to_regmarks=to_regmarks,
+                replace_ops=replace_ops,
+            ):
+                return True
             # The color attribute of SVG.parse decides which default color
             # a stroke / fill will get if the attribute "currentColor" is
             # set - we opt for "black"
@@ -1973,9 +2005,6 @@ class SVGLoader:
             )
         except ParseError as e:
             raise BadFileError(str(e)) from e
-        reuse = elements_service.reuse_operations_on_load
-        to_regmarks = elements_service.load_hidden_to_regmarks
-        replace_ops = kwargs.get("replace_ops", False)
         elements_service._loading_cleared = True
         svg_processor = SVGProcessor(
             elements_service,
@@ -1988,6 +2017,36 @@ class SVGLoader:
         svg_processor.cleanup()
         return True
 
+    @staticmethod
+    def stream(
+        elements_service, source, pathname, ppi, width, height, scale_factor, **kwargs
+    ):
+        """
+        Loads plain files without building the svgelements document, see svg_stream.
+
+        @param kwargs: parameters of the SVGProcessor
+        @return: False if the file needs the full loader
+        """
+        from .svg_stream import SVGStreamProcessor
+
+        svg_processor = SVGStreamProcessor(elements_service, **kwargs)
+        document = svg_processor.read(
+            source,
+            ppi=ppi,
+            width=width,
+            height=height,
+            color="black",
+            transform=f"scale({scale_factor})",
+        )
+        if document is None:
+            if not isinstance(source, str):
+                source.seek(0)
+            return False
+        elements_service._loading_cleared = True
+        svg_processor.process(document, pathname)
+        svg_processor.cleanup()
+        return True
+
 
 class SVGLoaderPlain:
     """
@@ -2014,6 +2073,19 @@ class SVGLoaderPlain:
             else:
                 width = None
                 height = None
+            to_regmarks = elements_service.load_hidden_to_regmarks
+            if elements_service.svg_stream_load and SVGLoader.stream(
+                elements_service,
+                source,
+                pathname,
+                ppi,
+                width,
+                height,
+                scale_factor,
+                load_operations=False,
+                load_hidden_to_regmarks=to_regmarks,
+            ):
+                return True
             # The color attribute of SVG.parse decides which default color
             # a stroke / fill will get if the attribute "currentColor" is
             # set - we opt for "black"
@@ -2029,7 +2101,6 @@ class SVGLoaderPlain:
         except ParseError as e:
             raise BadFileError(str(e)) from e
         elements_service._loading_cleared = True
-        to_regmarks = elements_service.load_hidden_to_regmarks
         svg_processor = SVGProcessor(
             elements_service, load_operations=False, load_hidden_to_regmarks=to_regmarks
         )
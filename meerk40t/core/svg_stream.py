@@ -0,0 +1,682 @@
+"""
+Streaming import of plain SVG files.
+
+SVG.parse builds the full svgelements object graph of a file, every path as a list of
+segment objects, before SVGProcessor converts them into nodes. For large exports of
+CAD programs, thousands of plain paths and polylines, that graph dominates the load
+time and memory.
+
+SVGStreamProcessor reads the file with iterparse instead, composes the svg values of
+every element the way SVG.parse does, and builds the Geomstr of paths and polylines
+directly. Path data is read by the lexer of svgelements, the segment rows are written
+by _GeomstrPathBuilder without creating segments. Styles and transforms are resolved
+once per distinct combination.
+
+Only plain files are streamed: svg, g, path, polyline, polygon, rect and line elements,
+and elements unknown to svgelements like title, metadata or those of other namespaces.
+Anything else, css styles, defs, use, circles, text, images, hidden elements, meerk40t
+attributes and operations, makes read() return None, the file is then loaded by
+SVG.parse.
+"""
+
+from xml.etree.ElementTree import ParseError, iterparse
+
+import numpy as np
+
+from meerk40t.core.geomstr import TYPE_CUBIC, TYPE_END, TYPE_LINE, TYPE_QUAD, Geomstr
+from meerk40t.core.svg_io import MEERK40T_NAMESPACE, SVGProcessor
+
+from .. import svgelements
+from ..svgelements import (
+    REGEX_COORD_PAIR,
+    SVG,
+    SVG_ATTR_COLOR,
+    SVG_ATTR_DATA,
+    SVG_ATTR_DISPLAY,
+    SVG_ATTR_FILL,
+    SVG_ATTR_ID,
+    SVG_ATTR_POINTS,
+    SVG_ATTR_STROKE,
+    SVG_ATTR_STYLE,
+    SVG_ATTR_TAG,
+    SVG_ATTR_TRANSFORM,
+    SVG_ATTR_VECTOR_EFFECT,
+    SVG_ATTR_VIEWBOX,
+    SVG_VALUE_CURRENT_COLOR,
+    SVG_VALUE_NON_SCALING_STROKE,
+    Color,
+    Matrix,
+    Path,
+    Rect,
+    Shape,
+    SimpleLine,
+    SVGLexicalParser,
+)
+
+SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
+
+# Elements that are streamed.
+STREAM_TAGS = ("svg", "g", "path", "polyline", "polygon", "rect", "line")
+# Elements svgelements creates objects for that need the full loader. Any other element
+# is unknown to svgelements, like title and desc it only passes its values on to its
+# children, which belong to the enclosing group.
+UNSUPPORTED_TAGS = (
+    "defs",
+    "clipPath",
+    "use",
+    "pattern",
+    "circle",
+    "ellipse",
+    "image",
+    "style",
+    "text",
+    "tspan",
+)
+# Attributes written by meerk40t or needing the full loader.
+UNSUPPORTED_ATTRIBUTES = (
+    "type",
+    "lock",
+    "bounds",
+    "paint_bounds",
+    "label_display",
+    "references",
+    "clip-path",
+    "mask",
+    "filter",
+)
+# Values that decide the stroke, fill and transform of a shape.
+STYLE_KEYS = (
+    "stroke",
+    "stroke_opacity",
+    "stroke-opacity",
+    "fill",
+    "fill_opacity",
+    "fill-opacity",
+    "stroke_width",
+    "stroke-width",
+    "transform",
+    "apply",
+    "vector-effect",
+    "viewport_transform",
+)
+RECT_KEYS = ("x", "y", "width", "height", "rx", "ry")
+LINE_KEYS = ("x1", "y1", "x2", "y2")
+
+
+class _Unsupported(Exception):
+    """
+    The file needs the full loader.
+    """
+
+
+class _ArcPath(Exception):
+    """
+    Path data contains arcs, the geometry is converted through svgelements.
+    """
+
+
+class StreamElement:
+    """
+    Element read by SVGStreamProcessor, standing in for the svgelements element in the
+    checks of SVGProcessor which only use its values.
+    """
+
+    __slots__ = ("tag", "values", "id", "children", "node_type", "kwargs", "bounds")
+
+    def __init__(self, tag, values):
+        self.tag = tag
+        self.values = values
+        self.id = values.get(SVG_ATTR_ID)
+        self.children = []
+        self.node_type = None
+        self.kwargs = None
+        # x and y arrays of the points for precalculated bounds.
+        self.bounds = None
+
+
+class _GeomstrPathBuilder:
+    """
+    Receives the commands of the svgelements path lexer in place of a Path and appends
+    the rows Geomstr.svg would give for the segments of that Path.
+
+    Current, control and z points follow the arithmetic of Path, so the values are
+    identical. Arcs raise _ArcPath, Path approximates them with cubics and revalidates
+    all segment connections after that.
+    """
+
+    def __init__(self):
+        self.rows = []
+        # Number of segments of the equivalent Path.
+        self.count = 0
+        self.x = None
+        self.y = None
+        self._move = None
+        self._first = None
+        # End of the previous segment, a move to it is a subpath break.
+        self._last = None
+        # Control point reflected by smooth curves, None after other segments.
+        self._control = None
+
+    @property
+    def current_point(self):
+        if self.x is None:
+            return None
+        return self
+
+    def _z(self):
+        if self._move is not None:
+            return self._move
+        return self._first
+
+    def _point(self, point):
+        if point in ("z", "Z"):
+            return self._z()
+        return point
+
+    def _append(self, end, row, control=None):
+        if self.count == 0:
+            self._first = end
+        self.count += 1
+        self.x, self.y = end
+        self._last = end
+        self._control = control
+        if row is not None:
+            self.rows.append(row)
+
+    def _start(self):
+        if self.x is None:
+            return None
+        return complex(self.x, self.y)
+
+    def _smooth(self):
+        if self._control is None:
+            return self.x, self.y
+        return (
+            self.x + (self.x - self._control[0]),
+            self.y + (self.y - self._control[1]),
+        )
+
+    def start(self):
+        pass
+
+    def end(self):
+        pass
+
+    def move(self, *points, relative=False, **kwargs):
+        end = self._point(points[0])
+        if self._last is not None and self._last == end:
+            if not self.rows or self.rows[-1][2].real != TYPE_END:
+                self.rows.append((np.nan, np.nan, complex(TYPE_END, 0), np.nan, np.nan))
+        self._move = end
+        self._append(end, None)
+        if len(points) > 1:
+            self.line(*points[1:], relative=relative)
+
+    def line(self, *points, relative=False, **kwargs):
+        for point in points:
+            self._line(self._point(point))
+
+    def _line(self, end):
+        start = self._start()
+        row = None
+        if start is not None:
+            row = (start, 0, complex(TYPE_LINE, 0), 0, complex(*end))
+        self._append(end, row)
+
+    def vertical(self, *y_points, relative=False, **kwargs):
+        for y in y_points:
+            self._line((self.x, self.y + y if relative else y))
+
+    def horizontal(self, *x_points, relative=False, **kwargs):
+        for x in x_points:
+            self._line((self.x + x if relative else x, self.y))
+
+    def _quad(self, control, end):
+        start = self._start()
+        row = None
+        if start is not None:
+            c = complex(*control)
+            row = (start, c, complex(TYPE_QUAD, 0), c, complex(*end))
+        self._append(end, row, control)
+
+    def _cubic(self, control1, control2, end):
+        start = self._start()
+        row = None
+        if start is not None:
+            row = (
+                start,
+                complex(*control1),
+                complex(TYPE_CUBIC, 0),
+                complex(*control2),
+                complex(*end),
+            )
+        self._append(end, row, control2)
+
+    def smooth_quad(self, *points, relative=False, **kwargs):
+        for point in points:
+            self._quad(self._smooth(), self._point(point))
+
+    def quad(self, *points, relative=False, **kwargs):
+        for index in range(0, len(points), 2):
+            control = points[index]
+            if control in ("z", "Z"):
+                control = self._z()
+                self._quad(control, control)
+                return
+            self._quad(control, self._point(points[index + 1]))
+
+    def smooth_cubic(self, *points, relative=False, **kwargs):
+        for index in range(0, len(points), 2):
+            control1 = self._smooth()
+            control2 = points[index]
+            if control2 in ("z", "Z"):
+                control2 = self._z()
+                self._cubic(control1, control2, control2)
+                return
+            self._cubic(control1, control2, self._point(points[index + 1]))
+
+    def cubic(self, *points, relative=False, **kwargs):
+        for index in range(0, len(points), 3):
+            control1 = points[index]
+            if control1 in ("z", "Z"):
+                control1 = self._z()
+                self._cubic(control1, control1, control1)
+                return
+            control2 = points[index + 1]
+            if control2 in ("z", "Z"):
+                control2 = self._z()
+                self._cubic(control1, control2, control2)
+                return
+            self._cubic(control1, control2, self._point(points[index + 2]))
+
+    def arc(self, *arc_args, relative=False, **kwargs):
+        raise _ArcPath
+
+    def closed(self, relative=False):
+        end = self._z()
+        if end is None:
+            raise ValueError
+        self._line(end)
+
+    def geometry(self):
+        if not self.rows:
+            return Geomstr()
+        return Geomstr(np.array(self.rows, dtype=complex))
+
+    def is_dot(self):
+        """
+        SVGProcessor.is_dot: at most two segments, none of them with length.
+        """
+        if self.count > 2:
+            return False
+        for row in self.rows:
+            segment_type = row[2].real
+            if segment_type == TYPE_END:
+                continue
+            if segment_type == TYPE_LINE:
+                points = (row[4],)
+            else:
+                points = (row[1], row[3], row[4])
+            if any(point != row[0] for point in points):
+                return False
+        return True
+
+
+def path_geometry(pathd):
+    """
+    Geomstr of the svg path data, as Geomstr.svg gives it for the Path after
+    SVGProcessor approximated its arcs with cubics.
+
+    @param pathd: svg path data
+    @return: geometry, whether the path is a dot, number of path segments
+    """
+    if not pathd.lstrip().startswith(("M", "m")):
+        # Empty or starting without current point, the segments of Path differ.
+        raise _Unsupported
+    builder = _GeomstrPathBuilder()
+    try:
+        try:
+            SVGLexicalParser().parse(builder, pathd)
+        except ValueError:
+            # Erroneous data, svgelements keeps the segments up to the error.
+            pass
+        except (TypeError, AttributeError):
+            # Commands without current point, SVG.parse fails on these too.
+            raise _Unsupported
+    except _ArcPath:
+        path = Path()
+        try:
+            path.parse(pathd)
+        except ValueError:
+            pass
+        count = len(path)
+        dot = count <= 2 and path.length(error=1, min_depth=1) == 0
+        path.approximate_arcs_with_cubics()
+        return Geomstr.svg(path), dot, count
+    return builder.geometry(), builder.is_dot(), builder.count
+
+
+class SVGStreamProcessor(SVGProcessor):
+    """
+    SVGProcessor of the documents read by read(). process() takes the document in place
+    of the parsed SVG.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._styles = {}
+
+    def read(self, source, ppi, width=None, height=None, color="black", transform=None):
+        """
+        Reads a plain svg file. The parameters are those of SVG.parse.
+
+        @return: root StreamElement or None if the file needs the full loader
+        """
+        self._styles = {}
+        try:
+            return self._read(source, ppi, width, height, color, transform)
+        except (_Unsupported, ParseError):
+            return None
+        finally:
+            self._styles = {}
+
+    def _read(self, source, ppi, width, height, color, transform):
+        values = {
+            SVG_ATTR_COLOR: color,
+            SVG_ATTR_FILL: "black",
+            SVG_ATTR_STROKE: "none",
+        }
+        if transform is not None:
+            values[SVG_ATTR_TRANSFORM] = transform
+        root = None
+        parent = None
+        stack = []
+        for event, elem in iterparse(source, events=("start", "end", "start-ns")):
+            if event == "start-ns":
+                if elem[1] == MEERK40T_NAMESPACE:
+                    # Saved by meerk40t, may contain operations and notes.
+                    raise _Unsupported
+                if elem[0] != SVG_ATTR_DATA:
+                    values[elem[0]] = elem[1]
+                continue
+            if event == "end":
+                parent, values = stack.pop()
+                elem.clear()
+                continue
+            tag = elem.tag
+            if tag.startswith(SVG_NAMESPACE):
+                tag = tag[len(SVG_NAMESPACE) :]
+            if tag in UNSUPPORTED_TAGS:
+                raise _Unsupported
+            stack.append((parent, values))
+            values = self._compose(values, elem, tag)
+            if tag not in STREAM_TAGS:
+                continue
+            element = StreamElement(tag, values)
+            if tag == "svg":
+                if root is not None:
+                    raise _Unsupported
+                width, height = self._viewport(values, ppi, width, height)
+                root = element
+                parent = element
+                continue
+            if root is None:
+                raise _Unsupported
+            if tag == "g":
+                label = self.get_tag_label(element)
+                if label == "regmarks" or element.id == "regmarks":
+                    raise _Unsupported
+                parent.children.append(element)
+                parent = element
+                continue
+            if self._shape(element, ppi, width, height):
+                parent.children.append(element)
+        if root is None:
+            raise _Unsupported
+        return root
+
+    @staticmethod
+    def _compose(values, elem, tag):
+        """
+        Values of the element, composed as SVG.parse does without css styles.
+        """
+        current_values = values
+        values = dict(current_values)
+        for key in ("preserveAspectRatio", SVG_ATTR_VIEWBOX, SVG_ATTR_ID, "class", "clip-path"):
+            values.pop(key, None)
+        attributes = dict(elem.attrib)
+        attributes[SVG_ATTR_TAG] = tag
+        if SVG_ATTR_STYLE in attributes:
+            for equate in attributes[SVG_ATTR_STYLE].split(";"):
+                equal_item = equate.split(":")
+                if len(equal_item) == 2:
+                    attributes[str(equal_item[0]).strip()] = str(equal_item[1]).strip()
+        for key in attributes:
+            if key in UNSUPPORTED_ATTRIBUTES or key.startswith("mk") or "meerk40t" in key:
+                raise _Unsupported
+        for key in (SVG_ATTR_FILL, SVG_ATTR_STROKE):
+            if attributes.get(key) == SVG_VALUE_CURRENT_COLOR:
+                if SVG_ATTR_COLOR in attributes:
+                    attributes[key] = attributes[SVG_ATTR_COLOR]
+                else:
+                    attributes[key] = current_values[SVG_ATTR_COLOR]
+            if attributes.get(key, "").startswith("url("):
+                raise _Unsupported
+        if SVG_ATTR_TRANSFORM in attributes and SVG_ATTR_TRANSFORM in current_values:
+            attributes[SVG_ATTR_TRANSFORM] = (
+                current_values[SVG_ATTR_TRANSFORM] + " " + attributes[SVG_ATTR_TRANSFORM]
+            )
+        values.update(attributes)
+        values["attributes"] = attributes
+        if (
+            values.get(SVG_ATTR_DISPLAY, "").lower() == "none"
+            or values.get("visibility") == "hidden"
+        ):
+            # Hidden elements go to the regmarks.
+            raise _Unsupported
+        return values
+
+    @staticmethod
+    def _viewport(values, ppi, width, height):
+        """
+        Viewport transform of the root svg element, as SVG.parse applies it.
+
+        @return: width and height for the lengths of the content
+        """
+        s = SVG(values)
+        if width is None:
+            width = s.viewbox.width if s.viewbox is not None else 1000
+        if height is None:
+            height = s.viewbox.height if s.viewbox is not None else 1000
+        s.render(ppi=ppi, width=width, height=height, viewbox=s.viewbox)
+        width, height = s.width, s.height
+        if s.viewbox is not None:
+            try:
+                if s.height == 0 or s.width == 0:
+                    raise _Unsupported
+                viewport_transform = s.viewbox_transform
+            except ZeroDivisionError:
+                raise _Unsupported
+            if SVG_ATTR_TRANSFORM in values:
+                values[SVG_ATTR_TRANSFORM] += " " + viewport_transform
+            else:
+                values[SVG_ATTR_TRANSFORM] = viewport_transform
+            values["viewport_transform"] = values[SVG_ATTR_TRANSFORM]
+            width, height = s.viewbox.width, s.viewbox.height
+        return width, height
+
+    def _style(self, values, ppi, width, height):
+        """
+        Stroke, fill, implicit stroke width, transform and stroke scale of the values,
+        resolved by svgelements once per distinct combination.
+        """
+        key = tuple(values.get(k) for k in STYLE_KEYS)
+        style = self._styles.get(key)
+        if style is None:
+            shape = Shape({k: v for k, v in zip(STYLE_KEYS, key) if v is not None})
+            shape.render(ppi=ppi, width=width, height=height)
+            style = (
+                shape.stroke,
+                shape.fill,
+                shape.implicit_stroke_width,
+                shape.transform,
+                values.get(SVG_ATTR_VECTOR_EFFECT) != SVG_VALUE_NON_SCALING_STROKE,
+            )
+            self._styles[key] = style
+        return style
+
+    def _shape(self, element, ppi, width, height):
+        """
+        Sets node type, node attributes and bounds points of the shape element.
+
+        @return: False if svgelements skips the element as degenerate or empty
+        """
+        values = element.values
+        tag = element.tag
+        kwargs = {}
+        if tag == "path":
+            geometry, dot, count = path_geometry(values.get(SVG_ATTR_DATA, ""))
+            if dot or count == 0:
+                # Loaded as elem point.
+                raise _Unsupported
+            element.node_type = "elem path"
+            kwargs["geometry"] = geometry
+        elif tag in ("polyline", "polygon"):
+            points = values.get(SVG_ATTR_POINTS)
+            if not isinstance(points, str):
+                raise _Unsupported
+            points = np.array(REGEX_COORD_PAIR.findall(points), dtype=float)
+            if len(points) == 0:
+                return False
+            if len(points) == 1:
+                raise _Unsupported
+            xs = points[:, 0]
+            ys = points[:, 1]
+            positions = xs + 1j * ys
+            if tag == "polygon":
+                positions = np.append(positions, positions[0])
+            count = len(positions) - 1
+            segments = np.zeros((count, 5), dtype=complex)
+            segments[:, 0] = positions[:-1]
+            segments[:, 2] = TYPE_LINE
+            segments[:, 4] = positions[1:]
+            element.node_type = "elem polyline"
+            kwargs["geometry"] = Geomstr(segments)
+            kwargs["closed"] = tag == "polygon"
+            element.bounds = (xs, ys)
+        elif tag == "rect":
+            rect = Rect({k: values[k] for k in RECT_KEYS if k in values})
+            rect.render(ppi=ppi, width=width, height=height)
+            if rect.is_degenerate():
+                return False
+            for k in RECT_KEYS:
+                kwargs[k] = getattr(rect, k)
+            element.node_type = "elem rect"
+            x, y, w, h = rect.x, rect.y, rect.width, rect.height
+            element.bounds = (
+                np.array([x, x + w, x + w, x], dtype=float),
+                np.array([y, y, y + h, y + h], dtype=float),
+            )
+        else:
+            line = SimpleLine({k: values[k] for k in LINE_KEYS if k in values})
+            line.render(ppi=ppi, width=width, height=height)
+            if line.x1 == line.x2 and line.y1 == line.y2:
+                # Dot.
+                raise _Unsupported
+            for k in LINE_KEYS:
+                kwargs[k] = getattr(line, k)
+            element.node_type = "elem line"
+            element.bounds = (
+                np.array([line.x1, line.x2], dtype=float),
+                np.array([line.y1, line.y2], dtype=float),
+            )
+        stroke, fill, stroke_width, matrix, stroke_scale = self._style(
+            values, ppi, width, height
+        )
+        if matrix.determinant == 0:
+            raise _Unsupported
+        # Looked up at runtime, the kernel may have installed the color cache.
+        color = svgelements.Color
+        kwargs["stroke"] = color(stroke) if stroke is not None else None
+        kwargs["stroke_width"] = stroke_width
+        kwargs["fill"] = color(fill) if fill is not None else None
+        kwargs["matrix"] = Matrix(matrix)
+        kwargs["stroke_scale"] = stroke_scale
+        element.kwargs = kwargs
+        return True
+
+    def parse(self, element, context_node, e_list, branch=None, uselabel=None):
+        """
+        Creates the nodes of the content of the read document.
+        """
+        for child in element.children:
+            self._create(child, context_node, e_list)
+
+    def _create(self, element, context_node, e_list):
+        label = self.get_tag_label(element)
+        if element.tag == "g":
+            e_dict = dict(element.values["attributes"])
+            if "stroke" in e_dict:
+                e_dict["stroke"] = Color(e_dict.get("stroke"))
+            if "fill" in e_dict:
+                e_dict["fill"] = Color(e_dict.get("fill"))
+            for attr in ("type", "id", "label"):
+                if attr in e_dict:
+                    del e_dict[attr]
+            with self.elements.node_lock:
+                context_node = context_node.add(
+                    type="group",
+                    id=element.id,
+                    label=label,
+                    fast=self.fastmode,
+                    **e_dict,
+                )
+                self.check_for_label_display(context_node, element)
+                self.check_for_bound_information(context_node, element)
+            context_node._ref_load = element.values.get("references")
+            e_list.append(context_node)
+            if hasattr(context_node, "validate"):
+                context_node.validate()
+            for child in element.children:
+                self._create(child, context_node, e_list)
+            element.values = None
+            return
+        with self.elements.node_lock:
+            node = context_node.add(
+                type=element.node_type,
+                id=element.id,
+                label=label,
+                lock=False,
+                hidden=False,
+                fast=self.fastmode,
+                **element.kwargs,
+            )
+            self.check_for_label_display(node, element)
+            self.check_for_line_attributes(node, element)
+            if element.tag in ("path", "polyline", "polygon"):
+                self.check_for_fill_attributes(node, element)
+            if element.tag == "path":
+                self.check_for_mk_path_attributes(node, element)
+            else:
+                self.check_for_mk_path_attributes(node, element, skip=("mkparam",))
+        has_bounds = self.check_for_bound_information(node, element)
+        if element.bounds is not None and not has_bounds and self.precalc_bbox:
+            xs, ys = element.bounds
+            matrix = element.kwargs["matrix"]
+            if not matrix.is_identity():
+                xs, ys = (
+                    xs * matrix.a + ys * matrix.c + 1 * matrix.e,
+                    xs * matrix.b + ys * matrix.d + 1 * matrix.f,
+                )
+            node._bounds = [
+                float(xs.min()),
+                float(ys.min()),
+                float(xs.max()),
+                float(ys.max()),
+            ]
+            node._bounds_dirty = False
+            node.revalidate_points()
+            node._points_dirty = False
+        e_list.append(node)
+        element.values = None
+        element.kwargs = None
@@ -7,14 +7,287 @@ execute undo and redo operations for the tree.
 
 
 For every change announced in the program ( with elements.undoscope("tag"): ) 
-a complete backup of the element tree is being made before applying the changes
+a snapshot of the element tree is being made before applying the changes
 So the undo_stack contains the state before the change. And "undo" of that 
 undo_index will restore the state before.
 If we have already made an undo (ie the undo_index is not the highest number 
 but below) then another mark will effectively create a new history.
 
+Snapshots are incremental: every node is stored as an immutable UndoRecord
+holding a detached copy of the node and the records of its children. A mark
+only copies the nodes that differ from the record stored at the previous mark,
+all other records (and therefore complete unchanged subtrees) are shared by
+reference between the states of the undo stack.
 """
 import threading
+from copy import copy
+from itertools import compress, count
+from operator import is_, is_not
+
+from .node.node import TRANSIENT_ATTRIBUTES
+
+
+def _same_value(a, b):
+    if a is b:
+        return True
+    try:
+        result = a == b
+        if hasattr(result, "all"):
+            # numpy arrays compare elementwise
+            return bool(result.all())
+        return bool(result)
+    except Exception:
+        # Incomparable values are treated as changed, which is always safe.
+        return False
+
+
+def node_unchanged(node, frozen):
+    """
+    Checks whether a live node still matches the detached copy taken at an
+    earlier mark. Values that were shared by the copy are caught by the
+    identity check, everything the copy duplicated (matrix, geometry,
+    colors, settings) is compared by value.
+
+    @param node: node within the tree
+    @param frozen: copy stored inside an UndoRecord
+    @return: True if the node does not need to be copied again
+    """
+    if node.__class__ is not frozen.__class__:
+        return False
+    live_dict = node.__dict__
+    frozen_dict = frozen.__dict__
+    if len(live_dict) != len(frozen_dict):
+        return False
+    keys = list(live_dict)
+    if keys != list(frozen_dict):
+        # Same attributes, but set in a different order.
+        if live_dict.keys() != frozen_dict.keys():
+            return False
+        frozen_values = [frozen_dict[key] for key in keys]
+    else:
+        frozen_values = frozen_dict.values()
+    is_reference = node.type == "reference"
+    # copy() shares most values, only visit the ones that are not identical.
+    for key, value, other in compress(
+        zip(keys, live_dict.values(), frozen_values),
+        map(is_not, live_dict.values(), frozen_values),
+    ):
+        if key in TRANSIENT_ATTRIBUTES:
+            continue
+        if is_reference and key == "node":
+            # Compared through UndoRecord.target
+            continue
+        if not _same_value(value, other):
+            return False
+    return True
+
+
+class UndoRecord:
+    """
+    Immutable snapshot of a single node and its subtree.
+
+    key: stable identity of the node across marks, used to relink references.
+    node: detached copy of the node, never attached to a tree.
+    children: tuple of UndoRecords of the children.
+    target: key of the referenced node for reference nodes, otherwise None.
+    """
+
+    __slots__ = ("key", "node", "children", "target")
+
+    def __init__(self, key, node, children, target=None):
+        self.key = key
+        self.node = node
+        self.children = children
+        self.target = target
+
+    @property
+    def type(self):
+        return self.node.type
+
+    @property
+    def expanded(self):
+        return self.node.expanded
+
+
+class UndoSnapshots:
+    """
+    Creates and restores incremental tree snapshots.
+
+    The instance remembers which record every live node was stored as, so the
+    next snapshot can reuse the record (and the whole subtree below it) if
+    nothing changed. After a restore the freshly created live nodes are
+    mapped to the records they were created from.
+
+    A node is considered unchanged if none of its attributes was rebound since
+    the last snapshot (checked by identity) and it did not announce an in-place
+    change through the tree notifications (modified, translated, scaled,
+    altered). Operation settings are compared by value as they are mutated in
+    place by the property setters.
+    """
+
+    def __init__(self):
+        self._keys = count()
+        # id(live node) -> (live node, UndoRecord, attribute values at snapshot)
+        self._known = dict()
+        self._touched = set()
+        self.copied = 0
+        self.shared = 0
+
+    # Tree listener methods.
+
+    def modified(self, node=None, **kwargs):
+        self._touched.add(id(node))
+
+    def altered(self, node=None, **kwargs):
+        self._touched.add(id(node))
+
+    def translated(self, node=None, **kwargs):
+        self._touched.add(id(node))
+
+    def scaled(self, node=None, **kwargs):
+        self._touched.add(id(node))
+
+    def node_changed(self, node=None, **kwargs):
+        self._touched.add(id(node))
+
+    def _freeze(self, node):
+        frozen = copy(node)
+        if node.type == "reference":
+            # Do not keep live nodes alive through the snapshot
+            frozen.__dict__["node"] = None
+        return frozen
+
+    def snapshot(self, tree):
+        """
+        Snapshot the branches of the given tree.
+
+        @param tree: root node
+        @return: tuple of UndoRecords for the children of the tree.
+        """
+        touched, self._touched = self._touched, set()
+        order = []
+        stack = list(reversed(tree._children))
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            children = node._children
+            if children:
+                stack.extend(reversed(children))
+
+        known = self._known
+        new_keys = dict()
+
+        def key_of(n):
+            n_entry = known.get(id(n))
+            if n_entry is not None and n_entry[0] is n:
+                return n_entry[1].key
+            n_key = new_keys.get(id(n))
+            if n_key is None:
+                n_key = next(self._keys)
+                new_keys[id(n)] = n_key
+            return n_key
+
+        records = dict()
+        new_known = dict()
+        copied = 0
+        # Reversed preorder guarantees children are handled before parents.
+        for node in reversed(order):
+            nid = id(node)
+            children = node._children
+            if children:
+                children = tuple([records[id(c)] for c in children])
+            else:
+                children = ()
+            attributes = node.__dict__
+            entry = known.get(nid)
+            unchanged = False
+            if entry is not None and entry[0] is node and nid not in touched:
+                previous = entry[1]
+                values = entry[2]
+                if len(attributes) == len(values) and all(
+                    map(is_, attributes.values(), values)
+                ):
+                    # Nothing was rebound, values changed in place are either
+                    # announced as touched or operation settings.
+                    settings = attributes.get("settings")
+                    unchanged = settings is None or settings == previous.node.settings
+                    if unchanged:
+                        new_entry = entry
+                else:
+                    # Something was rebound, often just a cached value.
+                    unchanged = node_unchanged(node, previous.node)
+                    if unchanged and node.type == "reference":
+                        unchanged = previous.target == key_of(node.node)
+                    if unchanged:
+                        new_entry = (node, previous, tuple(attributes.values()))
+            if unchanged:
+                old_children = previous.children
+                if len(old_children) != len(children) or not all(
+                    map(is_, old_children, children)
+                ):
+                    previous = UndoRecord(
+                        previous.key, previous.node, children, previous.target
+                    )
+                    new_entry = (node, previous, new_entry[2])
+                records[nid] = previous
+                new_known[nid] = new_entry
+                continue
+            target = None
+            if node.type == "reference" and node.node is not None:
+                target = key_of(node.node)
+            record = UndoRecord(key_of(node), self._freeze(node), children, target)
+            copied += 1
+            records[nid] = record
+            new_known[nid] = (node, record, tuple(attributes.values()))
+        self._known = new_known
+        self.copied = copied
+        self.shared = len(order) - copied
+        return tuple([records[id(c)] for c in tree._children])
+
+    def restore(self, tree, state):
+        """
+        Replaces the branches of the tree with fresh copies of the snapshot.
+
+        The records themselves are never attached to the tree, so the state
+        can be restored any number of times.
+
+        @param tree: root node
+        @param state: tuple of UndoRecords as returned by snapshot()
+        @return:
+        """
+        root = tree._root
+        tree._children.clear()
+        made = dict()
+        restored = []
+        references = []
+        stack = [(record, tree) for record in reversed(state)]
+        while stack:
+            record, parent = stack.pop()
+            node = copy(record.node)
+            node._root = root
+            node._parent = parent
+            parent._children.append(node)
+            made[record.key] = node
+            restored.append((node, record))
+            if record.target is not None:
+                references.append((node, record.target))
+            if record.children:
+                stack.extend((c, node) for c in reversed(record.children))
+        for node, target in references:
+            target_node = made.get(target)
+            node.node = target_node
+            if target_node is not None:
+                target_node._references.append(node)
+        self._known = {
+            id(node): (node, record, tuple(node.__dict__.values()))
+            for node, record in restored
+        }
+        self._touched = set()
+        tree._validate_tree()
+        # Mark structure dirty so that element caches are lazily invalidated.
+        if hasattr(root, "_structure_dirty"):
+            root._structure_dirty = True
+
 
 class UndoState:
     def __init__(self, state, message=None, hold=False):
@@ -26,18 +299,18 @@ class UndoState:
 
     @property
     def tree_representation(self):
-        def node_representation(node):
-            t = node.type 
-            if node.children:
-                t = f"{t}{'+' if node.expanded else ''}("
-                for n in node.children:
+        def node_representation(record):
+            t = record.type
+            if record.children:
+                t = f"{t}{'+' if record.expanded else ''}("
+                for n in record.children:
                     t = f"{t}{node_representation(n)},"
                 t += ")"
             return t
 
         s = ""
-        for node in self.state:
-            s += f"{node_representation(node)}, "
+        for record in self.state:
+            s += f"{node_representation(record)}, "
         return s
     
     def __str__(self):
@@ -58,6 +331,8 @@ class Undo:
         self._lock = threading.RLock()
         self._undo_stack = []
         self._undo_index = -1
+        self.snapshots = UndoSnapshots()
+        self.tree.listen(self.snapshots)
         self.mark("init")  # Set initial tree state.
         self.message = None
 
@@ -74,17 +349,6 @@ class Undo:
         """
         if not self.active:
             return
-        # # Performance: Skip undo for very large designs (hardcoded 1000-element threshold)
-        # # Creating a full tree snapshot for 10k+ elements takes ~3 seconds
-        # try:
-        #     elem_branch = self.tree.get(type="branch elems")
-        #     if elem_branch is not None:
-        #         elem_count = len(list(elem_branch.flat()))
-        #         if elem_count > 1000:
-        #             return
-        # except (AttributeError, TypeError):
-        #     # If we can't count elements, proceed with undo anyway
-        #     pass
         with self._lock:
             # print (f"** Mark {message} requested, current {self._undo_index} / {len(self._undo_stack)} **")
             old_idx = self._undo_index
@@ -108,7 +372,7 @@ class Undo:
             try:
                 self._undo_stack.insert(
                     self._undo_index,
-                    UndoState(self.tree.backup_tree(), message=message, hold=hold),
+                    UndoState(self.snapshots.snapshot(self.tree), message=message, hold=hold),
                 )
             except KeyError as e:
                 # Hit a concurrent issue.
@@ -148,14 +412,14 @@ class Undo:
             if to_be_restored == len(self._undo_stack) - 1 and self._undo_stack[to_be_restored].message != self.LAST_STATE:
                 # We store the current state, as none was stored so far
                 self._undo_stack.append(
-                    UndoState(self.tree.backup_tree(), message=self.LAST_STATE),
+                    UndoState(self.snapshots.snapshot(self.tree), message=self.LAST_STATE),
                 )
                 # print ("**** Did add a last state to go back to if needed ****")
             elif to_be_restored == len(self._undo_stack) - 2 and self._undo_stack[to_be_restored + 1].message == self.LAST_STATE:
                 # We are at the last actively monitored index but we already have a current state -> replace it
                 self._undo_stack.pop(-1)
                 self._undo_stack.append(
-                    UndoState(self.tree.backup_tree(), message=self.LAST_STATE),
+                    UndoState(self.snapshots.snapshot(self.tree), message=self.LAST_STATE),
                 )
                 # print ("**** Did add a last state to go back to if needed, and overwrote the last state ****")
             # print (f"Index: {self._undo_index} / {len(self._undo_stack)} - To be restored: {to_be_restored}, param: {index}")
@@ -166,9 +430,9 @@ class Undo:
                 # Invalid? Reset to bottom of stack
                 self._undo_index = 0
                 return False
-            self.tree.restore_tree(undo.state)
+            self.snapshots.restore(self.tree, undo.state)
             # try:
-            #     undo.state = self.tree.backup_tree()  # Get unused copy
+            #     undo.state = self.snapshots.snapshot(self.tree)  # Get unused copy
             # except KeyError:
             #     pass
             # Refresh all node layers
@@ -203,9 +467,9 @@ class Undo:
                 # Invalid? Reset to top of stack
                 self._undo_index = len(self._undo_stack)
                 return False
-            self.tree.restore_tree(redo.state)
+            self.snapshots.restore(self.tree, redo.state)
             # try:
-            #     redo.state = self.tree.backup_tree()  # Get unused copy
+            #     redo.state = self.snapshots.snapshot(self.tree)  # Get unused copy
             # except KeyError:
             #     pass
             # Refresh all node layers
@@ -268,7 +532,7 @@ class Undo:
                 if self._undo_index >= len(self._undo_stack) - 1:
                     self._undo_index += 1
                 self._undo_stack.append(
-                    UndoState(self.tree.backup_tree(), message=self.LAST_STATE),
+                    UndoState(self.snapshots.snapshot(self.tree), message=self.LAST_STATE),
                 )
                 while len(self._undo_stack) > self.levels:
                     self._undo_stack.pop(0)
@@ -332,7 +596,7 @@ class Undo:
 
     def debug_tree(self, state):
         def show_children(parent, header):
-            for e in parent._children:
+            for e in parent.children:
                 print (f"{header} {e.type}")
                 show_children(e, header + "--")
         for idx, n in enumerate(state):
@@ -282,10 +282,63 @@ def _construct(data):
     return data
 
 
+HUFFMAN_CHUNK = 0x10000
+
+
+class _HuffmanStates(dict):
+    """
+    Byte lookup tables of the huffman decoder, built as the decoder states are reached.
+
+    The state is the bits read since the last decoded character, always a proper prefix of some code. The table of a
+    state gives for every byte value the characters its 8 bits complete and the following state. Bits which are no
+    prefix of any code never decode, as when reading one bit at a time, this is the dead state None.
+    """
+
+    def __init__(self, huffman_dict):
+        super().__init__()
+        self.codes = huffman_dict
+        self.prefixes = {bits[:i] for bits in huffman_dict for i in range(len(bits))}
+        self.nibbles = {}
+
+    def nibble(self, state):
+        """
+        Lookup table of the 16 values of 4 bits.
+        """
+        table = self.nibbles.get(state)
+        if table is not None:
+            return table
+        table = []
+        for value in range(16):
+            decoded = b""
+            bits = state
+            if bits is not None:
+                for bit in "{:04b}".format(value):
+                    bits += bit
+                    character = self.codes.get(bits)
+                    if character is not None:
+                        decoded += bytes((character,))
+                        bits = ""
+                    elif bits not in self.prefixes:
+                        bits = None
+                        break
+            table.append((decoded, bits))
+        self.nibbles[state] = table
+        return table
+
+    def __missing__(self, state):
+        table = []
+        for decoded, bits in self.nibble(state):
+            table.extend((decoded + low, following) for low, following in self.nibble(bits))
+        self[state] = table
+        return table
+
+
 def _huffman_decode_python(file, uncompressed_length):
     """
     Python fallback for huffman decoding of the vector table.
 
+    The data is decoded a byte at a time through the lookup table of the decoder state, see _HuffmanStates.
+
     @param file:
     @param uncompressed_length:
     @return:
@@ -298,20 +351,17 @@ def _huffman_decode_python(file, uncompressed_length):
         huffman_dict[bits] = character
     data = file.read()
 
-    def bit_generator():
-        for d in data:
-            yield from "{:08b}".format(d)
-
+    states = _HuffmanStates(huffman_dict)
     q = bytearray()
-    c = ""
-    for b in bit_generator():
-        c += b
-        m = huffman_dict.get(c)
-        if m is not None:
-            q.append(m)
-            c = ""
+    state = ""
+    for start in range(0, len(data), HUFFMAN_CHUNK):
+        for value in data[start : start + HUFFMAN_CHUNK]:
+            decoded, state = states[state][value]
+            if decoded:
+                q += decoded
         if len(q) >= uncompressed_length:
-            return q
+            break
+    del q[uncompressed_length:]
     return q
 
 
@@ -698,6 +748,8 @@ class EZCFile:
         """
         if not hasattr(self, '_decompressed_vectors'):
             return  # No decompressed data available
+        if not any(isinstance(obj, EZHatch) for obj in self.objects):
+            return  # Only the text of hatches is given character outlines
         
         q = self._decompressed_vectors
         decompressed_stream = BytesIO(q)
@@ -706,29 +758,29 @@ class EZCFile:
         # This creates a map of {position: {char: [group_objects]}} for fast lookup
         character_outlines_by_position = {}
         
-        for offset in range(len(q) - 4):
-            if offset + 4 <= len(q):
-                val = struct.unpack('<I', q[offset:offset+4])[0]
-                if val == 0x10:  # EZGroup type
-                    decompressed_stream.seek(offset)
-                    test_objects = []
-                    try:
-                        if parse_object(decompressed_stream, test_objects, enable_resync=False):
-                            if test_objects:
-                                obj = test_objects[0]
-                                obj_label = getattr(obj, 'label', '')
-                                obj_pos = getattr(obj, 'position', None)
-                                
-                                # Only interested in single-character outline groups
-                                if len(obj_label) == 1 and obj_pos is not None:
-                                    if obj_pos not in character_outlines_by_position:
-                                        character_outlines_by_position[obj_pos] = {}
-                                    if obj_label not in character_outlines_by_position[obj_pos]:
-                                        character_outlines_by_position[obj_pos][obj_label] = []
-                                    
-                                    character_outlines_by_position[obj_pos][obj_label].append(obj)
-                    except Exception:
-                        pass
+        marker = struct.pack("<I", 0x10)  # EZGroup type
+        offset = q.find(marker, 0, len(q) - 1)
+        while offset != -1:
+            decompressed_stream.seek(offset)
+            test_objects = []
+            try:
+                if parse_object(decompressed_stream, test_objects, enable_resync=False):
+                    if test_objects:
+                        obj = test_objects[0]
+                        obj_label = getattr(obj, 'label', '')
+                        obj_pos = getattr(obj, 'position', None)
+                        
+                        # Only interested in single-character outline groups
+                        if len(obj_label) == 1 and obj_pos is not None:
+                            if obj_pos not in character_outlines_by_position:
+                                character_outlines_by_position[obj_pos] = {}
+                            if obj_label not in character_outlines_by_position[obj_pos]:
+                                character_outlines_by_position[obj_pos][obj_label] = []
+                            
+                            character_outlines_by_position[obj_pos][obj_label].append(obj)
+            except Exception:
+                pass
+            offset = q.find(marker, offset + 1, len(q) - 1)
         
         # Second pass: For each text, find character outlines at the same position
         for hatch_idx, hatch in enumerate(self.objects):
@@ -905,11 +957,13 @@ class EZVectorFile(list, EZObject):
 class EZCurve(EZObject):
     """
     Curves are some number of curve-type (usually 1 or 3) contours.
+
+    The point data of the contours is kept as read and only unpacked when the points are first used.
     """
 
     def __init__(self, file):
         super().__init__(file)
-        pts = []
+        contours = []
         (count, closed) = struct.unpack("<2I", file.read(8))
         for i in range(count):
             (unk1, curve_type, unk2, unk3) = struct.unpack("<BB2H", file.read(6))
@@ -918,15 +972,24 @@ class EZCurve(EZObject):
                 d = struct.unpack(f"<5d", file.read(40))
                 continue
             (pt_count,) = struct.unpack("<i", file.read(4))
-            pts.append(
-                (
-                    curve_type,
-                    closed,
-                    struct.unpack(f"<{pt_count * 2}d", file.read(16 * pt_count)),
-                )
-            )
-
-        self.points = pts
+            if pt_count < 0:
+                raise struct.error(f"bad point count {pt_count}")
+            raw = file.read(16 * pt_count)
+            if len(raw) != 16 * pt_count:
+                raise struct.error(f"unpack requires a buffer of {16 * pt_count} bytes")
+            contours.append((curve_type, closed, raw))
+        self._contours = contours
+        self._points = None
+
+    @property
+    def points(self):
+        if self._points is None:
+            self._points = [
+                (curve_type, closed, struct.unpack(f"<{len(raw) // 8}d", raw))
+                for curve_type, closed, raw in self._contours
+            ]
+            self._contours = None
+        return self._points
 
 
 class EZRect(EZObject):
@@ -26,6 +26,11 @@ POTRACE_CORNER = 2
 INFTY = float("inf")
 COS179 = math.cos(math.radians(179))
 
+# /* tiled tracing */
+TILE_SIZE = 512
+TILE_MARGIN = 5  # /* paths closer to a seam may depend on pixels beyond it */
+SEAM_CHUNK = 20000  # /* path points per task of the seam pass */
+
 
 class Bitmap:
     def __init__(self, data, blacklevel=0.5):
@@ -63,6 +68,65 @@ class Bitmap:
         )
         return Path(plist)
 
+    def trace_tiles(
+        self,
+        turdsize: int = 2,
+        turnpolicy: int = POTRACE_TURNPOLICY_MINORITY,
+        alphamax=1.0,
+        opticurve=True,
+        opttolerance=0.2,
+        tile_size=TILE_SIZE,
+        jobs=1,
+        channel=None,
+    ):
+        """
+        Traces the bitmap tile by tile, in up to `jobs` worker processes, and yields a Path
+        of curves for every tile as soon as it is done.
+
+        Curves closer than TILE_MARGIN pixels to the seam of their tile may continue in the
+        next tile. They are not yielded with the tile, instead the components they belong to,
+        with everything they enclose, are traced again as a whole once all tiles are done.
+        Together the yielded Paths hold the curves of trace(), the order of the curves
+        differs. With the minority, majority and random turn policies a few diagonal
+        junctions next to a seam may be resolved otherwise, these depend on the order in
+        which the paths are found.
+        """
+        from meerk40t.core.parallel import parallel_imap
+
+        bm = np.pad(self.data, [(0, 1), (0, 1)], mode="constant")
+        settings = (turdsize, turnpolicy, alphamax, opticurve, opttolerance)
+        tiles = _tiles(bm.shape, tile_size)
+        tasks = [
+            (bm[y0:y1, x0:x1].copy(), x0, y0, bm.shape, tile_size, settings)
+            for x0, y0, x1, y1 in tiles
+        ]
+        seams = np.zeros_like(bm)
+        results = parallel_imap(_trace_tile, tasks, jobs=jobs, channel=channel)
+        for (plist, mask), (x0, y0, x1, y1) in zip(results, tiles):
+            seams[y0:y1, x0:x1] |= mask
+            if plist:
+                yield Path(plist)
+
+        # /* components at the seams */
+        seams &= bm
+        if not seams.any():
+            return
+        chunks = []
+        chunk = []
+        points = 0
+        for p in bm_to_pathlist(seams, turdsize=turdsize, turnpolicy=turnpolicy):
+            chunk.append(p)
+            points += len(p)
+            if points >= SEAM_CHUNK:
+                chunks.append(chunk)
+                chunk = []
+                points = 0
+        if chunk:
+            chunks.append(chunk)
+        tasks = [(chunk, settings) for chunk in chunks]
+        for plist in parallel_imap(_process_paths, tasks, jobs=jobs, channel=channel):
+            yield Path(plist)
+
 
 class Path(list):
     def __init__(self, plist):
@@ -512,16 +576,19 @@ def _safe_get(bm: np.ndarray, y: int, x: int) -> int:
 
 @njit(cache=True)
 def _should_turn_right(
-    turnpolicy: int, sign: bool, x: int, y: int, bm: np.ndarray
+    turnpolicy: int, sign: bool, x: int, y: int, bm: np.ndarray, ox: int = 0, oy: int = 0
 ) -> bool:
-    """Determine if we should turn right based on turn policy."""
+    """Determine if we should turn right based on turn policy.
+
+    The random policy hashes the position offset by (ox, oy), the position of bm
+    within the whole bitmap."""
     if turnpolicy == POTRACE_TURNPOLICY_RIGHT:
         return True
     elif turnpolicy == POTRACE_TURNPOLICY_BLACK and sign:
         return True
     elif turnpolicy == POTRACE_TURNPOLICY_WHITE and not sign:
         return True
-    elif turnpolicy == POTRACE_TURNPOLICY_RANDOM and detrand(x, y):
+    elif turnpolicy == POTRACE_TURNPOLICY_RANDOM and detrand(x + ox, y + oy):
         return True
     elif turnpolicy == POTRACE_TURNPOLICY_MAJORITY and majority(bm, x, y):
         return True
@@ -606,7 +673,9 @@ def xor_path(bm: np.ndarray, p: _Path) -> None:
 
 
 @njit(cache=True)
-def _findpath_jit(bm: np.ndarray, x0: int, y0: int, sign: bool, turnpolicy: int):
+def _findpath_jit(
+    bm: np.ndarray, x0: int, y0: int, sign: bool, turnpolicy: int, ox: int = 0, oy: int = 0
+):
     """
     JIT-compiled version of findpath for performance.
     Returns tuple of (points_list, area, sign) instead of Path object.
@@ -642,7 +711,7 @@ def _findpath_jit(bm: np.ndarray, x0: int, y0: int, sign: bool, turnpolicy: int)
 
         # Decide turn direction based on pixel configuration
         if c and not d:  # Ambiguous turn - use turn policy
-            if _should_turn_right(turnpolicy, sign, x, y, bm):
+            if _should_turn_right(turnpolicy, sign, x, y, bm, ox, oy):
                 dirx, diry = _turn_right(dirx, diry)
             else:
                 dirx, diry = _turn_left(dirx, diry)
@@ -654,17 +723,21 @@ def _findpath_jit(bm: np.ndarray, x0: int, y0: int, sign: bool, turnpolicy: int)
     return pt, area, sign
 
 
-def findpath(bm, x0: int, y0: int, sign: bool, turnpolicy: int) -> _Path:
+def findpath(
+    bm, x0: int, y0: int, sign: bool, turnpolicy: int, ox: int = 0, oy: int = 0
+) -> _Path:
     """
     /* compute a path in the given pixmap, separating black from white.
     Start path at the point (x0,x1), which must be an upper left corner
     of the path. Also compute the area enclosed by the path. Return a
     new path_t object, or NULL on error (note that a legitimate path
     cannot have length 0). Sign is required for correct interpretation
-    of turnpolicies. */"""
+    of turnpolicies. */
+
+    (ox, oy) is the position of bm within the whole bitmap, for tiles of it."""
 
     # Use JIT-compiled version for performance
-    pt_tuples, area, sign = _findpath_jit(bm, x0, y0, sign, turnpolicy)
+    pt_tuples, area, sign = _findpath_jit(bm, x0, y0, sign, turnpolicy, ox, oy)
 
     # Convert tuples back to _Point objects
     pt = [_Point(x, y) for x, y in pt_tuples]
@@ -683,8 +756,23 @@ def findnext(bm: np.ndarray) -> Optional[Tuple[int, int]]:
        excess bytes have been cleared with bm_clearexcess. */
     """
     h, w = bm.shape
+    return findnext_from(bm, h - 1, 0)
+
+
+@njit(cache=True)
+def findnext_from(bm: np.ndarray, y0: int, x0: int) -> Optional[Tuple[int, int]]:
+    """
+    findnext, starting at the pixel (x0, y0). As in potrace the search continues from the
+    last pixel found: pixels before it are clear and xor_path never sets them.
+    """
+    h, w = bm.shape
+    if y0 < 0:
+        return None
     # scan bottom-up, left-to-right
-    for y in range(h - 1, -1, -1):
+    for x in range(x0, w):
+        if bm[y0, x]:
+            return y0, x
+    for y in range(y0 - 1, -1, -1):
         for x in range(w):
             if bm[y, x]:
                 return y, x
@@ -840,13 +928,19 @@ def pathlist_to_tree(plist: list, bm: np.ndarray) -> None:
 
 
 def bm_to_pathlist(
-    bm: np.ndarray, turdsize: int = 2, turnpolicy: int = POTRACE_TURNPOLICY_MINORITY
+    bm: np.ndarray,
+    turdsize: int = 2,
+    turnpolicy: int = POTRACE_TURNPOLICY_MINORITY,
+    ox: int = 0,
+    oy: int = 0,
 ) -> list:
     """
     /* Decompose the given bitmap into paths. Returns a linked list of
     path_t objects with the fields len, pt, area, sign filled
     in. Returns 0 on success with plistp set, or -1 on error with errno
     set. */
+
+    (ox, oy) is the position of bm within the whole bitmap, for tiles of it.
     """
     plist = []  # /* linked list of path objects */
     original = bm.copy()
@@ -854,15 +948,17 @@ def bm_to_pathlist(
     """/* be sure the byte padding on the right is set to 0, as the fast
     pixel search below relies on it */"""
     # /* iterate through components */
+    y = bm.shape[0] - 1
+    x = 0
     while True:
-        n = findnext(bm)
+        n = findnext_from(bm, y, x)
         if n is None:
             break
         y, x = n
         # /* calculate the sign by looking at the original */
         sign = original[y][x]
         # /* calculate the path */
-        path = findpath(bm, x, y + 1, sign, turnpolicy)
+        path = findpath(bm, x, y + 1, sign, turnpolicy, ox, oy)
         if path is None:
             raise ValueError
 
@@ -1983,3 +2079,122 @@ def process_path(
 
 
 # END TRACE SECTION.
+
+
+# /* ---------------------------------------------------------------------- */
+# /* tiled tracing */
+
+
+def _tiles(shape, tile_size: int) -> list:
+    """
+    Tiles (x0, y0, x1, y1) covering a bitmap of the given shape, row by row.
+    """
+    h, w = shape
+    return [
+        (x0, y0, min(x0 + tile_size, w), min(y0 + tile_size, h))
+        for y0 in range(0, h, tile_size)
+        for x0 in range(0, w, tile_size)
+    ]
+
+
+def _span_in_tile(low: int, high: int, tile_size: int, length: int) -> bool:
+    """
+    Whether the pixels [low, high) along one axis keep TILE_MARGIN pixels away from the
+    seams of the tile of the first pixel. The edges of the bitmap are no seams.
+    """
+    start = (low // tile_size) * tile_size
+    end = min(start + tile_size, length)
+    if start > 0 and low < start + TILE_MARGIN:
+        return False
+    if end < length and high > end - TILE_MARGIN:
+        return False
+    return high <= end
+
+
+def _path_in_tile(p: _Path, shape, tile_size: int, ox: int = 0, oy: int = 0) -> bool:
+    """
+    Whether the path, at (ox, oy) within the bitmap, is traced in full by its tile.
+    """
+    x0, y0, x1, y1 = setbbox_path(p)
+    h, w = shape
+    return _span_in_tile(x0 + ox, x1 + ox, tile_size, w) and _span_in_tile(
+        y0 + oy, y1 + oy, tile_size, h
+    )
+
+
+def _fill_path(mask: np.ndarray, p: _Path) -> None:
+    """
+    Set the pixels of the mask within the path.
+    """
+    x0, y0, x1, y1 = setbbox_path(p)
+    fill = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+    xor_path(fill, _Path([_Point(n.x - x0, n.y - y0) for n in p.pt], p.area, p.sign))
+    mask[y0:y1, x0:x1] |= fill
+
+
+def _strip_path(p: _Path) -> _Path:
+    """
+    Drop the intermediate results of process_path, keeping the decomposition points and
+    the final curve, before the path is sent back to the calling process.
+    """
+    p.next = None
+    p.childlist = []
+    p.sibling = []
+    p._lon = []
+    p._sums = []
+    p._po = []
+    p._curve = []
+    p._ocurve = []
+    return p
+
+
+def _trace_tile(task):
+    """
+    Traces a tile of the bitmap.
+
+    Returns the processed paths kept away from the seams, moved to the position of the
+    tile, and the mask of the components which are too close to a seam.
+    """
+    tile, ox, oy, shape, tile_size, settings = task
+    turdsize, turnpolicy, alphamax, opticurve, opttolerance = settings
+    mask = np.zeros_like(tile)
+    inside = []
+    # /* turds at the seams may be part of a larger component */
+    for p in bm_to_pathlist(tile, turdsize=-INFTY, turnpolicy=turnpolicy, ox=ox, oy=oy):
+        if _path_in_tile(p, shape, tile_size, ox, oy):
+            inside.append(p)
+        elif p.sign:
+            _fill_path(mask, p)
+    # /* paths within the components at the seams are traced with them, the turns
+    # of their decomposition depend on how the components are traced */
+    plist = [
+        p
+        for p in inside
+        if p.area > turdsize and not mask[p.pt[0].y - 1, p.pt[0].x]
+    ]
+    for p in plist:
+        for n in p.pt:
+            n.x += ox
+            n.y += oy
+    process_path(
+        plist,
+        alphamax=alphamax,
+        opticurve=opticurve,
+        opttolerance=opttolerance,
+    )
+    return [_strip_path(p) for p in plist], mask
+
+
+def _process_paths(task):
+    """
+    Processes the paths of the seam pass.
+    """
+    plist, settings = task
+    turdsize, turnpolicy, alphamax, opticurve, opttolerance = settings
+    process_path(
+        plist,
+        alphamax=alphamax,
+        opticurve=opticurve,
+        opttolerance=opttolerance,
+    )
+    return [_strip_path(p) for p in plist]
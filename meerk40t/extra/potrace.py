@@ -1,3 +1,4 @@
+from meerk40t.core.geomstr import Geomstr
 from meerk40t.core.node.node import Fillrule
 from meerk40t.svgelements import Color, Matrix, Path
 
@@ -68,6 +69,18 @@ def plugin(kernel, lifecycle=None):
         if not valid:
             from . import mk_potrace as potrace
 
+        def threshold_image(image, invert, blacklevel):
+            if image.mode not in ("L", "1"):
+                image = image.convert("L")
+
+            if not invert:
+                image = image.point(lambda e: 0 if (e / 255.0) < blacklevel else 255)
+            else:
+                image = image.point(lambda e: 255 if (e / 255.0) < blacklevel else 0)
+            if image.mode != "1":
+                image = image.convert("1")
+            return numpy.asarray(image)
+
         def make_vector(
             image,
             interpolationpolicy=None,
@@ -100,16 +113,7 @@ def plugin(kernel, lifecycle=None):
                 # print ("Optimised version")
                 invert = not invert
 
-            if image.mode not in ("L", "1"):
-                image = image.convert("L")
-
-            if not invert:
-                image = image.point(lambda e: 0 if (e / 255.0) < blacklevel else 255)
-            else:
-                image = image.point(lambda e: 255 if (e / 255.0) < blacklevel else 0)
-            if image.mode != "1":
-                image = image.convert("1")
-            npimage = numpy.asarray(image)
+            npimage = threshold_image(image, invert, blacklevel)
             bm = potrace.Bitmap(npimage)
             plist = bm.trace(
                 turdsize=turdsize,
@@ -136,6 +140,57 @@ def plugin(kernel, lifecycle=None):
 
         kernel.register("render-op/make_vector", make_vector)
 
+        def make_vector_tiles(
+            image,
+            interpolationpolicy=None,
+            invert=False,
+            turdsize=None,
+            alphamax=None,
+            opticurve=None,
+            opttolerance=None,
+            blacklevel=None,
+            tile_size=None,
+            jobs=1,
+            channel=None,
+        ):
+            """
+            Traces the image tile by tile with mk_potrace, yielding the Geomstr of the
+            curves of every tile as soon as it is traced.
+            """
+            from . import mk_potrace
+
+            if interpolationpolicy is None:
+                interpolationpolicy = 4  # POTRACE_TURNPOLICY_MINORITY
+            if turdsize is None:
+                turdsize = 2
+            if alphamax is None:
+                alphamax = 1
+            if opticurve is None:
+                opticurve = True
+            if opttolerance is None:
+                opttolerance = 0.2
+            if invert is None:
+                invert = False
+            if blacklevel is None:
+                blacklevel = 0.5
+            if not tile_size:
+                tile_size = mk_potrace.TILE_SIZE
+
+            bm = mk_potrace.Bitmap(threshold_image(image, invert, blacklevel))
+            for plist in bm.trace_tiles(
+                turdsize=turdsize,
+                turnpolicy=interpolationpolicy,
+                alphamax=alphamax,
+                opticurve=opticurve,
+                opttolerance=opttolerance,
+                tile_size=tile_size,
+                jobs=jobs,
+                channel=channel,
+            ):
+                yield curves_to_geometry(plist)
+
+        kernel.register("render-op/make_vector_tiles", make_vector_tiles)
+
         @kernel.console_option(
             "turnpolicy",
             "z",
@@ -259,3 +314,30 @@ def plugin(kernel, lifecycle=None):
                 )
                 paths.append(node)
             return "elements", paths
+
+
+def curves_to_geometry(curves):
+    """
+    Geomstr of traced curves, one closed subpath per curve.
+    """
+    geometry = Geomstr()
+    for curve in curves:
+        if geometry.index:
+            geometry.end()
+        start = complex(curve.start_point.x, curve.start_point.y)
+        for segment in curve.segments:
+            end = complex(segment.end_point.x, segment.end_point.y)
+            if segment.is_corner:
+                corner = complex(segment.c.x, segment.c.y)
+                geometry.line(start, corner)
+                geometry.line(corner, end)
+            else:
+                geometry.cubic(
+                    start,
+                    complex(segment.c1.x, segment.c1.y),
+                    complex(segment.c2.x, segment.c2.y),
+                    end,
+                )
+            start = end
+        geometry.close()
+    return geometry
@@ -10,11 +10,16 @@ Validation Stages.
         Stage 3, we successfully parsed $$
         Stage 4, we successfully parsed $G, send ?
         Stage 5, we successfully parsed ?
+
+Lines wait in a bounded queue. The sender thread only writes while the characters
+in flight fit in the device planning buffer, the writing driver is held while the
+queue exceeds the controller buffer limit.
 """
 import ast
 import re
 import threading
 import time
+from collections import deque
 
 from meerk40t.kernel import signal_listener
 
@@ -302,6 +307,63 @@ def hardware_settings(code):
         )
 
 
+class GrblThroughput:
+    """
+    Counts lines and bytes sent to the device, totals and rates over a sliding window.
+    """
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self._samples = deque()
+        self._window_bytes = 0
+        self.lines = 0
+        self.bytes = 0
+        self.acknowledged = 0
+        self.started = None
+
+    def reset(self):
+        self._samples.clear()
+        self._window_bytes = 0
+        self.lines = 0
+        self.bytes = 0
+        self.acknowledged = 0
+        self.started = None
+
+    def sent(self, length, now=None):
+        if now is None:
+            now = time.perf_counter()
+        if self.started is None:
+            self.started = now
+        self.lines += 1
+        self.bytes += length
+        self._samples.append((now, length))
+        self._window_bytes += length
+        self._expire(now)
+
+    def acknowledge(self):
+        self.acknowledged += 1
+
+    def _expire(self, now):
+        samples = self._samples
+        limit = now - self.window
+        while samples and samples[0][0] < limit:
+            self._window_bytes -= samples.popleft()[1]
+
+    def rates(self, now=None):
+        """
+        @return: lines per second, bytes per second over the window
+        """
+        if now is None:
+            now = time.perf_counter()
+        self._expire(now)
+        if not self._samples:
+            return 0.0, 0.0
+        elapsed = min(self.window, now - self.started)
+        if elapsed <= 0:
+            return 0.0, 0.0
+        return len(self._samples) / elapsed, self._window_bytes / elapsed
+
+
 def grbl_error_code(code):
     short = f"Error #{code}"
     if code == 1:
@@ -459,12 +521,14 @@ class GrblController:
         self._sending_lock = threading.Lock()
         self._realtime_lock = threading.Lock()
         self._loop_cond = threading.Condition()
-        self._sending_queue = []
-        self._realtime_queue = []
+        self._space_cond = threading.Condition()
+        self._sending_queue = deque()
+        self._realtime_queue = deque()
         # buffer for feedback...
         self._assembled_response = []
         self._forward_buffer = bytearray()
         self._device_buffer_size = self.service.planning_buffer_size
+        self.throughput = GrblThroughput()
         self._log = None
 
         self._paused = False
@@ -493,6 +557,49 @@ class GrblController:
             + len(self._forward_buffer)
         )
 
+    @property
+    def queued_lines(self):
+        return len(self._sending_queue) + len(self._realtime_queue)
+
+    def buffer_status(self):
+        """
+        Throughput and occupancy of the sending pipeline.
+
+        @return: dict of queued lines, bytes in flight, planning buffer size, rates and totals
+        """
+        lines_per_second, bytes_per_second = self.throughput.rates()
+        return {
+            "queued": self.queued_lines,
+            "in_flight": len(self._forward_buffer),
+            "planning_buffer": self._device_buffer_size,
+            "lines_per_second": lines_per_second,
+            "bytes_per_second": bytes_per_second,
+            "lines": self.throughput.lines,
+            "bytes": self.throughput.bytes,
+            "acknowledged": self.throughput.acknowledged,
+        }
+
+    def _signal_buffer(self):
+        self.service.signal("grbl;buffer", self.queued_lines, self.buffer_status())
+
+    def _space_available(self):
+        """
+        Notifies writers waiting in wait_for_space.
+        """
+        with self._space_cond:
+            self._space_cond.notify_all()
+
+    def wait_for_space(self, limit, timeout=None):
+        """
+        Blocks the calling thread until the controller holds no more than limit entries.
+
+        @param limit: permitted length of the controller
+        @param timeout: maximum time to wait in seconds
+        @return: whether there is space
+        """
+        with self._space_cond:
+            return self._space_cond.wait_for(lambda: len(self) <= limit, timeout)
+
     @property
     def _length_of_next_line(self):
         """
@@ -629,9 +736,7 @@ class GrblController:
         self.service.signal("grbl;write", data)
         with self._sending_lock:
             self._sending_queue.append(data)
-        self.service.signal(
-            "grbl;buffer", len(self._sending_queue) + len(self._realtime_queue)
-        )
+        self._signal_buffer()
         self._send_resume()
 
     def realtime(self, data):
@@ -650,9 +755,8 @@ class GrblController:
         if "\x18" in data:
             with self._sending_lock:
                 self._sending_queue.clear()
-        self.service.signal(
-            "grbl;buffer", len(self._sending_queue) + len(self._realtime_queue)
-        )
+            self._space_available()
+        self._signal_buffer()
         self._send_resume()
 
     ####################
@@ -693,6 +797,7 @@ class GrblController:
     def shutdown(self):
         self.is_shutdown = True
         self._forward_buffer.clear()
+        self._space_available()
 
     def validate_start(self, cmd):
         if cmd == "$":
@@ -720,6 +825,7 @@ class GrblController:
                 # If the forward planning buffer is longer than 3 it must have filled with failed attempts.
                 with self._forward_lock:
                     self._forward_buffer.clear()
+                self._space_available()
 
     def _rstop(self, *args):
         self._recving_thread = None
@@ -751,8 +857,10 @@ class GrblController:
         @param line:
         @return:
         """
+        data = bytes(line, encoding="latin-1")
         with self._forward_lock:
-            self._forward_buffer += bytes(line, encoding="latin-1")
+            self._forward_buffer += data
+        self.throughput.sent(len(data))
         self.connection.write(line)
         # print(f"OUT: {line.strip()} [timestamp={time.time():.2f}]")
 
@@ -765,7 +873,7 @@ class GrblController:
         @return:
         """
         with self._realtime_lock:
-            line = self._realtime_queue.pop(0)
+            line = self._realtime_queue.popleft()
         if "!" in line:
             self._paused = True
         if "~" in line:
@@ -776,6 +884,7 @@ class GrblController:
             self._paused = False
             with self._forward_lock:
                 self._forward_buffer.clear()
+            self._space_available()
 
     def _sending_single_line(self):
         """
@@ -784,10 +893,11 @@ class GrblController:
         @return:
         """
         with self._sending_lock:
-            line = self._sending_queue.pop(0)
+            line = self._sending_queue.popleft()
         if line:
             self._send(line)
-        self.service.signal("grbl;buffer", len(self._sending_queue))
+        self._space_available()
+        self._signal_buffer()
         return True
 
     def _send_halt(self):
@@ -864,7 +974,9 @@ class GrblController:
             raise ValueError("No forward command exists.")
         with self._forward_lock:
             cmd_issued = self._forward_buffer[: q + 1]
-            self._forward_buffer = self._forward_buffer[q + 1 :]
+            del self._forward_buffer[: q + 1]
+        self.throughput.acknowledge()
+        self._space_available()
         return cmd_issued
 
     def _recving(self):
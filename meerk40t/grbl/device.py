@@ -471,6 +471,31 @@ class GRBLDevice(Service, Status):
                 "section": "_5_Config",
                 "tip": _("Distance of the curve interpolation in mils"),
             },
+            {
+                "attr": "use_arcs",
+                "object": self,
+                "default": False,
+                "type": bool,
+                "label": _("Native arcs"),
+                "section": "_5_Config",
+                "tip": _(
+                    "Send curves as G2/G3 arcs instead of interpolating them into short lines.\n"
+                    "Not every GRBL compatible firmware supports G2/G3."
+                ),
+            },
+            {
+                "attr": "arc_tolerance",
+                "object": self,
+                "default": 1.0,
+                "type": float,
+                "label": _("Arc Tolerance"),
+                "trailer": _("mil"),
+                "section": "_5_Config",
+                "conditional": (self, "use_arcs"),
+                "tip": _(
+                    "Maximal distance in mils between a curve and the arcs sent for it."
+                ),
+            },
             {
                 "attr": "has_endstops",
                 "object": self,
@@ -913,6 +938,43 @@ class GRBLDevice(Service, Status):
             channel(_("Forced grbl validation."))
             self.controller.force_validate()
 
+        @self.console_option(
+            "reset", "r", type=bool, action="store_true", help=_("Reset counters")
+        )
+        @self.console_command(
+            "grbl_buffer",
+            help=_("Show throughput and buffer occupancy of the grbl controller"),
+            input_type=None,
+        )
+        def grbl_buffer(command, channel, _, reset=False, **kwgs):
+            controller = self.controller
+            if reset:
+                controller.throughput.reset()
+            status = controller.buffer_status()
+            channel(
+                _("Throughput: {lines:.1f} lines/s, {bytes:.0f} bytes/s").format(
+                    lines=status["lines_per_second"], bytes=status["bytes_per_second"]
+                )
+            )
+            channel(
+                _("Queued: {queued} lines, limit {limit}").format(
+                    queued=status["queued"],
+                    limit=self.max_buffer if self.limit_buffer else _("none"),
+                )
+            )
+            channel(
+                _("Planning buffer: {in_flight}/{size} bytes").format(
+                    in_flight=status["in_flight"], size=status["planning_buffer"]
+                )
+            )
+            channel(
+                _("Sent: {lines} lines, {bytes} bytes, {acknowledged} acknowledged").format(
+                    lines=status["lines"],
+                    bytes=status["bytes"],
+                    acknowledged=status["acknowledged"],
+                )
+            )
+
         @self.console_command(
             "soft_reset",
             help=_("Send realtime soft reset gcode to the device"),
@@ -1417,3 +1479,39 @@ class GRBLDevice(Service, Status):
         settings = self.get_operation_power_speed_defaults(operation_type)
         # Anything additional for the operation type can be added here
         return settings
+
+
+def motion_model(service):
+    """
+    Motion model of the grbl planner for job time estimates.
+
+    The acceleration, junction deviation and maximum rates are the $120, $121, $11, $110 and $111 settings of
+    the controller once they were read, and the common values of diode lasers before. G0 travel moves at the
+    maximum rates rather than at the travel speed.
+    """
+    from ..core.estimator import MotionModel
+
+    config = service.hardware_config
+
+    def value(key, default=None):
+        try:
+            return float(config[key])
+        except (KeyError, TypeError, ValueError):
+            return default
+
+    max_rate_x = value(110)
+    max_rate_y = value(111)
+    if max_rate_x is not None and max_rate_y is not None:
+        max_speed_x = max_rate_x / 60.0
+        max_speed_y = max_rate_y / 60.0
+        rapid_speed = float("inf")
+    else:
+        max_speed_x = max_speed_y = None
+        rapid_speed = service.rapid_speed
+    return MotionModel(
+        acceleration=min(value(120, 1000.0), value(121, 1000.0)),
+        junction_deviation=value(11, 0.01),
+        max_speed_x=max_speed_x,
+        max_speed_y=max_speed_y,
+        rapid_speed=rapid_speed,
+    )
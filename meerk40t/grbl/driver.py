@@ -23,6 +23,7 @@ from ..core.plotplanner import PlotPlanner
 from ..core.units import UNITS_PER_INCH, UNITS_PER_MIL, UNITS_PER_MM, Length
 from ..device.basedevice import PLOT_FINISH, PLOT_JOG, PLOT_RAPID, PLOT_SETTING
 from ..kernel import signal_listener
+from ..tools.arcfit import fit_arc, fit_bezier
 
 
 class GRBLDriver(Parameters):
@@ -130,6 +131,62 @@ class GRBLDriver(Parameters):
             return True
         return self.paused
 
+    def _hold(self):
+        """
+        Blocks while work is held. A full controller buffer releases the driver as soon
+        as the controller sent or the device acknowledged enough lines.
+
+        @return: False if the kernel shut down while waiting
+        """
+        while self.hold_work(0):
+            if self.service.kernel.is_shutdown:
+                return False
+            if self.paused:
+                time.sleep(0.05)
+            else:
+                self.service.controller.wait_for_space(self.service.max_buffer, 0.05)
+        return True
+
+    def _curve(self, segment_type, points):
+        """
+        Plots a quad, cubic or arc segment from its start point. With native arcs the
+        segment is fitted with G2/G3 arcs within the arc tolerance, otherwise it is
+        interpolated into lines.
+
+        @param segment_type: "quad", "cubic" or "arc"
+        @param points: complex start, control point(s) and end
+        @return: False if the kernel shut down while waiting
+        """
+        if self.service.use_arcs:
+            tolerance = self.service.arc_tolerance
+            if segment_type == "arc":
+                motions = fit_arc(*points, tolerance)
+            else:
+                motions = fit_bezier(points, tolerance)
+            for motion in motions:
+                if not self._hold():
+                    return False
+                end = motion[1]
+                if motion[0] == "arc":
+                    center = motion[2]
+                    self._arc(end.real, end.imag, center.real, center.imag, motion[3])
+                else:
+                    self._move(end.real, end.imag)
+            return True
+        g = Geomstr()
+        if segment_type == "quad":
+            g.quad(*points)
+        elif segment_type == "cubic":
+            g.cubic(*points)
+        else:
+            g.arc(*points)
+        interp = self.service.interp
+        for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
+            if not self._hold():
+                return False
+            self._move(p.real, p.imag)
+        return True
+
     def get(self, key, default=None):
         """
         Required.
@@ -313,12 +370,9 @@ class GRBLDriver(Parameters):
         else:
             self(f"M4{self.line_end}")
         first = True
-        g = Geomstr()
         for segment_type, start, c1, c2, end, sets in geom.as_lines():
-            while self.hold_work(0):
-                if self.service.kernel.is_shutdown:
-                    return
-                time.sleep(0.05)
+            if not self._hold():
+                return
             x = self.native_x
             y = self.native_y
             start_x, start_y = start.real, start.imag
@@ -355,41 +409,16 @@ class GRBLDriver(Parameters):
                 first = False
             elif segment_type == "quad":
                 self.move_mode = 1
-                interp = self.service.interp
-                g.clear()
-                g.quad(complex(start), complex(c1), complex(end))
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    while self.paused:
-                        time.sleep(0.05)
-                    self._move(p.real, p.imag)
+                if not self._curve("quad", (start, c1, end)):
+                    return
             elif segment_type == "cubic":
                 self.move_mode = 1
-                interp = self.service.interp
-                g.clear()
-                g.cubic(
-                    complex(start),
-                    complex(c1),
-                    complex(c2),
-                    complex(end),
-                )
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    while self.paused:
-                        time.sleep(0.05)
-                    self._move(p.real, p.imag)
+                if not self._curve("cubic", (start, c1, c2, end)):
+                    return
             elif segment_type == "arc":
-                # TODO: Allow arcs to be directly executed by GRBL which can actually use them.
                 self.move_mode = 1
-                interp = self.service.interp
-                g.clear()
-                g.arc(
-                    complex(start),
-                    complex(c1),
-                    complex(end),
-                )
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    while self.paused:
-                        time.sleep(0.05)
-                    self._move(p.real, p.imag)
+                if not self._curve("arc", (start, c1, end)):
+                    return
             elif segment_type == "point":
                 function = sets.get("function")
                 if function == "dwell":
@@ -453,10 +482,8 @@ class GRBLDriver(Parameters):
 
             current += 1
             self._set_queue_status(current, total)
-            while self.hold_work(0):
-                if self.service.kernel.is_shutdown:
-                    return
-                time.sleep(0.05)
+            if not self._hold():
+                return
             x = self.native_x
             y = self.native_y
             start_x, start_y = q.start
@@ -496,27 +523,22 @@ class GRBLDriver(Parameters):
                 self._move(*q.end)
             elif isinstance(q, QuadCut):
                 self.move_mode = 1
-                interp = self.service.interp
-                g = Geomstr()
-                g.quad(complex(*q.start), complex(*q.c()), complex(*q.end))
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    while self.paused:
-                        time.sleep(0.05)
-                    self._move(p.real, p.imag)
+                if not self._curve(
+                    "quad", (complex(*q.start), complex(*q.c()), complex(*q.end))
+                ):
+                    return
             elif isinstance(q, CubicCut):
                 self.move_mode = 1
-                interp = self.service.interp
-                g = Geomstr()
-                g.cubic(
-                    complex(*q.start),
-                    complex(*q.c1()),
-                    complex(*q.c2()),
-                    complex(*q.end),
-                )
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    while self.paused:
-                        time.sleep(0.05)
-                    self._move(p.real, p.imag)
+                if not self._curve(
+                    "cubic",
+                    (
+                        complex(*q.start),
+                        complex(*q.c1()),
+                        complex(*q.c2()),
+                        complex(*q.end),
+                    ),
+                ):
+                    return
             elif isinstance(q, WaitCut):
                 self.wait(q.dwell_time)
             elif isinstance(q, HomeCut):
@@ -533,8 +555,8 @@ class GRBLDriver(Parameters):
                 self.move_mode = 1
                 self.set("power", 1000)
                 for ox, oy, on, x, y in q.plot:
-                    while self.hold_work(0):
-                        time.sleep(0.05)
+                    if not self._hold():
+                        return
                     # q.plot can have different on values, these are parsed
                     if self.on_value != on:
                         self.power_dirty = True
@@ -549,8 +571,8 @@ class GRBLDriver(Parameters):
                 self.plot_planner.push(q)
                 self.move_mode = 1
                 for x, y, on in self.plot_planner.gen():
-                    while self.hold_work(0):
-                        time.sleep(0.05)
+                    if not self._hold():
+                        return
                     if on > 1:
                         # Special Command.
                         if isinstance(on, float):
@@ -890,6 +912,32 @@ class GRBLDriver(Parameters):
         y /= self.unit_scale
         line.append(f"X{x:.3f}")
         line.append(f"Y{y:.3f}")
+        self._write_motion(line, old_current)
+
+    def _arc(self, x, y, cx, cy, ccw):
+        """
+        Circular arc to x, y around the center cx, cy. G3 for counterclockwise arcs, G2
+        otherwise. The center is written as offset from the current position.
+        """
+        old_current = self.service.current
+        ox = self.native_x
+        oy = self.native_y
+        if self._absolute:
+            self.native_x = x
+            self.native_y = y
+        else:
+            self.native_x += x
+            self.native_y += y
+        line = ["G3" if ccw else "G2"]
+        x /= self.unit_scale
+        y /= self.unit_scale
+        line.append(f"X{x:.3f}")
+        line.append(f"Y{y:.3f}")
+        line.append(f"I{(cx - ox) / self.unit_scale:.3f}")
+        line.append(f"J{(cy - oy) / self.unit_scale:.3f}")
+        self._write_motion(line, old_current)
+
+    def _write_motion(self, line, old_current):
         if self.zaxis_dirty:
             self.zaxis_dirty = False
             if self.zaxis is not None:
@@ -659,13 +659,16 @@ class GcodeJob:
                 # 2 = CW ARC
                 # 3 = CCW ARC
 
+                # Arc orientations refer to gcode coordinates with the y-axis
+                # pointing up, svgelements' ccw refers to the y-axis pointing down.
+                cw = self.move_mode == 2
                 cx = ox
                 cy = oy
                 if "i" in gc:
-                    ix = gc["i"].pop(0)  # * self.scale
+                    ix = gc["i"].pop(0) * self.scale
                     cx += ix
                 if "j" in gc:
-                    jy = gc["j"].pop(0)  # * self.scale
+                    jy = gc["j"].pop(0) * self.scale
                     cy += jy
                 if "r" in gc:
                     # Strictly speaking this uses the R parameter, but that wasn't coded.
@@ -673,7 +676,7 @@ class GcodeJob:
                         start=(ox, oy),
                         center=(cx, cy),
                         end=(nx, ny),
-                        ccw=self.move_mode == 3,
+                        ccw=cw,
                     )
                     for p in range(self._interpolate + 1):
                         x, y = arc.point(p / self._interpolate)
@@ -683,7 +686,7 @@ class GcodeJob:
                         start=(ox, oy),
                         center=(cx, cy),
                         end=(nx, ny),
-                        ccw=self.move_mode == 3,
+                        ccw=cw,
                     )
                     for p in range(self._interpolate + 1):
                         x, y = arc.point(p / self._interpolate)
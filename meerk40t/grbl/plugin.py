@@ -4,7 +4,7 @@ GRBL Device Plugin
 Registers the required files to run the GRBL device.
 """
 from meerk40t.grbl.control import GRBLControl, greet
-from meerk40t.grbl.device import GRBLDevice, GRBLDriver
+from meerk40t.grbl.device import GRBLDevice, GRBLDriver, motion_model
 from meerk40t.grbl.emulator import GRBLEmulator
 from meerk40t.grbl.gcodejob import GcodeJob
 from meerk40t.grbl.interpreter import GRBLInterpreter
@@ -27,6 +27,7 @@ def plugin(kernel, lifecycle=None):
         _ = kernel.translation
 
         kernel.register("provider/device/grbl", GRBLDevice)
+        kernel.register("estimator/grbl", motion_model)
         kernel.register("provider/friendly/grbl", ("GRBL-Diode-Laser", 2))
         kernel.register(
             "dev_info/grbl-generic",
@@ -1205,7 +1205,7 @@ class MaterialPanel(ScrolledPanel):
             inform=False,
             use_settings=self.op_data,
         )
-        self.op_data.write_configuration()
+        self.op_data.write_configuration_later()
         self.retrieve_material_list(reload=True, setter=newsection)
 
     def on_delete(self, event):
@@ -1218,7 +1218,7 @@ class MaterialPanel(ScrolledPanel):
                 self.active_material,
                 use_settings=self.op_data,
             )
-            self.op_data.write_configuration()
+            self.op_data.write_configuration_later()
             self.retrieve_material_list(reload=True)
 
     def on_delete_all(self, event):
@@ -1299,7 +1299,7 @@ class MaterialPanel(ScrolledPanel):
                     self.context.elements.clear_persistent_operations(
                         material, use_settings=self.op_data, flush=False
                     )
-            self.op_data.write_configuration()
+            self.op_data.write_configuration_later()
             busy.end()
             self.on_reset(None)
 
@@ -1834,7 +1834,7 @@ class MaterialPanel(ScrolledPanel):
         except (OSError, RuntimeError, PermissionError, FileNotFoundError):
             return False
         if added:
-            self.op_data.write_configuration()
+            self.op_data.write_configuration_later()
         return added
 
     def on_import(self, event, filename=None):
@@ -1952,7 +1952,7 @@ class MaterialPanel(ScrolledPanel):
                 inform=False,
                 use_settings=self.op_data,
             )
-        self.op_data.write_configuration()
+        self.op_data.write_configuration_later()
         self.retrieve_material_list(reload=True, setter=section)
 
     def on_use_current(self, event):
@@ -2003,7 +2003,7 @@ class MaterialPanel(ScrolledPanel):
             inform=False,
             use_settings=self.op_data,
         )
-        self.op_data.write_configuration()
+        self.op_data.write_configuration_later()
         self.retrieve_material_list(reload=True, setter=section)
 
     def on_reset(self, event):
@@ -2048,7 +2048,7 @@ class MaterialPanel(ScrolledPanel):
             self.op_data.write_persistent(section, "laser", op_ltype)
             changes = True
         if changes:
-            self.op_data.write_configuration()
+            self.op_data.write_configuration_later()
         self.on_reset(None)
 
     def update_entry(self, event):
@@ -2109,7 +2109,7 @@ class MaterialPanel(ScrolledPanel):
                 inform=False,
                 use_settings=self.op_data,
             )
-            self.op_data.write_configuration()
+            self.op_data.write_configuration_later()
             self.retrieve_material_list(reload=True, setter=self.active_material)
 
     def on_list_selection(self, event):
@@ -2437,7 +2437,7 @@ class MaterialPanel(ScrolledPanel):
                 False,
                 use_settings=self.op_data,
             )
-            self.op_data.write_configuration()
+            self.op_data.write_configuration_later()
             self.retrieve_material_list(reload=True, setter=section)
 
         def create_basic(event):
@@ -2451,7 +2451,7 @@ class MaterialPanel(ScrolledPanel):
                 False,
                 use_settings=self.op_data,
             )
-            self.op_data.write_configuration()
+            self.op_data.write_configuration_later()
             self.retrieve_material_list(reload=True, setter=section)
 
         menu.AppendSeparator()
@@ -3047,7 +3047,7 @@ class MaterialPanel(ScrolledPanel):
                     flush=False,
                     use_settings=self.op_data,
                 )
-                self.op_data.write_configuration()
+                self.op_data.write_configuration_later()
                 self.fill_preview()
 
         op_dict = {
@@ -3371,7 +3371,7 @@ class MaterialPanel(ScrolledPanel):
                     event.Veto()
                     return
             # Set the new data in the listctrl
-            self.op_data.write_configuration()
+            self.op_data.write_configuration_later()
             self.list_preview.SetItem(list_id, col_id, new_data)
 
     def set_parent(self, par_panel):
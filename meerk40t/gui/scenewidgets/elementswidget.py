@@ -99,8 +99,13 @@ class ElementsWidget(Widget):
             draw_mode |= DRAW_MODE_EDIT
         # t0 = time.time()
         if self.filter in (SHOW_ALL, SHOW_ELEMENTS_ALL):
+            if self.renderer.context.setting(bool, "supress_non_visible", True):
+                # Culled by the spatial index, the renderer skips these anyway.
+                nodes = context.elements.query_rect(box, unbounded=True)
+            else:
+                nodes = context.elements.elems_nodes()
             self.renderer.render(
-                context.elements.elems_nodes(),
+                nodes,
                 gc,
                 draw_mode,
                 zoomscale=zoom_scale,
@@ -125,7 +125,11 @@ class RectSelectWidget(Widget):
 
         # We don't want every single element to issue a signal
         with elements.signalfree("emphasized"):
-            for node in elements.elems():
+            # Elements outside the rectangle are not covered, only the ones
+            # the spatial index finds need to be tested.
+            for node in elements.query_rect(
+                (sel_left, sel_top, sel_right, sel_bottom), types=elem_nodes
+            ):
                 try:
                     bounds = node.bounds
                 except AttributeError:
@@ -374,7 +378,12 @@ class RectSelectWidget(Widget):
                 # t1 = perf_counter()
                 other_points = []
                 selected_points = []
-                for e in self.scene.context.elements.elems():
+                # The selected elements lie within the boundaries, only elements
+                # near them can contribute points.
+                nearby = self.scene.context.elements.query_rect(
+                    (b[0] - gap, b[1] - gap, b[2] + gap, b[3] + gap), types=elem_nodes
+                )
+                for e in nearby:
                     target = selected_points if e.emphasized else other_points
                     if not hasattr(e, "as_geometry"):
                         continue
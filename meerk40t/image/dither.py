@@ -12,9 +12,13 @@ from PIL import Image
 
 try:
     from numba import njit
+
+    HAS_NUMBA = True
 except Exception as e:
     # Jit does not exist, add a dummy decorator and continue.
     # print (f"Encountered error: {e}")
+    HAS_NUMBA = False
+
     def njit(*args, **kwargs):
         def inner(func):
             return func
@@ -401,6 +405,148 @@ def bayer_blue_dither(image):
     return noisy_image
 
 
+# Diffusion maps of the error diffusion methods above, (dx, dy, coefficient).
+diffusion_maps = {
+    "atkinson": (
+        (1, 0, 1 / 8),
+        (2, 0, 1 / 8),
+        (-1, 1, 1 / 8),
+        (0, 1, 1 / 8),
+        (1, 1, 1 / 8),
+        (0, 2, 1 / 8),
+    ),
+    "legacy-floyd-steinberg": (
+        (1, 0, 7 / 16),
+        (-1, 1, 3 / 16),
+        (0, 1, 5 / 16),
+        (1, 1, 1 / 16),
+    ),
+    "jarvis-judice-ninke": (
+        (1, 0, 7 / 48),
+        (2, 0, 5 / 48),
+        (-2, 1, 3 / 48),
+        (-1, 1, 5 / 48),
+        (0, 1, 7 / 48),
+        (1, 1, 5 / 48),
+        (2, 1, 3 / 48),
+        (-2, 2, 1 / 48),
+        (-1, 2, 3 / 48),
+        (0, 2, 5 / 48),
+        (1, 2, 3 / 48),
+        (2, 2, 1 / 48),
+    ),
+    "stucki": (
+        (1, 0, 8 / 42),
+        (2, 0, 4 / 42),
+        (-2, 1, 2 / 42),
+        (-1, 1, 4 / 42),
+        (0, 1, 8 / 42),
+        (1, 1, 4 / 42),
+        (2, 1, 2 / 42),
+        (-2, 2, 1 / 42),
+        (-1, 2, 2 / 42),
+        (0, 2, 4 / 42),
+        (1, 2, 2 / 42),
+        (2, 2, 1 / 42),
+    ),
+    "burkes": (
+        (1, 0, 8 / 32),
+        (2, 0, 4 / 32),
+        (-2, 1, 2 / 32),
+        (-1, 1, 4 / 32),
+        (0, 1, 8 / 32),
+        (1, 1, 4 / 32),
+        (2, 1, 2 / 32),
+    ),
+    "sierra3": (
+        (1, 0, 5 / 32),
+        (2, 0, 3 / 32),
+        (-2, 1, 2 / 32),
+        (-1, 1, 4 / 32),
+        (0, 1, 5 / 32),
+        (1, 1, 4 / 32),
+        (2, 1, 2 / 32),
+        (-1, 2, 2 / 32),
+        (0, 2, 3 / 32),
+        (1, 2, 2 / 32),
+    ),
+    "sierra2": (
+        (1, 0, 4 / 16),
+        (2, 0, 3 / 16),
+        (-2, 1, 1 / 16),
+        (-1, 1, 2 / 16),
+        (0, 1, 3 / 16),
+        (1, 1, 2 / 16),
+        (2, 1, 1 / 16),
+    ),
+    "sierra-2-4a": (
+        (1, 0, 2 / 4),
+        (-1, 1, 1 / 4),
+        (0, 1, 1 / 4),
+    ),
+    "shiau-fan": (
+        (1, 0, 0.5),
+        (-2, 1, 1 / 8),
+        (-1, 1, 1 / 8),
+        (0, 1, 2 / 8),
+    ),
+    "shiau-fan-2": (
+        (1, 0, 0.5),
+        (-3, 1, 1 / 16),
+        (-2, 1, 1 / 16),
+        (1, 1, 2 / 16),
+        (0, 1, 4 / 16),
+    ),
+}
+
+
+def error_diffusion(image, diff_map):
+    """
+    Numpy error diffusion, gives the results of the per-pixel methods above without numba.
+
+    Like those, the scan runs along the first axis and the diffusion offsets (dx, dy) are
+    (first, second) axis. A pixel only depends on pixels of earlier scan lines and the
+    pixels before it on its own line, so all pixels on the wavefront x + k * y = t can be
+    processed at once. With k larger than the horizontal span of the map no two pixels
+    of a wavefront diffuse into the same pixel and every pixel receives its errors in
+    scan order, the result matches the sequential scan. In a padded flat buffer the
+    pixels of a wavefront are equally spaced, each step works on strided slices.
+
+    @param image: float32 array, dithered in place
+    @param diff_map: tuple of (dx, dy, coefficient)
+    @return: image
+    """
+    width, height = image.shape
+    if width == 0 or height == 0:
+        return image
+    min_dx = min(0, min(dx for dx, dy, c in diff_map))
+    max_dx = max(0, max(dx for dx, dy, c in diff_map))
+    max_dy = max(dy for dx, dy, c in diff_map)
+    k = max_dx - min_dx + 1
+    left = -min_dx
+    line = left + width + max_dx + k
+    step = line - k
+    padded = np.zeros((height + max_dy, line), dtype=np.float32)
+    padded[:height, left : left + width] = image.T
+    flat = padded.reshape(-1)
+    offsets = [(dy * line + dx, c) for dx, dy, c in diff_map]
+    black = np.float32(0)
+    white = np.float32(255)
+    for t in range(width + k * (height - 1)):
+        y_lo = max(0, -((width - 1 - t) // k))
+        y_hi = min(height - 1, t // k)
+        start = left + t + y_lo * step
+        stop = left + t + y_hi * step + 1
+        pixels = flat[start:stop:step]
+        dithered = np.where(pixels <= 127, black, white)
+        error = pixels - dithered
+        flat[start:stop:step] = dithered
+        for offset, coefficient in offsets:
+            flat[start + offset : stop + offset : step] += error * coefficient
+    image[:] = padded[:height, left : left + width].T
+    return image
+
+
 function_map = {
     "atkinson": atkinson,
     "legacy-floyd-steinberg": floyd_steinberg,
@@ -424,6 +570,10 @@ def dither(image, method="Legacy-Floyd-Steinberg"):
 
     diff = image.convert("F")
     data = np.array(diff).astype(np.float32)
-    dither_function(data)
+    if not HAS_NUMBA and method in diffusion_maps:
+        # Per-pixel python is far too slow without numba.
+        error_diffusion(data, diffusion_maps[method])
+    else:
+        dither_function(data)
     diff = Image.fromarray(data)
     return diff
@@ -16,6 +16,7 @@ from meerk40t.svgelements import Color, Matrix, Path
 from meerk40t.core.geomstr import Geomstr
 
 from .dither import dither
+from .scheduler import ImageScheduler
 
 try:
     import cv2
@@ -711,11 +712,16 @@ def plugin(kernel, lifecycle=None):
         kernel.register("raster_script/Xin", RasterScripts.raster_script_xin())
         kernel.register("raster_script/Newsy", RasterScripts.raster_script_newsy())
         kernel.register("raster_script/Simple", RasterScripts.raster_script_simple())
+    if lifecycle == "preshutdown":
+        scheduler = kernel.lookup("image/scheduler")
+        if scheduler is not None:
+            scheduler.shutdown()
     if lifecycle != "register":
         return
     _ = kernel.translation
     preproc = RasterImagePreprocessor(kernel)
     kernel.register("load/ImageLoader", ImageLoader)
+    kernel.register("image/scheduler", ImageScheduler(kernel))
     choices = [
         {
             "attr": "image_dpi",
@@ -780,6 +786,22 @@ def plugin(kernel, lifecycle=None):
             # Hint for translation _("Images")
             "section": "Images",
         },
+        {
+            "attr": "image_jobs",
+            "object": kernel.elements,
+            "default": 1,
+            "type": int,
+            "label": _("Image processing jobs"),
+            "tip": _(
+                "Number of worker processes used to process images (script, dither).\n"
+                + "1 processes images in the main process, 0 uses all available processors."
+            ),
+            "page": "Input/Output",
+            # Hint for translation _("Images")
+            "section": "Images",
+            "lower": 0,
+            "upper": 64,
+        },
     ]
     kernel.register_choices("preferences", choices)
 
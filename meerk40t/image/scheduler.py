@@ -0,0 +1,236 @@
+"""
+Scheduler for the processing of image nodes.
+
+Updating an image node (script, dither, keyhole) used to start a dedicated thread for
+that node, loading a file with hundreds of images started hundreds of threads contending
+for the same work. The scheduler processes the requests with a bounded number of worker
+threads instead:
+
+* Requests are coalesced per node, a node waiting to be processed is processed once
+  with its latest state.
+* Emphasized (selected) nodes are processed first, hidden nodes last.
+* A request for a node that is being processed supersedes the running one. A result of
+  a worker process that has been superseded is dropped, its task is cancelled if it did
+  not start yet.
+
+With the `image_jobs` setting above 1 the processing itself runs in the shared process
+pool of core.parallel, each worker thread waiting for one worker process. The pool is
+shared with the planner and grows to the larger of both settings, a replaced pool
+finishes its tasks so neither cancels the tasks of the other. Otherwise the
+worker threads process the nodes in this process.
+"""
+
+import threading
+from concurrent.futures import CancelledError
+from concurrent.futures.process import BrokenProcessPool
+from heapq import heappop, heappush
+
+from meerk40t.core.parallel import (
+    UnpicklableError,
+    discard_executor,
+    resolve_jobs,
+    submit,
+)
+
+# Worker threads if the images are processed in this process.
+THREADS = 2
+
+
+class ImageScheduler:
+    def __init__(self, kernel):
+        self.kernel = kernel
+        self._lock = threading.Lock()
+        self._heap = []
+        self._sequence = 0
+        # Node key: (node, context, generation, priority) of the waiting request.
+        self._pending = {}
+        # Node key: generation of the latest request.
+        self._generation = {}
+        # Node key: future of the worker process.
+        self._active = {}
+        self._workers = 0
+        self._worker_count = 0
+        self._stopped = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.processed = 0
+
+    def __len__(self):
+        """
+        @return: number of waiting and running requests
+        """
+        with self._lock:
+            return len(set(self._pending) | set(self._active))
+
+    def jobs(self):
+        """
+        Number of worker processes, 1 if the images are processed in this process.
+        """
+        elements = self.kernel.elements
+        return resolve_jobs(elements.setting(int, "image_jobs", 1))
+
+    @staticmethod
+    def priority(node):
+        """
+        Lower values are processed first.
+        """
+        if getattr(node, "emphasized", False):
+            return 0
+        if getattr(node, "hidden", False):
+            return 2
+        return 1
+
+    def submit(self, node, context, priority=None):
+        """
+        Requests processing of the image node. Replaces a waiting request of the node and
+        supersedes a running one.
+
+        @param node: image node
+        @param context: context receiving the update signals
+        @param priority: optional priority, see priority()
+        """
+        if priority is None:
+            priority = self.priority(node)
+        key = id(node)
+        with self._lock:
+            if self._stopped:
+                return
+            self.submitted += 1
+            generation = self._generation.get(key, 0) + 1
+            self._generation[key] = generation
+            previous = self._pending.get(key)
+            if previous is not None:
+                self.coalesced += 1
+                priority = min(priority, previous[3])
+            self._pending[key] = (node, context, generation, priority)
+            future = self._active.get(key)
+            if future is not None and future is not True and future.cancel():
+                self.cancelled += 1
+            if key not in self._active:
+                self._push(key, priority)
+            self._start_workers()
+
+    def cancel(self, node):
+        """
+        Drops the waiting request of the node and the result of a running one.
+        """
+        key = id(node)
+        with self._lock:
+            if self._pending.pop(key, None) is not None:
+                self.cancelled += 1
+            if key in self._active:
+                self._generation[key] = self._generation.get(key, 0) + 1
+                future = self._active[key]
+                if future is not True and future.cancel():
+                    self.cancelled += 1
+            elif key in self._generation:
+                del self._generation[key]
+
+    def shutdown(self):
+        """
+        Drops all waiting requests, the workers finish their current node.
+        """
+        with self._lock:
+            self._stopped = True
+            self._pending.clear()
+            self._heap.clear()
+            for future in self._active.values():
+                if future is not True:
+                    future.cancel()
+
+    def _push(self, key, priority):
+        self._sequence += 1
+        heappush(self._heap, (priority, self._sequence, key))
+
+    def _start_workers(self):
+        jobs = self.jobs()
+        limit = jobs if jobs > 1 else THREADS
+        while self._workers < min(limit, len(self._heap)):
+            self._workers += 1
+            self._worker_count += 1
+            self.kernel.threaded(
+                self._worker,
+                thread_name=f"image_worker_{self._worker_count}",
+                daemon=True,
+            )
+
+    def _next(self):
+        """
+        Pops the next request, skipping superseded heap entries and nodes being processed.
+        """
+        while self._heap:
+            priority, sequence, key = heappop(self._heap)
+            request = self._pending.get(key)
+            if request is None or request[3] != priority or key in self._active:
+                continue
+            del self._pending[key]
+            self._active[key] = True
+            return key, request
+        return None, None
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                key, request = self._next()
+                if key is None:
+                    self._workers -= 1
+                    if not self._pending:
+                        # Forget the generations of nodes without any request.
+                        for k in list(self._generation):
+                            if k not in self._active:
+                                del self._generation[k]
+                    return
+            node, context, generation, priority = request
+            try:
+                self._process(key, node, context, generation)
+            finally:
+                with self._lock:
+                    del self._active[key]
+                    if key in self._pending:
+                        self._push(key, self._pending[key][3])
+
+    def _superseded(self, key, generation):
+        with self._lock:
+            return self._stopped or self._generation.get(key) != generation
+
+    def _process(self, key, node, context, generation):
+        step = node._default_units / node.dpi
+        crop = not node.prevent_crop
+        jobs = self.jobs()
+        result = None
+        if jobs > 1:
+            from meerk40t.core.node.elem_image import process_image_task
+
+            future = None
+            try:
+                task = node._process_task(step, step, crop)
+                with self._lock:
+                    if self._stopped or self._generation.get(key) != generation:
+                        return
+                    future = submit(process_image_task, task, jobs)
+                    self._active[key] = future
+                result = future.result()
+            except CancelledError:
+                return
+            except BrokenProcessPool:
+                if future is not None:
+                    discard_executor(future.executor)
+            except UnpicklableError:
+                pass
+            except Exception:
+                # A processing error reoccurs below, in this process.
+                pass
+        if self._superseded(key, generation):
+            with self._lock:
+                self.cancelled += 1
+            return
+        with node._update_lock:
+            if result is None:
+                node.process_image(step, step, crop)
+            else:
+                node._set_processed(*result)
+        with self._lock:
+            self.processed += 1
+        if not self._superseded(key, generation):
+            node._update_finished(context)
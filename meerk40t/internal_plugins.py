@@ -3,151 +3,199 @@ Internal plugins are a list of plugins which are included internally with MeerK4
 are written like regular plugins and obey the rules for the meerk40t/kernel plugin system. Plugins can contain
 additional plugin references (this is itself a plugin).
 
-For example,
-        from .core import core
+Plugins are listed as "package.module:attribute" of the plugin function, in the order they are added.
 
-        plugins.append(core.plugin)
+Plugins with a manifest in LAZY_PLUGINS are not imported at startup. The manifest declares the registered paths,
+console commands, features and settings sections of the plugin and the kernel imports it on first use, see
+meerk40t.kernel.plugins.LazyPlugin. Plugins registering settings defaults or attributes used by other code directly
+must not be lazy.
 
 Provides all the core plugins for meerk40t to run which are sub-references from that plugin file.
 """
 
+from meerk40t.kernel import LazyPlugin
+
+PLUGINS = (
+    "meerk40t.network.kernelserver:plugin",
+    "meerk40t.device.basedevice:plugin",
+    "meerk40t.extra.coolant:plugin",
+    "meerk40t.lihuiyu.plugin:plugin",
+    "meerk40t.moshi.plugin:plugin",
+    "meerk40t.grbl.plugin:plugin",
+    "meerk40t.ruida.plugin:plugin",
+    "meerk40t.rotary.rotary:plugin",
+    "meerk40t.cylinder.cylinder:plugin",
+    "meerk40t.core.core:plugin",
+    "meerk40t.image.imagetools:plugin",
+    "meerk40t.fill.fills:plugin",
+    "meerk40t.fill.patterns:plugin",
+    "meerk40t.extra.vectrace:plugin",
+    "meerk40t.extra.potrace:plugin",
+    "meerk40t.extra.vtracer:plugin",
+    "meerk40t.extra.inkscape:plugin",
+    "meerk40t.extra.hershey:plugin",
+    "meerk40t.extra.ezd:plugin",
+    "meerk40t.extra.lbrn:plugin",
+    "meerk40t.extra.xcs_reader:plugin",
+    "meerk40t.extra.updater:plugin",
+    "meerk40t.extra.winsleep:plugin",
+    "meerk40t.extra.param_functions:plugin",
+    "meerk40t.extra.serial_exchange:plugin",
+    "meerk40t.camera.plugin:plugin",
+    "meerk40t.dxf.plugin:plugin",
+    "meerk40t.extra.cag:plugin",
+    "meerk40t.balormk.plugin:plugin",
+    "meerk40t.newly.plugin:plugin",
+    "meerk40t.gui.plugin:plugin",
+    "meerk40t.extra.imageactions:plugin",
+    "meerk40t.extra.outerworld:plugin",
+)
+
+ESP3D_COMMANDS = (
+    "esp3d_clear_all",
+    "esp3d_config",
+    "esp3d_delete",
+    "esp3d_list",
+    "esp3d_pause",
+    "esp3d_resume",
+    "esp3d_run_file",
+    "esp3d_stop",
+    "esp3d_upload_run",
+)
+
+NEWLY_DEVICES = (
+    "amc",
+    "anwei",
+    "artsign-n",
+    "artsign-u",
+    "beijing",
+    "dagong",
+    "duowei",
+    "evertech",
+    "gama",
+    "greatsign",
+    "helo",
+    "hpc",
+    "jinan-jinweik",
+    "jinan-suke",
+    "jinli",
+    "lecai-laser",
+    "lecai-plasma",
+    "light-tech",
+    "lion",
+    "mini",
+    "rabbit",
+    "raylaser",
+    "ruijie",
+    "senfeng",
+    "sicono",
+    "villa",
+    "weifang",
+    "workline",
+    "xinxing",
+    "xinyi",
+    "zl",
+)
+
+LAZY_PLUGINS = {
+    "meerk40t.lihuiyu.plugin:plugin": {
+        "paths": (
+            "dev_info/m2-nano",
+            "dev_info/m3-nano",
+            "estimator/lhystudios",
+            "interpreter/lihuiyu",
+            "load/EgvLoader",
+            "provider/device/lhystudios",
+            "provider/friendly/lhystudios",
+        ),
+        "sections": ("lhystudios",),
+    },
+    "meerk40t.moshi.plugin:plugin": {
+        "paths": (
+            "dev_info/moshi-co2",
+            "provider/device/moshi",
+            "provider/friendly/moshi",
+        ),
+        "sections": ("moshi",),
+    },
+    "meerk40t.grbl.plugin:plugin": {
+        "paths": (
+            "dev_info/grbl-diode",
+            "dev_info/grbl-fluidnc",
+            "dev_info/grbl-generic",
+            "dev_info/grbl-k40",
+            "dev_info/grbl-longer-ray5",
+            "dev_info/grbl-ortur",
+            "driver/grbl",
+            "emulator/grbl",
+            "estimator/grbl",
+            "interpreter/grbl",
+            "load/GCodeLoader",
+            "provider/device/grbl",
+            "provider/friendly/grbl",
+            "spoolerjob/grbl",
+        ),
+        "commands": ("grblcontrol", "grblmock")
+        + ESP3D_COMMANDS
+        + tuple(f"device/{command}" for command in ESP3D_COMMANDS),
+        "sections": ("grbl",),
+    },
+    "meerk40t.ruida.plugin:plugin": {
+        "paths": (
+            "dev_info/ruida-beta",
+            "emulator/ruida",
+            "load/RDLoader",
+            "provider/device/ruida",
+            "spoolerjob/ruida",
+        ),
+        "commands": ("ruidacontrol",),
+        "sections": ("ruida",),
+    },
+    "meerk40t.extra.potrace:plugin": {
+        "paths": ("render-op/make_vector", "render-op/make_vector_tiles"),
+        "commands": ("image/potrace",),
+    },
+    "meerk40t.extra.ezd:plugin": {"paths": ("load/EZDLoader",)},
+    "meerk40t.extra.lbrn:plugin": {"paths": ("load/LbrnLoader",)},
+    "meerk40t.extra.xcs_reader:plugin": {
+        "paths": ("load/XCSLoaderFull", "load/XCSLoaderPlain"),
+    },
+    "meerk40t.camera.plugin:plugin": {
+        "paths": ("camera-enabled", "window/CameraInterface", "wxpane/CameraPane"),
+        "commands": (r"camera\d*",),
+        "features": ("camera",),
+    },
+    "meerk40t.dxf.plugin:plugin": {
+        "paths": ("choices/preferences", "load/DxfLoader"),
+    },
+    "meerk40t.balormk.plugin:plugin": {
+        "paths": (
+            "dev_info/balor-co2",
+            "dev_info/balor-fiber",
+            "dev_info/balor-fiber-mopa",
+            "dev_info/balor-uv",
+            "estimator/balor",
+            "provider/device/balor",
+            "provider/friendly/balor",
+        ),
+        "sections": ("balor",),
+    },
+    "meerk40t.newly.plugin:plugin": {
+        "paths": tuple(f"dev_info/g3v8-{name}" for name in NEWLY_DEVICES)
+        + ("provider/device/newly", "provider/friendly/newly"),
+        "sections": ("newly",),
+    },
+}
+
 
 def plugin(kernel, lifecycle):
     if lifecycle == "plugins":
         plugins = list()
-
-        from .network import kernelserver
-
-        plugins.append(kernelserver.plugin)
-
-        from .device import basedevice
-
-        plugins.append(basedevice.plugin)
-
-        from .extra.coolant import plugin as coolantplugin
-
-        plugins.append(coolantplugin)
-
-        from .lihuiyu import plugin as lihuiyu_driver
-
-        plugins.append(lihuiyu_driver.plugin)
-
-        from .moshi import plugin as moshi_driver
-
-        plugins.append(moshi_driver.plugin)
-
-        from .grbl.plugin import plugin as grbl_driver_plugin
-
-        plugins.append(grbl_driver_plugin)
-
-        from .ruida import plugin as ruida_driver
-
-        plugins.append(ruida_driver.plugin)
-
-        from .rotary import rotary
-
-        plugins.append(rotary.plugin)
-
-        from .cylinder import cylinder
-
-        plugins.append(cylinder.plugin)
-
-        from .core import core
-
-        plugins.append(core.plugin)
-
-        from .image import imagetools
-
-        plugins.append(imagetools.plugin)
-
-        from .fill import fills
-
-        plugins.append(fills.plugin)
-
-        from .fill import patterns
-
-        plugins.append(patterns.plugin)
-
-        from .extra import vectrace
-
-        plugins.append(vectrace.plugin)
-
-        from .extra import potrace
-
-        plugins.append(potrace.plugin)
-
-        from .extra import vtracer
-
-        plugins.append(vtracer.plugin)
-
-        from .extra import inkscape
-
-        plugins.append(inkscape.plugin)
-
-        from .extra import hershey
-
-        plugins.append(hershey.plugin)
-
-        from .extra import ezd
-
-        plugins.append(ezd.plugin)
-
-        from .extra import lbrn
-
-        plugins.append(lbrn.plugin)
-
-        from .extra import xcs_reader
-
-        plugins.append(xcs_reader.plugin)
-
-        from .extra import updater
-
-        plugins.append(updater.plugin)
-
-        from .extra import winsleep
-
-        plugins.append(winsleep.plugin)
-
-        from .extra import param_functions
-
-        plugins.append(param_functions.plugin)
-
-        from .extra import serial_exchange
-
-        plugins.append(serial_exchange.plugin)
-
-        from meerk40t.camera.plugin import plugin as camera_plugin
-
-        plugins.append(camera_plugin)
-
-        from .dxf.plugin import plugin as dxf_io_plugin
-
-        plugins.append(dxf_io_plugin)
-
-        from .extra import cag
-
-        plugins.append(cag.plugin)
-
-        from .balormk.plugin import plugin as balorplugin
-
-        kernel.add_plugin(balorplugin)
-
-        from .newly.plugin import plugin as newlyplugin
-
-        kernel.add_plugin(newlyplugin)
-
-        from .gui.plugin import plugin as wxplugin
-
-        plugins.append(wxplugin)
-
-        from .extra.imageactions import plugin as splitterplugin
-
-        plugins.append(splitterplugin)
-
-        from .extra.outerworld import plugin as owplugin
-
-        plugins.append(owplugin)
-
+        for name in PLUGINS:
+            if name in LAZY_PLUGINS:
+                plugins.append(LazyPlugin(name, **LAZY_PLUGINS[name]))
+            else:
+                plugins.append(kernel.import_plugin(name))
         return plugins
 
     if lifecycle == "invalidate":
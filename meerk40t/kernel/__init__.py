@@ -8,8 +8,10 @@ from .jobs import *
 from .kernel import *
 from .lifecycles import *
 from .module import *
+from .plugins import *
 from .service import *
 from .settings import *
+from .signals import *
 
 _gettext = lambda e: e
 _gettext_language = None
@@ -26,8 +26,10 @@ from .inhibitor import Inhibitor
 from .jobs import ConsoleFunction, Job
 from .lifecycles import *
 from .module import Module
+from .plugins import LazyPlugin, PluginProfile, import_plugin
 from .service import Service
 from .settings import Settings
+from .signals import SignalPolicy, SignalProfiler
 
 KERNEL_VERSION = "0.0.10"
 
@@ -135,6 +137,7 @@ class Kernel(Settings):
         delay: float = 0.05,  # 20 ticks per second
         language: str = None,
         restarted: bool = False,
+        profile_startup: bool = False,
     ):
         """
         Initialize the Kernel. This sets core attributes of the ecosystem that are accessible to all modules.
@@ -168,6 +171,12 @@ class Kernel(Settings):
         self._kernel_plugins = []
         self._service_plugins = {}
         self._module_plugins = {}
+        # Lazy plugins declared but not yet imported, and by their declared paths.
+        self._lazy_plugins = []
+        self._lazy_paths = {}
+        self._lazy_lock = threading.RLock()
+        # Import and lifecycle times of the plugins.
+        self.plugin_profile = PluginProfile() if profile_startup else None
 
         # All established contexts.
         self.contexts = {}
@@ -228,6 +237,12 @@ class Kernel(Settings):
         self._message_queue = {}
         self._process_lock = threading.Lock()
         self._processing = {}
+        # Coalescing policies by signal code and the signal bus profiler.
+        self.signal_policies = {}
+        self.signal_profiler = SignalProfiler()
+        self._signal_queued_time = {}
+        self._processing_queued_time = {}
+        self._signal_dispatch_time = {}
 
         # Channels
         self.channels = {}
@@ -377,14 +392,14 @@ class Kernel(Settings):
         @param plugin:
         @return:
         """
-        additional_plugins = plugin(self, "plugins")
+        additional_plugins = self.plugin_call(plugin, self, "plugins")
         if additional_plugins is not None:
             if not isinstance(additional_plugins, (tuple, list)):
                 additional_plugins = tuple(additional_plugins)
             for p in additional_plugins:
                 self.add_plugin(p)
-        service_paths = plugin(self, "service")
-        module_paths = plugin(self, "module")
+        service_paths = self.plugin_call(plugin, self, "service")
+        module_paths = self.plugin_call(plugin, self, "module")
         if service_paths is None and module_paths is None:
             # This is just a kernel plugin.
             if plugin not in self._kernel_plugins:
@@ -409,6 +424,130 @@ class Kernel(Settings):
                 if plugin not in self._module_plugins[p]:
                     self._module_plugins[p].append(plugin)
 
+    def plugin_call(self, plugin: Callable, kernel: Any, lifecycle: str) -> Any:
+        """
+        Calls the plugin with the lifecycle, timing the call if the plugins are profiled.
+        """
+        if self.plugin_profile is None:
+            return plugin(kernel, lifecycle)
+        return self.plugin_profile.call(plugin, kernel, lifecycle)
+
+    def import_plugin(self, name: str) -> Callable:
+        """
+        Imports the plugin function given as "package.module:attribute", timing the import if the plugins are
+        profiled.
+        """
+        if self.plugin_profile is None:
+            return import_plugin(name)
+        return self.plugin_profile.measure(name, "import", import_plugin, name)
+
+    def add_late_plugin(self, plugin: Callable, position: int) -> List[Callable]:
+        """
+        Adds a plugin after the kernel lifecycle has started, see LazyPlugin. Service and module plugins are added
+        as usual and invalidated if the invalidate lifecycle is passed. The kernel plugins are returned rather
+        than added, the caller runs their lifecycles.
+
+        @param plugin: plugin function
+        @param position: current kernel lifecycle position
+        @return: kernel plugins
+        """
+        kernel_plugins = []
+        additional_plugins = self.plugin_call(plugin, self, "plugins")
+        if additional_plugins is not None:
+            if not isinstance(additional_plugins, (tuple, list)):
+                additional_plugins = tuple(additional_plugins)
+            for p in additional_plugins:
+                kernel_plugins.extend(self.add_late_plugin(p, position))
+        service_paths = self.plugin_call(plugin, self, "service")
+        module_paths = self.plugin_call(plugin, self, "module")
+        if service_paths is None and module_paths is None:
+            kernel_plugins.append(plugin)
+            return kernel_plugins
+        if position >= LIFECYCLE_KERNEL_INVALIDATE and self.plugin_call(
+            plugin, self, "invalidate"
+        ):
+            return kernel_plugins
+        # Sub plugins are already added.
+        for paths, plugins in (
+            (service_paths, self._service_plugins),
+            (module_paths, self._module_plugins),
+        ):
+            if paths is None:
+                continue
+            if not isinstance(paths, (tuple, list)):
+                paths = (paths,)
+            for p in paths:
+                if p not in plugins:
+                    plugins[p] = list()
+                if plugin not in plugins[p]:
+                    plugins[p].append(plugin)
+        return kernel_plugins
+
+    def add_lazy_plugin(self, lazy_plugin: LazyPlugin) -> None:
+        """
+        Declares a lazy plugin, imported on the first use of anything in its manifest.
+        """
+        with self._lazy_lock:
+            if lazy_plugin in self._lazy_plugins:
+                return
+            self._lazy_plugins.append(lazy_plugin)
+            for path in lazy_plugin.paths:
+                self._lazy_paths.setdefault(path, []).append(lazy_plugin)
+
+    def load_lazy_plugins(self, lazy_plugins=None) -> bool:
+        """
+        Imports the given declared lazy plugins, all if None, and brings them to the current kernel lifecycle.
+
+        @return: whether any plugin was loaded
+        """
+        loaded = False
+        with self._lazy_lock:
+            lazy_plugins = list(self._lazy_plugins if lazy_plugins is None else lazy_plugins)
+            for lazy_plugin in lazy_plugins:
+                if lazy_plugin not in self._lazy_plugins:
+                    continue
+                self._lazy_plugins.remove(lazy_plugin)
+                for path in lazy_plugin.paths:
+                    declared = self._lazy_paths[path]
+                    declared.remove(lazy_plugin)
+                    if not declared:
+                        del self._lazy_paths[path]
+                channel = self.channel("kernel-lifecycle")
+                if channel:
+                    channel(f"(plugin) lazy load: {lazy_plugin.name}")
+                position = Kernel.kernel_lifecycle_position(self)
+                if lazy_plugin.load(self, position):
+                    loaded = True
+        return loaded
+
+    def _load_lazy_match(self, matchtext: str) -> bool:
+        if matchtext.startswith("command/"):
+            # Commands are loaded by name during parsing, see _load_lazy_command.
+            return False
+        match = re.compile(matchtext)
+        lazy_plugins = []
+        for path, declared in list(self._lazy_paths.items()):
+            if match.match(path):
+                lazy_plugins.extend(p for p in declared if p not in lazy_plugins)
+        if not lazy_plugins:
+            return False
+        return self.load_lazy_plugins(lazy_plugins)
+
+    def _load_lazy_command(self, command: str, input_type: Optional[str]) -> bool:
+        command = f"{input_type}/{command}"
+        return self.load_lazy_plugins(
+            [
+                p
+                for p in self._lazy_plugins
+                if any(re.fullmatch(declared, command) for declared in p.commands)
+            ]
+        )
+
+    def _load_lazy_feature(self, feature: str) -> bool:
+        return self.load_lazy_plugins(
+            [p for p in self._lazy_plugins if feature in p.features]
+        )
+
     # ==========
     # SERVICES API
     # ==========
@@ -729,7 +868,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-precli")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "precli")
+                self.plugin_call(plugin, kernel, "precli")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_CLI <= end:
@@ -742,7 +881,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-cli")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "cli")
+                self.plugin_call(plugin, kernel, "cli")
 
         objects = self.get_linked_objects(kernel)
         for k in objects:
@@ -758,19 +897,19 @@ class Kernel(Settings):
             plugin_list = self._kernel_plugins
             for i in range(len(plugin_list) - 1, -1, -1):
                 plugin = plugin_list[i]
-                if plugin(kernel, "invalidate"):
+                if self.plugin_call(plugin, kernel, "invalidate"):
                     del plugin_list[i]
             for domain in self._service_plugins:
                 plugin_list = self._service_plugins[domain]
                 for i in range(len(plugin_list) - 1, -1, -1):
                     plugin = plugin_list[i]
-                    if plugin(kernel, "invalidate"):
+                    if self.plugin_call(plugin, kernel, "invalidate"):
                         del plugin_list[i]
             for module_path in self._module_plugins:
                 plugin_list = self._module_plugins[module_path]
                 for i in range(len(plugin_list) - 1, -1, -1):
                     plugin = plugin_list[i]
-                    if plugin(kernel, "invalidate"):
+                    if self.plugin_call(plugin, kernel, "invalidate"):
                         del plugin_list[i]
 
         objects = self.get_linked_objects(kernel)
@@ -785,7 +924,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-preregister")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "preregister")
+                self.plugin_call(plugin, kernel, "preregister")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_REGISTER <= end:
@@ -798,7 +937,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-register")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "register")
+                self.plugin_call(plugin, kernel, "register")
 
         objects = self.get_linked_objects(kernel)
         for k in objects:
@@ -812,7 +951,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-configure")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "configure")
+                self.plugin_call(plugin, kernel, "configure")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_PREBOOT <= end:
@@ -825,7 +964,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-preboot")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "preboot")
+                self.plugin_call(plugin, kernel, "preboot")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_BOOT <= end:
@@ -841,7 +980,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-boot")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "boot")
+                self.plugin_call(plugin, kernel, "boot")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_POSTBOOT <= end:
@@ -854,7 +993,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-postboot")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "postboot")
+                self.plugin_call(plugin, kernel, "postboot")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_PRESTART <= end:
@@ -867,7 +1006,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-prestart")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "prestart")
+                self.plugin_call(plugin, kernel, "prestart")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_START <= end:
@@ -880,7 +1019,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-start")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "start")
+                self.plugin_call(plugin, kernel, "start")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_POSTSTART <= end:
@@ -893,7 +1032,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-poststart")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "poststart")
+                self.plugin_call(plugin, kernel, "poststart")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_READY <= end:
@@ -906,7 +1045,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-ready")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "ready")
+                self.plugin_call(plugin, kernel, "ready")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_FINISHED <= end:
@@ -919,7 +1058,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-finished")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "finished")
+                self.plugin_call(plugin, kernel, "finished")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_PREMAIN <= end:
@@ -937,7 +1076,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-premain")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "premain")
+                self.plugin_call(plugin, kernel, "premain")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_MAINLOOP <= end:
@@ -950,7 +1089,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-mainloop")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "mainloop")
+                self.plugin_call(plugin, kernel, "mainloop")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_POSTMAIN <= end:
@@ -963,13 +1102,13 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-postmain")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "postmain")
+                self.plugin_call(plugin, kernel, "postmain")
 
         if start < LIFECYCLE_KERNEL_PRESHUTDOWN <= end:
             if channel:
                 channel("(plugin) kernel-preshutdown")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "preshutdown")
+                self.plugin_call(plugin, kernel, "preshutdown")
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_PRESHUTDOWN <= end:
                 k._kernel_lifecycle = LIFECYCLE_KERNEL_PRESHUTDOWN
@@ -985,7 +1124,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-shutdown")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "shutdown")
+                self.plugin_call(plugin, kernel, "shutdown")
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_SHUTDOWN <= end:
                 k._kernel_lifecycle = LIFECYCLE_KERNEL_SHUTDOWN
@@ -1035,7 +1174,7 @@ class Kernel(Settings):
                 channel(f"(plugin) service-added: {str(service)}")
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "added")
+                    self.plugin_call(plugin, service, "added")
             except (KeyError, AttributeError):
                 pass
 
@@ -1063,7 +1202,7 @@ class Kernel(Settings):
             start = LIFECYCLE_SERVICE_DETACHED
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "service_detach")
+                    self.plugin_call(plugin, service, "service_detach")
             except (KeyError, AttributeError):
                 pass
 
@@ -1087,7 +1226,7 @@ class Kernel(Settings):
             start = LIFECYCLE_SERVICE_ATTACHED
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "service_attach")
+                    self.plugin_call(plugin, service, "service_attach")
             except (KeyError, AttributeError):
                 pass
 
@@ -1110,7 +1249,7 @@ class Kernel(Settings):
                 channel(f"(plugin) service-assigned: {str(service)}")
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "assigned")
+                    self.plugin_call(plugin, service, "assigned")
             except (KeyError, AttributeError):
                 pass
 
@@ -1132,7 +1271,7 @@ class Kernel(Settings):
             self.remove_service(service)
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "shutdown")
+                    self.plugin_call(plugin, service, "shutdown")
             except (KeyError, AttributeError):
                 pass
 
@@ -1176,7 +1315,7 @@ class Kernel(Settings):
             module.context.opened[module.name] = module
             try:
                 for plugin in self._module_plugins[module.registered_path]:
-                    plugin(module, "module_open")
+                    self.plugin_call(plugin, module, "module_open")
             except (KeyError, AttributeError):
                 pass
 
@@ -1202,7 +1341,7 @@ class Kernel(Settings):
                 pass  # Nothing to close.
             try:
                 for plugin in self._module_plugins[module.registered_path]:
-                    plugin(module, "module_close")
+                    self.plugin_call(plugin, module, "module_close")
             except (KeyError, AttributeError):
                 pass
 
@@ -1221,7 +1360,7 @@ class Kernel(Settings):
                 channel(f"(plugin) module-shutdown: {str(module)}")
             try:
                 for plugin in self._module_plugins[module.registered_path]:
-                    plugin(module, "shutdown")
+                    self.plugin_call(plugin, module, "shutdown")
             except (KeyError, AttributeError):
                 pass
 
@@ -1303,6 +1442,9 @@ class Kernel(Settings):
             self.channel("console").unwatch(self.__print_delegate)
 
     def premain(self):
+        if self.plugin_profile is not None:
+            for line in self.plugin_profile.report(limit=30):
+                print(line)
         if hasattr(self.args, "console") and self.args.console:
             self.channel("console").watch(self.__print_delegate)
             import sys
@@ -1558,6 +1700,7 @@ class Kernel(Settings):
         self.listeners = {}
         self.listener_stats = {}
         self.listener_call_stats = {}
+        self.signal_profiler.reset()
         if (
             self.scheduler_thread != threading.current_thread() and not self.scheduler_thread.daemon
         ):  # Join if not this thread and not daemon.
@@ -1578,6 +1721,8 @@ class Kernel(Settings):
         @return:
         """
         matchtext = "/".join(args)
+        if self._lazy_paths:
+            self._load_lazy_match(matchtext)
         match = re.compile(matchtext)
         for domain, service in self.services_active():
             for r in service._registered:
@@ -1595,6 +1740,8 @@ class Kernel(Settings):
         @param suffix: provide the suffix of the match only.
         @return:
         """
+        if self._lazy_paths:
+            self._load_lazy_match(matchtext)
         match = re.compile(matchtext)
         for domain, service in self.services_active():
             for r in service._registered:
@@ -1618,6 +1765,8 @@ class Kernel(Settings):
         @return:
         """
         value = "/".join(args)
+        if self._lazy_paths and value in self._lazy_paths:
+            self.load_lazy_plugins(self._lazy_paths[value])
         for domain, service in self.services_active():
             try:
                 return service._registered[value]
@@ -1633,6 +1782,8 @@ class Kernel(Settings):
             try:
                 v = self._registered[f"feature/{feature}"]
             except KeyError:
+                if self._lazy_plugins and self._load_lazy_feature(feature):
+                    return self.has_feature(*args)
                 return False
             if not v:
                 return False
@@ -1763,6 +1914,10 @@ class Kernel(Settings):
             channel(
                 f"Lookup Change Processing ({str(threading.current_thread().name)})"
             )
+        if self._lazy_paths:
+            # Load outside the lookup lock, loading plugins register paths and take that lock.
+            for matchtext in list(self.lookups):
+                self._load_lazy_match(matchtext)
         with self._lookup_lock:
             for matchtext in self.lookups:
                 if channel:
@@ -2156,8 +2311,33 @@ class Kernel(Settings):
         else:
             self.listener_stats[code][0] += 1 # Calls
         # print(f"Signal queued: {code} {path} {message}: {self.listener_stats[code]}")
+        policy = self.signal_policies.get(code)
+        profiler = self.signal_profiler
         with self._message_queue_lock:
+            queued = self._message_queue.get(code)
+            if queued is not None and policy is not None and policy.merge is not None:
+                message = policy.merge(queued[1], message)
             self._message_queue[code] = path, message
+            if queued is None:
+                self._signal_queued_time[code] = time.time()
+        if profiler.enabled:
+            profiler.queued(code, queued is not None)
+
+    def signal_policy(
+        self, code: str, merge: Optional[Callable] = None, interval: float = 0.0
+    ) -> None:
+        """
+        Sets how repeated messages of a signal are coalesced. Without a policy the latest message queued before
+        the queue is processed is delivered.
+
+        @param code: Signal code
+        @param merge: function(previous message, message) returning the message to queue in place of both
+        @param interval: minimum time between deliveries in seconds, later messages are held back and merged
+        """
+        if merge is None and not interval:
+            self.signal_policies.pop(code, None)
+        else:
+            self.signal_policies[code] = SignalPolicy(merge, interval)
 
     def _process_add_listeners(self):
         """
@@ -2239,8 +2419,18 @@ class Kernel(Settings):
         queue = self._processing
         signal_channel = self.channel("signals")
         signal_channel_all = self.channel("signals-all")
+        profiler = self.signal_profiler if self.signal_profiler.enabled else None
+        if profiler is not None:
+            profiler.tick(len(queue))
         for signal, payload in queue.items():
             origin, message = payload
+            queued_time = self._processing_queued_time.get(signal)
+            if signal in self.signal_policies:
+                self._signal_dispatch_time[signal] = time.time()
+            if profiler is not None:
+                profiler.delivered(
+                    signal, None if queued_time is None else time.time() - queued_time
+                )
             if signal in self.listeners:
                 if signal not in self.listener_stats:
                     self.listener_stats[signal] = [1, 0, 0]  # [calls, messages, duration]
@@ -2252,6 +2442,8 @@ class Kernel(Settings):
                         duration = time.time() - t0
                         self.listener_stats[signal][1] += 1 # Messages
                         self.listener_stats[signal][2] += duration # Duration
+                        if profiler is not None:
+                            profiler.listener(signal, listener, duration)
 
                         # Record per-listener statistics (only when debug_mode is active)
                         if getattr(self.root, 'debug_mode', False):
@@ -2299,13 +2491,46 @@ class Kernel(Settings):
             return
         with self._process_lock:
             with self._message_queue_lock:
-                self._processing.update(self._message_queue)
-                self._message_queue.clear()
+                if self.signal_policies:
+                    self._take_due_signals()
+                else:
+                    self._processing.update(self._message_queue)
+                    self._message_queue.clear()
+                queued_time = self._signal_queued_time
+                self._signal_queued_time = {
+                    code: queued_time[code]
+                    for code in self._message_queue
+                    if code in queued_time
+                }
+                self._processing_queued_time = queued_time
             self._process_add_listeners()
             self._process_remove_listeners()
             self._process_signal_queue()
             self._processing.clear()
 
+    def _take_due_signals(self):
+        """
+        Moves the queued signals to processing, except for signals whose policy interval since their last delivery
+        has not passed. These stay queued, merging later messages, until a later tick.
+        """
+        now = time.time()
+        policies = self.signal_policies
+        held = {}
+        for code, payload in self._message_queue.items():
+            policy = policies.get(code)
+            if (
+                policy is not None
+                and policy.interval
+                and now - self._signal_dispatch_time.get(code, 0.0) < policy.interval
+            ):
+                held[code] = payload
+                if self.signal_profiler.enabled:
+                    self.signal_profiler.deferred(code)
+            else:
+                self._processing[code] = payload
+        self._message_queue.clear()
+        self._message_queue.update(held)
+
     def last_signal(self, signal: str) -> Optional[Tuple]:
         """
         Queries the last signal for a particular signal/path
@@ -2439,9 +2664,9 @@ class Kernel(Settings):
         @return:
         """
         with self._remove_lock:
-            for signal in self.listeners:
-                listens = self.listeners[signal]
-                for listener, lso in listens:
+            # The scheduler thread may add listeners meanwhile.
+            for signal, listens in list(self.listeners.items()):
+                for listener, lso in list(listens):
                     if lso is cookie:
                         self._removing_listeners.append((signal, listener, cookie))
         with self._add_lock:
@@ -2588,6 +2813,10 @@ class Kernel(Settings):
                 except CommandMatchRejected:
                     # Command match was rejected, more commands should be searched.
                     continue
+            if not command_executed and self._lazy_plugins:
+                if self._load_lazy_command(command, str(input_type)):
+                    # The command is provided by a plugin which is loaded now, parse again.
+                    continue
             if not command_executed:
                 context_name = "Base" if input_type is None else input_type
                 channel(
@@ -2687,6 +2916,8 @@ class Kernel(Settings):
             'help' will display the list of accepted commands. Help <command> will provided extended help for
             that topic. Help can be sub-specified by output or input type.
             """
+            # Help lists the commands of all plugins.
+            self.load_lazy_plugins()
             if extended_help is not None:
                 found = False
                 for func, command_name, sname in self.find(
@@ -2782,6 +3013,7 @@ class Kernel(Settings):
             """
             'find' will display the list of accepted commands that contain a given substr.
             """
+            self.load_lazy_plugins()
             allcommands = []
             allparams = []
             substr = remainder
@@ -3244,12 +3476,16 @@ class Kernel(Settings):
                     channel(context_name)
             return
 
-        @self.console_command("plugin", _("list loaded plugins in kernel"))
+        @self.console_command("plugin", help=_("list loaded plugins in kernel"))
         def plugin(channel, _, args=tuple(), **kwargs):
             if len(args) == 0:
                 plugins = self._kernel_plugins
                 channel(_("Kernel Plugins:"))
                 for name in plugins:
+                    if isinstance(name, LazyPlugin):
+                        state = _("loaded") if name.plugins is not None else _("lazy")
+                        channel(f"kernel: {name.name} ({state})")
+                        continue
                     channel(f"kernel: {name.__module__}")
                 channel(_("Service Plugins:"))
                 for path in self._service_plugins:
@@ -3944,6 +4180,105 @@ class Kernel(Settings):
                     lid_safe = lid_safe[:42] + '...'
                 channel(f"{idx:3d} {sig_safe:<35} {lid_safe:<45} {calls:6d} {total_time:12.3f} {avg:12.6f}")
 
+        @self.console_argument(
+            "action", type=str, help=_("start, stop, reset, json or export")
+        )
+        @self.console_argument("filename", type=str, help=_("file to export to"))
+        @self.console_command(
+            "signal-profile",
+            help=_("Profile the signal bus: listener latencies, queue depth and lag"),
+        )
+        def signal_profile(channel, _, action=None, filename=None, **kwargs):
+            """
+            Usage: signal-profile [start|stop|reset|json|export <filename>]
+            Without action the summary of the recorded statistics is shown.
+            """
+            profiler = self.signal_profiler
+            if action == "start":
+                profiler.enabled = True
+                channel(_("Signal profiling started."))
+                return
+            if action == "stop":
+                profiler.enabled = False
+                channel(_("Signal profiling stopped."))
+                return
+            if action == "reset":
+                profiler.reset()
+                channel(_("Signal profile reset."))
+                return
+            if action == "json":
+                channel(profiler.to_json(indent=2))
+                return
+            if action == "export":
+                if filename is None:
+                    channel(_("Please provide a filename."))
+                    return
+                with open(filename, "w") as f:
+                    f.write(profiler.to_json(indent=2))
+                channel(_("Signal profile exported to {file}.").format(file=filename))
+                return
+            if action is not None:
+                raise CommandSyntaxError
+            data = profiler.as_dict()
+            depth = data["queue_depth"]
+            channel(
+                _("Signal profiling {state}: {ticks} ticks, queue depth max {max}, mean {mean:.2f}").format(
+                    state=_("on") if profiler.enabled else _("off"),
+                    ticks=data["ticks"],
+                    max=depth["max"],
+                    mean=depth["mean"],
+                )
+            )
+            if self.signal_policies:
+                for code, policy in sorted(self.signal_policies.items()):
+                    channel(f"  {code}: {policy}")
+            header = (
+                f"{'Signal':<35} {'Queued':>7} {'Merged':>7} {'Held':>6} {'Sent':>6} "
+                f"{'Lag p50':>9} {'Lag p99':>9}"
+            )
+            channel(header)
+            channel("-" * len(header))
+            signals = sorted(
+                data["signals"].items(),
+                key=lambda item: -sum(h["total"] for h in item[1]["listeners"].values()),
+            )
+            for code, record in signals:
+                code_safe = code.replace("\n", "\\n")
+                if len(code_safe) > 35:
+                    code_safe = code_safe[:32] + "..."
+                lag = record["lag"]
+                channel(
+                    f"{code_safe:<35} {record['queued']:7d} {record['coalesced']:7d} "
+                    f"{record['deferred']:6d} {record['delivered']:6d} "
+                    f"{lag['p50'] * 1000:7.1f}ms {lag['p99'] * 1000:7.1f}ms"
+                )
+                for lid, histogram in sorted(
+                    record["listeners"].items(), key=lambda item: -item[1]["total"]
+                ):
+                    lid_safe = lid.replace("\n", "\\n")
+                    if len(lid_safe) > 45:
+                        lid_safe = lid_safe[:42] + "..."
+                    channel(
+                        f"     {lid_safe:<45} {histogram['count']:6d} "
+                        f"p50 {histogram['p50'] * 1000:.2f}ms p99 {histogram['p99'] * 1000:.2f}ms "
+                        f"max {histogram['max'] * 1000:.2f}ms"
+                    )
+
+        @self.console_argument("limit", type=int, help=_("Number of plugins to list"))
+        @self.console_command(
+            "plugin-profile",
+            help=_("Import and lifecycle times of the plugins (requires --profile-startup)"),
+        )
+        def plugin_profile(channel, _, limit=None, **kwargs):
+            lazy = [p.name for p in self._lazy_plugins]
+            if lazy:
+                channel(_("Not loaded: {plugins}").format(plugins=", ".join(lazy)))
+            if self.plugin_profile is None:
+                channel(_("Plugins are only profiled when started with --profile-startup."))
+                return
+            for line in self.plugin_profile.report(limit=limit):
+                channel(line)
+
         # Flat tracker console command
         @self.console_argument("action", type=str, default=None, help=_("Action: 'reset' to reset the counter"))
         @self.console_command("flat-stats", help=_("Show or reset the global flat() call counter"))
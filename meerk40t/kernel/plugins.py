@@ -0,0 +1,176 @@
+"""
+Lazy plugins and plugin startup profiling.
+
+A LazyPlugin stands in for a plugin module which is not imported at startup. Its manifest declares what the plugin
+provides: the registered paths (providers, loaders, windows, commands as "command/<input_type>/<name>"), the
+features it sets and the settings sections of its saved services. The kernel imports the module on the first
+lookup, find or match of a declared path, on a console command it declares, on a feature query, or during preboot
+if settings sections exist for it. The loaded plugin is then brought up to the current kernel lifecycle and
+receives the later lifecycles through the LazyPlugin.
+
+The PluginProfile records the import time and the time of every lifecycle call of every plugin.
+"""
+
+import importlib
+import threading
+import time
+
+from .lifecycles import (
+    KERNEL_LIFECYCLE_NAMES,
+    LIFECYCLE_KERNEL_INIT,
+    LIFECYCLE_KERNEL_MAINLOOP,
+)
+
+KERNEL_LIFECYCLE_POSITIONS = {name: position for position, name in KERNEL_LIFECYCLE_NAMES.items()}
+
+
+def import_plugin(name):
+    """
+    Imports "package.module:attribute" and returns the attribute, the plugin function.
+    """
+    module, _, attribute = name.partition(":")
+    return getattr(importlib.import_module(module), attribute or "plugin")
+
+
+def plugin_name(plugin):
+    """
+    Readable name of a plugin function or object.
+    """
+    name = getattr(plugin, "name", None)
+    if isinstance(name, str):
+        return name
+    module = getattr(plugin, "__module__", None)
+    qualname = getattr(plugin, "__qualname__", None) or type(plugin).__qualname__
+    return f"{module}:{qualname}" if module else qualname
+
+
+class PluginProfile:
+    """
+    Durations of plugin imports and lifecycle calls. Durations exclude nested measured calls, a lazy plugin loaded
+    during the lifecycle of another plugin is counted for itself only.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.times = {}
+        self._nested = threading.local()
+
+    def add(self, plugin, phase, duration):
+        name = plugin if isinstance(plugin, str) else plugin_name(plugin)
+        phases = self.times.get(name)
+        if phases is None:
+            phases = {}
+            self.times[name] = phases
+        phases[phase] = phases.get(phase, 0.0) + duration
+
+    def measure(self, plugin, phase, function, *args):
+        stack = getattr(self._nested, "stack", None)
+        if stack is None:
+            stack = []
+            self._nested.stack = stack
+        stack.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            duration = time.perf_counter() - t0
+            nested = stack.pop()
+            if stack:
+                stack[-1] += duration
+            self.add(plugin, phase, duration - nested)
+
+    def call(self, plugin, kernel, lifecycle):
+        return self.measure(plugin, lifecycle, plugin, kernel, lifecycle)
+
+    def total(self, name):
+        return sum(self.times[name].values())
+
+    def report(self, limit=None, threshold=0.0005):
+        """
+        Lines of the plugins by total time, with the phases taking at least threshold seconds.
+        """
+        names = sorted(self.times, key=self.total, reverse=True)
+        if limit is not None:
+            names = names[:limit]
+        lines = [
+            f"Startup {time.perf_counter() - self.started:.3f}s, "
+            f"plugins {sum(self.total(name) for name in self.times):.3f}s"
+        ]
+        for name in names:
+            phases = ", ".join(
+                f"{phase} {duration * 1000:.1f}ms"
+                for phase, duration in sorted(
+                    self.times[name].items(), key=lambda item: -item[1]
+                )
+                if duration >= threshold
+            )
+            lines.append(f"{self.total(name) * 1000:9.1f}ms  {name}  {phases}".rstrip())
+        return lines
+
+
+class LazyPlugin:
+    """
+    Plugin imported on first use.
+
+    @param name: "package.module:attribute" of the plugin function
+    @param paths: registered paths the plugin provides
+    @param commands: console commands the plugin provides, "<input_type>/<name>" or "<name>" for base commands
+    @param features: features the plugin sets
+    @param sections: settings section prefixes of services the plugin starts during preboot
+    """
+
+    def __init__(self, name, paths=(), commands=(), features=(), sections=()):
+        self.name = name
+        self.paths = frozenset(paths)
+        self.commands = frozenset(
+            command if "/" in command else f"None/{command}" for command in commands
+        )
+        self.features = frozenset(features)
+        self.sections = tuple(sections)
+        self.plugins = None
+        self.position = LIFECYCLE_KERNEL_INIT
+
+    def __repr__(self):
+        return f"LazyPlugin('{self.name}')"
+
+    def __call__(self, kernel, lifecycle=None):
+        if self.plugins is None:
+            if lifecycle == "preregister":
+                kernel.add_lazy_plugin(self)
+            elif lifecycle == "preboot":
+                if any(True for prefix in self.sections for _ in kernel.section_startswith(prefix)):
+                    kernel.load_lazy_plugins((self,))
+            return
+        position = KERNEL_LIFECYCLE_POSITIONS.get(lifecycle)
+        if position is None or position <= self.position:
+            return
+        self.position = position
+        for plugin in self.plugins:
+            kernel.plugin_call(plugin, kernel, lifecycle)
+
+    def load(self, kernel, position):
+        """
+        Imports the plugin and runs the kernel lifecycles up to the given position.
+
+        @return: whether the plugin is valid
+        """
+        plugins = kernel.add_late_plugin(kernel.import_plugin(self.name), position)
+        for lifecycle_position, lifecycle in sorted(KERNEL_LIFECYCLE_NAMES.items()):
+            if (
+                lifecycle_position <= LIFECYCLE_KERNEL_INIT
+                or lifecycle_position > position
+                or lifecycle_position == LIFECYCLE_KERNEL_MAINLOOP
+            ):
+                continue
+            if lifecycle == "invalidate":
+                plugins = [
+                    plugin
+                    for plugin in plugins
+                    if not kernel.plugin_call(plugin, kernel, lifecycle)
+                ]
+            else:
+                for plugin in plugins:
+                    kernel.plugin_call(plugin, kernel, lifecycle)
+        self.plugins = plugins
+        self.position = position
+        return bool(plugins)
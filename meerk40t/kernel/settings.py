@@ -1,6 +1,9 @@
 import ast
 import configparser
+import io
 import os
+import tempfile
+import threading
 from pathlib import Path
 from typing import Any, Dict, Generator, Optional, Union
 
@@ -18,6 +21,12 @@ class Settings:
     Reading/writing and deleting are performed on the config_dict which stores a set of values
     these are loaded during the `read_configuration` step and are committed to disk when
     `write_configuration` is called.
+
+    Sections changed since the last write are tracked, a write only serializes those and reuses
+    the text of the unchanged sections. The file is replaced atomically and is not written at all
+    without changes. Changes made directly to the config_dict rather than through these methods
+    must be announced with `mark_dirty`. `write_configuration_later` writes in a background
+    thread, after a delay collecting further changes.
     """
 
     def __init__(
@@ -34,6 +43,14 @@ class Settings:
         else:
             self._config_file = filename
         self._config_dict = {}
+        # Serialized text by section in file order, the sections changed since, whether the
+        # file holds that text and the files already backed up in this session.
+        self._section_text = {}
+        self._dirty_sections = set()
+        self._written = False
+        self._backed_up = set()
+        self._write_lock = threading.RLock()
+        self._write_timer = None
         self.create_backup = create_backup
         self.prevent_persisting = False
         if not ignore_settings:
@@ -82,24 +99,86 @@ class Settings:
                     self._config_dict[section] = config_section
                 try:
                     config_section[option] = parser.get(section, option)
+                    self._dirty_sections.add(section)
                 except Exception as e:
                     print(
                         f"We had an error in the config, section {section}.{option}, try to recover from {e}"
                     )
 
+    def mark_dirty(self, section: Optional[str] = None) -> None:
+        """
+        Marks a section, or without section all sections, as changed for the next write.
+
+        @param section: changed section
+        """
+        if section is None:
+            self._section_text.clear()
+        else:
+            self._dirty_sections.add(section)
+
+    @staticmethod
+    def _section_to_text(section_key: str, section: Dict[str, str]) -> str:
+        """
+        Serializes one section the way the ConfigParser writes it.
+        """
+        parser = configparser.ConfigParser()
+        for key, value in section.items():
+            try:
+                if "%" in value:
+                    value = value.replace("%", "%%")
+                parser.set(section_key, key, value)
+            except configparser.NoSectionError:
+                parser.add_section(section_key)
+                parser.set(section_key, key, value)
+            except (
+                configparser.DuplicateOptionError,
+                configparser.DuplicateSectionError,
+            ) as e:
+                print(
+                    f"We had a duplication error in the config, try to recover from {e}"
+                )
+        fp = io.StringIO()
+        parser.write(fp)
+        return fp.getvalue()
+
+    def _update_section_text(self) -> bool:
+        """
+        Serializes the changed sections and orders the section text like the config_dict.
+
+        @return: whether the text changed
+        """
+        dirty = self._dirty_sections
+        self._dirty_sections = set()
+        serialized = set(dirty)
+        cached = self._section_text
+        section_text = {}
+        for section_key, section in list(self._config_dict.items()):
+            text = None if section_key in serialized else cached.get(section_key)
+            if text is None:
+                # Copied, the section may change while a background write serializes it.
+                text = self._section_to_text(section_key, dict(section))
+            section_text[section_key] = text
+        self._section_text = section_text
+        # Marks added while serializing are kept for the next write.
+        self._dirty_sections.update(dirty.difference(serialized))
+        return bool(serialized) or list(cached) != list(section_text)
+
     def write_configuration(
         self, targetfile: Optional[Union[str, Path]] = None
     ) -> None:
         """
         Write configuration writes the config file to disk. This is typically done during the shutdown process.
 
-        This uses the python ConfigParser to save data from the _config_dict.
+        Only the sections changed since the last write are serialized, without changes the own config file is not
+        written. The text is written to a temporary file which replaces the target, the target is never left
+        partially written. Backups are rotated once per session and target.
         @return:
         """
 
         def create_backup_if_needed(targetfile: str) -> None:
-            if not self.create_backup:
+            if not self.create_backup or targetfile in self._backed_up:
                 return
+            self._backed_up.add(targetfile)
             VERSIONS = 5
             try:
                 if os.path.exists(targetfile):
@@ -126,34 +205,71 @@ class Settings:
                 # print (f"Error happened: {e}")
                 pass
 
+        timer = self._write_timer
+        if timer is not None and timer is not threading.current_thread():
+            # Written now, the pending background write is not needed.
+            timer.cancel()
+            self._write_timer = None
         if self.prevent_persisting:
             return
+        own_file = targetfile is None or str(targetfile) == str(self._config_file)
         target: str = str(self._config_file) if targetfile is None else str(targetfile)
-        try:
-            parser = configparser.ConfigParser()
-            for section_key in self._config_dict:
-                section = self._config_dict[section_key]
-                for key in section:
-                    value = section[key]
+        with self._write_lock:
+            changed = self._update_section_text()
+            if own_file and not changed and self._written and os.path.exists(target):
+                return
+            if not own_file:
+                if changed:
+                    self._written = False
+            temp = None
+            try:
+                fd, temp = tempfile.mkstemp(
+                    prefix=f"{os.path.basename(target)}.",
+                    suffix=".tmp",
+                    dir=os.path.dirname(os.path.abspath(target)),
+                )
+                with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                    fp.write("".join(self._section_text.values()))
+                    fp.flush()
+                    os.fsync(fp.fileno())
+                create_backup_if_needed(target)
+                os.replace(temp, target)
+                temp = None
+                if own_file:
+                    self._written = True
+            except (PermissionError, FileNotFoundError, OSError, RuntimeError):
+                if own_file:
+                    self._written = False
+                return
+            finally:
+                if temp is not None:
                     try:
-                        if "%" in value:
-                            value = value.replace("%", "%%")
-                        parser.set(section_key, key, value)
-                    except configparser.NoSectionError:
-                        parser.add_section(section_key)
-                        parser.set(section_key, key, value)
-                    except (
-                        configparser.DuplicateOptionError,
-                        configparser.DuplicateSectionError,
-                    ) as e:
-                        print(
-                            f"We had a duplication error in the config, try to recover from {e}"
-                        )
-            create_backup_if_needed(target)
-            with open(target, "w", encoding="utf-8") as fp:
-                parser.write(fp)
-        except (PermissionError, FileNotFoundError, OSError, RuntimeError):
+                        os.remove(temp)
+                    except OSError:
+                        pass
+
+    def write_configuration_later(self, delay: float = 1.0) -> None:
+        """
+        Writes the configuration in a background thread after delay seconds, changes made until then are written
+        with it. Calls while a write is pending do nothing, a call of write_configuration writes at once.
+
+        @param delay: seconds to wait for further changes
+        """
+        if self._write_timer is not None:
             return
+        timer = threading.Timer(delay, self._write_pending)
+        timer.daemon = True
+        self._write_timer = timer
+        timer.start()
+
+    def _write_pending(self) -> None:
+        # Changes made while writing schedule another write.
+        self._write_timer = None
+        try:
+            self.write_configuration()
+        except AttributeError:
+            # The settings were destroyed during shutdown.
+            pass
 
     def literal_dict(self) -> Dict[str, Dict[str, Any]]:
         literal_dict = {}
@@ -177,6 +293,7 @@ class Settings:
 
     def set_dict(self, literal_dict: Dict[str, Dict[str, Any]]) -> None:
         self._config_dict.clear()
+        self._section_text.clear()
         for section in literal_dict:
             section_dict = {}
             self._config_dict[section] = section_dict
@@ -244,14 +361,14 @@ class Settings:
             if cls_attr is not None:
                 if isinstance(cls_attr, property) and getattr(cls_attr, 'fset', None) is None:
                     try:
-                        del self._config_dict[section][possible]
+                        self.delete_persistent(section, possible)
                         # silent: key removed to avoid shadowing read-only property
                     except Exception:
                         pass
                     continue
                 if callable(cls_attr):
                     try:
-                        del self._config_dict[section][possible]
+                        self.delete_persistent(section, possible)
                         # silent: key removed to avoid shadowing callable
                     except Exception:
                         pass
@@ -266,7 +383,7 @@ class Settings:
             # call and cause errors (see tests). Also remove the persisted key.
             if callable(value):
                 try:
-                    del self._config_dict[section][key]
+                    self.delete_persistent(section, key)
                     # silent: removed persisted key because an instance callable exists
                 except Exception:
                     pass
@@ -288,7 +405,7 @@ class Settings:
                     except AttributeError:
                         # read-only property; remove persisted key to avoid future issues
                         try:
-                            del self._config_dict[section][key]
+                            self.delete_persistent(section, key)
                             # silent: removed persisted key to avoid shadowing read-only property
                         except Exception:
                             pass
@@ -297,7 +414,7 @@ class Settings:
                 if callable(cls_attr):
                     # Don't overwrite methods; remove persisted key
                     try:
-                        del self._config_dict[section][key]
+                        self.delete_persistent(section, key)
                         # silent: removed persisted key to avoid shadowing callable
                     except Exception:
                         pass
@@ -341,7 +458,7 @@ class Settings:
                     except AttributeError:
                         # read-only property; skip assignment and remove persisted key
                         try:
-                            del self._config_dict[section][k]
+                            self.delete_persistent(section, k)
                             # print(f"Settings: removed persisted key '{k}' in section '{section}' to avoid shadowing read-only property on {type(obj).__name__}")
                         except Exception:
                             pass
@@ -350,7 +467,7 @@ class Settings:
                 # If attribute is callable, don't overwrite methods; remove persisted key
                 if callable(cls_attr):
                     try:
-                        del self._config_dict[section][k]
+                        self.delete_persistent(section, k)
                         # silent: removed persisted key to avoid shadowing callable
                     except Exception:
                         pass
@@ -402,11 +519,12 @@ class Settings:
             config_section = {}
             self._config_dict[section] = config_section
 
-        if isinstance(value, (str, int, float, bool)):
-            config_section[str(key)] = str(value)
-        elif isinstance(value, (list, tuple)):
-            s = str(value)
-            config_section[str(key)] = s
+        if isinstance(value, (str, int, float, bool, list, tuple)):
+            key = str(key)
+            value = str(value)
+            if config_section.get(key) != value:
+                config_section[key] = value
+                self._dirty_sections.add(section)
 
     def write_persistent_dict(self, section: str, write_dict: Dict[str, Any]) -> None:
         """
@@ -456,6 +574,7 @@ class Settings:
         """
         try:
             del self._config_dict[section][key]
+            self._dirty_sections.add(section)
         except KeyError:
             pass
 
@@ -465,6 +584,7 @@ class Settings:
         @return:
         """
         self._config_dict.clear()
+        self._section_text.clear()
 
     def keylist(self, section: str) -> Generator[str, None, None]:
         """
@@ -0,0 +1,221 @@
+"""
+Signal bus profiling and coalescing.
+
+The kernel queues signals by their code, a signal sent several times before the queue is processed is delivered
+once with the latest message. A SignalPolicy changes this for a signal code:
+
+* merge: function (previous message, message) -> message, combining the messages queued within one tick rather
+  than dropping the earlier ones, eg. merge_nodes for signals of changed nodes.
+* interval: minimum time in seconds between two deliveries, the signal is held back (and merged) until then.
+
+The SignalProfiler records, while enabled, how often signals are queued, coalesced and held back, the queue depth
+of every processing tick, the lag between queueing and delivery and latency histograms of every listener.
+"""
+
+import json
+import time
+
+def merge_last(previous, message):
+    """
+    The later message replaces the earlier one, the default of the signal queue.
+    """
+    return message
+
+
+def merge_nodes(previous, message):
+    """
+    Merges messages whose first argument is a node or a list of nodes into one list of the distinct nodes. The
+    other arguments are those of the later message. A message without arguments (everything changed) wins.
+    """
+    if not previous or not message:
+        return ()
+    nodes = []
+    seen = set()
+    for item in (previous[0], message[0]):
+        for node in item if isinstance(item, (list, tuple)) else (item,):
+            if node is not None and id(node) not in seen:
+                seen.add(id(node))
+                nodes.append(node)
+    return (nodes, *message[1:])
+
+
+class SignalPolicy:
+    """
+    Coalescing of a signal code.
+
+    @param merge: function (previous message, message) -> message or None for the latest message
+    @param interval: minimum time between deliveries in seconds
+    """
+
+    __slots__ = ("merge", "interval")
+
+    def __init__(self, merge=None, interval=0.0):
+        self.merge = merge
+        self.interval = interval
+
+    def __repr__(self):
+        merge = getattr(self.merge, "__name__", self.merge)
+        return f"SignalPolicy(merge={merge}, interval={self.interval})"
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations in power of two buckets of microseconds, bucket i counts durations below 2**i µs.
+    """
+
+    BUCKETS = 25
+
+    __slots__ = ("counts", "count", "total", "maximum")
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, seconds):
+        micro = int(seconds * 1e6)
+        self.counts[min(micro.bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, fraction):
+        """
+        Upper bound of the bucket of the given fraction of durations.
+
+        @param fraction: 0-1
+        @return: seconds
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min((1 << index) / 1e6, self.maximum)
+        return self.maximum
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.maximum,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets_us": {
+                f"<{1 << index}": count
+                for index, count in enumerate(self.counts)
+                if count
+            },
+        }
+
+
+class _SignalRecord:
+    __slots__ = ("queued", "coalesced", "deferred", "delivered", "lag", "listeners")
+
+    def __init__(self):
+        self.queued = 0
+        self.coalesced = 0
+        self.deferred = 0
+        self.delivered = 0
+        self.lag = LatencyHistogram()
+        self.listeners = {}
+
+
+class SignalProfiler:
+    """
+    Statistics of the signal bus, recorded while enabled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.ticks = 0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.depths = {}
+        self.signals = {}
+
+    def _record(self, code):
+        record = self.signals.get(code)
+        if record is None:
+            record = _SignalRecord()
+            self.signals[code] = record
+        return record
+
+    def queued(self, code, coalesced):
+        record = self._record(code)
+        record.queued += 1
+        if coalesced:
+            record.coalesced += 1
+
+    def deferred(self, code):
+        self._record(code).deferred += 1
+
+    def tick(self, depth):
+        self.ticks += 1
+        self.depth_total += depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+        bucket = 1 << depth.bit_length()
+        self.depths[bucket] = self.depths.get(bucket, 0) + 1
+
+    def delivered(self, code, lag):
+        record = self._record(code)
+        record.delivered += 1
+        if lag is not None:
+            record.lag.add(lag)
+
+    def listener(self, code, listener, duration):
+        listeners = self._record(code).listeners
+        try:
+            name = f"{listener.__module__}:{listener.__qualname__}"
+        except AttributeError:
+            name = repr(listener)
+        histogram = listeners.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            listeners[name] = histogram
+        histogram.add(duration)
+
+    def as_dict(self):
+        """
+        @return: JSON serializable statistics
+        """
+        return {
+            "started": self.started,
+            "duration": time.time() - self.started,
+            "ticks": self.ticks,
+            "queue_depth": {
+                "max": self.max_depth,
+                "mean": self.depth_total / self.ticks if self.ticks else 0.0,
+                "buckets": {
+                    f"<{bucket}": self.depths[bucket] for bucket in sorted(self.depths)
+                },
+            },
+            "signals": {
+                code: {
+                    "queued": record.queued,
+                    "coalesced": record.coalesced,
+                    "deferred": record.deferred,
+                    "delivered": record.delivered,
+                    "lag": record.lag.as_dict(),
+                    "listeners": {
+                        name: histogram.as_dict()
+                        for name, histogram in record.listeners.items()
+                    },
+                }
+                for code, record in self.signals.items()
+            },
+        }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.as_dict(), indent=indent, default=str)
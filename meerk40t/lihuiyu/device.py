@@ -8,7 +8,10 @@ the given device type.
 import platform
 from hashlib import md5
 
+import numpy as np
+
 import meerk40t.constants as mkconst
+from meerk40t.core.estimator import MotionModel
 from meerk40t.core.laserjob import LaserJob
 from meerk40t.core.spoolers import Spooler
 from meerk40t.core.units import UNITS_PER_MIL, Length
@@ -19,6 +22,7 @@ from meerk40t.kernel import CommandSyntaxError, Service, signal_listener
 
 from .controller import LihuiyuController
 from .driver import LihuiyuDriver
+from .laserspeed import get_acceleration_for_speed
 from .tcp_connection import TCPOutput
 
 
@@ -1345,3 +1349,52 @@ class LihuiyuDevice(Service, Status):
         settings = self.get_operation_power_speed_defaults(operation_type)
         # Anything additional for the operation type can be added here
         return settings
+
+
+class LihuiyuMotionModel(MotionModel):
+    """
+    Motion of the lihuiyu boards for job time estimates. The board ramps with the acceleration of the accel
+    value of the speedcode and moves connected cuts at constant speed, it does not slow down at corners.
+    """
+
+    # Approximate acceleration in mm/s² of the accel values 1-4 of the speedcode.
+    ACCELERATIONS = (0.0, 500.0, 1000.0, 2000.0, 3000.0)
+
+    def __init__(self, fix_speeds=False, **kwargs):
+        super().__init__(**kwargs)
+        self.fix_speeds = fix_speeds
+
+    def accelerations(self, speeds, raster=False, horizontal=True):
+        return np.array(
+            [
+                self.ACCELERATIONS[
+                    get_acceleration_for_speed(
+                        speed,
+                        raster=raster,
+                        raster_horizontal=horizontal,
+                        fix_speeds=self.fix_speeds,
+                    )
+                ]
+                for speed in np.asarray(speeds, dtype=float).tolist()
+            ],
+            dtype=float,
+        )
+
+
+def motion_model(service):
+    """
+    Motion model of the lihuiyu board for job time estimates. Travel of the rapid override moves at the
+    override speeds of the axes.
+    """
+    if service.rapid_override:
+        return LihuiyuMotionModel(
+            fix_speeds=service.fix_speeds,
+            rapid_acceleration=LihuiyuMotionModel.ACCELERATIONS[4],
+            rapid_speed=float("inf"),
+            rapid_speed_x=service.rapid_override_speed_x,
+            rapid_speed_y=service.rapid_override_speed_y,
+        )
+    return LihuiyuMotionModel(
+        fix_speeds=service.fix_speeds,
+        rapid_acceleration=LihuiyuMotionModel.ACCELERATIONS[4],
+    )
@@ -4,7 +4,7 @@ Lihuiyu Device Plugin
 Registers the needed classes for the lihuiyu device.
 """
 
-from meerk40t.lihuiyu.device import LihuiyuDevice
+from meerk40t.lihuiyu.device import LihuiyuDevice, motion_model
 
 
 def plugin(kernel, lifecycle=None):
@@ -21,6 +21,7 @@ def plugin(kernel, lifecycle=None):
             return True
     if lifecycle == "register":
         kernel.register("provider/device/lhystudios", LihuiyuDevice)
+        kernel.register("estimator/lhystudios", motion_model)
         kernel.register("provider/friendly/lhystudios", ("CO2-Laser (K40)", 1))
         _ = kernel.translation
         kernel.register(
@@ -131,6 +131,11 @@ parser.add_argument(
     default=None,
     help="run meerk40t with profiler file specified",
 )
+parser.add_argument(
+    "--profile-startup",
+    action="store_true",
+    help="report import and lifecycle times of the plugins",
+)
 parser.add_argument(
     "-u",
     "--lock-device-config",
@@ -162,6 +167,11 @@ parser.add_argument(
 
 def run():
     argv = sys.argv[1:]
+    if argv and argv[0] == "compile":
+        # Headless job compiler, see meerk40t.compiler.
+        from meerk40t.compiler import run as compile_run
+
+        return compile_run(argv[1:])
     args = parser.parse_args(argv)
 
     ###################
@@ -222,6 +232,7 @@ def _exe(restarted, args):
         ansi=not args.disable_ansi,
         ignore_settings=args.nuke_settings,
         restarted=restarted,
+        profile_startup=args.profile_startup,
     )
     kernel.args = args
     kernel.add_plugin(internal_plugins)
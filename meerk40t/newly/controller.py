@@ -2,10 +2,11 @@
 Newly Controller
 """
 
-import math
 import struct
 import time
 
+import numpy as np
+
 from meerk40t.core.cutcode.rastercut import RasterCut
 from meerk40t.newly.mock_connection import MockConnection
 from meerk40t.newly.usb_connection import USBConnection
@@ -564,7 +565,9 @@ class NewlyController:
         """
         Send a scanline movement.
 
-        @param bits: list of bits.
+        The bits are packed least significant bit first, the first bit of the scanline is bit 0 of the first byte.
+
+        @param bits: list or numpy array of bits.
         @param right: Moving right?
         @param left: Moving left?
         @param top: Moving top?
@@ -575,23 +578,17 @@ class NewlyController:
         cmd = None
         if left:  # left movement
             cmd = bytearray(b"YF")
-            bits = bits[::-1]
         elif right:
             cmd = bytearray(b"YZ")
-            bits = bits[::-1]
         elif top:
             cmd = bytearray(b"XF")
-            bits = bits[::-1]
         elif bottom:
             cmd = bytearray(b"XZ")
-            bits = bits[::-1]
         if cmd is None:
             return  # 0,0 goes nowhere.
         count = len(bits)
-        byte_length = int(math.ceil(count / self.BITS_PER_BYTE))
         cmd += struct.pack(">i", count)[1:]
-        binary = "".join([str(b) for b in bits])
-        cmd += int(binary, 2).to_bytes(byte_length, "little")
+        cmd += np.packbits(np.asarray(bits, dtype=bool), bitorder="little").tobytes()
         self(cmd)
         if left:
             self._last_x -= count
@@ -611,45 +608,22 @@ class NewlyController:
 
     def raster(self, raster_cut: RasterCut):
         """
-        Execute a raster cut operation with optimized scanline processing.
+        Execute a raster cut operation with packed scanlines.
 
         This method handles the complete raster engraving process including:
         - Horizontal or vertical raster scanning based on cut orientation
         - Bidirectional scanning with direction changes at scanline boundaries
         - Automatic jog movements for large gaps to optimize travel time
-        - Bit-level scanline generation from raster data
+        - Scanline bits packed with np.packbits
         - Command buffering and execution
 
-        The algorithm processes the raster plot point by point, building scanlines
-        of consecutive pixels and committing them when direction changes or Y-axis
-        movement is required.
+        The plot is taken as numpy arrays. The scanline is committed where the scan direction switches or the
+        position across the scanline changes, these points are found for the whole plot at once. The bits of
+        every plot point are repeated for the length of its move, and each scanline is a slice of these bits.
 
         Args:
             raster_cut: RasterCut object containing plot data and settings
         """
-        scanline = []
-        increasing = True
-
-        def commit_scanline():
-            if scanline:
-                # If there is a scanline commit the scanline.
-                if raster_cut.horizontal:
-                    # Horizontal Raster.
-                    if increasing:
-                        self.scanline(scanline, right=True)
-                        scanline.clear()
-                    else:
-                        self.scanline(scanline, left=True)
-                        scanline.clear()
-                else:
-                    # Vertical raster.
-                    if increasing:
-                        self.scanline(scanline, bottom=True)
-                        scanline.clear()
-                    else:
-                        self.scanline(scanline, top=True)
-                        scanline.clear()
-
         self("IN")
         self._clear_settings()
 
@@ -657,51 +631,56 @@ class NewlyController:
 
         self._raster_jog(previous_x, previous_y, raster_cut)
 
+        x, y, on = raster_cut.plot.plot_arrays()
         if raster_cut.horizontal:
             self.mode = "raster_horizontal"
-            for x, y, on in raster_cut.plot.plot():
-                dx = x - previous_x
-                dy = y - previous_y
-                if dx < 0 and increasing or dx > 0 and not increasing:
-                    # X direction has switched.
-                    commit_scanline()
-                    increasing = not increasing
-                if dy != 0:
-                    # We are moving in the Y direction.
-                    commit_scanline()
-                    if abs(dy) > self.service.max_raster_jog:
-                        self._raster_jog(x, y, raster_cut)
-                    else:
-                        self._relative = True
-                        self("PR")
-                        self._goto(x, y)  # remain standard rastermode
-                if dx != 0:
-                    # Normal move, extend bytes.
-                    scanline.extend([int(on)] * abs(dx))
-                previous_x, previous_y = x, y
+            forward, backward = "right", "left"
+            # Moves along (delta) and across (step) the scanline.
+            delta = np.diff(x, prepend=previous_x)
+            step = np.diff(y, prepend=previous_y)
         else:
             self.mode = "raster_vertical"
-            for x, y, on in raster_cut.plot.plot():
-                dx = x - previous_x
-                dy = y - previous_y
-                if dy < 0 and increasing or dy > 0 and not increasing:
-                    # Y direction has switched.
-                    commit_scanline()
-                    increasing = not increasing
-                if dx != 0:
-                    # We are moving in the X direction.
-                    commit_scanline()
-                    if abs(dx) > self.service.max_raster_jog:
-                        self._raster_jog(x, y, raster_cut)
-                    else:
-                        self._relative = True
-                        self("PR")
-                        self._goto(x, y)  # remain standard rastermode
-                if dy != 0:
-                    # Normal move, extend bytes
-                    scanline.extend([int(on)] * abs(dy))
-                previous_x, previous_y = x, y
-        commit_scanline()
+            forward, backward = "bottom", "top"
+            delta = np.diff(y, prepend=previous_y)
+            step = np.diff(x, prepend=previous_x)
+        count = len(delta)
+
+        # The direction switches at moves opposing the previous move, the first move is compared to increasing.
+        moving = np.flatnonzero(delta)
+        increasing = delta[moving] > 0
+        switches = np.zeros(count, dtype=bool)
+        switches[moving[increasing != np.concatenate(([True], increasing[:-1]))]] = True
+        commits = np.flatnonzero(switches | (step != 0)).tolist()
+
+        lengths = np.abs(delta).astype(np.int64)
+        bits = np.repeat(np.trunc(on) != 0, lengths)
+        ends = np.concatenate(([0], np.cumsum(lengths))).tolist()
+        xs = x.tolist()
+        ys = y.tolist()
+        steps = step.tolist()
+
+        increasing = True
+        start = 0
+        for index in commits + [count]:
+            if ends[index] != ends[start]:
+                # If there is a scanline commit the scanline.
+                self.scanline(
+                    bits[ends[start] : ends[index]],
+                    **{forward if increasing else backward: True},
+                )
+            if index == count:
+                break
+            if switches[index]:
+                increasing = not increasing
+            if steps[index] != 0:
+                # We are moving across the scanline.
+                if abs(steps[index]) > self.service.max_raster_jog:
+                    self._raster_jog(xs[index], ys[index], raster_cut)
+                else:
+                    self._relative = True
+                    self("PR")
+                    self._goto(xs[index], ys[index])  # remain standard rastermode
+            start = index
 
     #######################
     # SETS FOR PLOTLIKES
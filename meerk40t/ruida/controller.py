@@ -39,7 +39,7 @@ class RuidaController:
         self.events = service.channel(f"{service.safe_label}/events")
 
         self.job = RDJob()
-        self._send_queue = []
+        self._packed = None
         self._send_thread = None
         self._status_thread_sleep = 0.2 # Time between polls.
         self._status_gross_to = 40 # seconds
@@ -76,22 +76,17 @@ class RuidaController:
     def start_sending(self):
         self._send_thread = threading.Thread(target=self._data_sender, daemon=True)
         self.events("Sending File...")
-        self.divide_data_into_queue()
-        self.events(f"File in {len(self._send_queue)} chunk(s)")
+        self._packed = self.job.pack(checksum=self.service.interface == "udp")
+        self.events(f"File in {len(self._packed)} chunk(s)")
         self._send_thread.start()
 
-    def divide_data_into_queue(self):
-        last = 0
-        total = 0
-        data = self.job.buffer
-        for i, command in enumerate(data):
-            total += len(command)
-            if total > 1000:
-                self._send_queue.append(self.job.get_contents(last, i))
-                last = i
-                total = 0
-        if last != len(data):
-            self._send_queue.append(self.job.get_contents(last))
+    def _session(self):
+        '''The session the controller writes to, None if the pipe is not a
+        session.'''
+        session = getattr(self.service, "active_session", None)
+        if session is not None and self.write == session.write:
+            return session
+        return None
 
     def resume_monitor(self):
         '''Start the background machine status monitor.'''
@@ -123,18 +118,57 @@ class RuidaController:
         queued. This runs until the queue is empty at which point it
         terminates.'''
         self._job_lock.acquire()
-        while self._send_queue:
-            data = self._send_queue.pop(0)
-            self.write(data)
-        self._send_queue.clear()
+        packed = self._packed
+        self._packed = None
+        session = self._session()
+        size = len(packed.data)
+        start = time.time()
+        try:
+            if session is None:
+                for chunk in packed.chunks():
+                    self.write(chunk)
+                sent, retransmits = size, 0
+            else:
+                sent, retransmits = self._send_packets(session, packed, start)
+        except ConnectionError:
+            sent, retransmits = 0, 0
+        elapsed = max(time.time() - start, 1e-6)
         self._send_thread = None
-        self.events("File Sent.")
+        _msg = (f"{sent} bytes in {elapsed:.2f}s ({sent / elapsed:.0f} bytes/s), "
+                f"{retransmits} retransmit(s)")
+        if sent < size:
+            self.events(f"File send failed, not connected. {_msg}")
+        else:
+            self.events(f"File Sent. {_msg}")
         self._job_lock.release()
         if self.job.low_power_warning:
             self.events(f'WARNING: Power less than 10% may not fire CO2.')
         if self.job.high_power_warning:
             self.events(f'WARNING: Power greater than 70% reduces CO2 life.')
 
+    def _send_packets(self, session, packed, start):
+        '''Queue the packets with the session and wait until they are
+        transmitted, reporting the progress once a second.
+
+        Returns the bytes transmitted and the number of retransmits.'''
+        sent = session.sent_bytes
+        naks = session.naks
+        size = len(packed.data)
+        for packet in packed.packets():
+            session.write_packet(packet)
+        report = start
+        while session.connected and session.sent_bytes - sent < size:
+            time.sleep(0.05)
+            now = time.time()
+            if now - report >= 1.0:
+                report = now
+                done = min(session.sent_bytes - sent, size)
+                self.events(
+                    f"Sent {done}/{size} bytes ({done / (now - start):.0f} bytes/s), "
+                    f"{session.naks - naks} retransmit(s)"
+                )
+        return min(session.sent_bytes - sent, size), session.naks - naks
+
     # This table defines the sequence in which specific mem reads occur. It also
     # controls the number of times the same request repeats relative to
     # other requests. The intent is to be able the tune the responsiveness of
@@ -611,12 +611,15 @@ class RuidaDevice(Service, Status):
                     driver = RuidaDriver(self)
                     job = LaserJob(filename, list(data.plan), driver=driver)
 
-                    driver.controller.write = f.write
+                    # The controller records the job, nothing is sent to a device.
+                    driver.controller.write = lambda data: None
                     driver.controller.job.set_magic(magic)
 
                     driver.job_start(job)
                     job.execute()
                     driver.job_finish(job)
+                    rdjob = driver.controller.job
+                    f.write(rdjob.swizzle(rdjob.get_contents()))
 
             except (PermissionError, OSError):
                 channel(_("Could not save: {filename}").format(filename=filename))
@@ -19,11 +19,11 @@ from .rdjob import (
     decodeu35,
     encode32,
     magic_keys,
-    parse_commands,
     parse_filenumber,
     parse_mem,
     swizzles_lut,
 )
+from .rddecoder import RdDecoder, swizzle_tables
 
 
 class RuidaEmulator:
@@ -43,6 +43,9 @@ class RuidaEmulator:
 
         # self.magic = 0x38
         self.lut_swizzle, self.lut_unswizzle = swizzles_lut(self.magic)
+        self._swizzle_table, self._unswizzle_table = swizzle_tables(self.magic)
+        # Decoder of the 50200 packets, keeps commands split over two packets.
+        self._stream = RdDecoder()
 
         self.channel = None
 
@@ -96,6 +99,7 @@ class RuidaEmulator:
         self.magic = magic
         self.job.set_magic(magic)
         self.lut_swizzle, self.lut_unswizzle = swizzles_lut(self.magic)
+        self._swizzle_table, self._unswizzle_table = swizzle_tables(self.magic)
         if self.channel:
             self.channel(f"Setting magic to 0x{self.magic:02x}")
 
@@ -127,7 +131,7 @@ class RuidaEmulator:
             if self.channel:
                 self.channel("--> " + str(data.hex()))
             return
-        self.write(data)
+        self.write(data, stream=self._stream)
 
     def realtime_write(self, bytes_to_write):
         """
@@ -140,7 +144,7 @@ class RuidaEmulator:
         self.msg_reply(b"\xCC")  # Clear ACK.
         self.write(bytes_to_write, unswizzle=False)
 
-    def write(self, data, unswizzle=True):
+    def write(self, data, unswizzle=True, stream=None):
         """
         Procedural commands sent in large data chunks. This can be through USB or UDP or a loaded file. These are
         expected to be unswizzled with the swizzle_mode set for the reply. Write will parse out the individual commands
@@ -148,14 +152,20 @@ class RuidaEmulator:
 
         @param data:
         @param unswizzle: Whether the given data should be unswizzled
+        @param stream: RdDecoder of a packet stream, commands at the end of the packet which are incomplete are
+            completed by the next packet. None, the data is complete.
         @return:
         """
         packet = self.unswizzle(data) if unswizzle else data
-        for command in parse_commands(packet):
-            array = list(command)
+        if stream is None:
+            records = RdDecoder().decode(packet)
+        else:
+            records = stream.feed(packet)
+        for record in records:
+            array = record.data
             try:
                 if not self._process_realtime(array):
-                    self.job.write_command(command)
+                    self.job.write_command(bytes(array))
                     self.device.spooler.send(self.job, prevent_duplicate=True)
             except (RuidaCommandError, IndexError):
                 if self.channel:
@@ -1491,7 +1501,7 @@ class RuidaEmulator:
         return "Unknown", 0
 
     def unswizzle(self, data):
-        return bytes([self.lut_unswizzle[b] for b in data])
+        return bytes(data).translate(self._unswizzle_table)
 
     def swizzle(self, data):
-        return bytes([self.lut_swizzle[b] for b in data])
+        return bytes(data).translate(self._swizzle_table)
@@ -0,0 +1,666 @@
+"""
+Ruida Decoder
+
+Decoding of the Ruida wire format: swizzling, field decoding and a table driven decoder
+of the command stream.
+
+Every command starts with a byte >= 0x80 and continues with 7-bit data bytes. The
+command table is keyed on the opcode and, where the opcode has them, the sub-opcode
+(and for 0xCA 0x01 the third byte). Each entry gives the name of the command, the
+fields that follow and a description, so decoding a command is one lookup and the
+decoding of its fields.
+
+RdDecoder unswizzles with bytes.translate, splits the stream with a regular expression
+and yields RdCommand records whose data is a memoryview of the unswizzled buffer. Fed
+packet by packet, it keeps a command split over two packets until its remaining bytes
+arrive.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from meerk40t.svgelements import Color
+
+# A command byte followed by its data bytes, or data bytes without a command.
+COMMAND_PATTERN = re.compile(rb"[\x80-\xff][\x00-\x7f]*|[\x00-\x7f]+")
+
+
+def signed35(v):
+    v = int(v)
+    v &= 0x7FFFFFFFF
+    if v > 0x3FFFFFFFF:
+        return -0x800000000 + v
+    else:
+        return v
+
+
+def signed32(v):
+    v = int(v)
+    v &= 0xFFFFFFFF
+    if v > 0x7FFFFFFF:
+        return -0x100000000 + v
+    else:
+        return v
+
+
+def signed14(v):
+    v = int(v)
+    v &= 0x7FFF
+    if v > 0x1FFF:
+        return -0x4000 + v
+    else:
+        return v
+
+
+def decode14(data):
+    return signed14(decodeu14(data))
+
+
+def decodeu14(data):
+    return (data[0] & 0x7F) << 7 | (data[1] & 0x7F)
+
+
+def decode35(data):
+    return signed35(decodeu35(data))
+
+
+def decode32(data):
+    return signed32(decodeu35(data))
+
+
+def decodeu35(data):
+    return (
+        (data[0] & 0x7F) << 28
+        | (data[1] & 0x7F) << 21
+        | (data[2] & 0x7F) << 14
+        | (data[3] & 0x7F) << 7
+        | (data[4] & 0x7F)
+    )
+
+
+def abscoord(data):
+    return decode32(data)
+
+
+def relcoord(data):
+    return decode14(data)
+
+
+def parse_mem(data):
+    return decode14(data)
+
+
+def parse_filenumber(data):
+    return decode14(data)
+
+
+def parse_speed(data):
+    return decode35(data) / 1000.0
+
+
+def parse_frequency(data):
+    return decodeu35(data)
+
+
+def parse_power(data):
+    return decodeu14(data) / 163.84  # 16384 / 100%
+
+
+def parse_time(data):
+    return decodeu35(data) / 1000.0
+
+
+def parse_commands(data):
+    """
+    Parses data blob into command chunk sized pieces.
+    @param data:
+    @return:
+    """
+    if not isinstance(data, (bytes, bytearray)):
+        data = bytes(data)
+    return COMMAND_PATTERN.findall(data)
+
+
+def swizzle_byte(b, magic):
+    b ^= (b >> 7) & 0xFF
+    b ^= (b << 7) & 0xFF
+    b ^= (b >> 7) & 0xFF
+    b ^= magic
+    b = (b + 1) & 0xFF
+    return b
+
+
+def unswizzle_byte(b, magic):
+    b = (b - 1) & 0xFF
+    b ^= magic
+    b ^= (b >> 7) & 0xFF
+    b ^= (b << 7) & 0xFF
+    b ^= (b >> 7) & 0xFF
+    return b
+
+
+def swizzles_lut(magic):
+    if magic == -1:
+        lut = [s for s in range(256)]
+        return lut, lut
+    lut_swizzle = [swizzle_byte(s, magic) for s in range(256)]
+    lut_unswizzle = [unswizzle_byte(s, magic) for s in range(256)]
+    return lut_swizzle, lut_unswizzle
+
+
+@lru_cache(maxsize=None)
+def swizzle_tables(magic):
+    """
+    Swizzle and unswizzle tables of the magic number for bytes.translate.
+    """
+    lut_swizzle, lut_unswizzle = swizzles_lut(magic)
+    return bytes(lut_swizzle), bytes(lut_unswizzle)
+
+
+def decode_bytes(data, magic=0x88):
+    return bytes(data).translate(swizzle_tables(magic)[1])
+
+
+def determine_magic_via_histogram(data):
+    """
+    Determines magic number via histogram. The number which occurs most in RDWorks files is overwhelmingly 0. It's
+    about 50% of all data. The swizzle algorithm means that the swizzle for 0 is magic + 1, so we find the most
+    frequent number and subtract one from that and that is *most* likely the magic number.
+
+    @param data:
+    @return:
+    """
+    data = np.frombuffer(bytes(data), dtype=np.uint8)
+    if not len(data):
+        return None
+    # Each byte counts 1, a byte repeating the previous byte counts 5.
+    histogram = np.bincount(data, minlength=256)
+    repeats = data[1:][data[1:] == data[:-1]]
+    histogram += 4 * np.bincount(repeats, minlength=256)
+    return int(np.argmax(histogram)) - 1
+
+
+def encode_bytes(data, magic=0x88):
+    return bytes(data).translate(swizzle_tables(magic)[0])
+
+
+# Fields: size in bytes and decode function.
+BYTE = (1, lambda data: data[0])
+ABS = (5, abscoord)
+REL = (2, relcoord)
+POWER = (2, parse_power)
+SPEED = (5, parse_speed)
+# Force engrave speed and axis move speed are reported in m/s.
+SPEED_M = (5, lambda data: parse_speed(data) / 1000.0)
+TIME = (5, parse_time)
+FREQUENCY = (5, parse_frequency)
+U35 = (5, decodeu35)
+V14 = (2, decode14)
+MEM = (2, parse_mem)
+FILENUMBER = (2, parse_filenumber)
+# Remainder of the command, up to 10 bytes.
+NAME = (None, lambda data: bytes(data[:10]))
+
+
+def _layer_color(data):
+    c = decodeu35(data)
+    return Color(red=c & 0xFF, green=(c >> 8) & 0xFF, blue=(c >> 16) & 0xFF).hex
+
+
+COLOR = (5, _layer_color)
+
+
+class RdCommandType(NamedTuple):
+    name: str
+    key: Tuple[int, ...]
+    fields: tuple
+    description: Union[str, Callable]
+    # Description of a truncated command, truncated commands are errors without one.
+    short: Optional[str] = None
+    # (start, end, decode) of the fields, end is None for the remainder of the command.
+    layout: tuple = ()
+    # Shortest complete command.
+    minimum: int = 0
+    # Length of the command, None if not fixed.
+    length: Optional[int] = None
+
+
+class RdCommand(NamedTuple):
+    offset: int
+    command: Optional[RdCommandType]
+    # Decoded fields, None if the command is truncated.
+    values: Optional[tuple]
+    data: Union[memoryview, bytes]
+
+    @property
+    def name(self):
+        return self.command.name if self.command is not None else None
+
+    def describe(self):
+        """
+        Description of the command, as given by RDJob.process.
+        """
+        command = self.command
+        if command is None:
+            if self.data[0] < 0x80:
+                return f"NOT A COMMAND: {self.data[0]}"
+            if _table[self.data[0]] is None:
+                return "Unknown Command!"
+            return ""
+        if self.values is None:
+            return command.short
+        if command.description.__class__ is not str:
+            return command.description(self.data, *self.values)
+        return command.description.format(*self.values)
+
+
+def _set_setting(array, mem, v0, v1):
+    return (
+        f"Set {array[2]:02x} {array[3]:02x} (mem: {mem:04x})= {v0} (0x{v0:08x}) {v1} "
+        f"(0x{v1:08x})"
+    )
+
+
+POINT = "({}μm, {}μm)"
+REPEAT = "({}, {}, {}, {}, {}, {}, {})"
+
+COMMANDS = (
+    ("AXIS_X_MOVE", (0x80, 0x00), (ABS,), "Axis X Move {}"),
+    ("AXIS_Z_MOVE", (0x80, 0x08), (ABS,), "Axis Z Move {}"),
+    ("MOVE_ABS_XY", (0x88,), (ABS, ABS), "Move Absolute " + POINT),
+    (
+        "MOVE_REL_XY",
+        (0x89,),
+        (REL, REL),
+        "Move Relative ({:+}μm, {:+}μm)",
+        "Move Relative (no coords)",
+    ),
+    ("MOVE_REL_X", (0x8A,), (REL,), "Move Horizontal Relative ({:+}μm)"),
+    ("MOVE_REL_Y", (0x8B,), (REL,), "Move Vertical Relative ({:+}μm)"),
+    ("AXIS_A_MOVE", (0xA0, 0x00), (ABS,), "Axis Y Move {}"),
+    ("AXIS_U_MOVE", (0xA0, 0x08), (ABS,), "Axis U Move {}"),
+    ("CUT_ABS_XY", (0xA8,), (ABS, ABS), "Cut Absolute " + POINT),
+    ("CUT_REL_XY", (0xA9,), (REL, REL), "Cut Relative ({:+}μm, {:+}μm)"),
+    ("CUT_REL_X", (0xAA,), (REL,), "Cut Horizontal Relative ({:+}μm)"),
+    ("CUT_REL_Y", (0xAB,), (REL,), "Cut Vertical Relative ({:+}μm)"),
+    ("IMD_POWER_1", (0xC7,), (POWER,), "Imd Power 1 ({})", "Imd Power 1 (0)"),
+    ("IMD_POWER_2", (0xC0,), (POWER,), "Imd Power 2 ({})"),
+    ("IMD_POWER_3", (0xC2,), (POWER,), "Imd Power 3 ({})"),
+    ("IMD_POWER_4", (0xC3,), (POWER,), "Imd Power 4 ({})"),
+    ("END_POWER_1", (0xC8,), (POWER,), "End Power 1 ({})"),
+    ("END_POWER_2", (0xC1,), (POWER,), "End Power 2 ({})"),
+    ("END_POWER_3", (0xC4,), (POWER,), "End Power 3 ({})"),
+    ("END_POWER_4", (0xC5,), (POWER,), "End Power 4 ({})"),
+    ("MIN_POWER_1", (0xC6, 0x01), (POWER,), "Power 1 min={}"),
+    ("MAX_POWER_1", (0xC6, 0x02), (POWER,), "Power 1 max={}"),
+    ("MIN_POWER_3", (0xC6, 0x05), (POWER,), "Power 3 min={}"),
+    ("MAX_POWER_3", (0xC6, 0x06), (POWER,), "Power 3 max={}"),
+    ("MIN_POWER_4", (0xC6, 0x07), (POWER,), "Power 4 min={}"),
+    ("MAX_POWER_4", (0xC6, 0x08), (POWER,), "Power 4 max={}"),
+    ("LASER_INTERVAL", (0xC6, 0x10), (TIME,), "Laser Interval {}ms"),
+    ("ADD_DELAY", (0xC6, 0x11), (TIME,), "Add Delay {}ms"),
+    ("LASER_ON_DELAY", (0xC6, 0x12), (TIME,), "Laser On Delay {}ms"),
+    ("LASER_OFF_DELAY", (0xC6, 0x13), (TIME,), "Laser Off Delay {}ms"),
+    ("LASER_ON_DELAY2", (0xC6, 0x15), (TIME,), "Laser On2 {}ms"),
+    ("LASER_OFF_DELAY2", (0xC6, 0x16), (TIME,), "Laser Off2 {}ms"),
+    ("MIN_POWER_2", (0xC6, 0x21), (POWER,), "Power 2 min={}"),
+    ("MAX_POWER_2", (0xC6, 0x22), (POWER,), "Power 2 max={}"),
+    ("MIN_POWER_1_PART", (0xC6, 0x31), (BYTE, POWER), "{}, Power 1 Min=({})"),
+    ("MAX_POWER_1_PART", (0xC6, 0x32), (BYTE, POWER), "{}, Power 1 Max=({})"),
+    ("MIN_POWER_3_PART", (0xC6, 0x35), (BYTE, POWER), "{}, Power 3 Min ({})"),
+    ("MAX_POWER_3_PART", (0xC6, 0x36), (BYTE, POWER), "{}, Power 3 Max ({})"),
+    ("MIN_POWER_4_PART", (0xC6, 0x37), (BYTE, POWER), "{}, Power 4 Min ({})"),
+    ("MAX_POWER_4_PART", (0xC6, 0x38), (BYTE, POWER), "{}, Power 4 Max ({})"),
+    ("MIN_POWER_2_PART", (0xC6, 0x41), (BYTE, POWER), "{}, Power 2 Min ({})"),
+    ("MAX_POWER_2_PART", (0xC6, 0x42), (BYTE, POWER), "{}, Power 2 Max ({})"),
+    ("THROUGH_POWER_1", (0xC6, 0x50), (POWER,), "Through Power 1 ({})"),
+    ("THROUGH_POWER_2", (0xC6, 0x51), (POWER,), "Through Power 2 ({})"),
+    ("THROUGH_POWER_3", (0xC6, 0x55), (POWER,), "Through Power 3 ({})"),
+    ("THROUGH_POWER_4", (0xC6, 0x56), (POWER,), "Through Power 4 ({})"),
+    (
+        "FREQUENCY_PART",
+        (0xC6, 0x60),
+        (BYTE, BYTE, FREQUENCY),
+        "{1}, Laser {0}, Frequency ({2})",
+    ),
+    ("SPEED_LASER_1", (0xC9, 0x02), (SPEED,), "Speed Laser 1 {}mm/s"),
+    ("SPEED_AXIS", (0xC9, 0x03), (SPEED,), "Axis Speed {}mm/s"),
+    ("SPEED_LASER_1_PART", (0xC9, 0x04), (BYTE, SPEED), "{}, Speed {}mm/s"),
+    ("FORCE_ENG_SPEED", (0xC9, 0x05), (SPEED_M,), "Force Eng Speed {}mm/s"),
+    ("SPEED_AXIS_MOVE", (0xC9, 0x06), (SPEED_M,), "Axis Move Speed {}mm/s"),
+    ("LAYER_END", (0xCA, 0x01, 0x00), (), "End Layer"),
+    ("WORK_MODE_1", (0xCA, 0x01, 0x01), (), "Work Mode 1"),
+    ("WORK_MODE_2", (0xCA, 0x01, 0x02), (), "Work Mode 2"),
+    ("WORK_MODE_3", (0xCA, 0x01, 0x03), (), "Work Mode 3"),
+    ("WORK_MODE_4", (0xCA, 0x01, 0x04), (), "Work Mode 4"),
+    ("WORK_MODE_5", (0xCA, 0x01, 0x55), (), "Work Mode 5"),
+    ("WORK_MODE_6", (0xCA, 0x01, 0x05), (), "Work Mode 6"),
+    ("LASER_DEVICE_0", (0xCA, 0x01, 0x10), (), "Layer Device 0"),
+    ("LASER_DEVICE_1", (0xCA, 0x01, 0x11), (), "Layer Device 1"),
+    ("AIR_ASSIST_OFF", (0xCA, 0x01, 0x12), (), "Air Assist Off"),
+    ("AIR_ASSIST_ON", (0xCA, 0x01, 0x13), (), "Air Assist On"),
+    ("DB_HEAD", (0xCA, 0x01, 0x14), (), "DbHead"),
+    ("EN_LASER_2_OFFSET_0", (0xCA, 0x01, 0x30), (), "EnLaser2Offset 0"),
+    ("EN_LASER_2_OFFSET_1", (0xCA, 0x01, 0x31), (), "EnLaser2Offset 1"),
+    ("LAYER_NUMBER_PART", (0xCA, 0x02), (BYTE,), "{}, Layer Number"),
+    ("EN_LASER_TUBE_START", (0xCA, 0x03), (), "EnLaserTube Start"),
+    ("X_SIGN_MAP", (0xCA, 0x04), (BYTE,), "X Sign Map {}"),
+    ("LAYER_COLOR", (0xCA, 0x05), (COLOR,), "Layer Color {}"),
+    ("LAYER_COLOR_PART", (0xCA, 0x06), (BYTE, COLOR), "Color Part {}, {}"),
+    ("EN_EX_IO", (0xCA, 0x10), (BYTE,), "EnExIO Start {}"),
+    ("MAX_LAYER_PART", (0xCA, 0x22), (BYTE,), "{}, Max Layer"),
+    ("U_FILE_ID", (0xCA, 0x30), (FILENUMBER,), "U File ID {}"),
+    ("ZU_MAP", (0xCA, 0x40), (BYTE,), "ZU Map {}"),
+    ("WORK_MODE_PART", (0xCA, 0x41), (BYTE, BYTE), "{}, Work Mode {}"),
+    ("ACK", (0xCC,), (), "ACK from machine"),
+    ("ERR", (0xCD,), (), "ERR from machine"),
+    ("KEEP_ALIVE", (0xCE,), (), "Keep Alive"),
+    ("SET_INHALE_ZONE", (0xD0,), (BYTE,), "Set Inhale Zone {}"),
+    ("END_OF_FILE", (0xD7,), (), "End Of File"),
+    ("START_PROCESS", (0xD8, 0x00), (), "Start Process"),
+    (
+        "REF_POINT_2",
+        (0xD8, 0x10),
+        (),
+        "Ref Point Mode 2, Machine Zero/Absolute Position",
+    ),
+    ("REF_POINT_1", (0xD8, 0x11), (), "Ref Point Mode 1, Anchor Point"),
+    ("REF_POINT_0", (0xD8, 0x12), (), "Ref Point Mode 0, Current Position"),
+    ("RAPID_MOVE_X", (0xD9, 0x00), (BYTE, ABS), "Rapid move X ({1}μm)"),
+    ("RAPID_MOVE_Y", (0xD9, 0x01), (BYTE, ABS), "Rapid move Y ({1}μm)"),
+    ("RAPID_MOVE_Z", (0xD9, 0x02), (BYTE, ABS), "Rapid move Z ({1}μm)"),
+    ("RAPID_MOVE_U", (0xD9, 0x03), (BYTE, ABS), "Rapid move U ({1}μm)"),
+    ("RAPID_FEED_AXIS_MOVE", (0xD9, 0x0F), (BYTE, ABS), "Rapid move Feed ({1}μm)"),
+    (
+        "RAPID_MOVE_XY",
+        (0xD9, 0x10),
+        (BYTE, ABS, ABS),
+        "Rapid move XY ({1}μm, {2}μm)",
+    ),
+    (
+        "RAPID_MOVE_XYU",
+        (0xD9, 0x30),
+        (BYTE, ABS, ABS, ABS),
+        "Rapid move XYU ({1}μm, {2}μm, {3}μm)",
+    ),
+    ("GET_SETTING", (0xDA, 0x00), (MEM,), ""),
+    ("SET_SETTING", (0xDA, 0x01), (MEM, U35, U35), _set_setting),
+    ("DOCUMENT_FILE_UPLOAD", (0xE5, 0x00), (BYTE,), "Document Page Number {}"),
+    ("DOCUMENT_FILE_END", (0xE5, 0x02), (), "Document Data End"),
+    ("SET_FILE_SUM", (0xE5, 0x05), (U35,), "Set File Sum {}"),
+    ("SET_ABSOLUTE", (0xE6, 0x01), (), "Set Absolute"),
+    ("BLOCK_END", (0xE7, 0x00), (), "Block End"),
+    # Null terminated filename, only realtime, see emulator.
+    ("SET_FILENAME", (0xE7, 0x01), None, ""),
+    ("PROCESS_TOP_LEFT", (0xE7, 0x03), (ABS, ABS), "Process TopLeft " + POINT),
+    ("PROCESS_REPEAT", (0xE7, 0x04), (V14,) * 7, "Process Repeat " + REPEAT),
+    ("ARRAY_DIRECTION", (0xE7, 0x05), (BYTE,), "Array Direction ({})"),
+    ("FEED_REPEAT", (0xE7, 0x06), (U35, U35), "Feed Repeat ({}, {})"),
+    (
+        "PROCESS_BOTTOM_RIGHT",
+        (0xE7, 0x07),
+        (ABS, ABS),
+        "Process BottomRight" + POINT,
+    ),
+    ("ARRAY_REPEAT", (0xE7, 0x08), (V14,) * 7, "Array Repeat " + REPEAT),
+    ("FEED_LENGTH", (0xE7, 0x09), (U35,), "Feed Length {}"),
+    ("FEED_INFO", (0xE7, 0x0A), (), "Feed Info"),
+    ("ARRAY_EN_MIRROR_CUT", (0xE7, 0x0B), (BYTE,), "Array En Mirror Cut {}"),
+    (
+        "ARRAY_MIRROR_CUT_DISTANCE",
+        (0xE7, 0x0C),
+        (BYTE,),
+        "Array Mirror Cut Distance {}",
+    ),
+    ("ARRAY_MIN_POINT", (0xE7, 0x13), (ABS, ABS), "Array Min Point " + POINT),
+    ("ARRAY_MAX_POINT", (0xE7, 0x17), (ABS, ABS), "Array Max Point " + POINT),
+    ("ARRAY_ADD", (0xE7, 0x23), (ABS, ABS), "Array Add " + POINT),
+    ("ARRAY_MIRROR", (0xE7, 0x24), (BYTE,), "Array Mirror {}"),
+    ("SET_TICK_COUNT", (0xE7, 0x32), (U35,), "Set Tick Count {}"),
+    ("BLOCK_X_SIZE", (0xE7, 0x35), (U35, U35), "Block X Size {} {}"),
+    ("ARRAY_EVEN_DISTANCE", (0xE7, 0x37), (ABS, ABS), "Array Even Distance {} {}"),
+    ("SET_FEED_AUTO_PAUSE", (0xE7, 0x38), (BYTE,), "Set Feed Auto Pause {}"),
+    ("UNION_BLOCK_PROPERTY", (0xE7, 0x3A), (), "Union Block Property"),
+    ("SET_FILE_PROPERTY", (0xE7, 0x3B), (BYTE,), "Set File Property {}"),
+    ("BY_TEST", (0xE7, 0x46), (), "BY Test 0x11227766"),
+    (
+        "DOCUMENT_MIN_POINT",
+        (0xE7, 0x50),
+        (ABS, ABS),
+        "Document Min Point" + POINT,
+    ),
+    (
+        "DOCUMENT_MAX_POINT",
+        (0xE7, 0x51),
+        (ABS, ABS),
+        "Document Max Point" + POINT,
+    ),
+    ("PART_MIN_POINT", (0xE7, 0x52), (BYTE, ABS, ABS), "{}, Min Point" + POINT),
+    ("PART_MAX_POINT", (0xE7, 0x53), (BYTE, ABS, ABS), "{}, MaxPoint" + POINT),
+    ("PEN_OFFSET", (0xE7, 0x54), (BYTE, ABS), "Pen Offset {}: {}μm"),
+    ("LAYER_OFFSET", (0xE7, 0x55), (BYTE, ABS), "Layer Offset {}: {}μm"),
+    ("PLIST_FEED", (0xE7, 0x57), (), "PList Feed"),
+    (
+        "SET_CURRENT_ELEMENT_INDEX",
+        (0xE7, 0x60),
+        (BYTE,),
+        "Set Current Element Index ({})",
+    ),
+    (
+        "PART_MIN_POINT_EX",
+        (0xE7, 0x61),
+        (BYTE, ABS, ABS),
+        "{}, MinPointEx" + POINT,
+    ),
+    (
+        "PART_MAX_POINT_EX",
+        (0xE7, 0x62),
+        (BYTE, ABS, ABS),
+        "{}, MaxPointEx" + POINT,
+    ),
+    # Realtime commands, see emulator.
+    ("REALTIME", (0xE8,), None, ""),
+    ("ARRAY_START", (0xEA,), (BYTE,), "Array Start ({})"),
+    ("ARRAY_END", (0xEB,), (), "Array End"),
+    ("REF_POINT_SET", (0xF0,), (), "Ref Point Set"),
+    ("ELEMENT_MAX_INDEX", (0xF1, 0x00), (BYTE,), "Element Max Index ({})"),
+    (
+        "ELEMENT_NAME_MAX_INDEX",
+        (0xF1, 0x01),
+        (BYTE,),
+        "Element Name Max Index({})",
+    ),
+    ("ENABLE_BLOCK_CUTTING", (0xF1, 0x02), (BYTE,), "Enable Block Cutting ({})"),
+    ("DISPLAY_OFFSET", (0xF1, 0x03), (ABS, ABS), "Display Offset " + POINT),
+    ("FEED_AUTO_CALC", (0xF1, 0x04), (BYTE,), "Feed Auto Calc ({})"),
+    ("UNKNOWN_F1_20", (0xF1, 0x20), (BYTE, BYTE), "Unknown ({},{})"),
+    ("ELEMENT_INDEX", (0xF2, 0x00), (BYTE,), "Element Index ({})"),
+    ("ELEMENT_NAME_INDEX", (0xF2, 0x01), (BYTE,), "Element Name Index ({})"),
+    ("ELEMENT_NAME", (0xF2, 0x02), (NAME,), "Element Name ({})"),
+    (
+        "ELEMENT_ARRAY_MIN_POINT",
+        (0xF2, 0x03),
+        (ABS, ABS),
+        "Element Array Min Point " + POINT,
+    ),
+    (
+        "ELEMENT_ARRAY_MAX_POINT",
+        (0xF2, 0x04),
+        (ABS, ABS),
+        "Element Array Max Point " + POINT,
+    ),
+    ("ELEMENT_ARRAY", (0xF2, 0x05), (V14,) * 7, "Element Array " + REPEAT),
+    ("ELEMENT_ARRAY_ADD", (0xF2, 0x06), (ABS, ABS), "Element Array Add " + POINT),
+    ("ELEMENT_ARRAY_MIRROR", (0xF2, 0x07), (BYTE,), "Element Array Mirror ({})"),
+)
+
+
+def _build_table():
+    """
+    Dispatch table of the 256 opcodes: None for unknown opcodes, an RdCommandType, or
+    a dict keyed on the next byte.
+    """
+    table = [None] * 256
+    by_name = dict()
+    for entry in COMMANDS:
+        name, key, fields, description = entry[:4]
+        short = entry[4] if len(entry) > 4 else None
+        layout = list()
+        pos = len(key)
+        length = None
+        if fields is not None:
+            for size, decode in fields:
+                layout.append((pos, None if size is None else pos + size, decode))
+                if size is not None:
+                    pos += size
+            if all(size is not None for size, decode in fields):
+                length = pos
+        command = RdCommandType(
+            name, key, fields, description, short, tuple(layout), pos, length
+        )
+        by_name[name] = command
+        level = table
+        for b in key[:-1]:
+            sub = level[b] if level is table else level.get(b)
+            if sub is None:
+                sub = level[b] = dict()
+            level = sub
+        level[key[-1]] = command
+    return table, by_name
+
+
+_table, COMMAND_TYPES = _build_table()
+
+
+def lookup(data):
+    """
+    @param data: unswizzled command
+    @return: RdCommandType of the command, None if unknown.
+    """
+    entry = _table[data[0]]
+    i = 1
+    while entry.__class__ is dict:
+        if i >= len(data):
+            return None
+        entry = entry.get(data[i])
+        i += 1
+    return entry
+
+
+def is_incomplete(data):
+    """
+    @param data: unswizzled command
+    @return: whether the command is shorter than the table length of its command.
+    """
+    entry = _table[data[0]]
+    i = 1
+    while entry.__class__ is dict:
+        if i >= len(data):
+            return True
+        entry = entry.get(data[i])
+        i += 1
+    return entry is not None and entry.length is not None and len(data) < entry.length
+
+
+def decode_command(data, offset=0):
+    """
+    Decodes a single unswizzled command.
+
+    @param data: bytes, memoryview or list of the command
+    @param offset: offset of the command in the stream
+    @return: RdCommand
+    """
+    command = lookup(data)
+    if command is None:
+        return RdCommand(offset, None, None, data)
+    if len(data) < command.minimum:
+        return RdCommand(offset, command, None, data)
+    values = tuple([decode(data[start:end]) for start, end, decode in command.layout])
+    return RdCommand(offset, command, values, data)
+
+
+class RdDecoder:
+    """
+    Decodes a stream of Ruida commands into RdCommand records.
+
+    decode() decodes complete data such as a .rd file. feed() decodes packets as they
+    arrive: a command at the end of a packet that is shorter than its table length is
+    kept until the next packet, and data bytes at the start of a packet complete it.
+    Commands without a known length are complete at the end of a packet, as they would
+    be without the decoder.
+    """
+
+    def __init__(self, magic=None):
+        """
+        @param magic: swizzle magic of the data, None for unswizzled data.
+        """
+        self.magic = None
+        self._unswizzle = None
+        self.set_magic(magic)
+        self._pending = b""
+        self.offset = 0
+
+    def set_magic(self, magic):
+        self.magic = magic
+        self._unswizzle = None if magic is None else swizzle_tables(magic)[1]
+
+    def unswizzle(self, data):
+        if self._unswizzle is None:
+            return data
+        return data.translate(self._unswizzle)
+
+    def commands(self, data, offset=0):
+        """
+        Splits unswizzled data into RdCommand records without copying the data.
+
+        @param data: unswizzled bytes
+        @param offset: stream offset of data
+        @return: generator of RdCommand
+        """
+        view = memoryview(data)
+        for match in COMMAND_PATTERN.finditer(data):
+            start, end = match.span()
+            yield decode_command(view[start:end], offset + start)
+
+    def decode(self, data):
+        """
+        Decodes complete data, including any pending data of earlier packets.
+
+        @param data: swizzled bytes
+        @return: list of RdCommand
+        """
+        records = self.feed(data)
+        records.extend(self.flush())
+        return records
+
+    def feed(self, data):
+        """
+        Decodes the next packet of the stream.
+
+        @param data: swizzled bytes
+        @return: list of the RdCommand records completed by this packet
+        """
+        data = self.unswizzle(bytes(data))
+        offset = self.offset - len(self._pending)
+        self.offset += len(data)
+        if self._pending:
+            data = self._pending + data
+            self._pending = b""
+        records = list(self.commands(data, offset))
+        if records and is_incomplete(records[-1].data):
+            # Truncated by the end of the packet.
+            self._pending = bytes(records.pop().data)
+        return records
+
+    def flush(self):
+        """
+        @return: list with the pending command, if any
+        """
+        if not self._pending:
+            return []
+        data = self._pending
+        self._pending = b""
+        return [decode_command(memoryview(data), self.offset - len(data))]
@@ -1,6 +1,8 @@
 import threading
 import time
 
+import numpy as np
+
 from meerk40t.core.cutcode.plotcut import PlotCut
 from meerk40t.core.units import UNITS_PER_uM
 from meerk40t.svgelements import Color
@@ -8,6 +10,34 @@ from meerk40t.core.cutcode.linecut import LineCut
 from meerk40t.core.cutcode.rastercut import RasterCut
 
 from .exceptions import RuidaCommandError
+# The decoding of the wire format lives in rddecoder, imported here for existing users.
+from .rddecoder import (
+    abscoord,
+    decode14,
+    decode32,
+    decode35,
+    decode_bytes,
+    decode_command,
+    decodeu14,
+    decodeu35,
+    determine_magic_via_histogram,
+    encode_bytes,
+    parse_commands,
+    parse_filenumber,
+    parse_frequency,
+    parse_mem,
+    parse_power,
+    parse_speed,
+    parse_time,
+    relcoord,
+    signed14,
+    signed32,
+    signed35,
+    swizzle_byte,
+    swizzle_tables,
+    swizzles_lut,
+    unswizzle_byte,
+)
 
 # Ports 50207 and 40207
 INTERFACE_FRAME = b"\xA5\x53\x00"
@@ -331,178 +361,91 @@ def encode_frequency(freq_hz):
     return encode32(freq_hz * 1000)
 
 
-def signed35(v):
-    v = int(v)
-    v &= 0x7FFFFFFFF
-    if v > 0x3FFFFFFFF:
-        return -0x800000000 + v
-    else:
-        return v
-
-
-def signed32(v):
-    v = int(v)
-    v &= 0xFFFFFFFF
-    if v > 0x7FFFFFFF:
-        return -0x100000000 + v
-    else:
-        return v
-
-
-def signed14(v):
-    v = int(v)
-    v &= 0x7FFF
-    if v > 0x1FFF:
-        return -0x4000 + v
-    else:
-        return v
-
-
-def decode14(data):
-    return signed14(decodeu14(data))
-
-
-def decodeu14(data):
-    return (data[0] & 0x7F) << 7 | (data[1] & 0x7F)
-
-
-def decode35(data):
-    return signed35(decodeu35(data))
-
-
-def decode32(data):
-    return signed32(decodeu35(data))
-
-
-def decodeu35(data):
-    return (
-        (data[0] & 0x7F) << 28
-        | (data[1] & 0x7F) << 21
-        | (data[2] & 0x7F) << 14
-        | (data[3] & 0x7F) << 7
-        | (data[4] & 0x7F)
-    )
-
-
-def abscoord(data):
-    return decode32(data)
-
-
-def relcoord(data):
-    return decode14(data)
-
-
-def parse_mem(data):
-    return decode14(data)
-
-
-def parse_filenumber(data):
-    return decode14(data)
-
-
-def parse_speed(data):
-    return decode35(data) / 1000.0
-
-
-def parse_frequency(data):
-    return decodeu35(data)
-
-
-def parse_power(data):
-    return decodeu14(data) / 163.84  # 16384 / 100%
-
-
-def parse_time(data):
-    return decodeu35(data) / 1000.0
+def magic_keys():
+    mk = dict()
+    for g in range(256):
+        mk[encode_bytes(b"\xda\x00\x05\x7E", magic=g)] = g
+    return mk
 
 
-def parse_commands(data):
+class PackedJob:
     """
-    Parses data blob into command chunk sized pieces.
-    @param data:
-    @return:
+    Job compiled for transmission. The commands are swizzled once into a single
+    bytearray and divided into packets at command boundaries. With checksums (UDP) every
+    packet is preceded by its checksum, so each packet is sent as one memoryview slice
+    of the data without further processing.
     """
-    mark = 0
-    for i, b in enumerate(data):
-        if b >= 0x80 and mark != i:
-            yield data[mark:i]
-            mark = i
-    if mark != len(data):
-        yield data[mark:]
-
-
-def swizzle_byte(b, magic):
-    b ^= (b >> 7) & 0xFF
-    b ^= (b << 7) & 0xFF
-    b ^= (b >> 7) & 0xFF
-    b ^= magic
-    b = (b + 1) & 0xFF
-    return b
-
-
-def unswizzle_byte(b, magic):
-    b = (b - 1) & 0xFF
-    b ^= magic
-    b ^= (b >> 7) & 0xFF
-    b ^= (b << 7) & 0xFF
-    b ^= (b >> 7) & 0xFF
-    return b
-
-
-def swizzles_lut(magic):
-    if magic == -1:
-        lut = [s for s in range(256)]
-        return lut, lut
-    lut_swizzle = [swizzle_byte(s, magic) for s in range(256)]
-    lut_unswizzle = [unswizzle_byte(s, magic) for s in range(256)]
-    return lut_swizzle, lut_unswizzle
-
-
-def decode_bytes(data, magic=0x88):
-    lut_swizzle, lut_unswizzle = swizzles_lut(magic)
-    array = list()
-    for b in data:
-        array.append(lut_unswizzle[b])
-    return bytes(array)
-
-
-def determine_magic_via_histogram(data):
-    """
-    Determines magic number via histogram. The number which occurs most in RDWorks files is overwhelmingly 0. It's
-    about 50% of all data. The swizzle algorithm means that the swizzle for 0 is magic + 1, so we find the most
-    frequent number and subtract one from that and that is *most* likely the magic number.
 
-    @param data:
-    @return:
-    """
-    histogram = [0] * 256
-    prev = -1
-    for d in data:
-        histogram[d] += 5 if prev == d else 1
-        prev = d
-    m = 0
-    magic = None
-    for i in range(len(histogram)):
-        v = histogram[i]
-        if v > m:
-            m = v
-            magic = i - 1
-    return magic
-
-
-def encode_bytes(data, magic=0x88):
-    lut_swizzle, lut_unswizzle = swizzles_lut(magic)
-    array = list()
-    for b in data:
-        array.append(lut_swizzle[b])
-    return bytes(array)
+    def __init__(self, commands, swizzle_table, checksum=True, packet_size=1000):
+        """
+        @param commands: unswizzled commands
+        @param swizzle_table: bytes.translate table of the magic number
+        @param checksum: precede each packet with its 16-bit checksum
+        @param packet_size: largest packet payload, unless a single command is longer
+        """
+        self.raw = b"".join(commands)
+        ends = np.cumsum(
+            np.fromiter(map(len, commands), dtype=np.int64, count=len(commands))
+        )
+        bounds = [0]
+        total = len(self.raw)
+        while bounds[-1] < total:
+            start = bounds[-1]
+            i = int(np.searchsorted(ends, start + packet_size, side="right"))
+            end = int(ends[i - 1]) if i else 0
+            if end <= start:
+                # Single command longer than a packet.
+                end = int(ends[np.searchsorted(ends, start, side="right")])
+            bounds.append(end)
+        swizzled = memoryview(self.raw.translate(swizzle_table))
+        if len(bounds) > 1:
+            sums = np.add.reduceat(
+                np.frombuffer(swizzled, dtype=np.uint8),
+                np.array(bounds[:-1], dtype=np.int64),
+                dtype=np.int64,
+            )
+            self.checksums = (sums & 0xFFFF).tolist()
+        else:
+            self.checksums = []
+        self.payload_bounds = bounds
+        if checksum:
+            self.bounds = [b + 2 * i for i, b in enumerate(bounds)]
+            data = bytearray(total + 2 * len(self.checksums))
+            for i, value in enumerate(self.checksums):
+                start = self.bounds[i]
+                data[start] = value >> 8
+                data[start + 1] = value & 0xFF
+                data[start + 2 : self.bounds[i + 1]] = swizzled[
+                    bounds[i] : bounds[i + 1]
+                ]
+            self.data = data
+        else:
+            self.bounds = bounds
+            self.data = bytearray(swizzled)
 
+    def __len__(self):
+        return len(self.bounds) - 1
 
-def magic_keys():
-    mk = dict()
-    for g in range(256):
-        mk[encode_bytes(b"\xda\x00\x05\x7E", magic=g)] = g
-    return mk
+    def packet(self, index):
+        """
+        @return: memoryview of the swizzled packet, with its checksum for UDP.
+        """
+        return memoryview(self.data)[self.bounds[index] : self.bounds[index + 1]]
+
+    def packets(self):
+        view = memoryview(self.data)
+        bounds = self.bounds
+        for i in range(len(bounds) - 1):
+            yield view[bounds[i] : bounds[i + 1]]
+
+    def chunks(self):
+        """
+        Unswizzled payloads of the packets, for pipes which swizzle themselves.
+        """
+        view = memoryview(self.raw)
+        bounds = self.payload_bounds
+        for i in range(len(bounds) - 1):
+            yield view[bounds[i] : bounds[i + 1]]
 
 
 class RDJob:
@@ -520,6 +463,8 @@ class RDJob:
         self.label = "Ruida Job"
         self.reply = None
         self.buffer = list()
+        # Index of the next command of the buffer to execute.
+        self._index = 0
         self.plotcut = None
 
         self.priority = priority
@@ -550,6 +495,7 @@ class RDJob:
         # 0x11 for the 634XG
         self.magic = magic
         self.lut_swizzle, self.lut_unswizzle = swizzles_lut(self.magic)
+        self._swizzle_table, self._unswizzle_table = swizzle_tables(self.magic)
 
         self.first_layer = True
         self.first_move = True
@@ -594,7 +540,9 @@ class RDJob:
                 return "Disabled"
 
     def clear(self):
-        self.buffer.clear()
+        with self.lock:
+            self.buffer.clear()
+            self._index = 0
 
     def set_magic(self, magic):
         """
@@ -606,6 +554,7 @@ class RDJob:
         if magic is not None and magic != self.magic:
             self.magic = magic
             self.lut_swizzle, self.lut_unswizzle = swizzles_lut(self.magic)
+            self._swizzle_table, self._unswizzle_table = swizzle_tables(self.magic)
 
     def write_blob(self, data, magic=None):
         """
@@ -628,6 +577,14 @@ class RDJob:
         with self.lock:
             self.buffer.append(command)
 
+    def pack(self, checksum=True, packet_size=1000):
+        """
+        Compiles the buffer for transmission, see PackedJob.
+        """
+        with self.lock:
+            commands = list(self.buffer)
+        return PackedJob(commands, self._swizzle_table, checksum, packet_size)
+
     def file_sum(self):
         return sum([sum(list(g)) for g in self.buffer])
 
@@ -645,16 +602,23 @@ class RDJob:
         if self.time_started is None:
             self.time_started = time.time()
         with self.lock:
-            command = self.buffer.pop(0)
+            index = self._index
+            command = self.buffer[index]
+            self._index = index + 1
         try:
-            array = list(command)
-            self.process(array, offset=self.offset)
+            self.process(command, offset=self.offset)
             self.offset += len(command)
         except IndexError as e:
             raise RuidaCommandError(
-                f"Could not process Ruida buffer, {self.buffer[:25]} with magic: {self.magic:02}"
+                f"Could not process Ruida buffer, {self.buffer[index + 1:index + 26]} with magic: {self.magic:02}"
             ) from e
-        if not self.buffer:
+        with self.lock:
+            finished = self._index >= len(self.buffer)
+            if finished:
+                # Executed commands are kept until the end, rather than popped one by one.
+                self.buffer.clear()
+                self._index = 0
+        if finished:
             # Buffer is empty now. Job is complete
             self.runtime += time.time() - self.time_started
             self._stopped = True
@@ -757,577 +721,136 @@ class RDJob:
         Parses an individual unswizzled ruida command, updating the emulator state.
 
         These commands can change the position, settings, speed, color, power, create elements.
-        @param array:
+        The command is decoded with the command table of rddecoder, the commands changing
+        the state have a handler in RDJob.handlers.
+        @param array: unswizzled command, bytes, memoryview or list
+        @param offset: offset of the command, shown in the channel
         @return:
-
-        TODO: Migrate this to use the Ruida Protocol Analyzer decode state
-        machine (class RdDecoder).
         """
-        desc = ""
         if array[0] < 0x80:
             if self.channel:
                 self.channel(f"NOT A COMMAND: {array[0]}")
             raise RuidaCommandError("Not a command.")
-        elif array[0] == 0x80:
-            value = abscoord(array[2:7])
-            if array[1] == 0x00:
-                desc = f"Axis X Move {value}"
-                self.x += value
-            elif array[1] == 0x08:
-                desc = f"Axis Z Move {value}"
-                self.z += value
-        elif array[0] == 0x88:  # 0b10001000 11 characters.
-            x = abscoord(array[1:6])
-            y = abscoord(array[6:11])
-            self.plot_location(x * self.scale, y * self.scale, 0)
-            desc = f"Move Absolute ({x}μm, {y}μm)"
-        elif array[0] == 0x89:  # 0b10001001 5 characters
-            if len(array) > 1:
-                dx = relcoord(array[1:3])
-                dy = relcoord(array[3:5])
-                self.plot_location(
-                    self.x + dx * self.scale, self.y + dy * self.scale, 0
-                )
-                desc = f"Move Relative ({dx:+}μm, {dy:+}μm)"
+        record = decode_command(array, offset)
+        command = record.command
+        if command is not None:
+            if record.values is None:
+                if command.short is None:
+                    raise IndexError(f"Truncated command {command.name}")
             else:
-                desc = "Move Relative (no coords)"
-        elif array[0] == 0x8A:  # 0b10101010 3 characters
-            dx = relcoord(array[1:3])
-            self.plot_location(self.x + dx * self.scale, self.y, 0)
-            desc = f"Move Horizontal Relative ({dx:+}μm)"
-        elif array[0] == 0x8B:  # 0b10101011 3 characters
-            dy = relcoord(array[1:3])
-            self.plot_location(self.x, self.y + dy * self.scale, 0)
-            desc = f"Move Vertical Relative ({dy:+}μm)"
-        elif array[0] == 0xA0:
-            value = abscoord(array[2:7])
-            if array[1] == 0x00:
-                desc = f"Axis Y Move {value}"
-            elif array[1] == 0x08:
-                desc = f"Axis U Move {value}"
-        elif array[0] == 0xA8:  # 0b10101000 11 characters.
-            x = abscoord(array[1:6])
-            y = abscoord(array[6:11])
-            self.plot_location(x * self.scale, y * self.scale, 1)
-            desc = f"Cut Absolute ({x}μm, {y}μm)"
-        elif array[0] == 0xA9:  # 0b10101001 5 characters
-            dx = relcoord(array[1:3])
-            dy = relcoord(array[3:5])
-            self.plot_location(self.x + dx * self.scale, self.y + dy * self.scale, 1)
-            desc = f"Cut Relative ({dx:+}μm, {dy:+}μm)"
-        elif array[0] == 0xAA:  # 0b10101010 3 characters
-            dx = relcoord(array[1:3])
-            self.plot_location(self.x + dx * self.scale, self.y, 1)
-            desc = f"Cut Horizontal Relative ({dx:+}μm)"
-        elif array[0] == 0xAB:  # 0b10101011 3 characters
-            dy = relcoord(array[1:3])
-            self.plot_location(self.x, self.y + dy * self.scale, 1)
-            desc = f"Cut Vertical Relative ({dy:+}μm)"
-        elif array[0] == 0xC7:
-            try:
-                v0 = parse_power(array[1:3])
-            except IndexError:
-                v0 = 0
-            desc = f"Imd Power 1 ({v0})"
-        elif array[0] == 0xC2:
-            v0 = parse_power(array[1:3])
-            desc = f"Imd Power 3 ({v0})"
-        elif array[0] == 0xC0:
-            v0 = parse_power(array[1:3])
-            desc = f"Imd Power 2 ({v0})"
-        elif array[0] == 0xC3:
-            v0 = parse_power(array[1:3])
-            desc = f"Imd Power 4 ({v0})"
-        elif array[0] == 0xC8:
-            v0 = parse_power(array[1:3])
-            desc = f"End Power 1 ({v0})"
-        elif array[0] == 0xC4:
-            v0 = parse_power(array[1:3])
-            desc = f"End Power 3 ({v0})"
-        elif array[0] == 0xC1:
-            v0 = parse_power(array[1:3])
-            desc = f"End Power 2 ({v0})"
-        elif array[0] == 0xC5:
-            v0 = parse_power(array[1:3])
-            desc = f"End Power 4 ({v0})"
-        elif array[0] == 0xC6:
-            if array[1] == 0x01:
-                power = parse_power(array[2:4])
-                self.power1_min = power
-                power = self.power1_min
-                desc = f"Power 1 min={power}"
-                self.power = power * 10  # 1000 / 100
-            elif array[1] == 0x02:
-                power = parse_power(array[2:4])
-                self.power1_max = power
-                power = self.power1_max
-                desc = f"Power 1 max={power}"
-                self.power = power * 10  # 1000 / 100
-            elif array[1] == 0x05:
-                power = parse_power(array[2:4])
-                desc = f"Power 3 min={power}"
-            elif array[1] == 0x06:
-                power = parse_power(array[2:4])
-                desc = f"Power 3 max={power}"
-            elif array[1] == 0x07:
-                power = parse_power(array[2:4])
-                desc = f"Power 4 min={power}"
-            elif array[1] == 0x08:
-                power = parse_power(array[2:4])
-                desc = f"Power 4 max={power}"
-            elif array[1] == 0x10:
-                interval = parse_time(array[2:7])
-                desc = f"Laser Interval {interval}ms"
-            elif array[1] == 0x11:
-                interval = parse_time(array[2:7])
-                desc = f"Add Delay {interval}ms"
-            elif array[1] == 0x12:
-                interval = parse_time(array[2:7])
-                desc = f"Laser On Delay {interval}ms"
-            elif array[1] == 0x13:
-                interval = parse_time(array[2:7])
-                desc = f"Laser Off Delay {interval}ms"
-            elif array[1] == 0x15:
-                interval = parse_time(array[2:7])
-                desc = f"Laser On2 {interval}ms"
-            elif array[1] == 0x16:
-                interval = parse_time(array[2:7])
-                desc = f"Laser Off2 {interval}ms"
-            elif array[1] == 0x21:
-                power = parse_power(array[2:4])
-                desc = f"Power 2 min={power}"
-                self.power2_min = power
-            elif array[1] == 0x22:
-                power = parse_power(array[2:4])
-                desc = f"Power 2 max={power}"
-                self.power2_max = power
-            elif array[1] == 0x31:
-                part = array[2]
-                self.power1_min = parse_power(array[3:5])
-                desc = f"{part}, Power 1 Min=({self.power1_min})"
-            elif array[1] == 0x32:
-                part = array[2]
-                self.power1_max = parse_power(array[3:5])
-                desc = f"{part}, Power 1 Max=({self.power1_max})"
-            elif array[1] == 0x35:
-                part = array[2]
-                power = parse_power(array[3:5])
-                desc = f"{part}, Power 3 Min ({power})"
-            elif array[1] == 0x36:
-                part = array[2]
-                power = parse_power(array[3:5])
-                desc = f"{part}, Power 3 Max ({power})"
-            elif array[1] == 0x37:
-                part = array[2]
-                power = parse_power(array[3:5])
-                desc = f"{part}, Power 4 Min ({power})"
-            elif array[1] == 0x38:
-                part = array[2]
-                power = parse_power(array[3:5])
-                desc = f"{part}, Power 4 Max ({power})"
-            elif array[1] == 0x41:
-                part = array[2]
-                power = parse_power(array[3:5])
-                desc = f"{part}, Power 2 Min ({power})"
-            elif array[1] == 0x42:
-                part = array[2]
-                power = parse_power(array[3:5])
-                desc = f"{part}, Power 2 Max ({power})"
-            elif array[1] == 0x50:
-                power = parse_power(array[2:4])
-                desc = f"Through Power 1 ({power})"
-            elif array[1] == 0x51:
-                power = parse_power(array[2:4])
-                desc = f"Through Power 2 ({power})"
-            elif array[1] == 0x55:
-                power = parse_power(array[2:4])
-                desc = f"Through Power 3 ({power})"
-            elif array[1] == 0x56:
-                power = parse_power(array[2:4])
-                desc = f"Through Power 4 ({power})"
-            elif array[1] == 0x60:
-                laser = array[2]
-                part = array[3]
-                frequency = parse_frequency(array[4:9])
-                desc = f"{part}, Laser {laser}, Frequency ({frequency})"
-                if frequency != self.frequency:
-                    self.frequency = frequency
-        elif array[0] == 0xC9:
-            if array[1] == 0x02:
-                self.plot_commit()
-                speed = parse_speed(array[2:7])
-                if speed != self.speed:
-                    self.speed = speed
-                desc = f"Speed Laser 1 {speed}mm/s"
-            elif array[1] == 0x03:
-                speed = parse_speed(array[2:7])
-                desc = f"Axis Speed {speed}mm/s"
-            elif array[1] == 0x04:
-                self.plot_commit()
-                part = array[2]
-                speed = parse_speed(array[3:8])
-                if speed != self.speed:
-                    self.speed = speed
-                desc = f"{part}, Speed {speed}mm/s"
-            elif array[1] == 0x05:
-                speed = parse_speed(array[2:7]) / 1000.0
-                desc = f"Force Eng Speed {speed}mm/s"
-            elif array[1] == 0x06:
-                speed = parse_speed(array[2:7]) / 1000.0
-                desc = f"Axis Move Speed {speed}mm/s"
-        elif array[0] == 0xCA:
-            if array[1] == 0x01:
-                if array[2] == 0x00:
-                    desc = "End Layer"
-                elif array[2] == 0x01:
-                    desc = "Work Mode 1"
-                elif array[2] == 0x02:
-                    desc = "Work Mode 2"
-                elif array[2] == 0x03:
-                    desc = "Work Mode 3"
-                elif array[2] == 0x04:
-                    desc = "Work Mode 4"
-                elif array[2] == 0x55:
-                    desc = "Work Mode 5"
-                elif array[2] == 0x05:
-                    desc = "Work Mode 6"
-                elif array[2] == 0x10:
-                    desc = "Layer Device 0"
-                elif array[2] == 0x11:
-                    desc = "Layer Device 1"
-                elif array[2] == 0x12:
-                    desc = "Air Assist Off"
-                elif array[2] == 0x13:
-                    desc = "Air Assist On"
-                elif array[2] == 0x14:
-                    desc = "DbHead"
-                elif array[2] == 0x30:
-                    desc = "EnLaser2Offset 0"
-                elif array[2] == 0x31:
-                    desc = "EnLaser2Offset 1"
-            elif array[1] == 0x02:
-                part = array[2]
-                desc = f"{part}, Layer Number"
-            elif array[1] == 0x03:
-                desc = "EnLaserTube Start"
-            elif array[1] == 0x04:
-                value = array[2]
-                desc = f"X Sign Map {value}"
-            elif array[1] == 0x05:
-                self.plot_commit()
-                c = decodeu35(array[2:7])
-                r = c & 0xFF
-                g = (c >> 8) & 0xFF
-                b = (c >> 16) & 0xFF
-                c = Color(red=r, blue=b, green=g)
-                self.set_color(c.hex)
-                desc = f"Layer Color {str(self.color)}"
-            elif array[1] == 0x06:
-                part = array[2]
-                c = decodeu35(array[3:8])
-                r = c & 0xFF
-                g = (c >> 8) & 0xFF
-                b = (c >> 16) & 0xFF
-                c = Color(red=r, blue=b, green=g)
-                self.set_color(c.hex)
-                desc = f"Color Part {part}, {self.color}"
-            elif array[1] == 0x10:
-                value = array[2]
-                desc = f"EnExIO Start {value}"
-            elif array[1] == 0x22:
-                part = array[2]
-                desc = f"{part}, Max Layer"
-            elif array[1] == 0x30:
-                filenumber = parse_filenumber(array[2:4])
-                desc = f"U File ID {filenumber}"
-            elif array[1] == 0x40:
-                value = array[2]
-                desc = f"ZU Map {value}"
-            elif array[1] == 0x41:
-                part = array[2]
-                mode = array[3]
-                desc = f"{part}, Work Mode {mode}"
-        elif array[0] == 0xCC:
-            desc = "ACK from machine"
-        elif array[0] == 0xCD:
-            desc = "ERR from machine"
-        elif array[0] == 0xCE:
-            desc = "Keep Alive"
-        elif array[0] == 0xD0:
-            zone = array[1]
-            desc = f"Set Inhale Zone {zone}"
-        elif array[0] == 0xD7:
-            self.plot_commit()
-            try:
-                self._driver.plot_start()
-            except AttributeError:
-                pass
-            desc = "End Of File"
-        elif array[0] == 0xD8:
-            if array[1] == 0x00:
-                desc = "Start Process"
-            elif array[1] == 0x10:
-                desc = "Ref Point Mode 2, Machine Zero/Absolute Position"
-            elif array[1] == 0x11:
-                desc = "Ref Point Mode 1, Anchor Point"
-            elif array[1] == 0x12:
-                desc = "Ref Point Mode 0, Current Position"
-        elif array[0] == 0xD9:
-            if array[1] == 0x00:
-                opts = array[2]
-                value = abscoord(array[3:8])
-                desc = f"Rapid move X ({value}μm)"
-            elif array[1] == 0x01:
-                opts = array[2]
-                value = abscoord(array[3:8])
-                desc = f"Rapid move Y ({value}μm)"
-            elif array[1] == 0x02:
-                opts = array[2]
-                value = abscoord(array[3:8])
-                desc = f"Rapid move Z ({value}μm)"
-            elif array[1] == 0x03:
-                opts = array[2]
-                value = abscoord(array[3:8])
-                desc = f"Rapid move U ({value}μm)"
-            elif array[1] == 0x0F:
-                opts = array[2]
-                value = abscoord(array[3:8])
-                desc = f"Rapid move Feed ({value}μm)"
-            elif array[1] == 0x10:
-                opts = array[2]
-                x = abscoord(array[3:8])
-                y = abscoord(array[8:13])
-                desc = f"Rapid move XY ({x}μm, {y}μm)"
-            elif array[1] == 0x30:
-                opts = array[2]
-                x = abscoord(array[3:7])
-                y = abscoord(array[8:13])
-                u = abscoord(array[13:18])
-                desc = f"Rapid move XYU ({x}μm, {y}μm, {u}μm)"
-        elif array[0] == 0xDA:
-            mem = parse_mem(array[2:4])
-            if array[1] == 0x01:
-                value0 = array[4:9]
-                value1 = array[9:14]
-                v0 = decodeu35(value0)
-                v1 = decodeu35(value1)
-                desc = f"Set {array[2]:02x} {array[3]:02x} (mem: {mem:04x})= {v0} (0x{v0:08x}) {v1} (0x{v1:08x})"
-        elif array[0] == 0xE5:  # 0xE502
-            if array[1] == 0x00:
-                # RDWorks File Upload
-                filenumber = array[2]
-                desc = f"Document Page Number {filenumber}"
-                # TODO: Requires Response.
-            if array[1] == 0x02:
-                # len 3
-                desc = "Document Data End"
-            elif array[1] == 0x05:
-                _sum = decodeu35(array[2:7])
-                desc = f"Set File Sum {_sum}"
-
-        elif array[0] == 0xE6:
-            if array[1] == 0x01:
-                desc = "Set Absolute"
-                # Only seen in Absolute Coords. MachineZero is Ref2 but does not Set Absolute.
-        elif array[0] == 0xE7:
-            if array[1] == 0x00:
-                self.plot_commit()
-                desc = "Block End"
-            elif array[1] == 0x01:
-                pass  # Set filename for job (only realtime, see emulator)
-            elif array[1] == 0x03:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Process TopLeft ({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x04:
-                v0 = decode14(array[2:4])
-                v1 = decode14(array[4:6])
-                v2 = decode14(array[6:8])
-                v3 = decode14(array[8:10])
-                v4 = decode14(array[10:12])
-                v5 = decode14(array[12:14])
-                v6 = decode14(array[14:16])
-                desc = f"Process Repeat ({v0}, {v1}, {v2}, {v3}, {v4}, {v5}, {v6})"
-            elif array[1] == 0x05:
-                direction = array[2]
-                desc = f"Array Direction ({direction})"
-            elif array[1] == 0x06:
-                v1 = decodeu35(array[2:7])
-                v2 = decodeu35(array[7:12])
-                desc = f"Feed Repeat ({v1}, {v2})"
-            elif array[1] == 0x07:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Process BottomRight({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x08:  # Same value given to F2 04
-                v0 = decode14(array[2:4])
-                v1 = decode14(array[4:6])
-                v2 = decode14(array[6:8])
-                v3 = decode14(array[8:10])
-                v4 = decode14(array[10:12])
-                v5 = decode14(array[12:14])
-                v6 = decode14(array[14:16])
-                desc = f"Array Repeat ({v0}, {v1}, {v2}, {v3}, {v4}, {v5}, {v6})"
-            elif array[1] == 0x09:
-                v1 = decodeu35(array[2:7])
-                desc = f"Feed Length {v1}"
-            elif array[1] == 0x0A:
-                desc = f"Feed Info"
-            elif array[1] == 0x0B:
-                v1 = array[2]
-                desc = f"Array En Mirror Cut {v1}"
-            elif array[1] == 0x0C:
-                v1 = array[2]
-                desc = f"Array Mirror Cut Distance {v1}"
-            elif array[1] == 0x0C:
-                v1 = array[2]
-                desc = f"Set File Head Distance {v1}"
-            elif array[1] == 0x13:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Array Min Point ({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x17:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Array Max Point ({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x23:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Array Add ({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x24:
-                v1 = array[2]
-                desc = f"Array Mirror {v1}"
-            elif array[1] == 0x32:
-                v1 = decodeu35(array[2:7])
-                desc = f"Set Tick Count {v1}"
-            elif array[1] == 0x35:
-                v1 = decodeu35(array[2:7])
-                v2 = decodeu35(array[7:12])
-                desc = f"Block X Size {v1} {v2}"
-            elif array[1] == 0x32:
-                desc = f"Set File Empty"
-            elif array[1] == 0x37:
-                v1 = abscoord(array[2:7])
-                v2 = abscoord(array[7:12])
-                desc = f"Array Even Distance {v1} {v2}"
-            elif array[1] == 0x38:
-                v1 = array[2]
-                desc = f"Set Feed Auto Pause {v1}"
-            elif array[1] == 0x3A:
-                desc = f"Union Block Property"
-            elif array[1] == 0x3B:
-                v1 = array[2]
-                desc = f"Set File Property {v1}"
-            elif array[1] == 0x46:
-                desc = "BY Test 0x11227766"
-            elif array[1] == 0x50:
-                c_x = abscoord(array[1:6])
-                c_y = abscoord(array[6:11])
-                desc = f"Document Min Point({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x51:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Document Max Point({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x52:
-                part = array[2]
-                c_x = abscoord(array[3:8])
-                c_y = abscoord(array[8:13])
-                desc = f"{part}, Min Point({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x53:
-                part = array[2]
-                c_x = abscoord(array[3:8])
-                c_y = abscoord(array[8:13])
-                desc = f"{part}, MaxPoint({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x54:
-                axis = array[2]
-                c_x = abscoord(array[3:8])
-                desc = f"Pen Offset {axis}: {c_x}μm"
-            elif array[1] == 0x55:
-                axis = array[2]
-                c_x = abscoord(array[3:8])
-                desc = f"Layer Offset {axis}: {c_x}μm"
-            elif array[1] == 0x57:
-                desc = f"PList Feed"
-            elif array[1] == 0x60:
-                desc = f"Set Current Element Index ({array[2]})"
-            elif array[1] == 0x61:
-                part = array[2]
-                c_x = abscoord(array[3:8])
-                c_y = abscoord(array[8:13])
-                desc = f"{part}, MinPointEx({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x62:
-                part = array[2]
-                c_x = abscoord(array[3:8])
-                c_y = abscoord(array[8:13])
-                desc = f"{part}, MaxPointEx({c_x}μm, {c_y}μm)"
-        elif array[0] == 0xE8:
-            # Realtime command.
-            pass
-        elif array[0] == 0xEA:
-            index = array[1]
-            desc = f"Array Start ({index})"
-        elif array[0] == 0xEB:
-            desc = "Array End"
-        elif array[0] == 0xF0:
-            desc = "Ref Point Set"
-        elif array[0] == 0xF1:
-            if array[1] == 0x00:
-                index = array[2]
-                desc = f"Element Max Index ({index})"
-            elif array[1] == 0x01:
-                index = array[2]
-                desc = f"Element Name Max Index({index})"
-            elif array[1] == 0x02:
-                enable = array[2]
-                desc = f"Enable Block Cutting ({enable})"
-            elif array[1] == 0x03:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Display Offset ({c_x}μm, {c_y}μm)"
-            elif array[1] == 0x04:
-                enable = array[2]
-                desc = f"Feed Auto Calc ({enable})"
-            elif array[1] == 0x20:
-                desc = f"Unknown ({array[2]},{array[3]})"
-        elif array[0] == 0xF2:
-            if array[1] == 0x00:
-                index = array[2]
-                desc = f"Element Index ({index})"
-            if array[1] == 0x01:
-                index = array[2]
-                desc = f"Element Name Index ({index})"
-            if array[1] == 0x02:
-                name = bytes(array[2:12])
-                desc = f"Element Name ({str(name)})"
-            if array[1] == 0x03:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Element Array Min Point ({c_x}μm, {c_y}μm)"
-            if array[1] == 0x04:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Element Array Max Point ({c_x}μm, {c_y}μm)"
-            if array[1] == 0x05:
-                v0 = decode14(array[2:4])
-                v1 = decode14(array[4:6])
-                v2 = decode14(array[6:8])
-                v3 = decode14(array[8:10])
-                v4 = decode14(array[10:12])
-                v5 = decode14(array[12:14])
-                v6 = decode14(array[14:16])
-                desc = f"Element Array ({v0}, {v1}, {v2}, {v3}, {v4}, {v5}, {v6})"
-            if array[1] == 0x06:
-                c_x = abscoord(array[2:7])
-                c_y = abscoord(array[7:12])
-                desc = f"Element Array Add ({c_x}μm, {c_y}μm)"
-            if array[1] == 0x07:
-                index = array[2]
-                desc = f"Element Array Mirror ({index})"
-        else:
-            desc = "Unknown Command!"
+                handler = self.handlers.get(command.name)
+                if handler is not None:
+                    handler(self, *record.values)
         if self.channel:
             prefix = f"{offset:06x}" if offset is not None else ""
-            self.channel(f"{prefix}-**-> {str(bytes(array).hex())}\t({desc})")
+            self.channel(
+                f"{prefix}-**-> {str(bytes(array).hex())}\t({record.describe()})"
+            )
+
+    def _axis_x_move(self, value):
+        self.x += value
+
+    def _axis_z_move(self, value):
+        self.z += value
+
+    def _move_abs_xy(self, x, y):
+        self.plot_location(x * self.scale, y * self.scale, 0)
+
+    def _move_rel_xy(self, dx, dy):
+        self.plot_location(self.x + dx * self.scale, self.y + dy * self.scale, 0)
+
+    def _move_rel_x(self, dx):
+        self.plot_location(self.x + dx * self.scale, self.y, 0)
+
+    def _move_rel_y(self, dy):
+        self.plot_location(self.x, self.y + dy * self.scale, 0)
+
+    def _cut_abs_xy(self, x, y):
+        self.plot_location(x * self.scale, y * self.scale, 1)
+
+    def _cut_rel_xy(self, dx, dy):
+        self.plot_location(self.x + dx * self.scale, self.y + dy * self.scale, 1)
+
+    def _cut_rel_x(self, dx):
+        self.plot_location(self.x + dx * self.scale, self.y, 1)
+
+    def _cut_rel_y(self, dy):
+        self.plot_location(self.x, self.y + dy * self.scale, 1)
+
+    def _min_power_1(self, power):
+        self.power1_min = power
+        self.power = power * 10  # 1000 / 100
+
+    def _max_power_1(self, power):
+        self.power1_max = power
+        self.power = power * 10  # 1000 / 100
+
+    def _min_power_2(self, power):
+        self.power2_min = power
+
+    def _max_power_2(self, power):
+        self.power2_max = power
+
+    def _min_power_1_part(self, part, power):
+        self.power1_min = power
+
+    def _max_power_1_part(self, part, power):
+        self.power1_max = power
+
+    def _frequency_part(self, laser, part, frequency):
+        self.frequency = frequency
+
+    def _speed_laser_1(self, speed):
+        self.plot_commit()
+        self.speed = speed
+
+    def _speed_laser_1_part(self, part, speed):
+        self.plot_commit()
+        self.speed = speed
+
+    def _layer_color(self, color):
+        self.plot_commit()
+        self.set_color(color)
+
+    def _layer_color_part(self, part, color):
+        self.set_color(color)
+
+    def _end_of_file(self):
+        self.plot_commit()
+        try:
+            self._driver.plot_start()
+        except AttributeError:
+            pass
+
+    def _block_end(self):
+        self.plot_commit()
+
+    # Commands changing the job state, by the command name in the rddecoder table.
+    handlers = {
+        "AXIS_X_MOVE": _axis_x_move,
+        "AXIS_Z_MOVE": _axis_z_move,
+        "MOVE_ABS_XY": _move_abs_xy,
+        "MOVE_REL_XY": _move_rel_xy,
+        "MOVE_REL_X": _move_rel_x,
+        "MOVE_REL_Y": _move_rel_y,
+        "CUT_ABS_XY": _cut_abs_xy,
+        "CUT_REL_XY": _cut_rel_xy,
+        "CUT_REL_X": _cut_rel_x,
+        "CUT_REL_Y": _cut_rel_y,
+        "MIN_POWER_1": _min_power_1,
+        "MAX_POWER_1": _max_power_1,
+        "MIN_POWER_2": _min_power_2,
+        "MAX_POWER_2": _max_power_2,
+        "MIN_POWER_1_PART": _min_power_1_part,
+        "MAX_POWER_1_PART": _max_power_1_part,
+        "FREQUENCY_PART": _frequency_part,
+        "SPEED_LASER_1": _speed_laser_1,
+        "SPEED_LASER_1_PART": _speed_laser_1_part,
+        "LAYER_COLOR": _layer_color,
+        "LAYER_COLOR_PART": _layer_color_part,
+        "END_OF_FILE": _end_of_file,
+        "BLOCK_END": _block_end,
+    }
 
     def decode_reply(self, reply):
         '''Decode a reply which received in response to a command.
@@ -1361,10 +884,10 @@ class RDJob:
         return _mem, _v, _decoded
 
     def unswizzle(self, data):
-        return bytes([self.lut_unswizzle[b] for b in data])
+        return bytes(data).translate(self._unswizzle_table)
 
     def swizzle(self, data):
-        return bytes([self.lut_swizzle[b] for b in data])
+        return bytes(data).translate(self._swizzle_table)
 
     def _calculate_layer_bounds(self, layer):
         max_x = float("-inf")
@@ -66,6 +66,9 @@ class RuidaSession:
         self.acks = 0
         self.naks = 0
         self.replies = 0
+        # Bytes of the PackedJob packets acknowledged (UDP) or written (USB).
+        # Other messages, e.g. status queries, are not counted.
+        self.sent_bytes = 0
         self.enqs = 0
         self.dropped_packets = 0
 
@@ -194,6 +197,14 @@ class RuidaSession:
                 continue
         # self.send(data) # TODO: Where this goes is not known at this time.
 
+    def write_packet(self, packet):
+        '''Queue a packet of a PackedJob for transmission.
+
+        The packet is a memoryview which is already swizzled, and preceded by its
+        checksum for UDP, so it is written as is. Raises ConnectionError like write.
+        '''
+        self.write(memoryview(packet))
+
     def _package(self, data):
         _data = self.swizzle(data)
         if self.interface == 'udp':
@@ -335,11 +346,17 @@ class RuidaSession:
                 if self._shutdown or _message is None:
                     continue
                 # Transition
-                # Check for only KNOWN command expecting a reply.
-                if (_message[0] == 0xDA
-                        and _message[1] != 0x01): # 0x01 is a memory set -- no reply.
-                    self._reply_pending = True
-                _packet = self._package(_message)
+                if isinstance(_message, memoryview):
+                    # Packet of a PackedJob, swizzled and checksummed.
+                    _packet = _message
+                    _job_bytes = len(_packet)
+                else:
+                    _job_bytes = 0
+                    # Check for only KNOWN command expecting a reply.
+                    if (_message[0] == 0xDA
+                            and _message[1] != 0x01): # 0x01 is a memory set -- no reply.
+                        self._reply_pending = True
+                    _packet = self._package(_message)
                 try:
                     self.transport.write(_packet)
                 except TransportError:
@@ -347,6 +364,8 @@ class RuidaSession:
                 self.sends += 1
                 if self.interface == 'udp':
                     self._ack_pending = True
+                else:
+                    self.sent_bytes += _job_bytes
 
                 # ACK_PENDING
                 _tries = self._tries
@@ -374,6 +393,7 @@ class RuidaSession:
                             self._responding = True
                             self._ack_pending = False
                             self.acks += 1
+                            self.sent_bytes += _job_bytes
                         elif _ack == NAK:
                             try:
                                 self.transport.write(_packet)
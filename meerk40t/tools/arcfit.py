@@ -0,0 +1,269 @@
+"""
+Arc fitting of curves.
+
+Controllers that execute circular arcs natively (G2/G3) need far fewer commands for a
+curve approximated by arcs than for the same curve flattened into short lines.
+
+Quadratic and cubic beziers are approximated by biarcs: two tangent-continuous arcs
+meeting the curve tangents at both ends. A span that does not fit within the tolerance
+is split in half and each half fit again. Points are complex numbers.
+
+The results are lists of motions:
+    ("line", end)
+    ("arc", end, center, ccw)
+where ccw is True for counterclockwise arcs with the y-axis pointing up, this is G3.
+"""
+
+from math import atan2, sqrt, tau
+
+# Arcs with a radius larger than this many tolerances are emitted as lines, G2/G3
+# controllers lose precision on nearly straight arcs.
+MAX_RADIUS_FACTOR = 1e6
+
+# The curve is checked at samples against a share of the tolerance, this leaves a
+# margin for the deviation between the samples.
+SAMPLES = 16
+SAMPLE_MARGIN = 0.9
+MAX_DEPTH = 12
+
+
+def _dot(a, b):
+    return a.real * b.real + a.imag * b.imag
+
+
+def _cross(a, b):
+    return a.real * b.imag - a.imag * b.real
+
+
+def bezier_point(points, t):
+    """
+    Point at t of the quadratic or cubic bezier defined by points.
+    """
+    if len(points) == 3:
+        p0, p1, p2 = points
+        mt = 1 - t
+        return mt * mt * p0 + 2 * mt * t * p1 + t * t * p2
+    p0, p1, p2, p3 = points
+    mt = 1 - t
+    return (
+        mt * mt * mt * p0
+        + 3 * mt * mt * t * p1
+        + 3 * mt * t * t * p2
+        + t * t * t * p3
+    )
+
+
+def bezier_tangent(points, t):
+    """
+    Direction of the bezier at t, a unit complex or 0 for a curve without direction.
+    """
+    if len(points) == 3:
+        p0, p1, p2 = points
+        d = 2 * (1 - t) * (p1 - p0) + 2 * t * (p2 - p1)
+    else:
+        p0, p1, p2, p3 = points
+        mt = 1 - t
+        d = 3 * mt * mt * (p1 - p0) + 6 * mt * t * (p2 - p1) + 3 * t * t * (p3 - p2)
+    if abs(d) < 1e-12:
+        # Cusp or coincident control point, use the direction towards a nearby point.
+        near = 1e-4 if t < 0.5 else -1e-4
+        d = bezier_point(points, t + near) - bezier_point(points, t)
+        if near < 0:
+            d = -d
+    length = abs(d)
+    if length < 1e-12:
+        return 0
+    return d / length
+
+
+def arc_through(start, control, end):
+    """
+    Center and orientation of the circle through three points.
+
+    @return: center, ccw or None, None if the points are collinear
+    """
+    a = control - start
+    b = end - control
+    cross = _cross(a, b)
+    if abs(cross) < 1e-12 * max(abs(a), abs(b), 1.0) ** 2:
+        return None, None
+    d = 2 * (
+        start.real * (control.imag - end.imag)
+        + control.real * (end.imag - start.imag)
+        + end.real * (start.imag - control.imag)
+    )
+    s2 = abs(start) ** 2
+    c2 = abs(control) ** 2
+    e2 = abs(end) ** 2
+    cx = (
+        s2 * (control.imag - end.imag)
+        + c2 * (end.imag - start.imag)
+        + e2 * (start.imag - control.imag)
+    ) / d
+    cy = (
+        s2 * (end.real - control.real)
+        + c2 * (start.real - end.real)
+        + e2 * (control.real - start.real)
+    ) / d
+    return complex(cx, cy), cross > 0
+
+
+def _arc_from_tangent(start, tangent, end):
+    """
+    Circle starting at start in the direction of tangent and passing through end.
+
+    @return: center, ccw or None, None if the arc is a straight line
+    """
+    chord = end - start
+    normal = tangent * 1j
+    denominator = 2 * _dot(normal, chord)
+    if abs(denominator) < 1e-12 * max(abs(chord), 1.0):
+        return None, None
+    return start + normal * (_dot(chord, chord) / denominator), _cross(tangent, chord) > 0
+
+
+def biarc(start, start_tangent, end, end_tangent):
+    """
+    Biarc between two points with unit tangents, the joint is chosen such that both
+    arcs have equal tangent lengths.
+
+    @return: joint point or None if no biarc exists
+    """
+    v = end - start
+    t = start_tangent + end_tangent
+    vt = _dot(v, t)
+    vv = _dot(v, v)
+    denominator = 2 * (1 - _dot(start_tangent, end_tangent))
+    if abs(denominator) < 1e-12:
+        # Parallel tangents.
+        vt2 = _dot(v, end_tangent)
+        if abs(vt2) < 1e-12:
+            return None
+        d = vv / (4 * vt2)
+    else:
+        discriminant = vt * vt + denominator * vv
+        if discriminant < 0:
+            return None
+        d = (-vt + sqrt(discriminant)) / denominator
+    if d <= 0:
+        return None
+    return (start + end + d * (start_tangent - end_tangent)) / 2
+
+
+def _angle(p, center):
+    return atan2(p.imag - center.imag, p.real - center.real)
+
+
+def arc_distance(p, start, end, center, ccw):
+    """
+    Distance of p to the arc from start to end around center.
+    """
+    radius = abs(start - center)
+    a_start = _angle(start, center)
+    sweep = (_angle(end, center) - a_start) % tau
+    position = (_angle(p, center) - a_start) % tau
+    if not ccw:
+        sweep = (tau - sweep) % tau
+        position = (tau - position) % tau
+    if position <= sweep:
+        return abs(abs(p - center) - radius)
+    return min(abs(p - start), abs(p - end))
+
+
+def line_distance(p, start, end):
+    """
+    Distance of p to the line segment from start to end.
+    """
+    d = end - start
+    length2 = _dot(d, d)
+    if length2 == 0:
+        return abs(p - start)
+    t = max(0.0, min(1.0, _dot(p - start, d) / length2))
+    return abs(p - (start + t * d))
+
+
+def _motion(start, tangent, end, tolerance):
+    """
+    Arc from start with tangent to end, or a line if the arc is nearly straight.
+    """
+    center, ccw = _arc_from_tangent(start, tangent, end)
+    if center is None or abs(center - start) > MAX_RADIUS_FACTOR * tolerance:
+        return ("line", end)
+    return ("arc", end, center, ccw)
+
+
+def _deviation(motion, start, p):
+    if motion[0] == "line":
+        return line_distance(p, start, motion[1])
+    return arc_distance(p, start, motion[1], motion[2], motion[3])
+
+
+def _fit(points, t0, t1, p0, p1, tolerance, depth, results):
+    d0 = bezier_tangent(points, t0)
+    d1 = bezier_tangent(points, t1)
+    motions = None
+    if abs(p1 - p0) <= tolerance:
+        motions = [(p0, ("line", p1))]
+    elif d0 != 0 and d1 != 0:
+        joint = biarc(p0, d0, p1, d1)
+        if joint is not None:
+            first = _motion(p0, d0, joint, tolerance)
+            # Second arc is the reverse of an arc leaving the end against its tangent.
+            second = _motion(p1, -d1, joint, tolerance)
+            if second[0] == "arc":
+                second = ("arc", p1, second[2], not second[3])
+            else:
+                second = ("line", p1)
+            motions = [(p0, first), (joint, second)]
+    if motions is not None:
+        limit = tolerance * SAMPLE_MARGIN
+        for k in range(1, SAMPLES):
+            p = bezier_point(points, t0 + (t1 - t0) * k / SAMPLES)
+            if min(_deviation(m, start, p) for start, m in motions) > limit:
+                motions = None
+                break
+    if motions is None:
+        if depth >= MAX_DEPTH:
+            results.append(("line", p1))
+            return
+        tm = (t0 + t1) / 2
+        pm = bezier_point(points, tm)
+        _fit(points, t0, tm, p0, pm, tolerance, depth + 1, results)
+        _fit(points, tm, t1, pm, p1, tolerance, depth + 1, results)
+        return
+    results.extend(m for start, m in motions)
+
+
+def fit_bezier(points, tolerance):
+    """
+    Approximates a quadratic (3 points) or cubic (4 points) bezier with biarcs.
+
+    @param points: complex control points
+    @param tolerance: permitted distance between curve and arcs
+    @return: list of motions ending at the last point
+    """
+    points = tuple(complex(p) for p in points)
+    results = []
+    _fit(points, 0.0, 1.0, points[0], points[-1], tolerance, 0, results)
+    return results
+
+
+def fit_arc(start, control, end, tolerance):
+    """
+    Motions of the circular arc from start through control to end. A closed arc
+    (start equals end) is split at control into two halves, controllers treat an
+    arc ending at its start ambiguously.
+    """
+    start = complex(start)
+    control = complex(control)
+    end = complex(end)
+    if start == end:
+        if start == control:
+            return []
+        center = (start + control) / 2
+        # Closed arcs run with increasing angles, see Geomstr.arc_sweep.
+        return [("arc", control, center, True), ("arc", end, center, True)]
+    center, ccw = arc_through(start, control, end)
+    if center is None or abs(center - start) > MAX_RADIUS_FACTOR * tolerance:
+        return [("line", end)]
+    return [("arc", end, center, ccw)]
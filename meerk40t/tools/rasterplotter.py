@@ -125,6 +125,7 @@ class RasterPlotter:
         filter=None,
         laserspot=0,
         special=None,
+        pixels=None,
     ):
         """
         Initialization for the Raster Plotter function. This should set all the needed parameters for plotting.
@@ -154,6 +155,8 @@ class RasterPlotter:
                        of black pixels on the same line / on the same column), timewise okayish
         @param laserspot: the laserbeam diameter in pixels (low dpi = irrelevant, high dpi very relevant)
         @param special: a dict of special treatment instructions for the different algorithms
+        @param pixels: optional uint8 (or bool) numpy array of the data, indexed [y, x], or the "L" / "1" image
+                    of the data. Enables the vectorized horizontal and vertical rastering, see _plot_runs.
         """
         # Don't try to plot from two different sources at the same time...
         self._locked = False
@@ -203,6 +206,8 @@ class RasterPlotter:
         self.step_x = step_x
         self.step_y = step_y
         self.filter = filter
+        self._pixels = None
+        self._prepare_pixels(pixels)
         self.initial_x, self.initial_y = self.calculate_first_pixel()
         self.final_x, self.final_y = self.calculate_last_pixel()
         self._distance_travel = 0
@@ -224,6 +229,57 @@ class RasterPlotter:
     def reset(self):
         self._cache = None
 
+    def _prepare_pixels(self, pixels):
+        """
+        Lookup tables of the filtered values of all 256 pixel values, the same values px() gives for them.
+
+        self._skipped: pixel value is the skip pixel
+        self._run_codes: code of the value within a pixel chain, 0 for pixels that are off
+        self._run_values: values of the codes
+        """
+        if pixels is None:
+            return
+        pixels = np.asarray(pixels)
+        if pixels.dtype not in (np.uint8, np.bool_) or pixels.shape != (
+            self.height,
+            self.width,
+        ):
+            return
+        try:
+            values = [
+                value if self.filter is None else self.filter(value)
+                for value in range(256)
+            ]
+            skipped = np.array([value == self.skip_pixel for value in values], dtype=bool)
+            codes = {}
+            run_values = [0]
+            run_codes = np.zeros(256, dtype=np.uint16)
+            for value, filtered in enumerate(values):
+                on = 0 if skipped[value] else filtered
+                if not on:
+                    continue
+                code = codes.get(on)
+                if code is None:
+                    code = len(run_values)
+                    codes[on] = code
+                    run_values.append(on)
+                run_codes[value] = code
+        except (TypeError, ValueError):
+            # Filter does not accept or give plain pixel values.
+            return
+        if pixels.dtype == np.bool_:
+            # Mode "1" images give 0 or 255 pixels. The bytes of a bool array are 0 and 1, or 0 and 255 for
+            # the array of an image, so index the tables with them, every nonzero byte as 255, instead of copying.
+            pixels = pixels.view(np.uint8)
+            on = np.full(256, 255)
+            on[0] = 0
+            skipped = skipped[on]
+            run_codes = run_codes[on]
+        self._pixels = pixels
+        self._skipped = skipped
+        self._run_codes = run_codes
+        self._run_values = run_values
+
     def px(self, x, y):
         """
         Returns the filtered pixel value at the given coordinates.
@@ -244,6 +300,8 @@ class RasterPlotter:
 
         if all pixels skipped returns None
         """
+        if self._pixels is not None:
+            return self._first_unskipped(y, True, False)
         for x in range(self.width):
             pixel = self.px(x, y)
             if pixel != self.skip_pixel:
@@ -256,6 +314,8 @@ class RasterPlotter:
 
         if all pixels skipped returns None
         """
+        if self._pixels is not None:
+            return self._first_unskipped(x, False, False)
         for y in range(self.height):
             pixel = self.px(x, y)
             if pixel != self.skip_pixel:
@@ -268,6 +328,8 @@ class RasterPlotter:
 
         if all pixels skipped returns None
         """
+        if self._pixels is not None:
+            return self._first_unskipped(y, True, True)
         for x in range(self.width - 1, -1, -1):
             pixel = self.px(x, y)
             if pixel != self.skip_pixel:
@@ -280,12 +342,41 @@ class RasterPlotter:
 
         if all pixels skipped returns None
         """
+        if self._pixels is not None:
+            return self._first_unskipped(x, False, True)
         for y in range(self.height - 1, -1, -1):
             pixel = self.px(x, y)
             if pixel != self.skip_pixel:
                 return y
         return None
 
+    def _first_unskipped(self, index, row, reverse):
+        """
+        Vectorized search of the *_not_equal methods.
+
+        @param index: y of the row or x of the column
+        @param row: search the row, otherwise the column
+        @param reverse: search from the right or bottom
+        @return: first position not equal to the skip pixel, None if all pixels are skipped
+        """
+        if row:
+            if not 0 <= index < self.height:
+                raise IndexError
+            line = self._pixels[index]
+        else:
+            if not 0 <= index < self.width:
+                raise IndexError
+            line = self._pixels[:, index]
+        if not len(line):
+            return None
+        unskipped = ~self._skipped[line]
+        if reverse:
+            unskipped = unskipped[::-1]
+        position = int(unskipped.argmax())
+        if not unskipped[position]:
+            return None
+        return len(line) - 1 - position if reverse else position
+
     @property
     def distance_travel(self):
         return self._distance_travel
@@ -663,10 +754,31 @@ class RasterPlotter:
                         )
                         print(f"Image dimensions: {self.width}x{self.height}")
             else:
-                data = list(self._plot_pixels())
+                data = self._plot_runs()
+                if data is None:
+                    data = list(self._plot_pixels())
             self._cache = data
         else:
             data = self._cache
+        if isinstance(data, tuple):
+            # Run arrays of _plot_runs, the distances are calculated in bulk.
+            xs, ys, codes, whole = data
+            px, py, nx, ny = self._run_arrays_in_scene(data)
+            values = np.array(self._run_values, dtype=object)[codes].tolist()
+            if self.use_integers:
+                yield from zip(
+                    nx.astype(np.int64).tolist(), ny.astype(np.int64).tolist(), values
+                )
+            else:
+                # int positions and int offset and step give int values, as they do below.
+                line = np.ones(len(codes), dtype=bool)
+                yield from zip(
+                    self._run_positions(px, offset_x, step_x, whole if self.horizontal else line),
+                    self._run_positions(py, offset_y, step_y, line if self.horizontal else whole),
+                    values,
+                )
+            self._locked = False
+            return
         last_x = offset_x
         last_y = offset_y
         if self.use_integers:
@@ -725,6 +837,56 @@ class RasterPlotter:
                     last_y = ny
         self._locked = False
 
+    def _run_arrays_in_scene(self, data):
+        """
+        Scene positions of the run arrays of _plot_runs, and the travel and burn distances of the plot.
+
+        @return: x, y positions, and rounded x, y positions
+        """
+        xs, ys, codes, whole = data
+        px = self.offset_x + self.step_x * xs
+        py = self.offset_y + ys * self.step_y
+        nx = np.rint(px)
+        ny = np.rint(py)
+        dx = np.diff(nx, prepend=self.offset_x)
+        dy = np.diff(ny, prepend=self.offset_y)
+        distance = np.sqrt(dx * dx + dy * dy)
+        on = codes != 0
+        self._distance_burn = float(distance[on].sum())
+        self._distance_travel = float(distance[~on].sum())
+        return px, py, nx, ny
+
+    def plot_arrays(self):
+        """
+        The plot as numpy arrays: int64 x and y positions and float64 values, the values plot() yields with
+        use_integers. The vectorized horizontal and vertical rastering gives these without building the tuples,
+        other traversals are collected from plot().
+
+        @return: x, y, on arrays
+        """
+        if self.use_integers and self.debug_level == 0 and self.initial_x is not None:
+            while self._locked:
+                sleep(0.1)
+            self._locked = True
+            data = self._cache
+            if data is None:
+                data = self._plot_runs()
+                if data is not None:
+                    self._cache = data
+            if isinstance(data, tuple):
+                codes = data[2]
+                px, py, nx, ny = self._run_arrays_in_scene(data)
+                values = np.asarray(self._run_values, dtype=float)[codes]
+                self._locked = False
+                return nx.astype(np.int64), ny.astype(np.int64), values
+            self._locked = False
+        plotted = list(self.plot())
+        if not plotted:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        xs, ys, on = zip(*plotted)
+        return np.array(xs), np.array(ys), np.array(on, dtype=float)
+
     def _plot_pixels(self):
         legacy = self.special.get("legacy", False)
         if self.direction in (RASTER_GREEDY_H, RASTER_GREEDY_V):
@@ -749,6 +911,179 @@ class RasterPlotter:
                 yield from self._plot_vertical()
             # yield from self._plot_vertical()
 
+    @staticmethod
+    def _run_positions(positions, offset, step, whole):
+        """
+        Plotted positions as python numbers, int where offset, step and position are int.
+        """
+        positions = positions.tolist()
+        if isinstance(offset, int) and isinstance(step, int):
+            for index in np.flatnonzero(whole).tolist():
+                positions[index] = int(positions[index])
+        return positions
+
+    def _scanline_runs(self, horizontal):
+        """
+        Pixel chains of all scanlines, see _get_pixel_chains.
+
+        @param horizontal: scanlines are rows, otherwise columns
+        @return: starts, ends, codes of the chains ordered by scanline and start, index of the first chain of
+            every scanline
+        """
+        pixels = self._pixels if horizontal else self._pixels.T
+        codes = self._run_codes[pixels]
+        count, length = codes.shape
+        change = np.ones(codes.shape, dtype=bool)
+        np.not_equal(codes[:, 1:], codes[:, :-1], out=change[:, 1:])
+        lines, starts = np.nonzero(change)
+        run_codes = codes[lines, starts]
+        ends = np.empty_like(starts)
+        ends[:-1] = starts[1:] - 1
+        ends[-1] = length - 1
+        ends[:-1][lines[1:] != lines[:-1]] = length - 1
+        on = run_codes != 0
+        lines = lines[on]
+        bounds = np.searchsorted(lines, np.arange(count + 1))
+        return starts[on], ends[on], run_codes[on], bounds
+
+    def _plot_runs(self):
+        """
+        Vectorized _plot_horizontal and _plot_vertical. The chains of all scanlines are found with numpy, and
+        every scanline is plotted as arrays rather than tuple by tuple.
+
+        This requires the pixels array and no overlap, the overlap blanks pixels of the following scanlines
+        while plotting.
+
+        @return: x, y and code arrays of the plot, mask of the positions along the scanline that are int,
+            or None if it does not apply
+        """
+        if (
+            self._pixels is None
+            or self.overlap
+            or self.special.get("legacy", False)
+            or self.direction
+            in (
+                RASTER_GREEDY_H,
+                RASTER_GREEDY_V,
+                RASTER_CROSSOVER,
+                RASTER_SPIRAL,
+                RASTER_DIAGONAL,
+            )
+        ):
+            return None
+        if (
+            self.initial_x is None
+            or self.final_x is None
+            or self.initial_y is None
+            or self.final_y is None
+        ):
+            empty = np.zeros(0)
+            return empty, empty, np.zeros(0, dtype=np.uint16), np.zeros(0, dtype=bool)
+        horizontal = self.horizontal
+        # Positions along the scanline (pos) and of the scanline (line).
+        if horizontal:
+            first_line, last_line = self.initial_y, self.final_y
+            last_pos = self.initial_x
+            forward_line = self.start_minimum_y
+            dpos = 1 if self.start_minimum_x else -1
+        else:
+            first_line, last_line = self.initial_x, self.final_x
+            last_pos = self.initial_y
+            forward_line = self.start_minimum_x
+            dpos = 1 if self.start_minimum_y else -1
+        lower = min(first_line, last_line)
+        upper = max(first_line, last_line)
+        if forward_line:
+            dline = 1
+            lines = range(lower, upper + 1)
+        else:
+            dline = -1
+            lines = range(upper, lower - 1, -1)
+        starts, ends, codes, bounds = self._scanline_runs(horizontal)
+        overscan = self.overscan
+        bidirectional = self.bidirectional
+        pos_parts = []
+        line_parts = []
+        code_parts = []
+        # Positions _plot_horizontal and _plot_vertical give as int rather than chain edges.
+        whole_parts = []
+        whole = True
+        first = True
+        for line in lines:
+            a = bounds[line]
+            b = bounds[line + 1]
+            if a == b:
+                # Just climb the line, and don't change directions
+                pos_parts.append((last_pos,))
+                line_parts.append((line,))
+                code_parts.append((0,))
+                whole_parts.append((whole,))
+                continue
+            low = int(starts[a])
+            high = int(ends[b - 1])
+            head_pos = []
+            head_line = []
+            overscan_low = 0 if dpos >= 0 else overscan
+            overscan_high = 0 if dpos <= 0 else overscan
+            if not first and low - overscan_low <= last_pos <= high + overscan_high:
+                # Inside the chain, move to the side
+                if dpos > 0 and bidirectional:
+                    last_pos = low - overscan_low - 1
+                else:
+                    last_pos = high + overscan_high + 1
+                whole = True
+                head_pos.append(last_pos)
+                head_line.append(line - dline)
+            head_pos.append(last_pos)
+            head_line.append(line)
+            if dpos > 0:
+                sp = starts[a:b] - 0.5
+                ep = ends[a:b] + 0.5
+                on = codes[a:b]
+            else:
+                sp = ends[a:b][::-1] + 0.5
+                ep = starts[a:b][::-1] - 0.5
+                on = codes[a:b][::-1]
+            # Travel to the start of a chain unless the previous chain ends there.
+            travel = np.empty(len(sp), dtype=bool)
+            travel[0] = last_pos != sp[0]
+            np.not_equal(ep[:-1], sp[1:], out=travel[1:])
+            burn_index = np.arange(len(sp)) + np.cumsum(travel)
+            count = len(head_pos) + int(burn_index[-1]) + 1
+            positions = np.empty(count)
+            positions[: len(head_pos)] = head_pos
+            run_codes = np.zeros(count, dtype=np.uint16)
+            burn_index += len(head_pos)
+            positions[burn_index] = ep
+            positions[burn_index[travel] - 1] = sp[travel]
+            run_codes[burn_index] = on
+            line_values = np.full(count, line)
+            line_values[: len(head_line)] = head_line
+            whole_values = np.zeros(count, dtype=bool)
+            whole_values[: len(head_pos)] = whole
+            last_pos = float(ep[-1])
+            whole = False
+            pos_parts.append(positions)
+            line_parts.append(line_values)
+            code_parts.append(run_codes)
+            whole_parts.append(whole_values)
+            if overscan:
+                last_pos += dpos * overscan
+                pos_parts.append((last_pos,))
+                line_parts.append((line,))
+                code_parts.append((0,))
+                whole_parts.append((False,))
+            if bidirectional:
+                dpos = -dpos
+            first = False
+        positions = np.concatenate(pos_parts).astype(float)
+        line_values = np.concatenate(line_parts).astype(float)
+        run_codes = np.concatenate(code_parts).astype(np.uint16)
+        whole_values = np.concatenate(whole_parts).astype(bool)
+        if horizontal:
+            return positions, line_values, run_codes, whole_values
+        return line_values, positions, run_codes, whole_values
+
     def _debug_data(self, force=False):
         if self.debug_level < 3 and not force:
             return
@@ -1651,14 +1986,19 @@ class RasterPlotter:
 
         t0 = perf_counter()
         # initialize the matrix
-        image = np.empty((self.width, self.height))
-        # Apply filter and eliminate skip_pixel
-        for x in range(self.width):
-            for y in range(self.height):
-                px = self.px(x, y)
-                if px == self.skip_pixel:
-                    px = 0
-                image[x, y] = px
+        if self._pixels is not None:
+            # Filtered values with the skip_pixel eliminated, from the prepared pixels.
+            values = np.asarray(self._run_values, dtype=float)
+            image = values[self._run_codes[self._pixels]].T
+        else:
+            image = np.empty((self.width, self.height))
+            # Apply filter and eliminate skip_pixel
+            for x in range(self.width):
+                for y in range(self.height):
+                    px = self.px(x, y)
+                    if px == self.skip_pixel:
+                        px = 0
+                    image[x, y] = px
         t1 = perf_counter()
         results = process_image(image)
         results.sort()
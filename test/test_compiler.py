@@ -0,0 +1,147 @@
+"""
+Headless job compiler.
+
+Verifies that:
+1. `meerk40t compile` writes the driver output of grbl, lihuiyu and ruida devices
+2. Compiling a file twice writes the same bytes, the operations of the user are neither
+   read nor written
+3. Files compiled in worker processes are identical to files compiled serially
+4. Files which cannot be loaded are reported and fail the run
+5. Compiling never imports wxPython
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from meerk40t import compiler, main
+from meerk40t.core import parallel
+from meerk40t.ruida.rdjob import RDJob
+
+SVG = """<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="50mm" height="50mm" viewBox="0 0 50 50">
+<rect x="5" y="5" width="20" height="20" stroke="red" fill="none"/>
+<circle cx="30" cy="30" r="10" stroke="blue" fill="none"/>
+</svg>
+"""
+
+
+class TestCompiler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.files = []
+        for name in ("first.svg", "second design.svg"):
+            filename = os.path.join(self.directory.name, name)
+            with open(filename, "w") as f:
+                f.write(SVG)
+            self.files.append(filename)
+
+    def tearDown(self):
+        parallel.shutdown()
+
+    def compile(self, *args):
+        argv = sys.argv
+        sys.argv = ["meerk40t", "compile", *args]
+        try:
+            return main.run()
+        finally:
+            sys.argv = argv
+
+    def read(self, directory, name):
+        with open(os.path.join(self.directory.name, directory, name), "rb") as f:
+            return f.read()
+
+    def test_compile_devices(self):
+        output = os.path.join(self.directory.name, "grbl")
+        self.assertEqual(self.compile("-d", "grbl", "-o", output, self.files[0]), 0)
+        commands = self.read("grbl", "first.gcode").decode().split()
+        self.assertIn("G1", commands)
+        self.assertNotIn("G2", commands)
+        self.assertEqual(
+            self.compile("-d", "grbl", "-s", "use_arcs=1", "-o", output, self.files[0]),
+            0,
+        )
+        commands = self.read("grbl", "first.gcode").decode().split()
+        self.assertIn("G2", commands)
+
+        self.assertEqual(self.compile("-d", "lhystudios", self.files[0]), 0)
+        egv = self.read("", "first.egv")
+        self.assertTrue(egv.startswith(b"Document type : LHYMICRO-GL file\n"))
+        self.assertGreater(len(egv), 1000)
+
+        self.assertEqual(self.compile("-d", "ruida", "-x", ".rdx", self.files[0]), 0)
+        job = RDJob()
+        job.write_blob(self.read("", "first.rdx"))
+        self.assertEqual(job.magic, 0x88)
+        self.assertGreater(len(job.buffer), 100)
+
+    def test_compile_deterministic(self):
+        for device in ("grbl", "lhystudios", "ruida"):
+            extension = compiler.DEVICE_EXTENSIONS[device]
+            for run in ("first", "second"):
+                output = os.path.join(self.directory.name, device, run)
+                self.assertEqual(
+                    self.compile("-d", device, "-o", output, self.files[0]), 0
+                )
+            self.assertEqual(
+                self.read(device, f"first/first.{extension}"),
+                self.read(device, f"second/first.{extension}"),
+                device,
+            )
+
+    def test_compile_parallel(self):
+        serial = os.path.join(self.directory.name, "serial")
+        workers = os.path.join(self.directory.name, "workers")
+        self.assertEqual(self.compile("-d", "grbl", "-o", serial, *self.files), 0)
+        self.assertEqual(
+            self.compile("-d", "grbl", "-j", "2", "-o", workers, *self.files), 0
+        )
+        for name in ("first.gcode", "second design.gcode"):
+            self.assertEqual(self.read("serial", name), self.read("workers", name))
+
+    def test_compile_failed(self):
+        missing = os.path.join(self.directory.name, "missing.svg")
+        task = (missing, compiler.output_filename(missing, "grbl"), "grbl", [])
+        result = compiler.compile_file(task)
+        self.assertIn("Could not load", result["error"])
+        self.assertIn("shutdown", result["times"])
+        self.assertEqual(self.compile("-d", "grbl", self.files[0], missing), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "first.gcode")))
+
+    def test_compile_without_wx(self):
+        script = """
+import sys
+
+
+class BlockWx:
+    attempts = []
+
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] == "wx":
+            self.attempts.append(name)
+            raise ImportError(name)
+        return None
+
+
+sys.meta_path.insert(0, BlockWx())
+from meerk40t.compiler import compile_file
+
+result = compile_file((sys.argv[1], sys.argv[2], "grbl", []))
+print(result["error"], BlockWx.attempts)
+"""
+        output = os.path.join(self.directory.name, "first.gcode")
+        result = subprocess.run(
+            [sys.executable, "-c", script, self.files[0], output],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(result.strip().split("\n")[-1], "None []")
+        self.assertTrue(os.path.exists(output))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+"""
+Tests for the packed, columnar CutCodeArray.
+
+Verifies that:
+1. Statistics and travel match the per-object calculation of CutCode
+2. Cuts are packed with their kind, settings and current direction
+3. Benchmark: statistics for 20k cuts, per-object vs packed
+"""
+
+import os
+import random
+import time
+import unittest
+
+from meerk40t.core.cutcode.cubiccut import CubicCut
+from meerk40t.core.cutcode.cutcode import CutCode
+from meerk40t.core.cutcode.cutcodearray import (
+    CUT_CUBIC,
+    CUT_LINE,
+    CUT_OBJECT,
+    CUT_QUAD,
+)
+from meerk40t.core.cutcode.cutgroup import CutGroup
+from meerk40t.core.cutcode.dwellcut import DwellCut
+from meerk40t.core.cutcode.linecut import LineCut
+from meerk40t.core.cutcode.quadcut import QuadCut
+from meerk40t.svgelements import Point
+
+
+def reference_statistics(cutcode, include_start=False):
+    """
+    Per-object calculation of the cutcode statistics as it was done by
+    CutCode.provide_statistics before packing.
+    """
+    result = []
+    cutcode_list = list(cutcode.flat())
+    total_distance_travel = 0
+    total_distance_cut = 0
+    total_extra = 0
+    total_duration_cut = 0
+    total_duration_travel = 0
+    total_internal_travel = 0
+    if include_start:
+        start = cutcode.start
+        if start is not None:
+            total_distance_travel += abs(
+                complex(*start) - complex(*cutcode_list[0].start)
+            )
+        else:
+            total_distance_travel += abs(complex(*cutcode_list[0].start))
+    rapid_speed = cutcode._native_speed(cutcode_list)
+    previous_total_time = 0
+    for i, current in enumerate(cutcode_list):
+        duration_of_this_travel = 0
+        duration_of_this_burn = 0
+        length_of_previous_travel = 0
+        if i > 0:
+            prev = cutcode_list[i - 1]
+            length_of_previous_travel = Point.distance(prev.end, current.start)
+            total_distance_travel += length_of_previous_travel
+        if rapid_speed is not None and rapid_speed != 0:
+            total_duration_travel = total_distance_travel / rapid_speed
+            duration_of_this_travel = length_of_previous_travel / rapid_speed
+        current_length = current.internal_length()
+        current_travel = current.internal_travel()
+        total_internal_travel += current_travel
+        total_distance_cut += current_length + current_travel
+        current_extra = current.extra()
+        total_extra += current_extra
+        cs = current.settings
+        native_mm = cs.get("native_mm", 39.3701)
+        native_speed = cs.get("native_speed", cs.get("speed", 0) * native_mm) * 0.91
+        if native_speed != 0:
+            duration_of_this_burn = (current_length + current_travel) / native_speed
+            total_duration_cut += duration_of_this_burn
+        result.append(
+            {
+                "type": type(current).__name__,
+                "total_distance_travel": total_distance_travel,
+                "total_distance_cut": total_distance_cut,
+                "total_time_extra": total_extra,
+                "total_time_travel": total_duration_travel,
+                "total_time_cut": total_duration_cut,
+                "time_at_start": previous_total_time,
+                "time_at_end_of_travel": previous_total_time
+                + duration_of_this_travel,
+                "time_at_end_of_burn": previous_total_time
+                + duration_of_this_travel
+                + current_extra
+                + duration_of_this_burn,
+                "total_internal_travel": total_internal_travel,
+            }
+        )
+        previous_total_time = total_duration_cut + total_duration_travel + total_extra
+    return result
+
+
+def random_cutcode(count, seed=1):
+    random.seed(seed)
+    cutcode = CutCode()
+    rapid = {"speed": 20, "native_rapid_speed": 500}
+    slow = {"speed": 40}
+    dwell = {"dwell_time": 5, "speed": 10}
+
+    def point():
+        return random.randint(0, 10000), random.randint(0, 10000)
+
+    for g in range(count // 10):
+        group = CutGroup(cutcode, closed=True)
+        settings = rapid if g % 2 else slow
+        for i in range(10):
+            r = random.random()
+            if r < 0.6:
+                cut = LineCut(point(), point(), settings=settings, parent=group)
+            elif r < 0.8:
+                cut = QuadCut(point(), point(), point(), settings=settings, parent=group)
+            elif r < 0.95:
+                cut = CubicCut(
+                    point(), point(), point(), point(), settings=settings, parent=group
+                )
+            else:
+                cut = DwellCut(point(), settings=dwell, parent=group)
+            if random.random() < 0.3:
+                cut.reverse()
+            group.append(cut)
+        cutcode.append(group)
+    return cutcode
+
+
+class TestCutCodeArray(unittest.TestCase):
+    def assertStatisticsEqual(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for e, a in zip(expected, actual):
+            self.assertEqual(e["type"], a["type"])
+            for key, value in e.items():
+                if key != "type":
+                    self.assertAlmostEqual(value, a[key], delta=1e-6 * max(1, value))
+
+    def test_statistics_match_cut_objects(self):
+        cutcode = random_cutcode(500)
+        for include_start in (False, True):
+            self.assertStatisticsEqual(
+                reference_statistics(cutcode, include_start),
+                cutcode.provide_statistics(include_start),
+            )
+
+    def test_statistics_with_start(self):
+        cutcode = random_cutcode(100, seed=2)
+        cutcode._start_x, cutcode._start_y = 3000, -2000
+        self.assertStatisticsEqual(
+            reference_statistics(cutcode, True), cutcode.provide_statistics(True)
+        )
+
+    def test_statistics_empty(self):
+        stats = CutCode().provide_statistics()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["total_time_cut"], 0)
+        self.assertEqual(CutCode().length_travel(), 0)
+
+    def test_lengths_match_cut_objects(self):
+        cutcode = random_cutcode(200, seed=3)
+        array = cutcode.as_array()
+        cuts = list(cutcode.flat())
+        self.assertEqual(len(array), len(cuts))
+        for length, cut in zip(array.lengths(), cuts):
+            self.assertAlmostEqual(length, cut.internal_length())
+        travel = 0
+        for i in range(1, len(cuts)):
+            travel += Point.distance(cuts[i - 1].end, cuts[i].start)
+        self.assertAlmostEqual(
+            array.travel_distances().sum(), travel, delta=1e-6 * travel
+        )
+        self.assertAlmostEqual(cutcode.length_travel(), travel, delta=1e-6 * travel)
+
+    def test_length_travel_stop_at(self):
+        cutcode = random_cutcode(50, seed=4)
+        cuts = list(cutcode.flat())
+        travel = Point.distance(cuts[0].end, cuts[1].start) + Point.distance(
+            cuts[1].end, cuts[2].start
+        )
+        self.assertAlmostEqual(cutcode.length_travel(stop_at=3), travel)
+        self.assertAlmostEqual(
+            cutcode.length_travel(include_start=True, stop_at=0), 0
+        )
+
+    def test_kinds(self):
+        settings = dict()
+        cutcode = CutCode()
+        cutcode.append(LineCut((0, 0), (10, 0), settings=settings))
+        cutcode.append(QuadCut((10, 0), (15, 5), (20, 0), settings=settings))
+        cutcode.append(CubicCut((20, 0), (25, 5), (30, 5), (35, 0), settings=settings))
+        cutcode.append(DwellCut((35, 0), settings=settings))
+        array = cutcode.as_array()
+        self.assertEqual(
+            list(array.kind[: len(array)]), [CUT_LINE, CUT_QUAD, CUT_CUBIC, CUT_OBJECT]
+        )
+        self.assertEqual(len(array.settings), 1)
+
+    def test_reversed_cuts(self):
+        settings = dict()
+        cutcode = CutCode()
+        cubic = CubicCut((0, 0), (0, 10), (10, 10), (10, 0), settings=settings)
+        cubic.reverse()
+        cutcode.append(cubic)
+        cutcode.append(LineCut((10, 0), (20, 0), settings=settings))
+        array = cutcode.as_array()
+        self.assertEqual(array.start[0], 10 + 0j)
+        self.assertEqual(array.control1[0], 10 + 10j)
+        self.assertAlmostEqual(array.travel_distances().sum(), 10)
+        self.assertAlmostEqual(array.lengths()[0], 30)
+        self.assertIs(array.objects[0], cubic)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestCutCodeArrayBenchmark(unittest.TestCase):
+    CUTS = 20000
+
+    def test_benchmark_statistics(self):
+        cutcode = random_cutcode(self.CUTS)
+        t0 = time.perf_counter()
+        expected = reference_statistics(cutcode, True)
+        t_objects = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        array = cutcode.as_array()
+        t_pack = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        actual = array.provide_statistics(True, cutcode.settings)
+        t_stats = time.perf_counter() - t0
+        print(
+            f"CutCode statistics {self.CUTS} cuts: objects {t_objects:.4f}s, "
+            f"packing {t_pack:.4f}s, packed statistics {t_stats:.4f}s"
+        )
+        self.assertEqual(len(expected), len(actual))
+        self.assertAlmostEqual(
+            expected[-1]["time_at_end_of_burn"],
+            actual[-1]["time_at_end_of_burn"],
+            delta=1e-6 * expected[-1]["time_at_end_of_burn"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,320 @@
+"""
+Motion model time estimates of cutcode.
+
+Verifies that:
+1. Trapezoidal move times match the closed forms of triangular and cruising moves
+2. Without acceleration and delays the estimate is length over speed, with acceleration it is longer and
+   approaches it for large accelerations
+3. Junction speeds and the speeds along connected cuts match a sequential grbl style planner
+4. Axis speed limits, galvo delays and raster scanlines (blank lines, overscan, unidirectional return)
+   add the expected time
+5. Devices register their motion model, LaserJob, the planner console and the spooler use it
+6. Benchmark: estimate of a large vector job and of a raster job, nominal and motion model
+"""
+
+import os
+import random
+import time
+import unittest
+from math import sqrt
+
+import numpy as np
+from PIL import Image
+
+from meerk40t.core.cutcode.cutcode import CutCode
+from meerk40t.core.cutcode.cutgroup import CutGroup
+from meerk40t.core.cutcode.linecut import LineCut
+from meerk40t.core.cutcode.quadcut import QuadCut
+from meerk40t.core.cutcode.rastercut import RasterCut
+from meerk40t.core.estimator import (
+    MotionModel,
+    device_estimator,
+    raster_scanlines,
+    trapezoid_time,
+)
+from meerk40t.core.laserjob import LaserJob
+from test import bootstrap
+
+
+def settings(speed=10.0, rapid=100.0, native_mm=1.0):
+    return {
+        "native_mm": native_mm,
+        "native_speed": speed * native_mm,
+        "native_rapid_speed": rapid * native_mm,
+    }
+
+
+def polyline(points, cut_settings, closed=False):
+    group = CutGroup(None, settings=cut_settings, closed=closed)
+    for a, b in zip(points, points[1:]):
+        group.append(LineCut(a, b, settings=cut_settings, parent=group))
+    return group
+
+
+def cutcode_of(*groups):
+    cutcode = CutCode()
+    for group in groups:
+        cutcode.extend(group.flat())
+    return cutcode
+
+
+def random_cutcode(rng, paths=20, cut_settings=None):
+    if cut_settings is None:
+        cut_settings = settings()
+    groups = []
+    for _ in range(paths):
+        x, y = rng.uniform(0, 500), rng.uniform(0, 500)
+        points = [(x, y)]
+        for _ in range(rng.randint(1, 20)):
+            x += rng.uniform(-20, 20)
+            y += rng.uniform(-20, 20)
+            points.append((x, y))
+        groups.append(polyline(points, cut_settings))
+    return cutcode_of(*groups)
+
+
+def planner_reference(segments, speed, acceleration, deviation):
+    """
+    Sequential planner: junction limits of grbl, then a backward and a forward pass over the blocks.
+
+    @param segments: list of (start, end) complex points of connected lines
+    @return: total time
+    """
+    n = len(segments)
+    lengths = [abs(e - s) for s, e in segments]
+    limits = [0.0] * (n + 1)
+    for i in range(1, n):
+        u = segments[i - 1][1] - segments[i - 1][0]
+        w = segments[i][1] - segments[i][0]
+        cosine = -(u.real * w.real + u.imag * w.imag) / (abs(u) * abs(w))
+        sine = sqrt(max(0.0, (1 - cosine) / 2))
+        limit = speed * speed
+        if sine < 1 - 1e-9:
+            limit = min(limit, acceleration * deviation * sine / (1 - sine))
+        limits[i] = limit
+    for i in range(n - 1, -1, -1):
+        limits[i] = min(limits[i], limits[i + 1] + 2 * acceleration * lengths[i])
+    for i in range(n):
+        limits[i + 1] = min(limits[i + 1], limits[i] + 2 * acceleration * lengths[i])
+    total = 0.0
+    for i in range(n):
+        w0, w1, d = limits[i], limits[i + 1], lengths[i]
+        # Distances accelerating and decelerating, cruise between them if they do not overlap.
+        peak = min(sqrt((2 * acceleration * d + w0 + w1) / 2), speed)
+        accelerating = (peak * peak - w0) / (2 * acceleration)
+        decelerating = (peak * peak - w1) / (2 * acceleration)
+        total += (peak - sqrt(w0)) / acceleration + (peak - sqrt(w1)) / acceleration
+        total += max(d - accelerating - decelerating, 0) / speed
+    return total
+
+
+def raster(width=100, height=60, blank_rows=(), step=2, overscan=0, bidirectional=True):
+    image = Image.new("L", (width, height), 255)
+    pixels = image.load()
+    for y in range(height):
+        if y in blank_rows:
+            continue
+        for x in range(10 + y % 7, width - 5 - y % 3):
+            pixels[x, y] = 0
+    return RasterCut(
+        image,
+        0,
+        0,
+        step,
+        step,
+        bidirectional=bidirectional,
+        overscan=overscan,
+        settings=settings(speed=200.0, rapid=400.0),
+    )
+
+
+class TestMotionModel(unittest.TestCase):
+    def test_trapezoid(self):
+        # Triangular: 2·sqrt(d/a) from rest to rest.
+        self.assertAlmostEqual(float(trapezoid_time(4.0, 100.0, 1.0)), 4.0)
+        # Cruising: d/v + v/a from rest to rest.
+        self.assertAlmostEqual(float(trapezoid_time(100.0, 10.0, 2.0)), 15.0)
+        # Entering at speed, only decelerating.
+        self.assertAlmostEqual(float(trapezoid_time(50.0, 10.0, 1.0, entry=100.0)), 10.0)
+        # No acceleration.
+        times = trapezoid_time([10.0, 0.0, 10.0], [5.0, 5.0, 0.0], 0.0)
+        self.assertEqual(times.tolist(), [2.0, 0.0, 0.0])
+
+    def test_nominal_and_acceleration(self):
+        rng = random.Random(1)
+        cutcode = random_cutcode(rng)
+        cuts = list(cutcode.flat())
+        length = sum(cut.length() for cut in cuts)
+        travel = sum(
+            abs(complex(*a.end) - complex(*b.start)) for a, b in zip(cuts, cuts[1:])
+        )
+        self.assertAlmostEqual(
+            MotionModel().estimate(cutcode), length / 10.0 + travel / 100.0, places=6
+        )
+        previous = float("inf")
+        for acceleration in (10.0, 100.0, 1000.0, 1e6):
+            estimate = MotionModel(acceleration=acceleration).estimate(cutcode)
+            self.assertLess(estimate, previous)
+            self.assertGreater(estimate, length / 10.0 + travel / 100.0)
+            previous = estimate
+        self.assertAlmostEqual(previous, length / 10.0 + travel / 100.0, places=2)
+        # Curves are estimated like their nominal length.
+        curve = CutCode([QuadCut((0, 0), (50, 100), (100, 0), settings=settings())])
+        self.assertAlmostEqual(
+            MotionModel().estimate(curve), curve.length_cut() / 10.0
+        )
+
+    def test_junctions_match_planner(self):
+        rng = random.Random(2)
+        for trial in range(50):
+            points = [0j]
+            for _ in range(rng.randint(1, 30)):
+                points.append(
+                    points[-1] + complex(rng.uniform(-30, 30), rng.uniform(-30, 30))
+                )
+            if trial % 5 == 0:
+                # Straight runs and reversals.
+                points = [complex(x, 0) for x in (0, 10, 20, 35, 20, 0)]
+            speed = rng.uniform(5, 50)
+            acceleration = rng.uniform(1, 500)
+            deviation = rng.choice((0.01, 0.1, 1.0))
+            group = polyline(
+                [(p.real, p.imag) for p in points], settings(speed=speed, rapid=speed)
+            )
+            model = MotionModel(acceleration=acceleration, junction_deviation=deviation)
+            # LineCut keeps integer coordinates.
+            segments = [
+                (complex(*cut.start), complex(*cut.end)) for cut in group.flat()
+            ]
+            expected = planner_reference(segments, speed, acceleration, deviation)
+            self.assertAlmostEqual(
+                model.estimate(cutcode_of(group)), expected, delta=1e-6 * expected
+            )
+        # A straight line split into parts takes as long as the line.
+        group = polyline([(x, 0) for x in range(0, 101, 5)], settings())
+        model = MotionModel(acceleration=1.0, junction_deviation=0.01)
+        self.assertAlmostEqual(model.estimate(cutcode_of(group)), 20.0)
+
+    def test_axis_limits_and_delays(self):
+        diagonal = cutcode_of(polyline([(0, 0), (30, 40)], settings(speed=10)))
+        self.assertAlmostEqual(MotionModel().estimate(diagonal), 5.0)
+        self.assertAlmostEqual(MotionModel(max_speed_x=3).estimate(diagonal), 10.0)
+        self.assertAlmostEqual(MotionModel(max_speed_y=2).estimate(diagonal), 20.0)
+
+        square = polyline([(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)], settings())
+        far = polyline([(100, 0), (110, 0)], settings())
+        near = polyline([(111, 0), (112, 0)], settings())
+        cutcode = cutcode_of(square, far, near)
+        plain = MotionModel().estimate(cutcode)
+        model = MotionModel(
+            laser_on_delay=1.0,
+            laser_off_delay=10.0,
+            polygon_delay=100.0,
+            jump_delay=1000.0,
+            long_jump_delay=10000.0,
+            long_jump_distance=50,
+        )
+        # Three marks, three corners, a long and a short jump.
+        self.assertAlmostEqual(model.estimate(cutcode) - plain, 3 + 30 + 300 + 11000)
+
+    def test_raster(self):
+        cut = raster(blank_rows=range(20, 30))
+        lengths, moves = raster_scanlines(cut)
+        self.assertEqual(len(lengths), 50)
+        self.assertEqual(len(moves), 49)
+        self.assertEqual(lengths[0], (100 - 5 - 10) * 2)
+        # The move over the blank rows steps 11 lines.
+        self.assertEqual(sorted(np.abs(moves.imag))[-1], 22)
+        overscan = raster_scanlines(raster(overscan=20))[0]
+        self.assertTrue(np.allclose(overscan - raster_scanlines(raster())[0], 20))
+
+        model = MotionModel(acceleration=1000.0, turn_time=0.01)
+        bidirectional = model.estimate(CutCode([raster()]))
+        unidirectional = model.estimate(CutCode([raster(bidirectional=False)]))
+        self.assertGreater(unidirectional, bidirectional)
+        lines = raster_scanlines(raster())[0]
+        burn = float(np.sum(trapezoid_time(lines, 200.0, 1000.0)))
+        self.assertGreater(bidirectional, burn + 59 * 0.01)
+        self.assertGreater(
+            bidirectional, MotionModel().estimate(CutCode([raster()]))
+        )
+
+
+class TestDeviceEstimators(unittest.TestCase):
+    def test_registered_models(self):
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i grbl 0\n")
+            device = kernel.device
+            model = device_estimator(device)
+            self.assertIsInstance(model, MotionModel)
+            self.assertEqual(model.junction_deviation, 0.01)
+            device.hardware_config.update({11: 0.05, 110: 6000, 111: 3000, 120: 800, 121: 500})
+            model = device_estimator(device)
+            self.assertEqual(model.acceleration, 500)
+            self.assertEqual((model.max_speed_x, model.max_speed_y), (100, 50))
+            self.assertEqual(model.junction_deviation, 0.05)
+
+            job = LaserJob("job", [random_cutcode(random.Random(3))], driver=device.driver)
+            self.assertAlmostEqual(
+                job.estimate_time(),
+                model.estimate(job.items[0]),
+            )
+
+            lines = []
+            kernel.channel("console").watch(lines.append)
+            kernel.console(
+                "rect 2cm 2cm 5cm 5cm engrave -s 30 plan copy-selected preprocess validate blob "
+                "preopt optimize estimate\n"
+            )
+            kernel.channel("console").unwatch(lines.append)
+            self.assertTrue(any("Estimated time" in str(line) for line in lines))
+
+            kernel.console("service device start -i balor 0\n")
+            model = device_estimator(kernel.device)
+            self.assertIsNone(model.acceleration)
+            self.assertAlmostEqual(model.laser_on_delay, kernel.device.delay_laser_on / 1e6)
+            kernel.console("service device start -i lhystudios 0\n")
+            model = device_estimator(kernel.device)
+            self.assertTrue(np.all(model.accelerations([10, 100, 400]) > 0))
+            kernel.console("service device start -i moshi 0\n")
+            self.assertIsNone(device_estimator(kernel.device))
+        finally:
+            kernel()
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestEstimatorBenchmark(unittest.TestCase):
+    def test_benchmark_estimate(self):
+        rng = random.Random(4)
+        cutcode = random_cutcode(rng, paths=10000)
+        model = MotionModel(acceleration=1000.0, junction_deviation=0.01, max_speed_x=80)
+        start = time.perf_counter()
+        nominal = cutcode.provide_statistics()[-1]["time_at_end_of_burn"]
+        elapsed_nominal = time.perf_counter() - start
+        start = time.perf_counter()
+        estimate = model.estimate(cutcode)
+        elapsed = time.perf_counter() - start
+        print(
+            f"\n{len(cutcode)} vector cuts: nominal {nominal:.1f}s in {elapsed_nominal:.3f}s, "
+            f"motion model {estimate:.1f}s in {elapsed:.3f}s"
+        )
+
+        cutcode = CutCode([raster(width=1000, height=1000, step=1)])
+        start = time.perf_counter()
+        nominal = cutcode.provide_statistics()[-1]["time_at_end_of_burn"]
+        elapsed_nominal = time.perf_counter() - start
+        start = time.perf_counter()
+        estimate = model.estimate(cutcode)
+        elapsed = time.perf_counter() - start
+        print(
+            f"1000x1000 raster: nominal {nominal:.1f}s in {elapsed_nominal:.3f}s, "
+            f"motion model {estimate:.1f}s in {elapsed:.3f}s"
+        )
+        self.assertGreater(estimate, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
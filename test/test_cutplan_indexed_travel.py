@@ -0,0 +1,246 @@
+"""
+Spatial-index-backed travel optimization.
+
+Verifies that:
+1. PointGrid finds the nearest point, resolving ties by key, while points are removed
+2. short_travel_cutcode_indexed orders cuts exactly as short_travel_cutcode_legacy,
+   including multiple passes and complete subpaths
+3. The indexed group-preserving selection keeps the inner-first order of
+   _group_preserving_selection, including unresolvable containment
+4. Benchmark: the selectors on a scenario produced by CutPlan.save_scenario
+"""
+
+import os
+import random
+import time
+import unittest
+
+from meerk40t.core.cutcode.cutcode import CutCode
+from meerk40t.core.cutcode.cutgroup import CutGroup
+from meerk40t.core.cutcode.linecut import LineCut
+from meerk40t.core.cutplan import (
+    _group_preserving_selection,
+    _improved_greedy_selection,
+    _indexed_group_preserving_selection,
+    inner_first_ident,
+    short_travel_cutcode_indexed,
+    short_travel_cutcode_legacy,
+    short_travel_cutcode_optimized,
+)
+from meerk40t.core.spatial import PointGrid
+from test import bootstrap
+
+
+def random_cutcode(seed, groups, passes=1, closed_fraction=0.5, nested=False):
+    """
+    Random subpaths of up to six segments, linked as path_to_cutobjects does.
+    With nested, some groups contain earlier groups, including a cycle and a
+    reference to a group outside the cutcode.
+    """
+    rnd = random.Random(seed)
+    cutcode = CutCode()
+    for g in range(groups):
+        closed = nested or rnd.random() < closed_fraction
+        group = CutGroup(cutcode, closed=closed)
+        if seed % 2:
+            # Dense rows, many coincident distances.
+            x0, y0 = (g % 20) * 100, (g // 20) * 100
+        else:
+            x0, y0 = rnd.randint(0, 20000), rnd.randint(0, 20000)
+        points = [
+            (x0 + rnd.randint(0, 300), y0 + rnd.randint(0, 300))
+            for _ in range(rnd.randint(2, 7))
+        ]
+        if closed:
+            points[-1] = points[0]
+        for a, b in zip(points, points[1:]):
+            cut = LineCut(a, b, settings={}, passes=passes, parent=group)
+            cut.closed = closed
+            group.append(cut)
+        for i, cut in enumerate(group):
+            cut.first = i == 0
+            cut.last = i == len(group) - 1
+            cut.next = group[i + 1] if i + 1 < len(group) else None
+            cut.previous = group[i - 1] if i > 0 else None
+        if closed:
+            group[-1].next = group[0]
+            group[0].previous = group[-1]
+        cutcode.append(group)
+    if nested:
+        for i, group in enumerate(cutcode):
+            if i > 2 and rnd.random() < 0.4:
+                group.contains = rnd.sample(list(cutcode[:i]), rnd.randint(1, 3))
+        cutcode[1].contains = [cutcode[4]]
+        cutcode[4].contains = (cutcode[4].contains or []) + [cutcode[1]]
+        cutcode[2].contains = [CutGroup(None, closed=True)]
+    cutcode._start_x, cutcode._start_y = rnd.randint(0, 1000), rnd.randint(0, 1000)
+    return cutcode
+
+
+def sequence(cutcode):
+    return [(cut.start, cut.end) for cut in cutcode.flat()]
+
+
+def scenario_cutcode(data, plan):
+    groups, start, original_travel = plan.create_cuts_from_scenario(data)
+    cutcode = CutCode(groups)
+    for group in cutcode:
+        group.parent = cutcode
+    cutcode._start_x, cutcode._start_y = start
+    return cutcode
+
+
+class TestPointGrid(unittest.TestCase):
+    def test_nearest_with_removal(self):
+        rnd = random.Random(3)
+        points = {i: (rnd.randint(0, 5000), rnd.randint(0, 5000)) for i in range(800)}
+        grid = PointGrid.for_points(points.values())
+        for key, (x, y) in points.items():
+            grid.insert(key, x, y)
+        self.assertEqual(len(grid), 800)
+        while points:
+            qx, qy = rnd.randint(-1000, 6000), rnd.randint(-1000, 6000)
+            expected = min(
+                ((x - qx) ** 2 + (y - qy) ** 2, key) for key, (x, y) in points.items()
+            )
+            found = grid.nearest(qx, qy)
+            self.assertEqual(found, expected)
+            grid.remove(found[1])
+            del points[found[1]]
+        self.assertIsNone(grid.nearest(0, 0))
+
+    def test_ties_and_keys(self):
+        grid = PointGrid(10)
+        grid.insert((1, 1), 5, 5)
+        grid.insert((0, 3), 15, 5)
+        grid.insert((2, 0), -5, 5)
+        self.assertEqual(grid.nearest(5, 5), (0, (1, 1)))
+        grid.remove((1, 1))
+        grid.remove((1, 1))
+        self.assertNotIn((1, 1), grid)
+        self.assertEqual(grid.nearest(5, 5), (100, (0, 3)))
+
+
+class TestIndexedTravel(unittest.TestCase):
+    def test_matches_legacy(self):
+        for seed in range(12):
+            for passes in (1, 2):
+                for complete_path in (False, True):
+                    groups = random.Random(seed).randint(5, 150)
+                    expected = short_travel_cutcode_legacy(
+                        random_cutcode(seed, groups, passes), complete_path=complete_path
+                    )
+                    actual = short_travel_cutcode_indexed(
+                        random_cutcode(seed, groups, passes), complete_path=complete_path
+                    )
+                    self.assertEqual(sequence(expected), sequence(actual))
+                    self.assertEqual(actual.start, expected.start)
+
+    def test_skip_groups(self):
+        for hatch_optimize in (False, True):
+            results = []
+            for optimizer in (short_travel_cutcode_legacy, short_travel_cutcode_indexed):
+                cutcode = random_cutcode(5, 40)
+                for group in cutcode[::3]:
+                    group.skip = True
+                results.append(
+                    sequence(optimizer(cutcode, hatch_optimize=hatch_optimize))
+                )
+            self.assertEqual(results[0], results[1])
+
+    def test_group_preserving_matches(self):
+        for seed in range(12):
+            for complete_path in (False, True):
+                groups = random.Random(seed).randint(6, 200)
+                expected = _group_preserving_selection(
+                    random_cutcode(seed, groups, nested=True), complete_path, None
+                )
+                actual = _indexed_group_preserving_selection(
+                    random_cutcode(seed, groups, nested=True), complete_path, None
+                )
+                self.assertEqual(sequence(expected), sequence(actual))
+
+    def test_all_cuts_burnt(self):
+        cutcode = random_cutcode(8, 150, nested=True)
+        contains = {id(group): group.contains for group in cutcode}
+        cuts = list(cutcode.flat())
+        result = _indexed_group_preserving_selection(cutcode, False, None)
+        self.assertEqual(len(list(result.flat())), len(cuts))
+        self.assertEqual(sum(cut.burns_done for cut in cuts), len(cuts))
+        for group in cutcode:
+            self.assertEqual(contains[id(group)], group.contains)
+
+    def test_dispatch(self):
+        expected = short_travel_cutcode_legacy(random_cutcode(2, 200))
+        actual = short_travel_cutcode_optimized(random_cutcode(2, 200))
+        self.assertGreater(len(expected), 500)
+        self.assertEqual(sequence(expected), sequence(actual))
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestIndexedTravelBenchmark(unittest.TestCase):
+    def test_benchmark_scenario(self):
+        kernel = bootstrap.bootstrap(profile="MeerK40t_TEST_indexed_travel")
+        try:
+            kernel.console("element* delete\noperation* delete\n")
+            for i in range(12):
+                for j in range(6):
+                    kernel.console(f"circle {i}cm {j}cm 3mm\n")
+                    kernel.console(f"rect {i}cm {j}cm 1mm 1mm\n")
+            kernel.console("element* cut\n")
+            kernel.console("plan clear copy preprocess validate blob\n")
+            plan = kernel.planner.default_plan
+            data = plan.save_scenario(
+                description="indexed travel benchmark", algorithm_testing=True
+            )
+            results = {}
+
+            def run(name, optimizer, prepare=None):
+                cutcode = scenario_cutcode(data, plan)
+                if prepare is not None:
+                    cutcode = prepare(cutcode)
+                t0 = time.perf_counter()
+                ordered = optimizer(cutcode)
+                elapsed = time.perf_counter() - t0
+                results[name] = ordered
+                print(
+                    f"{name}: {len(ordered)} cuts, travel {ordered.length_travel(True):.0f} in {elapsed:.3f}s"
+                )
+
+            def improved(cutcode):
+                for cut in cutcode.flat():
+                    cut.burns_done = 0
+                ordered = CutCode(
+                    _improved_greedy_selection(list(cutcode.candidate()), cutcode.start)
+                )
+                ordered._start_x, ordered._start_y = cutcode.start
+                return ordered
+
+            run("legacy", short_travel_cutcode_legacy)
+            run("improved greedy", improved)
+            run("indexed", short_travel_cutcode_indexed)
+            self.assertEqual(sequence(results["legacy"]), sequence(results["indexed"]))
+
+            # Containment detection is not part of the timed selection.
+            run(
+                "group preserving",
+                lambda c: _group_preserving_selection(c, False, None),
+                inner_first_ident,
+            )
+            run(
+                "indexed group preserving",
+                lambda c: _indexed_group_preserving_selection(c, False, None),
+                inner_first_ident,
+            )
+            self.assertEqual(
+                sequence(results["group preserving"]),
+                sequence(results["indexed group preserving"]),
+            )
+        finally:
+            kernel()
+
+
+if __name__ == "__main__":
+    unittest.main()
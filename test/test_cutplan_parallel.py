@@ -0,0 +1,203 @@
+"""
+Parallel conversion of plan operations with worker processes.
+
+Verifies that:
+1. parallel_map and parallel_imap keep the task order, fall back to serial processing if
+   tasks or results cannot be pickled and raise the errors of tasks, the shared pool
+   grows without breaking the tasks submitted to it and stopping it cancels the tasks
+   not yet started
+2. `plan --jobs N` blobs into the same cutcode as the serial planner
+3. Images of raster operations convert into the same geometry
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from meerk40t.core import parallel
+from meerk40t.core.cutplan import CutPlan
+from test import bootstrap
+
+
+def square(value):
+    return value * value
+
+
+def fail_on_three(value):
+    if value == 3:
+        raise ValueError(value)
+    return value
+
+
+def make_lock(value):
+    return threading.Lock()
+
+
+class TestParallelMap(unittest.TestCase):
+    def tearDown(self):
+        parallel.shutdown()
+
+    def test_serial(self):
+        self.assertEqual(parallel.parallel_map(square, range(5), jobs=1), [0, 1, 4, 9, 16])
+
+    def test_order_preserved(self):
+        self.assertEqual(
+            parallel.parallel_map(square, range(20), jobs=2),
+            [i * i for i in range(20)],
+        )
+
+    def test_unpicklable_falls_back(self):
+        messages = []
+        result = parallel.parallel_map(
+            lambda v: v + 1, [1, 2, 3], jobs=2, channel=messages.append
+        )
+        self.assertEqual(result, [2, 3, 4])
+        self.assertEqual(len(messages), 1)
+
+    def test_imap_order_preserved(self):
+        results = parallel.parallel_imap(square, range(20), jobs=2)
+        self.assertEqual(next(results), 0)
+        self.assertEqual(list(results), [i * i for i in range(1, 20)])
+
+    def test_imap_unpicklable_falls_back(self):
+        messages = []
+        result = parallel.parallel_imap(
+            lambda v: v + 1, [1, 2, 3], jobs=2, channel=messages.append
+        )
+        self.assertEqual(list(result), [2, 3, 4])
+        self.assertEqual(len(messages), 1)
+
+    def test_resolve_jobs(self):
+        self.assertEqual(parallel.resolve_jobs(None), 1)
+        self.assertEqual(parallel.resolve_jobs(3), 3)
+        self.assertGreaterEqual(parallel.resolve_jobs(0), 1)
+        with mock.patch.object(parallel, "SPAWN_POOL", False):
+            self.assertEqual(parallel.resolve_jobs(3), 1)
+            self.assertEqual(parallel.parallel_map(square, range(5), jobs=2), [0, 1, 4, 9, 16])
+
+    def test_unpicklable_result_falls_back(self):
+        messages = []
+        result = parallel.parallel_map(make_lock, [1, 2, 3], jobs=2, channel=messages.append)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(len(messages), 1)
+
+    def test_task_error_raised(self):
+        messages = []
+        with self.assertRaises(ValueError):
+            parallel.parallel_map(fail_on_three, range(6), jobs=2, channel=messages.append)
+        with self.assertRaises(ValueError):
+            list(parallel.parallel_imap(fail_on_three, range(6), jobs=2))
+        self.assertEqual(messages, [])
+
+    def test_pool_grows(self):
+        executor = parallel.get_executor(2)
+        futures = [executor.submit(square, i) for i in range(6)]
+        self.assertEqual(
+            parallel.parallel_map(square, range(6), jobs=3), [i * i for i in range(6)]
+        )
+        # The replaced pool finishes the tasks submitted to it.
+        self.assertEqual([f.result(timeout=60) for f in futures], [i * i for i in range(6)])
+        # The pool never shrinks.
+        self.assertIs(parallel.get_executor(2), parallel.get_executor(3))
+
+    def test_shutdown_cancels_pending(self):
+        executor = parallel.get_executor(2)
+        futures = [executor.submit(time.sleep, 0.2) for _ in range(20)]
+        parallel.shutdown()
+        self.assertIsNone(parallel._executor)
+        if parallel.CANCEL_FUTURES:
+            # The pool cancels in its own thread.
+            deadline = time.perf_counter() + 10
+            while not futures[-1].cancelled() and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(futures[-1].cancelled())
+
+
+class TestParallelPlan(unittest.TestCase):
+    def tearDown(self):
+        parallel.shutdown()
+
+    def _blob(self, jobs, stage="blob"):
+        kernel = bootstrap.bootstrap(profile="MeerK40t_TEST_parallel")
+        try:
+            kernel.console("element* delete\noperation* delete\n")
+            for i in range(12):
+                kernel.console(f"circle {i}cm 1cm 4mm\n")
+                kernel.console(f"rect {i}cm 3cm 5mm 8mm\n")
+            kernel.console("element* engrave\n")
+            kernel.console("rect 0cm 6cm 2cm 2cm\n")
+            kernel.console("rect 5cm 6cm 1cm 1cm\n")
+            kernel.console("element* cut -s 15\n")
+            image = Image.new("L", (64, 64), 255)
+            draw = ImageDraw.Draw(image)
+            draw.ellipse((8, 8, 56, 56), fill=0)
+            image_op = kernel.elements.op_branch.add(type="op image")
+            for i in range(3):
+                node = kernel.elements.elem_branch.add(
+                    type="elem image", image=image, x=i * 1000
+                )
+                image_op.add_reference(node)
+            kernel.console(
+                f"plan --jobs {jobs} clear copy preprocess validate {stage}\n"
+            )
+            cutplan = kernel.planner.default_plan
+            if stage == "geometry":
+                return [
+                    item.segments[: item.index].copy()
+                    for item in cutplan.plan
+                    if hasattr(item, "segments")
+                ]
+            cuts = []
+            for cutcode in cutplan.plan:
+                if not hasattr(cutcode, "flat"):
+                    continue
+                for cut in cutcode.flat():
+                    cuts.append(
+                        (
+                            type(cut).__name__,
+                            cut.start,
+                            cut.end,
+                            cut.passes,
+                            cut.closed,
+                            str(cut.color),
+                            cut.next is not None,
+                            cut.settings.get("speed"),
+                            cut.original_op,
+                        )
+                    )
+            return cuts
+        finally:
+            kernel()
+
+    def test_jobs_option(self):
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("plan --jobs 3\n")
+            self.assertEqual(kernel.planner.default_plan.jobs, 3)
+            self.assertEqual(kernel.planner.default_plan.parallel_jobs(), 3)
+            plan = CutPlan("x", kernel.planner)
+            self.assertEqual(plan.parallel_jobs(), 1)
+        finally:
+            kernel()
+
+    def test_parallel_blob_matches_serial(self):
+        serial = self._blob(1)
+        parallel_cuts = self._blob(2)
+        self.assertGreater(len(serial), 50)
+        self.assertEqual(serial, parallel_cuts)
+
+    def test_parallel_geometry_matches_serial(self):
+        serial = self._blob(1, stage="geometry")
+        parallel_geometry = self._blob(2, stage="geometry")
+        self.assertEqual(len(serial), len(parallel_geometry))
+        for a, b in zip(serial, parallel_geometry):
+            self.assertEqual(a.shape, b.shape)
+            self.assertTrue(np.array_equal(a, b, equal_nan=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
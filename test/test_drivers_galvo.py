@@ -1,4 +1,5 @@
 import os
+import time
 import unittest
 from test import bootstrap
 # 20.10.25 Update: reversed the sequence of qswitchperiod and markcurrernt in the LMC output.
@@ -204,3 +205,156 @@ class TestDriverGalvoRotary(unittest.TestCase):
             data = f.read()
         self.assertNotEqual(lmc_rect, data)
         self.assertEqual(lmc_rect_rotary, data)
+
+
+def _mock_controller(service):
+    """
+    Galvo controller on the mock connection collecting the sent list packets.
+    """
+    from meerk40t.balormk.controller import DRIVER_STATE_RAW, GalvoController
+
+    controller = GalvoController(service, force_mock=True)
+    controller.connect_if_needed()
+    # Raw mode sends lists without waiting for the board.
+    controller.mode = DRIVER_STATE_RAW
+    packets = []
+    controller.connection.write = lambda index, data: packets.append(
+        bytes(data)
+    )
+    return controller, packets
+
+
+def _written(controller, packets):
+    return b"".join(packets) + bytes(
+        controller._active_list[: controller._active_index]
+        if controller._active_list
+        else b""
+    )
+
+
+class TestGalvoListBatch(unittest.TestCase):
+    def test_list_mark_batch_equivalent(self):
+        """
+        Batched marks and jumps write the same list records as goto() and mark() point by point, including
+        repeated points, fractional and out of range coordinates, across several list packets.
+        """
+        import numpy as np
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            service = kernel.device
+            rng = np.random.default_rng(5)
+            count = 2000
+            points = rng.uniform(-0x800, 0x10800, count) + 1j * rng.uniform(
+                -0x800, 0x10800, count
+            )
+            points[::7] = np.round(points[::7])
+            points[10:20] = points[9]
+            points[30] = 1000 + 1000j
+            points[31] = 1000.5 + 1000j
+            jumps = rng.random(count) < 0.2
+
+            single, single_packets = _mock_controller(service)
+            single.list_mark_speed(100)
+            for p, jump in zip(points, jumps):
+                if jump:
+                    single.goto(p.real, p.imag)
+                else:
+                    single.mark(p.real, p.imag)
+
+            batch, batch_packets = _mock_controller(service)
+            batch.list_mark_speed(100)
+            batch.list_mark_batch(points[:500], jumps[:500])
+            batch.list_mark_batch(list(points[500:]), list(jumps[500:]))
+
+            self.assertGreater(len(single_packets), 2)
+            self.assertEqual(_written(single, single_packets), _written(batch, batch_packets))
+            self.assertEqual(single.get_last_xy(), batch.get_last_xy())
+
+            # Marks only, given as (x, y) rows.
+            single, single_packets = _mock_controller(service)
+            for p in points[:300]:
+                single.mark(p.real, p.imag)
+            batch, batch_packets = _mock_controller(service)
+            batch.list_mark_batch(np.column_stack((points[:300].real, points[:300].imag)))
+            self.assertEqual(_written(single, single_packets), _written(batch, batch_packets))
+        finally:
+            kernel()
+
+    def test_driver_curves_batched(self):
+        """
+        Jobs of curves and connected lines write the same list as the point by point controller calls.
+        """
+        from meerk40t.balormk.controller import GalvoController
+
+        files = ("tb_batch.lmc", "tb_single.lmc")
+        for file in files:
+            self.addCleanup(os.remove, file)
+
+        def list_mark_single(controller, points, jumps=None, angle=0):
+            for i, p in enumerate(points):
+                if jumps is not None and jumps[i]:
+                    controller.goto(p.real, p.imag)
+                else:
+                    controller.mark(p.real, p.imag)
+
+        batch = GalvoController.list_mark_batch
+        for file in files:
+            if file == "tb_single.lmc":
+                GalvoController.list_mark_batch = list_mark_single
+            kernel = bootstrap.bootstrap()
+            try:
+                kernel.console("service device start -i balor 0\n")
+                kernel.console("operation* delete\n")
+                kernel.console("circle 3cm 3cm 1cm\n")
+                kernel.console("polyline 1cm 1cm 2cm 1cm 2cm 2cm 1cm 2cm\n")
+                kernel.console(
+                    "element* engrave -s 15 plan copy-selected preprocess validate blob preopt "
+                    f"optimize save_job {file}\n"
+                )
+            finally:
+                GalvoController.list_mark_batch = batch
+                kernel()
+        with open(files[0]) as f:
+            batched = f.read()
+        with open(files[1]) as f:
+            single = f.read()
+        self.assertGreater(batched.count("listMarkTo"), 20)
+        self.assertEqual(single, batched)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestGalvoListBenchmark(unittest.TestCase):
+    def test_benchmark_list_packing(self):
+        import numpy as np
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            service = kernel.device
+            service.signal_updates = False
+            count = 100000
+            t = np.linspace(0, 400 * np.pi, count)
+            points = 0x8000 + (0x6000 * t / t[-1]) * np.exp(1j * t)
+            results = {}
+            for name in ("point by point", "batch"):
+                controller, packets = _mock_controller(service)
+                controller.DEBUG = False
+                start = time.perf_counter()
+                if name == "batch":
+                    controller.list_mark_batch(points)
+                else:
+                    for p in points:
+                        controller.mark(p.real, p.imag)
+                elapsed = time.perf_counter() - start
+                results[name] = _written(controller, packets)
+                print(
+                    f"\n{name}: {count} marks, {len(packets)} list packets, {elapsed:.3f}s, "
+                    f"{count / elapsed:,.0f} marks/s"
+                )
+            self.assertEqual(results["point by point"], results["batch"])
+        finally:
+            kernel()
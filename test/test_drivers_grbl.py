@@ -1,7 +1,16 @@
 import os
 import unittest
+
+import numpy as np
 from test import bootstrap
 
+from meerk40t.core.geomstr import Geomstr
+from meerk40t.core.units import UNITS_PER_MIL
+from meerk40t.grbl.controller import GrblThroughput
+from meerk40t.grbl.emulator import GRBLEmulator
+from meerk40t.svgelements import Matrix
+from meerk40t.tools.arcfit import fit_bezier
+
 gcode_rect = """G90
 G94
 G21
@@ -149,3 +158,166 @@ class TestDriverGRBLRotary(unittest.TestCase):
             data = f.read()
         self.assertNotEqual(gcode_rect, data)
         self.assertEqual(gcode_rect_rotary, data)
+
+
+class TestGRBLStreaming(unittest.TestCase):
+    def test_throughput_window(self):
+        meter = GrblThroughput(window=2.0)
+        for i in range(10):
+            meter.sent(20, now=10.0 + i * 0.1)
+        lines, rate = meter.rates(now=11.0)
+        self.assertAlmostEqual(lines, 10.0)
+        self.assertAlmostEqual(rate, 200.0)
+        self.assertEqual((meter.lines, meter.bytes), (10, 200))
+        # All samples left the window, the totals remain.
+        self.assertEqual(meter.rates(now=20.0), (0.0, 0.0))
+        self.assertEqual(meter.bytes, 200)
+        meter.reset()
+        self.assertEqual(meter.lines, 0)
+
+    def test_bounded_streaming(self):
+        """
+        The driver is held while the controller queue is full and every line is sent
+        and acknowledged by the mock connection.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i grbl 0\n")
+            device = kernel.device
+            controller = device.controller
+            device.interface = "mock"
+            controller.update_connection()
+            controller.force_validate()
+            device.limit_buffer = True
+            device.max_buffer = 10
+            written = []
+            peak = [0]
+
+            def write(data):
+                written.append(data)
+                controller.write(data)
+                peak[0] = max(peak[0], controller.queued_lines)
+
+            device.driver.out_pipe = write
+            g = Geomstr()
+            for i in range(150):
+                g.line(complex(i * 100, 0), complex(i * 100, 5000))
+            device.driver.geometry(g)
+            self.assertTrue(controller.wait_for_space(0, 30))
+            self.assertGreater(len(written), 150)
+            # The driver checks once per segment, a segment writes up to three lines,
+            # and a status query of the controller thread may be pending as well.
+            self.assertLessEqual(peak[0], device.max_buffer + 4)
+            status = controller.buffer_status()
+            self.assertEqual(status["queued"], 0)
+            # Validation and status queries are counted as well.
+            self.assertGreaterEqual(status["lines"], len(written))
+            self.assertGreaterEqual(status["acknowledged"], len(written))
+            self.assertGreaterEqual(
+                status["bytes"], sum(len(line) for line in written)
+            )
+            kernel.console("grbl_buffer\n")
+        finally:
+            kernel()
+
+
+class PlotRecorder:
+    """
+    Driver stand-in for the emulator, records the plotted points.
+    """
+
+    def __init__(self):
+        self.driver = self
+        self.points = []
+
+    def plot(self, plot):
+        for ox, oy, on, x, y in plot.plot:
+            self.points.append(complex(x, y) / UNITS_PER_MIL)
+
+    def plot_start(self):
+        pass
+
+    def move_abs(self, x, y):
+        pass
+
+    def set(self, key, value):
+        pass
+
+
+class TestGRBLArcs(unittest.TestCase):
+    def _gcode(self, geometry, use_arcs, tolerance=1.0):
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i grbl 0\n")
+            device = kernel.device
+            device.use_arcs = use_arcs
+            device.arc_tolerance = tolerance
+            lines = []
+            device.driver.out_pipe = lines.append
+            device.driver.geometry(geometry)
+            return lines
+        finally:
+            kernel()
+
+    def test_fit_bezier_tolerance(self):
+        curve = (0j, complex(1000, 3000), complex(4000, -2000), complex(5000, 1000))
+        motions = fit_bezier(curve, 1.0)
+        self.assertEqual(motions[-1][1], curve[-1])
+        self.assertTrue(all(m[0] == "arc" for m in motions))
+        self.assertLess(len(motions), 40)
+
+    def test_arcs_round_trip(self):
+        """
+        Gcode with G2/G3 arcs executed by the emulator stays within the tolerance of
+        the geometry, and needs a fraction of the lines of interpolated output.
+        """
+        geometry = Geomstr()
+        geometry.cubic(
+            complex(1000, 1000),
+            complex(2000, 4000),
+            complex(5000, -1000),
+            complex(6000, 2000),
+        )
+        geometry.quad(complex(6000, 2000), complex(7000, 5000), complex(9000, 2000))
+        # Counterclockwise and clockwise arcs, a closed circle.
+        geometry.arc(complex(9000, 2000), complex(10000, 1000), complex(11000, 2000))
+        geometry.arc(complex(11000, 2000), complex(12000, 3000), complex(13000, 2000))
+        geometry.arc(complex(4000, 6000), complex(6000, 6000), complex(4000, 6000))
+        tolerance = 1.0
+        arcs = self._gcode(geometry, True, tolerance)
+        interpolated = self._gcode(geometry, False)
+        self.assertTrue(any(line.startswith("G2 ") for line in arcs))
+        self.assertTrue(any(line.startswith("G3 ") for line in arcs))
+        self.assertLess(len(arcs) * 10, len(interpolated))
+
+        recorder = PlotRecorder()
+        emulator = GRBLEmulator(device=recorder, units_to_device_matrix=Matrix())
+        for line in arcs:
+            emulator.write(line)
+        self.assertGreater(len(recorder.points), 100)
+
+        # Distance to the geometry, as polyline of dense samples.
+        starts = []
+        ends = []
+        for e in range(geometry.index):
+            positions = np.array(
+                [geometry.position(e, t) for t in np.linspace(0, 1, 2001)]
+            )
+            starts.append(positions[:-1])
+            ends.append(positions[1:])
+        starts = np.concatenate(starts)
+        direction = np.concatenate(ends) - starts
+        length2 = np.maximum(np.abs(direction) ** 2, 1e-12)
+
+        def deviation(p):
+            t = ((p - starts) * np.conj(direction)).real / length2
+            return np.min(np.abs(starts + np.clip(t, 0, 1) * direction - p))
+
+        # Emulated positions are rounded to device units, gcode to 3 decimals in mm.
+        limit = tolerance + 0.1
+        for p in recorder.points:
+            self.assertLess(deviation(p), limit)
+        # Every part of the geometry was visited.
+        points = np.array(recorder.points)
+        for q in starts[::100]:
+            self.assertLess(np.min(np.abs(points - q)), 250)
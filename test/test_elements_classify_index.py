@@ -0,0 +1,247 @@
+"""
+Classification index.
+
+Verifies that:
+1. The numpy distance matrix equals Color.distance
+2. ClassifyIndex gives the results of op.would_classify, Color.distance and the black
+   test for every operation, element and fuzzy / default setting
+3. Elemental.classify assigns the same elements to the same operations as the
+   evaluation of every element / operation pair, with and without fuzzy matching
+4. Benchmark: classify of many elements, index and per-pair evaluation
+"""
+
+import os
+import time
+import unittest
+from random import Random
+from unittest import mock
+
+from meerk40t.core.elements.classify_index import ClassifyIndex, color_distance_matrix
+from meerk40t.core.node.op_cut import CutOpNode
+from meerk40t.core.node.op_dots import DotsOpNode
+from meerk40t.core.node.op_engrave import EngraveOpNode
+from meerk40t.core.node.op_image import ImageOpNode
+from meerk40t.core.node.op_raster import RasterOpNode
+from meerk40t.svgelements import Color
+from test.bootstrap import bootstrap
+
+
+class PairwiseIndex(ClassifyIndex):
+    """
+    Evaluates every element / operation pair, as classify did without the index.
+    """
+
+    def distance(self, c1, c2):
+        return Color.distance(c1, c2)
+
+    def is_black(self, color, fuzzy, fuzzydistance):
+        if fuzzy:
+            return (
+                Color.distance("black", color) <= fuzzydistance
+                or Color.distance("white", color) <= fuzzydistance
+            )
+        return Color("black") == color or Color("white") == color
+
+    def would_classify(self, op, node, fuzzy=False, fuzzydistance=100, usedefault=False):
+        return op.would_classify(
+            node, fuzzy=fuzzy, fuzzydistance=fuzzydistance, usedefault=usedefault
+        )
+
+
+def random_design(elements, count, seed=1):
+    """
+    Operations and elements with colors of a shared palette, so many elements share
+    their colors with an operation and with each other.
+    """
+    random = Random(seed)
+    elements.op_branch.remove_all_children()
+    palette = [Color(f"#{random.randint(0, 0xFFFFFF):06x}") for _ in range(60)]
+    palette.extend((Color("black"), Color("white"), Color("red")))
+    for i in range(40):
+        op_class = (EngraveOpNode, CutOpNode, RasterOpNode)[i % 3]
+        elements.op_branch.add_node(op_class(color=palette[i]))
+    nodes = []
+    for i in range(count):
+        stroke = palette[random.randrange(len(palette))]
+        fill = palette[random.randrange(len(palette))] if random.random() < 0.3 else None
+        nodes.append(
+            elements.elem_branch.add(
+                type="elem rect",
+                x=i,
+                y=0,
+                width=10,
+                height=10,
+                stroke=stroke,
+                fill=fill,
+            )
+        )
+    return nodes
+
+
+def classification(elements, nodes):
+    position = {id(node): i for i, node in enumerate(nodes)}
+    return [
+        (
+            op.type,
+            str(op.color),
+            sorted(position[id(ref.node)] for ref in op.children),
+        )
+        for op in elements.ops()
+    ]
+
+
+class TestColorDistanceMatrix(unittest.TestCase):
+    def test_matches_color_distance(self):
+        random = Random(0)
+        rows = [0, 0xFFFFFF, 0xFF0000] + [random.randint(0, 0xFFFFFF) for _ in range(60)]
+        columns = [0, 0xFFFFFF] + [random.randint(0, 0xFFFFFF) for _ in range(20)]
+        matrix = color_distance_matrix(rows, columns)
+        self.assertEqual(matrix.shape, (len(rows), len(columns)))
+        for i, c1 in enumerate(rows):
+            for j, c2 in enumerate(columns):
+                self.assertEqual(
+                    float(matrix[i, j]),
+                    Color.distance(Color(c1), Color(c2)),
+                )
+
+
+class TestClassifyIndex(unittest.TestCase):
+    def setUp(self):
+        self.kernel = bootstrap()
+        self.elements = self.kernel.elements
+
+    def tearDown(self):
+        self.kernel()
+
+    def test_matches_would_classify(self):
+        random = Random(2)
+        colors = [
+            None,
+            Color("black"),
+            Color("white"),
+            Color("#ff000080"),
+            Color("red"),
+            Color("#fe0101"),
+            Color("#0000ff"),
+            Color("#1010f0"),
+        ]
+        ops = [
+            EngraveOpNode(color="blue"),
+            EngraveOpNode(color="black"),
+            CutOpNode(color="red"),
+            RasterOpNode(color="black"),
+            RasterOpNode(color="#fe0101"),
+            ImageOpNode(),
+            DotsOpNode(color="blue"),
+        ]
+        default = EngraveOpNode(color="#1010f0")
+        default.default = True
+        ops.append(default)
+        fill_raster = RasterOpNode(color="red")
+        fill_raster.remove_color_attribute("stroke")
+        fill_raster.add_color_attribute("fill")
+        ops.append(fill_raster)
+        empty = RasterOpNode()
+        for attribute in list(empty.allowed_attributes):
+            empty.remove_color_attribute(attribute)
+        ops.append(empty)
+        for op in ops:
+            self.elements.op_branch.add_node(op)
+        nodes = []
+        for i in range(60):
+            node_type = ("elem rect", "elem path", "elem ellipse", "elem point")[i % 4]
+            settings = dict(x=i, y=0, width=10, height=10)
+            if node_type != "elem point":
+                settings["stroke"] = random.choice(colors)
+                settings["fill"] = random.choice(colors)
+            nodes.append(self.elements.elem_branch.add(type=node_type, **settings))
+        text = self.elements.elem_branch.add(type="elem text", text="A", stroke=Color("red"))
+        nodes.append(text)
+        ops[0].add_reference(nodes[0])
+        ops[2].add_reference(nodes[1])
+        index = ClassifyIndex(nodes, [op.color for op in ops] + ["black", "white"])
+        for fuzzy in (False, True):
+            for usedefault in (False, True):
+                for node in nodes:
+                    for op in ops:
+                        self.assertEqual(
+                            index.would_classify(
+                                op,
+                                node,
+                                fuzzy=fuzzy,
+                                fuzzydistance=100,
+                                usedefault=usedefault,
+                            ),
+                            op.would_classify(
+                                node,
+                                fuzzy=fuzzy,
+                                fuzzydistance=100,
+                                usedefault=usedefault,
+                            ),
+                        )
+                    stroke = getattr(node, "stroke", None)
+                    if stroke is None or stroke.argb is None:
+                        continue
+                    self.assertEqual(
+                        index.is_black(stroke, fuzzy, 100),
+                        PairwiseIndex.is_black(index, stroke, fuzzy, 100),
+                    )
+                    for color in colors[1:] + ["black", "white", "#123456"]:
+                        self.assertEqual(
+                            index.distance(abs(stroke), color),
+                            Color.distance(abs(stroke), color),
+                        )
+        self.assertLess(index.evaluations, index.lookups)
+
+    def test_classify_matches_pairwise(self):
+        elements = self.elements
+        nodes = random_design(elements, 500)
+        for fuzzy in (False, True):
+            elements.classify_fuzzy = fuzzy
+            random_design(elements, 0)
+            elements.classify(nodes)
+            indexed = classification(elements, nodes)
+            random_design(elements, 0)
+            with mock.patch(
+                "meerk40t.core.elements.elements.ClassifyIndex", PairwiseIndex
+            ):
+                elements.classify(nodes)
+            pairwise = classification(elements, nodes)
+            self.assertEqual(indexed, pairwise)
+            self.assertGreater(len(indexed), 40)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestClassifyIndexBenchmark(unittest.TestCase):
+    def test_benchmark_classify(self):
+        kernel = bootstrap()
+        try:
+            elements = kernel.elements
+            count = 2000
+            nodes = random_design(elements, count)
+            print()
+            for fuzzy in (False, True):
+                elements.classify_fuzzy = fuzzy
+                random_design(elements, 0)
+                t = time.perf_counter()
+                elements.classify(nodes)
+                indexed = time.perf_counter() - t
+                random_design(elements, 0)
+                with mock.patch(
+                    "meerk40t.core.elements.elements.ClassifyIndex", PairwiseIndex
+                ):
+                    t = time.perf_counter()
+                    elements.classify(nodes)
+                    pairwise = time.perf_counter() - t
+                print(
+                    f"classify {count} elements, fuzzy={fuzzy}: index {indexed:.3f}s, "
+                    f"per pair {pairwise:.3f}s, {pairwise / indexed:.1f}x"
+                )
+        finally:
+            kernel()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,274 @@
+"""
+Spatial index of the element tree.
+
+Verifies that:
+1. BoxTree gives the rectangle, contained, point and nearest results of a linear scan,
+   while entries are inserted, moved and removed
+2. Elemental.query_rect, query_point and nearest match the bounds of elems_nodes(),
+   after elements are translated, scaled, altered, grouped and deleted
+3. Selecting by position finds the same element through the index
+4. Benchmark: rectangle and point queries over many elements, index and linear scan
+"""
+
+import os
+import time
+import unittest
+
+import numpy as np
+
+from meerk40t.core.elements.element_types import elem_nodes
+from meerk40t.core.spatial import BoxTree
+from meerk40t.svgelements import Matrix
+from test.bootstrap import bootstrap, destroy
+
+
+def intersects(bounds, box):
+    x0, y0, x1, y1 = box
+    return bounds[0] <= x1 and bounds[2] >= x0 and bounds[1] <= y1 and bounds[3] >= y0
+
+
+def box_distance(bounds, x, y):
+    dx = max(bounds[0] - x, x - bounds[2], 0)
+    dy = max(bounds[1] - y, y - bounds[3], 0)
+    return dx * dx + dy * dy
+
+
+def add_rects(elements, count, seed=0, size=10000.0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, size, (count, 2))
+    wh = rng.exponential(size / 300, (count, 2)) + 1
+    with elements.node_lock:
+        for (x, y), (w, h) in zip(xy, wh):
+            elements.elem_branch.add(
+                type="elem rect",
+                x=float(x),
+                y=float(y),
+                width=float(w),
+                height=float(h),
+                matrix=Matrix(),
+                fast=True,
+            )
+    elements._tree.notify_tree_structure_changed()
+
+
+class TestBoxTree(unittest.TestCase):
+    def test_matches_linear_scan(self):
+        rng = np.random.default_rng(0)
+        for trial in range(100):
+            count = int(rng.integers(0, 300))
+            xy = rng.uniform(0, 100, (count, 2))
+            wh = rng.exponential(3, (count, 2))
+            boxes = {i: (x, y, x + w, y + h) for i, ((x, y), (w, h)) in enumerate(zip(xy, wh))}
+            tree = BoxTree(capacity=int(rng.integers(2, 17)))
+            tree.build(boxes.keys(), boxes.values())
+            for step in range(30):
+                action = rng.integers(0, 3)
+                if action == 0 and boxes:
+                    key = int(rng.choice(list(boxes)))
+                    del boxes[key]
+                    tree.remove(key)
+                elif action == 1:
+                    key = int(rng.integers(0, 500))
+                    x, y = rng.uniform(0, 100, 2)
+                    boxes[key] = (x, y, x + rng.uniform(0, 5), y + rng.uniform(0, 5))
+                    tree.insert(key, boxes[key])
+                self.assertEqual(len(tree), len(boxes))
+                x0, x1 = sorted(rng.uniform(-10, 110, 2))
+                y0, y1 = sorted(rng.uniform(-10, 110, 2))
+                box = (x0, y0, x1, y1)
+                self.assertEqual(
+                    tree.query(x1, y1, x0, y0).tolist(),
+                    sorted(k for k, b in boxes.items() if intersects(b, box)),
+                )
+                self.assertEqual(
+                    tree.query(*box, contained=True).tolist(),
+                    sorted(
+                        k
+                        for k, b in boxes.items()
+                        if b[0] >= x0 and b[2] <= x1 and b[1] >= y0 and b[3] <= y1
+                    ),
+                )
+                x, y = rng.uniform(-10, 110, 2)
+                self.assertEqual(
+                    tree.query_point(x, y).tolist(),
+                    sorted(k for k, b in boxes.items() if intersects(b, (x, y, x, y))),
+                )
+                for accept in (None, lambda key: key % 3 == 0):
+                    expected = min(
+                        (
+                            (box_distance(b, x, y), k)
+                            for k, b in boxes.items()
+                            if accept is None or accept(k)
+                        ),
+                        default=None,
+                    )
+                    found = tree.nearest(x, y, accept=accept)
+                    if expected is None:
+                        self.assertIsNone(found)
+                    else:
+                        self.assertEqual(found[1], expected[1])
+                        self.assertAlmostEqual(found[0], expected[0])
+
+    def test_overflow_repacks(self):
+        tree = BoxTree()
+        tree.build(range(100), [(i, i, i + 1, i + 1) for i in range(100)])
+        for i in range(100):
+            tree.insert(i, (i + 0.5, i, i + 1.5, i + 1))
+        self.assertEqual(tree.rebuilds, 2)
+        self.assertEqual(tree.query(50, 0, 50.2, 100).tolist(), [49])
+        self.assertEqual(len(tree), 100)
+
+
+class TestElementsSpatial(unittest.TestCase):
+    def setUp(self):
+        self.kernel = bootstrap()
+        self.elements = self.kernel.elements
+        self.elements.clear_elements(fast=True)
+
+    def tearDown(self):
+        destroy(self.kernel)
+
+    def assertMatchesScan(self, rng, count=20):
+        elements = self.elements
+        nodes = list(elements.elems_nodes())
+        for _ in range(count):
+            x0, x1 = sorted(rng.uniform(-100, 10100, 2))
+            y0, y1 = sorted(rng.uniform(-100, 10100, 2))
+            box = (x0, y0, x1, y1)
+            expected = [n for n in nodes if n.bounds is not None and intersects(n.bounds, box)]
+            self.assertEqual(elements.query_rect(box), expected)
+            expected = [
+                n
+                for n in nodes
+                if n.type in elem_nodes
+                and n.bounds is not None
+                and x0 <= n.bounds[0]
+                and n.bounds[2] <= x1
+                and y0 <= n.bounds[1]
+                and n.bounds[3] <= y1
+            ]
+            self.assertEqual(elements.query_rect(box, contained=True, types=elem_nodes), expected)
+            x, y = rng.uniform(0, 10000, 2)
+            expected = [
+                n for n in nodes if n.bounds is not None and intersects(n.bounds, (x, y, x, y))
+            ]
+            self.assertEqual(elements.query_point((x, y)), expected)
+            distance, node = elements.nearest((x, y), types=("elem rect",))
+            expected = min(
+                box_distance(n.bounds, x, y) for n in nodes if n.type == "elem rect"
+            )
+            self.assertAlmostEqual(distance, np.sqrt(expected))
+            self.assertAlmostEqual(box_distance(node.bounds, x, y), expected)
+
+    def test_queries_follow_changes(self):
+        elements = self.elements
+        rng = np.random.default_rng(1)
+        add_rects(elements, 500)
+        self.assertMatchesScan(rng)
+        nodes = list(elements.elems())
+        for node in rng.choice(nodes, 50, replace=False):
+            dx, dy = rng.uniform(-500, 500, 2)
+            node.matrix.post_translate(dx, dy)
+            node.translated(dx, dy)
+        self.assertMatchesScan(rng)
+        for node in rng.choice(nodes, 50, replace=False):
+            bounds = node.bounds
+            node.matrix.post_scale(3, 0.5, bounds[0], bounds[1])
+            node.scaled(3, 0.5, bounds[0], bounds[1])
+        for node in rng.choice(nodes, 20, replace=False):
+            node.width *= 4
+            node.altered()
+        self.assertMatchesScan(rng)
+        # Grouping is a structural change, moving a child changes the group bounds.
+        group = elements.elem_branch.add(type="group", label="Group")
+        for node in nodes[:10]:
+            group.append_child(node)
+        self.assertMatchesScan(rng)
+        nodes[0].matrix.post_translate(2000, 2000)
+        nodes[0].translated(2000, 2000)
+        self.assertMatchesScan(rng)
+        for node in nodes[100:200]:
+            node.remove_node()
+        self.assertMatchesScan(rng)
+
+    def test_select_by_position(self):
+        elements = self.elements
+        big = elements.elem_branch.add(
+            type="elem rect", x=0, y=0, width=1000, height=1000, matrix=Matrix()
+        )
+        small = elements.elem_branch.add(
+            type="elem rect", x=100, y=100, width=50, height=50, matrix=Matrix()
+        )
+        elements.elem_branch.add(
+            type="elem rect", x=5000, y=5000, width=50, height=50, matrix=Matrix()
+        )
+        elements.set_emphasized_by_position((120, 120), use_smallest=True)
+        self.assertEqual(list(elements.elems(emphasized=True)), [small])
+        elements.set_emphasized_by_position((120, 120), use_smallest=False)
+        self.assertEqual(list(elements.elems(emphasized=True)), [big])
+        small.matrix.post_translate(600, 0)
+        small.translated(600, 0)
+        elements.set_emphasized_by_position((720, 120), use_smallest=True)
+        self.assertEqual(list(elements.elems(emphasized=True)), [small])
+        elements.set_emphasized_by_position((3000, 3000))
+        self.assertEqual(list(elements.elems(emphasized=True)), [])
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestElementsSpatialBenchmark(unittest.TestCase):
+    def test_benchmark_queries(self):
+        kernel = bootstrap()
+        try:
+            elements = kernel.elements
+            elements.clear_elements(fast=True)
+            count = 30000
+            add_rects(elements, count)
+            nodes = list(elements.elems_nodes())
+            for node in nodes:
+                node.bounds
+            rng = np.random.default_rng(2)
+            views = [
+                (x, y, x + 1500, y + 1000) for x, y in rng.uniform(0, 9000, (100, 2))
+            ]
+
+            start = time.perf_counter()
+            elements.query_rect(views[0])
+            print(f"\n{count} elements, index build: {time.perf_counter() - start:.3f}s")
+
+            start = time.perf_counter()
+            scanned = [
+                [n for n in nodes if n.bounds is not None and intersects(n.bounds, view)]
+                for view in views
+            ]
+            scan = (time.perf_counter() - start) / len(views)
+            start = time.perf_counter()
+            queried = [elements.query_rect(view) for view in views]
+            query = (time.perf_counter() - start) / len(views)
+            self.assertEqual(scanned, queried)
+            print(f"view culling: scan {scan * 1000:.2f}ms, index {query * 1000:.3f}ms")
+
+            start = time.perf_counter()
+            for view in views:
+                elements.query_point(view[:2])
+            point = (time.perf_counter() - start) / len(views)
+            print(f"point query: {point * 1000:.3f}ms")
+
+            # Dragging a selection of 200 elements, one query per frame.
+            selection = nodes[:200]
+            start = time.perf_counter()
+            for frame in range(20):
+                for node in selection:
+                    node.matrix.post_translate(5, 5)
+                    node.translated(5, 5, interim=True)
+                elements.query_rect(views[frame])
+            drag = (time.perf_counter() - start) / 20
+            print(f"drag frame of {len(selection)} elements with query: {drag * 1000:.2f}ms")
+            self.assertLess(query, scan)
+        finally:
+            destroy(kernel)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,305 @@
+"""
+EZD huffman decoding and lazy object parsing.
+
+Verifies that:
+1. The table driven huffman decoder gives the characters of the bit by bit decoder for
+   random tables, long codes, truncated lengths and trailing data
+2. Tables which are not prefix free decode the shortest code, bits which are no code
+   stop the decoding as they did
+3. EZCFile lists the objects of a file and decodes the curve points on first use
+4. EZDLoader imports the curves of the file
+5. Benchmark: decoding the vector table, bit by bit and table driven
+"""
+
+import heapq
+import os
+import struct
+import tempfile
+import time
+import unittest
+from io import BytesIO
+from random import Random
+
+from meerk40t.extra.ezd import EZCFile, EZCurve, EZDLoader, EZGroup, _huffman_decode_python
+from test.bootstrap import bootstrap
+
+
+def per_bit_decode(file, uncompressed_length):
+    """
+    Huffman decoding one bit at a time through a dict of the code strings.
+    """
+    huffman_dict = {}
+    table_length = struct.unpack("<H", file.read(2))[0]
+    for i in range(table_length):
+        character, bb, length = struct.unpack("<BIH", file.read(7))
+        bits = "{:032b}".format(bb)[-length:]
+        huffman_dict[bits] = character
+    data = file.read()
+
+    def bit_generator():
+        for d in data:
+            yield from "{:08b}".format(d)
+
+    q = bytearray()
+    c = ""
+    for b in bit_generator():
+        c += b
+        m = huffman_dict.get(c)
+        if m is not None:
+            q.append(m)
+            c = ""
+        if len(q) >= uncompressed_length:
+            return q
+    return q
+
+
+def huffman_codes(data):
+    """
+    Huffman code strings of the characters of data.
+    """
+    frequency = {}
+    for b in data:
+        frequency[b] = frequency.get(b, 0) + 1
+    heap = [(f, i, (c,)) for i, (c, f) in enumerate(frequency.items())]
+    heapq.heapify(heap)
+    codes = {c: "" for c in frequency}
+    if len(heap) == 1:
+        codes[heap[0][2][0]] = "0"
+    order = len(heap)
+    while len(heap) > 1:
+        f1, _, a = heapq.heappop(heap)
+        f2, _, b = heapq.heappop(heap)
+        for c in a:
+            codes[c] = "0" + codes[c]
+        for c in b:
+            codes[c] = "1" + codes[c]
+        order += 1
+        heapq.heappush(heap, (f1 + f2, order, a + b))
+    return codes
+
+
+def huffman_table(codes):
+    table = struct.pack("<H", len(codes))
+    for character, bits in codes.items():
+        table += struct.pack("<BIH", character, int(bits, 2), len(bits))
+    return table
+
+
+def compress(data, codes=None, trailing=b""):
+    """
+    Huffman table and encoded data, as in the vector table.
+    """
+    if codes is None:
+        codes = huffman_codes(data)
+    bits = "".join(codes[b] for b in data)
+    bits += "0" * (-len(bits) % 8)
+    encoded = int(bits, 2).to_bytes(len(bits) // 8, "big") if bits else b""
+    return huffman_table(codes) + encoded + trailing
+
+
+def parse_struct_data(items):
+    data = struct.pack("<i", len(items))
+    for item in items:
+        data += struct.pack("<i", len(item)) + item
+    return data
+
+
+def object_header(object_type, label, pen=0):
+    return parse_struct_data(
+        [
+            struct.pack("<i", pen),
+            struct.pack("<i", object_type),
+            struct.pack("<i", 0),
+            label.encode("utf_16_le").ljust(60, b"\x00"),
+        ]
+        + [struct.pack("<i", 0)] * 7
+        + [struct.pack("<d", 0.0)] * 2
+        + [struct.pack("<2d", 1.0, 2.0), struct.pack("<d", 0.0)]
+    )
+
+
+def curve(label, contours, pen=0):
+    data = struct.pack("<i", 1) + object_header(1, label, pen)
+    data += struct.pack("<2I", len(contours), 0)
+    for points in contours:
+        data += struct.pack("<BB2H", 0, 1, 0, 0)
+        data += struct.pack("<i", len(points) // 2)
+        data += struct.pack(f"<{len(points)}d", *points)
+    return data
+
+
+def group(label, children):
+    data = struct.pack("<i", 0x10) + object_header(0x10, label)
+    data += struct.pack("<i", len(children))
+    return data + b"".join(children)
+
+
+def pen():
+    items = [struct.pack("<i", 0x0000FF), "pen".encode("utf_16_le").ljust(60, b"\x00")]
+    items += [struct.pack("<i", 1)] * 40
+    return parse_struct_data(items)
+
+
+def ezd_file(objects):
+    """
+    EZCad2 file of a pen and the given objects.
+    """
+    data = bytearray("EZCADUNI".encode("utf_16_le"))
+    data += struct.pack("<2i", 0, 2001)
+    data += b"\x00" * (180 + 140)
+    seek_table = len(data)
+    data += b"\x00" * (28 + 96)
+    pens = len(data)
+    data += struct.pack("<2i", 1, pens + 8) + pen()
+    vectors = len(data)
+    content = b"".join(objects) + struct.pack("<i", 0)
+    data += struct.pack("<5I", len(content), 0, 0, 0, 0) + compress(content)
+    data[seek_table : seek_table + 28] = struct.pack("<7i", 0, 0, pens, 0, 0, vectors, 0)
+    return bytes(data)
+
+
+def random_contours(random, count):
+    return [
+        [random.uniform(-50, 50) for _ in range(2 * random.randrange(2, 40))]
+        for _ in range(count)
+    ]
+
+
+class TestHuffmanDecode(unittest.TestCase):
+    def assertDecodes(self, blob, uncompressed_length):
+        self.assertEqual(
+            _huffman_decode_python(BytesIO(blob), uncompressed_length),
+            per_bit_decode(BytesIO(blob), uncompressed_length),
+        )
+
+    def test_random_tables(self):
+        random = Random(1)
+        for trial in range(150):
+            alphabet = random.randrange(1, 256)
+            skew = random.choice((0.05, 0.5, 3))
+            data = bytes(
+                min(int(random.expovariate(skew)), alphabet - 1)
+                for _ in range(random.randrange(1, 3000))
+            )
+            trailing = bytes(random.randrange(256) for _ in range(random.randrange(5)))
+            blob = compress(data, trailing=trailing)
+            for length in (len(data), len(data) + 50, max(1, len(data) // 2)):
+                self.assertDecodes(blob, length)
+            self.assertEqual(_huffman_decode_python(BytesIO(blob), len(data)), data)
+
+    def test_long_codes(self):
+        # Fibonacci frequencies give codes up to 29 bits.
+        frequency = [1, 1]
+        while len(frequency) < 30:
+            frequency.append(frequency[-1] + frequency[-2])
+        random = Random(2)
+        data = bytearray()
+        for character, count in enumerate(frequency[:22]):
+            data += bytes([character]) * count
+        data = bytes(random.sample(list(data), len(data)))
+        codes = huffman_codes(data)
+        self.assertGreater(max(len(bits) for bits in codes.values()), 16)
+        self.assertDecodes(compress(data, codes), len(data))
+
+    def test_irregular_tables(self):
+        # Not prefix free: the shortest code is decoded.
+        codes = {1: "0", 2: "01", 3: "1", 4: "110"}
+        blob = huffman_table(codes) + bytes([0b01101100, 0b10011101])
+        self.assertDecodes(blob, 100)
+        # Bits which are no prefix of any code are never decoded.
+        codes = {1: "00", 2: "01"}
+        blob = huffman_table(codes) + bytes([0b00011100, 0b00000000])
+        self.assertDecodes(blob, 100)
+        # A code of length 0 is the 32 bits of the table entry.
+        blob = huffman_table({7: "0"}) + struct.pack("<BIH", 9, 0xF0000001, 0)
+        blob = struct.pack("<H", 2) + blob[2:] + b"\x00\xf0\x00\x00\x01\x00"
+        self.assertDecodes(blob, 100)
+        self.assertDecodes(huffman_table({}) + b"\x12\x34", 10)
+
+
+class TestEZCFileLazy(unittest.TestCase):
+    def test_lazy_points(self):
+        random = Random(3)
+        first = random_contours(random, 3)
+        children = [random_contours(random, 2) for _ in range(4)]
+        data = ezd_file(
+            [
+                curve("first", first),
+                group("children", [curve(f"child{i}", c) for i, c in enumerate(children)]),
+            ]
+        )
+        ez = EZCFile(BytesIO(data))
+        self.assertEqual(len(ez.pens), 1)
+        self.assertEqual(len(ez.objects), 2)
+        outline, grouped = ez.objects
+        self.assertIsInstance(outline, EZCurve)
+        self.assertIsInstance(grouped, EZGroup)
+        self.assertEqual([c.label for c in grouped], [f"child{i}" for i in range(4)])
+        self.assertEqual(outline.position, (1.0, 2.0))
+        # The object list is known before the points are decoded.
+        self.assertIsNone(outline._points)
+        self.assertEqual(
+            outline.points, [(1, 0, tuple(contour)) for contour in first]
+        )
+        self.assertIs(outline.points, outline.points)
+        for child, contours in zip(grouped, children):
+            self.assertEqual(
+                child.points, [(1, 0, tuple(contour)) for contour in contours]
+            )
+
+    def test_truncated_curve(self):
+        data = curve("broken", [[0.0, 0.0, 1.0, 1.0]])
+        file = BytesIO(data[4:-8])
+        with self.assertRaises(struct.error):
+            EZCurve(file)
+
+    def test_loader(self):
+        random = Random(4)
+        data = ezd_file(
+            [curve(f"curve{i}", random_contours(random, 2), pen=0) for i in range(5)]
+        )
+        handle, pathname = tempfile.mkstemp(suffix=".ezd")
+        os.close(handle)
+        self.addCleanup(os.remove, pathname)
+        with open(pathname, "wb") as file:
+            file.write(data)
+        kernel = bootstrap()
+        try:
+            elements = kernel.elements
+            self.assertTrue(EZDLoader.load(kernel, elements, pathname))
+            paths = [node for node in elements.elems() if node.type == "elem path"]
+            self.assertEqual(sorted(node.label for node in paths), [f"curve{i}" for i in range(5)])
+        finally:
+            kernel()
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestHuffmanBenchmark(unittest.TestCase):
+    def test_benchmark_decode(self):
+        random = Random(5)
+        content = b"".join(
+            curve(f"curve{i}", random_contours(random, 3)) for i in range(300)
+        )
+        blob = compress(content)
+        megabytes = len(content) / 1e6
+
+        t = time.perf_counter()
+        expected = per_bit_decode(BytesIO(blob), len(content))
+        per_bit = time.perf_counter() - t
+
+        t = time.perf_counter()
+        decoded = _huffman_decode_python(BytesIO(blob), len(content))
+        table = time.perf_counter() - t
+        self.assertEqual(decoded, expected)
+        self.assertEqual(decoded, content)
+        print()
+        print(
+            f"huffman {megabytes:.2f}MB: bit by bit {megabytes / per_bit:.2f}MB/s, "
+            f"table driven {megabytes / table:.2f}MB/s, {per_bit / table:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+"""
+Streaming import of plain SVG files.
+
+Verifies that:
+1. Plain files load into the same nodes, attributes and geometry with and without
+   streaming
+2. Files with css styles, circles, hidden elements, dots, defs or saved by meerk40t are
+   left to the full loader
+3. The geometry of path data equals Geomstr.svg of the svgelements Path, for random
+   path data with relative, implicit and smooth commands and arcs
+4. Benchmark: time of loading a large CAD like file, time and peak memory of reading it
+"""
+
+import os
+import random
+import time
+import tracemalloc
+import unittest
+
+import numpy as np
+
+from meerk40t.core.geomstr import Geomstr
+from meerk40t.core.svg_stream import SVGStreamProcessor, path_geometry
+from meerk40t.svgelements import SVG, Path
+from test import bootstrap
+
+PLAIN = {
+    "layers": """<svg xmlns="http://www.w3.org/2000/svg"
+ xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+ xmlns:sodipodi="http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd"
+ width="210mm" height="297mm" viewBox="0 0 210 297">
+<title>Title</title><metadata><data/></metadata><sodipodi:namedview pagecolor="#fff"/>
+<g id="layer1" inkscape:label="Layer 1" inkscape:groupmode="layer"
+ transform="translate(3,4)" style="stroke:#ff0000;stroke-width:0.5">
+<path id="p1" d="M10 10 L 20 20 H 30 V 40 h5 v5 l1-1 1-1 z m 5 5 c1 1 2 2 3 3 s 4 4 5 5
+ S 1 1 2 2 Q 3 3 4 4 T 5 5 t 1 1 q1 1 2 2 C 1 2 3 4 5 6 Z"/>
+<path d="M1.5.5.5-1e-1L2,3 4,5M2 3L6 6" inkscape:label="Label"
+ style="fill:none;stroke-linecap:round;stroke-linejoin:bevel;fill-rule:evenodd"/>
+<path d="m 10 10 20 0 0 20 -20 0 z m 5 5 10 0 0 10 z M 10 10 L 11 11 M 11 11 L 12 14"
+ stroke="currentColor" color="blue" stroke-opacity="0.5"/>
+<path d="M10 10 A 5 5 0 0 1 20 20 a 3 6 30 1 0 5 5 L 1 1"
+ vector-effect="non-scaling-stroke"/>
+<path d="M0 0 C 1 1 2 2 3 3 Z L 5 5"/>
+<polyline points="1,2 3,4 5,6 7,9" stroke="blue" fill="none"/>
+<polygon points="1 2, 3 4, 5 6" transform="rotate(30)" fill="#00ff0080"/>
+<rect x="1" y="2" width="10" height="5" rx="1"/>
+<rect x="1mm" y="2%" width="10" height="5" transform="skewX(10)"/>
+<rect width="0" height="5"/>
+<line x1="1" y1="1" x2="5" y2="7" stroke-width="2px" stroke="black"/>
+<g><g transform="scale(2)"><path d="M 0 0 L 1 1"/></g></g>
+</g>
+<path d="M 1 1 L 2 2 3 3" stroke="#123" fill="none"/>
+</svg>""",
+    "no_viewbox": """<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">
+<path d="M 0 0 L 10 10 L 10 20"/><rect x="5" y="5" width="3" height="3" ry="9"/></svg>""",
+    "no_namespace": """<svg width="4in" height="3in" viewBox="0 0 400 300"
+ preserveAspectRatio="xMinYMin"><g stroke="green"><path d="M 0 0 L 10 10"/></g></svg>""",
+}
+
+FULL = {
+    "style": """<svg xmlns="http://www.w3.org/2000/svg"><style>.a{stroke:red}</style>
+<path class="a" d="M 0 0 L 1 1"/></svg>""",
+    "circle": """<svg xmlns="http://www.w3.org/2000/svg"><circle r="5"/>
+<path d="M 0 0 L 1 1"/></svg>""",
+    "hidden": """<svg xmlns="http://www.w3.org/2000/svg">
+<path d="M 0 0 L 1 1" style="display:none"/><path d="M 0 0 L 1 1"/></svg>""",
+    "dot": """<svg xmlns="http://www.w3.org/2000/svg"><path d="M 0 0 L 0 0"/>
+<path d="M 0 0 L 1 1"/></svg>""",
+    "defs": """<svg xmlns="http://www.w3.org/2000/svg">
+<defs><path id="a" d="M 0 0 L 1 1"/></defs><use href="#a"/></svg>""",
+}
+
+IGNORED = ("_parent", "_root", "_children", "_references", "shape", "geometry")
+
+
+def node_tree(elements):
+    nodes = []
+    for node in elements.elem_branch.flat():
+        attributes = {k: v for k, v in node.__dict__.items() if k not in IGNORED}
+        geometry = getattr(node, "geometry", None)
+        if geometry is not None:
+            attributes["geometry"] = geometry.segments[: geometry.index]
+        nodes.append((node.type, attributes))
+    return nodes
+
+
+def random_path(rng):
+    def number():
+        value = rng.choice(
+            (rng.uniform(-50, 50), rng.randint(-20, 20), 0, rng.uniform(0, 1))
+        )
+        text = repr(round(value, rng.randint(0, 4))) if isinstance(value, float) else str(value)
+        if rng.random() < 0.1:
+            text = text.replace("0.", ".")
+        return text
+
+    def pairs(count):
+        return " ".join(
+            number() + rng.choice((",", " ")) + number() for _ in range(count)
+        )
+
+    parts = [rng.choice("Mm") + " " + pairs(rng.randint(1, 3))]
+    for _ in range(rng.randint(0, 12)):
+        command = rng.choice("MmLlHhVvCcSsQqTtZzAa")
+        if command in "Zz":
+            parts.append(command)
+        elif command in "HhVv":
+            parts.append(command + " " + " ".join(number() for _ in range(rng.randint(1, 3))))
+        elif command in "Aa":
+            parts.append(f"{command} 5 3 20 {rng.randint(0, 1)} {rng.randint(0, 1)} {pairs(1)}")
+        else:
+            count = {"M": 1, "L": 1, "T": 1, "C": 3, "S": 2, "Q": 2}[command.upper()]
+            parts.append(command + " " + pairs(count * rng.randint(1, 2)))
+    return rng.choice((" ", "")).join(parts)
+
+
+def cad_file(filename, paths, polylines):
+    rng = np.random.default_rng(1)
+    with open(filename, "w") as f:
+        f.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="1000mm" height="1000mm" '
+            'viewBox="0 0 1000 1000">\n'
+        )
+        for layer in range(10):
+            f.write(f'<g id="layer{layer}" stroke="#{layer * 20:02x}0000" fill="none">\n')
+            for _ in range(paths // 10):
+                x, y = rng.uniform(0, 1000, 2)
+                d = [f"M {x:.3f} {y:.3f}"]
+                for dx, dy, cx, cy in rng.uniform(-5, 5, (20, 4)):
+                    d.append(f"l {dx:.3f} {dy:.3f} q {cx:.3f} {cy:.3f} {dx:.3f} {dy:.3f}")
+                f.write(f'<path d="{" ".join(d)} z"/>\n')
+            for _ in range(polylines // 10):
+                points = rng.uniform(0, 1000, (30, 2))
+                f.write(
+                    '<polyline points="'
+                    + " ".join(f"{px:.3f},{py:.3f}" for px, py in points)
+                    + '"/>\n'
+                )
+            f.write("</g>\n")
+        f.write("</svg>\n")
+
+
+class TestSVGStream(unittest.TestCase):
+    def setUp(self):
+        self.kernel = bootstrap.bootstrap()
+        self.elements = self.kernel.elements
+
+    def tearDown(self):
+        self.kernel()
+
+    def write(self, name, document):
+        filename = f"test_stream_{name}.svg"
+        with open(filename, "w") as f:
+            f.write(document)
+        self.addCleanup(os.remove, filename)
+        return filename
+
+    def load(self, filename, stream):
+        self.elements.svg_stream_load = stream
+        self.kernel.console("element* delete\n")
+        self.elements.load(filename)
+        return node_tree(self.elements)
+
+    def read(self, filename):
+        processor = SVGStreamProcessor(self.elements, load_operations=False)
+        return processor.read(filename, ppi=96.0, transform="scale(1)")
+
+    def assertSameNodes(self, expected, actual):
+        self.assertEqual([t for t, a in expected], [t for t, a in actual])
+        for (node_type, a), (_, b) in zip(expected, actual):
+            self.assertEqual(sorted(a), sorted(b), node_type)
+            for key in a:
+                if key == "geometry":
+                    self.assertEqual(a[key].shape, b[key].shape)
+                    self.assertTrue(np.array_equal(a[key], b[key], equal_nan=True))
+                else:
+                    self.assertEqual(a[key], b[key], f"{node_type} {key}")
+
+    def test_plain_files(self):
+        for name, document in PLAIN.items():
+            filename = self.write(name, document)
+            self.assertIsNotNone(self.read(filename), name)
+            expected = self.load(filename, False)
+            actual = self.load(filename, True)
+            self.assertGreater(len(expected), 1)
+            self.assertSameNodes(expected, actual)
+
+    def test_full_loader(self):
+        for name, document in FULL.items():
+            filename = self.write(name, document)
+            self.assertIsNone(self.read(filename), name)
+            self.assertSameNodes(self.load(filename, False), self.load(filename, True))
+        filename = self.write("saved", PLAIN["layers"])
+        self.load(filename, False)
+        self.kernel.console(f"save {filename}\n")
+        self.assertIsNone(self.read(filename))
+
+    def test_path_geometry(self):
+        rng = random.Random(3)
+        for _ in range(3000):
+            pathd = random_path(rng)
+            path = Path()
+            try:
+                path.parse(pathd)
+            except ValueError:
+                pass
+            count = len(path)
+            path.approximate_arcs_with_cubics()
+            expected = Geomstr.svg(path)
+            geometry, dot, actual_count = path_geometry(pathd)
+            self.assertEqual(count, actual_count, pathd)
+            a = expected.segments[: expected.index]
+            b = geometry.segments[: geometry.index]
+            self.assertEqual(a.shape, b.shape, pathd)
+            self.assertTrue(np.array_equal(a, b, equal_nan=True), pathd)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestSVGStreamBenchmark(unittest.TestCase):
+    def test_benchmark_cad_file(self):
+        filename = "test_stream_cad.svg"
+        cad_file(filename, 2000, 1000)
+        self.addCleanup(os.remove, filename)
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            counts = {}
+            for stream in (False, True):
+                elements.svg_stream_load = stream
+                kernel.console("element* delete\n")
+                start = time.perf_counter()
+                elements.load(filename)
+                elapsed = time.perf_counter() - start
+                counts[stream] = len(
+                    list(elements.elem_branch.flat(types=("elem path", "elem polyline")))
+                )
+                print(
+                    f"\n{'streamed' if stream else 'svgelements'} load, with classification: "
+                    f"{counts[stream]} shapes in {elapsed:.3f}s"
+                )
+            self.assertEqual(counts[False], counts[True])
+
+            # Reading the file alone, the time and peak memory before creating nodes.
+            def parse():
+                return SVG.parse(filename, ppi=96.0, transform="scale(1)")
+
+            def read():
+                processor = SVGStreamProcessor(elements, load_operations=False)
+                return processor.read(filename, ppi=96.0, transform="scale(1)")
+
+            peaks = {}
+            for name, reader in (("svgelements", parse), ("streamed", read)):
+                start = time.perf_counter()
+                reader()
+                elapsed = time.perf_counter() - start
+                tracemalloc.start()
+                document = reader()
+                peaks[name] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.assertIsNotNone(document)
+                print(f"{name} read: {elapsed:.3f}s, peak {peaks[name] / 1e6:.1f} MB")
+            self.assertLess(peaks["streamed"], peaks["svgelements"])
+        finally:
+            kernel()
+
+
+if __name__ == "__main__":
+    unittest.main()
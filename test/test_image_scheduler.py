@@ -0,0 +1,256 @@
+"""
+Shared scheduler for image node updates.
+
+Verifies that:
+1. Updates are processed by a bounded number of worker threads
+2. Requests for a waiting node are coalesced into one processing of its latest state
+3. Emphasized nodes are processed before other nodes, hidden nodes last
+4. Worker processes give the processed image of the node, a superseded request is dropped
+5. Planning with another number of jobs while images are processed replaces no pool and
+   breaks no task
+6. Benchmark: updating many images with threads per node and with the scheduler
+"""
+
+import os
+import threading
+import time
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from meerk40t.core import parallel
+from meerk40t.core.node.elem_image import ImageNode, process_image_task
+from meerk40t.core.units import UNITS_PER_INCH
+from meerk40t.svgelements import Matrix
+from test import bootstrap
+
+
+def square(value):
+    return value * value
+
+
+def noise_image(seed, size=96):
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (size, size), dtype=np.uint8), "L")
+
+
+def image_node(seed, size=96):
+    # Processed at 1.5 pixels per image pixel.
+    scale = 1.5 * UNITS_PER_INCH / 500
+    node = ImageNode(
+        image=noise_image(seed, size), matrix=Matrix.scale(scale, scale), dpi=500
+    )
+    node.dither_type = "atkinson"
+    return node
+
+
+def wait_for(scheduler, timeout=60):
+    end = time.time() + timeout
+    while len(scheduler) and time.time() < end:
+        time.sleep(0.01)
+
+
+class Recorder:
+    """
+    Records the order the nodes are processed in. A blocked recorder holds every
+    worker until released.
+    """
+
+    def __init__(self, blocked=False):
+        self.order = []
+        self.running = 0
+        self.peak = 0
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+        self.lock = threading.Lock()
+
+    def attach(self, node, name):
+        process_image = node.process_image
+
+        def recorded(*args, **kwargs):
+            self.release.wait(30)
+            with self.lock:
+                self.order.append(name)
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            process_image(*args, **kwargs)
+            with self.lock:
+                self.running -= 1
+
+        node.process_image = recorded
+        return node
+
+
+class TestImageScheduler(unittest.TestCase):
+    def setUp(self):
+        self.kernel = bootstrap.bootstrap()
+        self.context = self.kernel.root
+        self.scheduler = self.kernel.lookup("image/scheduler")
+        self.kernel.elements.image_jobs = 1
+
+    def tearDown(self):
+        self.kernel()
+        parallel.shutdown()
+
+    def test_bounded_threads(self):
+        recorder = Recorder()
+        nodes = [recorder.attach(image_node(i, 32), i) for i in range(40)]
+        for node in nodes:
+            node.update(self.context)
+        wait_for(self.scheduler)
+        self.assertEqual(sorted(recorder.order), list(range(40)))
+        self.assertLessEqual(recorder.peak, 2)
+        for node in nodes:
+            self.assertIsNotNone(node._processed_image)
+            self.assertEqual(node._processed_image.mode, "1")
+            self.assertIsNone(node.message)
+
+    def test_coalescing(self):
+        recorder = Recorder(blocked=True)
+        blockers = [recorder.attach(image_node(i, 32), f"blocker{i}") for i in range(2)]
+        node = recorder.attach(image_node(5), "node")
+        for blocker in blockers:
+            blocker.update(self.context)
+        for invert in (False, True, False, True):
+            node.invert = invert
+            node.update(self.context)
+        self.assertEqual(self.scheduler.coalesced, 3)
+        recorder.release.set()
+        wait_for(self.scheduler)
+        self.assertEqual(recorder.order.count("node"), 1)
+        expected = image_node(5)
+        expected.invert = True
+        expected.process_image(node._default_units / node.dpi, node._default_units / node.dpi)
+        self.assertTrue(
+            np.array_equal(
+                np.array(expected._processed_image), np.array(node._processed_image)
+            )
+        )
+
+    def test_priority(self):
+        recorder = Recorder(blocked=True)
+        blockers = [recorder.attach(image_node(i, 32), f"blocker{i}") for i in range(2)]
+        for blocker in blockers:
+            blocker.update(self.context)
+        nodes = {}
+        for name in ("hidden", "plain", "emphasized"):
+            nodes[name] = recorder.attach(image_node(len(name), 32), name)
+        nodes["hidden"].hidden = True
+        nodes["emphasized"].emphasized = True
+        for name in ("hidden", "plain", "emphasized"):
+            nodes[name].update(self.context)
+        recorder.release.set()
+        wait_for(self.scheduler)
+        self.assertEqual(recorder.order[2:], ["emphasized", "plain", "hidden"])
+
+    def test_cancel(self):
+        recorder = Recorder(blocked=True)
+        blockers = [recorder.attach(image_node(i, 32), f"blocker{i}") for i in range(2)]
+        for blocker in blockers:
+            blocker.update(self.context)
+        node = recorder.attach(image_node(7), "node")
+        node.update(self.context)
+        self.scheduler.cancel(node)
+        recorder.release.set()
+        wait_for(self.scheduler)
+        self.assertNotIn("node", recorder.order)
+
+    def test_process_task(self):
+        node = image_node(3)
+        node.operations = [{"name": "gamma", "enable": True, "factor": 1.4}]
+        step = node._default_units / node.dpi
+        matrix, image, dither, dither_type, depthmap = process_image_task(
+            node._process_task(step, step)
+        )
+        node.process_image(step, step)
+        self.assertEqual(matrix, node._actualized_matrix)
+        self.assertTrue(np.array_equal(np.array(image), np.array(node._processed_image)))
+        self.assertEqual((dither, dither_type), (node.dither, node.dither_type))
+
+    def test_worker_processes(self):
+        self.kernel.elements.image_jobs = 2
+        nodes = [image_node(i, 64) for i in range(6)]
+        for node in nodes:
+            node.update(self.context)
+        # Supersedes the first request of the node.
+        nodes[0].invert = True
+        nodes[0].update(self.context)
+        wait_for(self.scheduler, 120)
+        for i, node in enumerate(nodes):
+            expected = image_node(i, 64)
+            expected.invert = i == 0
+            step = node._default_units / node.dpi
+            expected.process_image(step, step)
+            self.assertTrue(
+                np.array_equal(
+                    np.array(expected._processed_image), np.array(node._processed_image)
+                )
+            )
+            self.assertEqual(expected._processed_matrix, node._processed_matrix)
+
+    def test_shared_pool(self):
+        self.kernel.elements.image_jobs = 2
+        executor = parallel.get_executor(3)
+        nodes = [image_node(i, 64) for i in range(6)]
+        for node in nodes:
+            node.update(self.context)
+        self.assertEqual(
+            parallel.parallel_map(square, range(5), jobs=3), [i * i for i in range(5)]
+        )
+        wait_for(self.scheduler, 120)
+        self.assertIs(parallel.get_executor(2), executor)
+        self.assertEqual(self.scheduler.cancelled, 0)
+        for node in nodes:
+            self.assertIsNotNone(node._processed_image)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestImageSchedulerBenchmark(unittest.TestCase):
+    def test_benchmark_updates(self):
+        kernel = bootstrap.bootstrap()
+        try:
+            context = kernel.root
+            scheduler = kernel.lookup("image/scheduler")
+            count = 30
+
+            start = time.perf_counter()
+            nodes = [image_node(i, 192) for i in range(count)]
+            for node in nodes:
+                ImageNode.update(node, None)
+            print(f"\n{count} images serial: {time.perf_counter() - start:.3f}s")
+
+            # A thread per node, as before the scheduler.
+            start = time.perf_counter()
+            nodes = [image_node(i, 192) for i in range(count)]
+            for i, node in enumerate(nodes):
+                node._needs_update = True
+                node._update_thread = context.threaded(
+                    node._process_image_thread,
+                    daemon=True,
+                    thread_name=f"image_update_{i}",
+                )
+            for node in nodes:
+                node._update_thread.join()
+            print(f"{count} images thread per node: {time.perf_counter() - start:.3f}s")
+
+            for jobs in (1, 2):
+                kernel.elements.image_jobs = jobs
+                start = time.perf_counter()
+                nodes = [image_node(i, 192) for i in range(count)]
+                for node in nodes:
+                    node.update(context)
+                wait_for(scheduler, 300)
+                print(
+                    f"{count} images scheduler, {jobs} job(s): {time.perf_counter() - start:.3f}s"
+                )
+                self.assertTrue(all(node._processed_image is not None for node in nodes))
+        finally:
+            kernel()
+
+
+if __name__ == "__main__":
+    unittest.main()
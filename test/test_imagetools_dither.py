@@ -0,0 +1,85 @@
+"""
+Numpy error diffusion without numba.
+
+Verifies that:
+1. error_diffusion gives the results of the per-pixel methods, for every diffusion map
+2. dither() produces the same image on either path
+3. Benchmark: both paths for every method of dither()
+"""
+
+import os
+import time
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from meerk40t.image import dither as dithering
+from meerk40t.image.dither import diffusion_maps, error_diffusion, function_map
+
+
+def gradient_image(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(0, 255, width, dtype=np.float32)[np.newaxis, :]
+    noise = rng.normal(0, 20, (height, width)).astype(np.float32)
+    return np.clip(ramp + noise, 0, 255).astype(np.float32)
+
+
+class TestErrorDiffusion(unittest.TestCase):
+    def test_matches_per_pixel(self):
+        for method, diff_map in diffusion_maps.items():
+            for shape in ((37, 23), (1, 9), (9, 1), (2, 2), (64, 50)):
+                data = gradient_image(shape[1], shape[0], seed=len(method))
+                expected = function_map[method](data.copy())
+                actual = error_diffusion(data.copy(), diff_map)
+                self.assertTrue(np.array_equal(expected, actual), method)
+
+    def test_every_method_mapped(self):
+        for method in function_map:
+            if method.startswith("bayer"):
+                continue
+            self.assertIn(method, diffusion_maps)
+
+    def test_dither_paths(self):
+        image = Image.fromarray(gradient_image(48, 32).astype(np.uint8), mode="L")
+        has_numba = dithering.HAS_NUMBA
+        try:
+            for method in diffusion_maps:
+                dithering.HAS_NUMBA = True
+                per_pixel = np.array(dithering.dither(image, method))
+                dithering.HAS_NUMBA = False
+                vectorized = np.array(dithering.dither(image, method))
+                self.assertTrue(np.array_equal(per_pixel, vectorized), method)
+                self.assertTrue(np.all((vectorized == 0) | (vectorized == 255)))
+        finally:
+            dithering.HAS_NUMBA = has_numba
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestErrorDiffusionBenchmark(unittest.TestCase):
+    def test_benchmark_methods(self):
+        data = gradient_image(200, 150)
+        print(f"\nDithering {data.shape[1]}x{data.shape[0]}, numba: {dithering.HAS_NUMBA}")
+        for method, dither_function in function_map.items():
+            start = time.perf_counter()
+            dither_function(data.copy())
+            per_pixel = time.perf_counter() - start
+            diff_map = diffusion_maps.get(method)
+            if diff_map is None:
+                print(f"{method}: {per_pixel:.4f}s")
+                continue
+            start = time.perf_counter()
+            error_diffusion(data.copy(), diff_map)
+            vectorized = time.perf_counter() - start
+            print(
+                f"{method}: per-pixel {per_pixel:.4f}s, numpy {vectorized:.4f}s, "
+                f"{per_pixel / vectorized:.1f}x"
+            )
+
+    def test_benchmark_large(self):
+        data = gradient_image(1000, 1000)
+        start = time.perf_counter()
+        error_diffusion(data, diffusion_maps["legacy-floyd-steinberg"])
+        print(f"\nnumpy floyd-steinberg 1 megapixel: {time.perf_counter() - start:.3f}s")
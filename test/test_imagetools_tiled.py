@@ -0,0 +1,180 @@
+"""
+Tiled processing of image nodes.
+
+Verifies that:
+1. Processing in bands gives the image and matrix of the whole image processing,
+   for transforms, crops, inversion, transparency and band safe scripts
+2. Scripts that need the whole image are processed whole
+3. Dithered bands keep the density of the whole image, also at the band seams
+4. Benchmark: time and peak numpy memory of the dither, whole and in bands
+"""
+
+import os
+import time
+import tracemalloc
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from meerk40t.core.cutcode.rastercut import RasterCut
+from meerk40t.core.node.elem_image import ImageNode
+from meerk40t.svgelements import Matrix
+
+
+def wave_image(width, height, seed=0, mode="RGB"):
+    """
+    Grayscale waves with noise and white margins at the top and left.
+    """
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    data = 128 + 100 * np.sin(xx / 17.0) * np.cos(yy / 23.0) + rng.normal(0, 10, (height, width))
+    data[: height // 6, :] = 255
+    data[:, : width // 7] = 255
+    image = Image.fromarray(np.clip(data, 0, 255).astype(np.uint8), "L").convert(mode)
+    if mode == "RGBA":
+        image.putalpha(Image.fromarray(np.where(xx > width - 20, 0, 255).astype(np.uint8)))
+    return image
+
+
+def process(image, matrix, operations=(), dither_type=None, tiled=False, **kwargs):
+    node = ImageNode(image=image, matrix=Matrix(matrix), dpi=500)
+    node.operations = [dict(op) for op in operations]
+    node.dither = dither_type is not None
+    node.dither_type = dither_type
+    node.invert = kwargs.get("invert", False)
+    if tiled:
+        node.TILE_PIXELS = 0
+        node.TILE_HEIGHT = kwargs.get("tile_height", 40)
+    step = kwargs.get("step", 1.0)
+    return node._process_image(step, step, kwargs.get("crop", True))
+
+
+TONE = {
+    "name": "tone",
+    "enable": True,
+    "type": "line",
+    "values": [(0, 0), (100, 150), (255, 255)],
+}
+GAMMA = {"name": "gamma", "enable": True, "factor": 1.6}
+UNSHARP = {
+    "name": "unsharp_mask",
+    "enable": True,
+    "percent": 500,
+    "radius": 4,
+    "threshold": 0,
+}
+EDGE = {"name": "edge_enhance", "enable": True}
+
+
+class TestTiledImage(unittest.TestCase):
+    def assertSameImage(self, expected, actual):
+        self.assertEqual(expected.size, actual.size)
+        self.assertEqual(expected.mode, actual.mode)
+        difference = np.abs(
+            np.array(expected, dtype=int) - np.array(actual, dtype=int)
+        )
+        # Shifted transform coefficients can round a pixel differently, the
+        # tone curve can stretch the difference.
+        self.assertLessEqual(difference.max(), 2)
+        self.assertLessEqual(np.count_nonzero(difference), 5)
+
+    def test_bands_match_whole(self):
+        cases = (
+            ("scale(1)", ()),
+            ("scale(2.3)", ()),
+            ("rotate(17) scale(1.7)", ()),
+            ("scale(2, 1.5)", (TONE, GAMMA)),
+            ("scale(2)", (UNSHARP, EDGE)),
+        )
+        for matrix, operations in cases:
+            for crop in (True, False):
+                for invert in (False, True):
+                    for mode in ("RGB", "RGBA"):
+                        image = wave_image(300, 220, mode=mode)
+                        kwargs = dict(crop=crop, invert=invert)
+                        m1, whole = process(image, matrix, operations, **kwargs)
+                        m2, bands = process(
+                            image, matrix, operations, tiled=True, **kwargs
+                        )
+                        self.assertEqual(m1, m2, matrix)
+                        self.assertSameImage(whole, bands)
+
+    def test_negative_steps(self):
+        image = wave_image(200, 150)
+        m1, whole = process(image, "scale(2.3)", step=-1.0)
+        m2, bands = process(image, "scale(2.3)", step=-1.0, tiled=True)
+        self.assertEqual(m1, m2)
+        self.assertSameImage(whole, bands)
+
+    def test_whole_image_scripts(self):
+        operations = (
+            {"name": "contrast", "enable": True, "contrast": 40, "brightness": 10},
+        )
+        node = ImageNode(image=wave_image(200, 150), matrix=Matrix("scale(2)"))
+        node.operations = [dict(op) for op in operations]
+        self.assertIsNone(node._band_margin())
+        node.operations = [dict(EDGE), dict(UNSHARP)]
+        self.assertEqual(node._band_margin(), 16)
+        image = wave_image(200, 150)
+        m1, whole = process(image, "scale(2)", operations)
+        m2, tiled = process(image, "scale(2)", operations, tiled=True)
+        self.assertTrue(np.array_equal(np.array(whole), np.array(tiled)))
+
+    def test_dither_bands(self):
+        image = wave_image(300, 220)
+        gray = np.array(process(image, "scale(2.3)", crop=False)[1], dtype=float) / 255
+        for dither_type in ("Floyd-Steinberg", "stucki", "atkinson"):
+            m1, whole = process(image, "scale(2.3)", dither_type=dither_type, crop=False)
+            m2, bands = process(
+                image, "scale(2.3)", dither_type=dither_type, crop=False, tiled=True
+            )
+            self.assertEqual(bands.mode, "1")
+            self.assertEqual(whole.size, bands.size)
+            whole = np.array(whole, dtype=float)
+            bands = np.array(bands, dtype=float)
+            self.assertAlmostEqual(whole.mean(), bands.mean(), delta=0.002)
+            # Rows after a seam are as close to the gray levels as any other row.
+            seams = np.arange(40, bands.shape[0], 40)
+            row_error = np.abs(bands.mean(axis=1) - gray.mean(axis=1))
+            self.assertLess(row_error[seams].mean(), 3 * row_error.mean())
+
+    def test_raster_cut(self):
+        matrix, image = process(
+            wave_image(200, 150), "scale(2)", dither_type="Floyd-Steinberg", tiled=True
+        )
+        cut = RasterCut(image, matrix.value_trans_x(), matrix.value_trans_y(), 1, 1)
+        plotted = list(cut.plot.plot())
+        self.assertGreater(len(plotted), image.height)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestTiledImageBenchmark(unittest.TestCase):
+    def test_benchmark_memory(self):
+        image = wave_image(600, 450)
+        for tiled in (False, True):
+            start = time.perf_counter()
+            matrix, result = process(
+                image, "scale(4)", dither_type="stucki", tiled=tiled, tile_height=512
+            )
+            print(
+                f"\n{'bands' if tiled else 'whole'} {result.width}x{result.height}: "
+                f"{time.perf_counter() - start:.3f}s"
+            )
+        # Tracing slows numpy down, the peaks are measured on a smaller image.
+        peaks = {}
+        for tiled in (False, True):
+            tracemalloc.start()
+            process(
+                image, "scale(2)", dither_type="stucki", tiled=tiled, tile_height=256
+            )
+            peaks[tiled] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{'bands' if tiled else 'whole'} numpy peak {peaks[tiled] / 1e6:.1f} MB")
+        self.assertLess(peaks[True], peaks[False] / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,238 @@
+"""
+Lazy plugins and plugin profiling.
+
+Verifies that:
+1. A lazy plugin is not imported until a declared path is looked up or matched, a declared
+   command is parsed, a declared feature is queried or a declared settings section exists
+2. The loaded plugin receives the passed kernel lifecycles once and in order, and the
+   later lifecycles through the lazy plugin
+3. A lazy plugin failing its invalidate lifecycle registers nothing
+4. The manifests of the internal lazy plugins declare what the plugins register
+5. The plugin profile records imports and lifecycles, without nested calls
+6. Benchmark: startup of the internal plugins with and without lazy plugins
+"""
+
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from meerk40t.kernel import Kernel, LazyPlugin, PluginProfile, plugin_name
+
+SAMPLE = "test.test_kernel_plugins:sample_plugin"
+
+
+def sample_plugin(kernel, lifecycle=None):
+    kernel.sample_lifecycles.append(lifecycle)
+    if lifecycle == "invalidate":
+        return kernel.sample_invalid
+    if lifecycle == "register":
+        kernel.register("sample/path", "sample")
+
+        @kernel.console_command("samplecmd")
+        def sample_command(channel, _, **kwargs):
+            channel("sample executed")
+
+    if lifecycle == "boot":
+        kernel.set_feature("sample")
+
+
+def sample_kernel(invalid=False, profile_startup=False, sections=()):
+    kernel = Kernel(
+        "MeerK40t",
+        "0.0.0-testing",
+        "MeerK40t_TEST",
+        ansi=False,
+        ignore_settings=True,
+        profile_startup=profile_startup,
+    )
+    kernel.sample_lifecycles = []
+    kernel.sample_invalid = invalid
+    for section in sections:
+        kernel.write_persistent(section, "label", section)
+    kernel.add_plugin(
+        LazyPlugin(
+            SAMPLE,
+            paths=("sample/path",),
+            commands=("samplecmd",),
+            features=("sample",),
+            sections=("sample",),
+        )
+    )
+    kernel(partial=True)
+    return kernel
+
+
+class TestLazyPlugin(unittest.TestCase):
+    def assertLoadedOnce(self, kernel):
+        lifecycles = kernel.sample_lifecycles
+        # plugins, service and module classify the plugin when it is added.
+        self.assertEqual(
+            lifecycles[:6], ["plugins", "service", "module", "precli", "cli", "invalidate"]
+        )
+        self.assertEqual(len(lifecycles), len(set(lifecycles)))
+
+    def test_lookup(self):
+        kernel = sample_kernel()
+        try:
+            self.assertEqual(kernel.sample_lifecycles, [])
+            self.assertIsNone(kernel.lookup("sample/other"))
+            self.assertEqual(kernel.sample_lifecycles, [])
+            self.assertEqual(kernel.lookup("sample/path"), "sample")
+            self.assertLoadedOnce(kernel)
+            self.assertEqual(kernel.sample_lifecycles[-1], "postmain")
+            # The main loop passed before the plugin was loaded, it is not replayed.
+            self.assertNotIn("mainloop", kernel.sample_lifecycles)
+            self.assertTrue(kernel.has_feature("sample"))
+        finally:
+            kernel()
+        self.assertEqual(kernel.sample_lifecycles[-2:], ["preshutdown", "shutdown"])
+        self.assertLoadedOnce(kernel)
+
+    def test_find_command_feature(self):
+        for trigger in ("find", "command", "feature"):
+            kernel = sample_kernel()
+            try:
+                lines = []
+                kernel.channel("console").watch(lines.append)
+                if trigger == "find":
+                    self.assertEqual(list(kernel.match("sample/.*")), ["sample/path"])
+                elif trigger == "command":
+                    kernel.console("samplecmd\n")
+                    self.assertTrue(any("sample executed" in line for line in lines))
+                else:
+                    self.assertTrue(kernel.has_feature("sample"))
+                self.assertLoadedOnce(kernel)
+                self.assertEqual(kernel._lazy_plugins, [])
+            finally:
+                kernel()
+
+    def test_section(self):
+        kernel = sample_kernel(sections=("sample0",))
+        try:
+            # Loaded during preboot, before the kernel passed boot.
+            self.assertLoadedOnce(kernel)
+            lifecycles = kernel.sample_lifecycles
+            self.assertLess(lifecycles.index("preboot"), lifecycles.index("boot"))
+        finally:
+            kernel()
+
+    def test_invalid(self):
+        kernel = sample_kernel(invalid=True)
+        try:
+            self.assertIsNone(kernel.lookup("sample/path"))
+            self.assertEqual(kernel.sample_lifecycles[-1], "invalidate")
+            self.assertFalse(kernel.has_feature("sample"))
+            kernel.console("samplecmd\n")
+            self.assertEqual(kernel.sample_lifecycles.count("invalidate"), 1)
+        finally:
+            kernel()
+        self.assertEqual(kernel.sample_lifecycles[-1], "invalidate")
+
+
+class TestInternalManifests(unittest.TestCase):
+    def test_manifests(self):
+        from meerk40t.core import core
+        from meerk40t.device import dummydevice
+        from meerk40t.internal_plugins import LAZY_PLUGINS
+
+        for name, manifest in LAZY_PLUGINS.items():
+            kernel = Kernel(
+                "MeerK40t", "0.0.0-testing", "MeerK40t_TEST", ansi=False, ignore_settings=True
+            )
+            try:
+                kernel.add_plugin(dummydevice.plugin)
+                kernel.add_plugin(core.plugin)
+                lazy = LazyPlugin(name, **manifest)
+                kernel.add_plugin(lazy)
+                kernel(partial=True)
+                self.assertIn(lazy, kernel._lazy_plugins, name)
+                before = set(kernel._registered)
+                if not kernel.load_lazy_plugins((lazy,)):
+                    # Invalid here, eg. without an optional dependency.
+                    continue
+                registered = set(kernel._registered) - before
+                declared = set(lazy.paths) | {f"command/{c}" for c in lazy.commands}
+                shared = {path for path in lazy.paths if path in before}
+                self.assertEqual(registered, declared - shared, name)
+            finally:
+                kernel()
+
+
+class TestPluginProfile(unittest.TestCase):
+    def test_profile(self):
+        kernel = sample_kernel(profile_startup=True)
+        try:
+            kernel.lookup("sample/path")
+            profile = kernel.plugin_profile
+            self.assertIsInstance(profile, PluginProfile)
+            phases = profile.times[SAMPLE]
+            self.assertIn("import", phases)
+            self.assertIn("register", phases)
+            self.assertIn("postmain", phases)
+            lines = []
+            kernel.channel("console").watch(lines.append)
+            kernel.console("plugin-profile\n")
+            self.assertTrue(any(SAMPLE in line for line in lines))
+        finally:
+            kernel()
+
+    def test_nested(self):
+        profile = PluginProfile()
+
+        def inner(kernel, lifecycle):
+            time.sleep(0.02)
+
+        def outer(kernel, lifecycle):
+            profile.call(inner, kernel, lifecycle)
+
+        profile.call(outer, None, "boot")
+        self.assertGreaterEqual(profile.times[plugin_name(inner)]["boot"], 0.02)
+        self.assertLess(profile.times[plugin_name(outer)]["boot"], 0.02)
+        lines = profile.report(threshold=0.01)
+        self.assertEqual(len(lines), 3)
+        self.assertIn("boot", lines[1])
+        self.assertNotIn("boot", lines[2])
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestLazyStartupBenchmark(unittest.TestCase):
+    def test_benchmark_startup(self):
+        # Every start is a fresh interpreter, the lazy plugins save their imports.
+        script = """
+import time
+t0 = time.perf_counter()
+import meerk40t.internal_plugins as internal_plugins
+from meerk40t.kernel import Kernel
+from meerk40t.main import parser
+if {eager}:
+    internal_plugins.LAZY_PLUGINS = {{}}
+kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t_TEST", ansi=False, ignore_settings=True)
+kernel.args = parser.parse_args(["-z"])
+kernel.add_plugin(internal_plugins.plugin)
+kernel(partial=True)
+print(time.perf_counter() - t0, len(kernel._lazy_plugins))
+kernel()
+"""
+        results = {}
+        for name, eager in (("lazy", False), ("eager", True)):
+            times = []
+            for _ in range(3):
+                output = subprocess.run(
+                    [sys.executable, "-c", script.format(eager=eager)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                elapsed, lazy = output.strip().split("\n")[-1].split()
+                times.append(float(elapsed))
+            results[name] = min(times), int(lazy)
+            print(f"\n{name}: startup {min(times):.3f}s, {lazy} plugins not loaded")
+        self.assertGreater(results["lazy"][1], 0)
+        self.assertEqual(results["eager"][1], 0)
+
+if __name__ == "__main__":
+    unittest.main()
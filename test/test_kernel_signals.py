@@ -0,0 +1,227 @@
+"""
+Signal bus coalescing and profiling.
+
+Verifies that:
+1. Without a policy the latest message queued within a tick is delivered
+2. Merge policies combine the messages of a tick, merge_nodes into one list of distinct nodes
+3. Interval policies hold signals back until the interval passed and deliver the merged message
+4. The core plugin installs the default policies
+5. The profiler records queued, coalesced, held and delivered signals, queue depth, lag and
+   listener latency histograms, and exports them as JSON with the signal-profile command
+6. Benchmark: a storm of element updates with an expensive listener, with and without policies
+"""
+
+import json
+import os
+import time
+import unittest
+
+from meerk40t.kernel import LatencyHistogram, merge_nodes
+from test import bootstrap
+
+
+class TestSignalPolicies(unittest.TestCase):
+    def setUp(self):
+        self.kernel = bootstrap.bootstrap()
+        self.kernel.process_queue()
+        self.received = []
+        self.kernel.listen("storm", self.on_storm)
+        self.kernel.process_queue()
+        self.received.clear()
+
+    def tearDown(self):
+        self.kernel.unlisten("storm", self.on_storm)
+        self.kernel()
+
+    def on_storm(self, origin, *message):
+        self.received.append(message)
+
+    def test_latest_message(self):
+        kernel = self.kernel
+        for i in range(5):
+            kernel.signal("storm", "/", i)
+        kernel.process_queue()
+        self.assertEqual(self.received, [(4,)])
+
+    def test_merge(self):
+        kernel = self.kernel
+        kernel.signal_policy("storm", merge=merge_nodes)
+        a, b, c = object(), object(), object()
+        kernel.signal("storm", "/", a, "first")
+        kernel.signal("storm", "/", [b, a], "second")
+        kernel.signal("storm", "/", (c,), "third")
+        kernel.signal("storm", "/", None, "fourth")
+        kernel.process_queue()
+        self.assertEqual(self.received, [([a, b, c], "fourth")])
+
+        # A message without nodes stands for all nodes.
+        kernel.signal("storm", "/", a)
+        kernel.signal("storm", "/")
+        kernel.signal("storm", "/", b)
+        kernel.process_queue()
+        self.assertEqual(self.received[-1], ())
+
+        kernel.signal_policy("storm")
+        self.assertNotIn("storm", kernel.signal_policies)
+        kernel.signal("storm", "/", a)
+        kernel.signal("storm", "/", b)
+        kernel.process_queue()
+        self.assertEqual(self.received[-1], (b,))
+
+    def test_interval(self):
+        kernel = self.kernel
+        kernel.signal_policy("storm", merge=merge_nodes, interval=0.2)
+        a, b = object(), object()
+        kernel.signal("storm", "/", a)
+        kernel.process_queue()
+        self.assertEqual(self.received, [(a,)])
+        kernel.signal("storm", "/", b)
+        kernel.process_queue()
+        kernel.signal("storm", "/", a)
+        kernel.process_queue()
+        self.assertEqual(len(self.received), 1)
+        self.assertIn("storm", kernel._message_queue)
+        time.sleep(0.25)
+        kernel.process_queue()
+        self.assertEqual(self.received[1:], [([b, a],)])
+        kernel.process_queue()
+        self.assertEqual(len(self.received), 2)
+
+    def test_default_policies(self):
+        policies = self.kernel.signal_policies
+        self.assertIs(policies["element_property_update"].merge, merge_nodes)
+        self.assertIs(policies["element_property_reload"].merge, merge_nodes)
+        self.assertGreater(policies["tree_changed"].interval, 0)
+        self.assertGreater(policies["refresh_scene"].interval, 0)
+
+
+class TestSignalProfiler(unittest.TestCase):
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        for micro in (1, 3, 3, 100, 5000):
+            histogram.add(micro / 1e6)
+        data = histogram.as_dict()
+        self.assertEqual(data["count"], 5)
+        self.assertAlmostEqual(data["max"], 5000e-6)
+        self.assertEqual(data["buckets_us"], {"<2": 1, "<4": 2, "<128": 1, "<8192": 1})
+        self.assertAlmostEqual(data["p50"], 4e-6)
+        self.assertAlmostEqual(data["p99"], 5000e-6)
+        self.assertEqual(LatencyHistogram().percentile(0.5), 0.0)
+
+    def test_profile(self):
+        kernel = bootstrap.bootstrap()
+        filename = "test_signal_profile.json"
+        try:
+            kernel.process_queue()
+
+            def slow(origin, *message):
+                time.sleep(0.002)
+
+            kernel.listen("storm", slow)
+            kernel.signal_policy("storm", interval=10)
+            lines = []
+            kernel.channel("console").watch(lines.append)
+            kernel.console("signal-profile reset\n")
+            kernel.console("signal-profile start\n")
+            self.assertTrue(kernel.signal_profiler.enabled)
+            for i in range(3):
+                kernel.signal("storm", "/", i)
+                kernel.signal("other", "/")
+                kernel.process_queue()
+            kernel.console("signal-profile stop\n")
+            kernel.signal("storm", "/")
+            kernel.process_queue()
+
+            data = kernel.signal_profiler.as_dict()
+            self.assertEqual(data["ticks"], 3)
+            self.assertEqual(data["queue_depth"]["max"], 2)
+            storm = data["signals"]["storm"]
+            self.assertEqual(storm["queued"], 3)
+            self.assertEqual(storm["coalesced"], 1)
+            self.assertEqual(storm["deferred"], 2)
+            self.assertEqual(storm["delivered"], 1)
+            self.assertEqual(storm["lag"]["count"], 1)
+            (name, listener), = storm["listeners"].items()
+            self.assertIn("slow", name)
+            self.assertEqual(listener["count"], 1)
+            self.assertGreaterEqual(listener["max"], 0.002)
+            self.assertEqual(data["signals"]["other"]["delivered"], 3)
+
+            kernel.console(f"signal-profile export {filename}\n")
+            with open(filename) as f:
+                exported = json.load(f)
+            self.assertEqual(exported["signals"]["storm"]["queued"], 3)
+            lines.clear()
+            kernel.console("signal-profile\n")
+            self.assertTrue(any("storm" in line for line in lines))
+            kernel.unlisten("storm", slow)
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
+            kernel()
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestSignalBenchmark(unittest.TestCase):
+    def test_benchmark_storm(self):
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.process_queue()
+            nodes = [object() for _ in range(2000)]
+            updated = set()
+
+            def expensive(origin, *message):
+                # Stands for a tree or property panel update, with a fixed cost per call.
+                sum(range(20000))
+                if message:
+                    items = message[0]
+                    updated.update(
+                        map(id, items if isinstance(items, (list, tuple)) else (items,))
+                    )
+
+            kernel.listen("element_property_update", expensive)
+            kernel.process_queue()
+            results = {}
+            for name, policy in (
+                ("latest", {}),
+                ("merged", {"merge": merge_nodes}),
+                ("merged, 20ms interval", {"merge": merge_nodes, "interval": 0.02}),
+            ):
+                kernel.signal_policy("element_property_update", **policy)
+                kernel.signal_profiler.reset()
+                kernel.signal_profiler.enabled = True
+                updated.clear()
+                start = time.perf_counter()
+                # Bulk edit, the queue is processed after every few signals.
+                for i, node in enumerate(nodes):
+                    kernel.signal("element_property_update", "/", node)
+                    if i % 4 == 3:
+                        kernel.process_queue()
+                while "element_property_update" in kernel._message_queue:
+                    kernel.process_queue()
+                elapsed = time.perf_counter() - start
+                kernel.signal_profiler.enabled = False
+                record = kernel.signal_profiler.as_dict()["signals"][
+                    "element_property_update"
+                ]
+                results[name] = record["delivered"], len(updated)
+                print(
+                    f"\n{name}: {len(nodes)} signals, {record['delivered']} listener calls, "
+                    f"{len(updated)} nodes seen, {elapsed:.3f}s"
+                )
+            kernel.unlisten("element_property_update", expensive)
+            kernel.signal_policy("element_property_update", merge=merge_nodes)
+            self.assertLess(results["latest"][1], len(nodes))
+            self.assertEqual(results["merged"][1], len(nodes))
+            self.assertEqual(results["merged, 20ms interval"][1], len(nodes))
+            self.assertLess(
+                results["merged, 20ms interval"][0], results["merged"][0]
+            )
+        finally:
+            kernel()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,313 @@
+"""
+Newly packed scanlines.
+
+Verifies that:
+1. scanline() packs the bits with np.packbits into the bytes of the string encoding
+2. raster() emits the commands of the per-pixel scanline loop for horizontal, vertical,
+   bidirectional and unidirectional rasters with gap jogs, overscan and every start corner
+3. Plots which are not vectorized (greedy, crossover) give the same commands
+4. The jobs sent through the mock connection are byte-identical
+5. Benchmark: rastering a large image, per pixel and packed
+"""
+
+import math
+import os
+import struct
+import time
+import unittest
+from random import Random
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from meerk40t.core.cutcode.rastercut import RasterCut
+from meerk40t.newly.controller import NewlyController
+from meerk40t.tools.rasterplotter import (
+    RASTER_CROSSOVER,
+    RASTER_GREEDY_H,
+    RASTER_GREEDY_V,
+)
+from test.bootstrap import bootstrap
+
+
+class PerPixelController(NewlyController):
+    """
+    Scanlines built pixel by pixel from the plot and encoded through a binary string, as
+    raster() and scanline() did before the bits were packed.
+    """
+
+    def scanline(self, bits, right=False, left=False, top=False, bottom=False):
+        self._commit_settings()
+        cmd = None
+        if left:
+            cmd = bytearray(b"YF")
+            bits = bits[::-1]
+        elif right:
+            cmd = bytearray(b"YZ")
+            bits = bits[::-1]
+        elif top:
+            cmd = bytearray(b"XF")
+            bits = bits[::-1]
+        elif bottom:
+            cmd = bytearray(b"XZ")
+            bits = bits[::-1]
+        if cmd is None:
+            return
+        count = len(bits)
+        byte_length = int(math.ceil(count / self.BITS_PER_BYTE))
+        cmd += struct.pack(">i", count)[1:]
+        binary = "".join([str(b) for b in bits])
+        cmd += int(binary, 2).to_bytes(byte_length, "little")
+        self(cmd)
+        if left:
+            self._last_x -= count
+        elif right:
+            self._last_x += count
+        elif top:
+            self._last_y -= count
+        elif bottom:
+            self._last_y += count
+
+    def raster(self, raster_cut):
+        scanline = []
+        increasing = True
+
+        def commit_scanline():
+            if scanline:
+                if raster_cut.horizontal:
+                    if increasing:
+                        self.scanline(scanline, right=True)
+                    else:
+                        self.scanline(scanline, left=True)
+                else:
+                    if increasing:
+                        self.scanline(scanline, bottom=True)
+                    else:
+                        self.scanline(scanline, top=True)
+                scanline.clear()
+
+        self("IN")
+        self._clear_settings()
+        previous_x, previous_y = raster_cut.plot.initial_position_in_scene()
+        self._raster_jog(previous_x, previous_y, raster_cut)
+        if raster_cut.horizontal:
+            self.mode = "raster_horizontal"
+            for x, y, on in raster_cut.plot.plot():
+                dx = x - previous_x
+                dy = y - previous_y
+                if dx < 0 and increasing or dx > 0 and not increasing:
+                    commit_scanline()
+                    increasing = not increasing
+                if dy != 0:
+                    commit_scanline()
+                    if abs(dy) > self.service.max_raster_jog:
+                        self._raster_jog(x, y, raster_cut)
+                    else:
+                        self._relative = True
+                        self("PR")
+                        self._goto(x, y)
+                if dx != 0:
+                    scanline.extend([int(on)] * abs(dx))
+                previous_x, previous_y = x, y
+        else:
+            self.mode = "raster_vertical"
+            for x, y, on in raster_cut.plot.plot():
+                dx = x - previous_x
+                dy = y - previous_y
+                if dy < 0 and increasing or dy > 0 and not increasing:
+                    commit_scanline()
+                    increasing = not increasing
+                if dx != 0:
+                    commit_scanline()
+                    if abs(dx) > self.service.max_raster_jog:
+                        self._raster_jog(x, y, raster_cut)
+                    else:
+                        self._relative = True
+                        self("PR")
+                        self._goto(x, y)
+                if dy != 0:
+                    scanline.extend([int(on)] * abs(dy))
+                previous_x, previous_y = x, y
+        commit_scanline()
+
+
+def random_image(width, height, seed=0, mode="1"):
+    """
+    Blobs on a blank image, with blank rows and columns between them.
+    """
+    random = Random(seed)
+    pixels = np.full((height, width), 255, dtype=np.uint8)
+    for _ in range(max(1, width * height // 200)):
+        x = random.randrange(width)
+        y = random.randrange(height)
+        pixels[y : y + random.randrange(1, 6), x : x + random.randrange(1, 12)] = (
+            random.randrange(0, 200)
+        )
+    image = Image.fromarray(pixels, "L")
+    if mode == "1":
+        image = image.convert("1")
+    return image
+
+
+def raster_cut(image, **kwargs):
+    settings = dict(kwargs)
+    cut_settings = {"speed": 150.0, "power": 800.0}
+    return RasterCut(
+        image.copy(),
+        offset_x=settings.pop("offset_x", 1000),
+        offset_y=settings.pop("offset_y", 2000),
+        step_x=settings.pop("step_x", 2),
+        step_y=settings.pop("step_y", 2),
+        settings=cut_settings,
+        **settings,
+    )
+
+
+class TestNewlyScanline(unittest.TestCase):
+    def setUp(self):
+        self.kernel = bootstrap()
+        self.kernel.console("service device start -i newly 0\n")
+        self.service = self.kernel.device
+
+    def tearDown(self):
+        self.kernel()
+
+    def controllers(self):
+        return (
+            PerPixelController(self.service, force_mock=True),
+            NewlyController(self.service, force_mock=True),
+        )
+
+    def run_raster(self, controller, cut):
+        controller._command_buffer.clear()
+        controller.raster(cut)
+        return list(controller._command_buffer), controller._last_x, controller._last_y
+
+    def test_scanline_packing(self):
+        random = Random(1)
+        expected, packed = self.controllers()
+        for controller in (expected, packed):
+            controller._set_raster_mode()
+        for count in list(range(1, 40)) + [63, 64, 65, 1000]:
+            bits = [random.randrange(2) for _ in range(count)]
+            for direction in ("right", "left", "top", "bottom"):
+                expected._command_buffer.clear()
+                packed._command_buffer.clear()
+                expected.scanline(bits, **{direction: True})
+                packed.scanline(np.array(bits, dtype=np.uint8), **{direction: True})
+                self.assertEqual(packed._command_buffer, expected._command_buffer)
+                self.assertEqual(
+                    (packed._last_x, packed._last_y),
+                    (expected._last_x, expected._last_y),
+                )
+
+    def test_raster_matches_per_pixel(self):
+        cases = 0
+        for seed, (width, height) in enumerate(((40, 30), (7, 61), (120, 9))):
+            image = random_image(width, height, seed)
+            for horizontal in (True, False):
+                for bidirectional in (True, False):
+                    for start_minimum_x in (True, False):
+                        for start_minimum_y in (True, False):
+                            for overscan in (0, 6):
+                                for max_raster_jog in (3, 15, 1000):
+                                    self.service.max_raster_jog = max_raster_jog
+                                    options = dict(
+                                        horizontal=horizontal,
+                                        bidirectional=bidirectional,
+                                        start_minimum_x=start_minimum_x,
+                                        start_minimum_y=start_minimum_y,
+                                        overscan=overscan,
+                                    )
+                                    expected, packed = self.controllers()
+                                    self.assertEqual(
+                                        self.run_raster(packed, raster_cut(image, **options)),
+                                        self.run_raster(
+                                            expected, raster_cut(image, **options)
+                                        ),
+                                        options,
+                                    )
+                                    cases += 1
+        self.assertEqual(cases, 288)
+
+    def test_raster_not_vectorized(self):
+        image = random_image(50, 40, 5, mode="L")
+        self.service.max_raster_jog = 15
+        for options in (
+            dict(direction=RASTER_GREEDY_H),
+            dict(direction=RASTER_CROSSOVER),
+            dict(step_x=3, step_y=1, direction=RASTER_GREEDY_V, horizontal=False),
+        ):
+            expected, packed = self.controllers()
+            self.assertEqual(
+                self.run_raster(packed, raster_cut(image, **options)),
+                self.run_raster(expected, raster_cut(image, **options)),
+            )
+
+    def test_raster_grayscale_and_blank(self):
+        self.service.max_raster_jog = 15
+        for image in (
+            random_image(60, 30, 6, mode="L"),
+            Image.new("L", (20, 20), 255),
+            Image.new("1", (20, 20), 0),
+        ):
+            expected, packed = self.controllers()
+            self.assertEqual(
+                self.run_raster(packed, raster_cut(image)),
+                self.run_raster(expected, raster_cut(image)),
+            )
+
+    def test_mock_connection_job(self):
+        self.service.max_raster_jog = 15
+        image = random_image(30, 20, 7)
+        jobs = []
+        for controller in self.controllers():
+            sent = []
+            controller._command_buffer.clear()
+            controller.open_job()
+            controller.raster(raster_cut(image))
+            with mock.patch("meerk40t.newly.mock_connection.sleep"):
+                controller.connect_if_needed()
+                controller.connection.channel = sent.append
+                controller.close_job()
+            jobs.append([p for p in sent if isinstance(p, bytes)])
+        self.assertTrue(jobs[0])
+        self.assertIn(b"YZ", b"".join(jobs[0]))
+        self.assertEqual(jobs[1], jobs[0])
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestNewlyScanlineBenchmark(unittest.TestCase):
+    def test_benchmark_raster(self):
+        kernel = bootstrap()
+        try:
+            kernel.console("service device start -i newly 0\n")
+            service = kernel.device
+            service.max_raster_jog = 15
+            image = random_image(1000, 500, 8)
+            print()
+            for horizontal in (True, False):
+                times = []
+                buffers = []
+                for controller_class in (PerPixelController, NewlyController):
+                    controller = controller_class(service, force_mock=True)
+                    cut = raster_cut(image, horizontal=horizontal)
+                    t = time.perf_counter()
+                    controller.raster(cut)
+                    times.append(time.perf_counter() - t)
+                    buffers.append(controller._command_buffer)
+                self.assertEqual(buffers[1], buffers[0])
+                print(
+                    f"newly raster {image.width}x{image.height}, "
+                    f"horizontal={horizontal}: per pixel {times[0]:.3f}s, "
+                    f"packed {times[1]:.3f}s, {times[0] / times[1]:.1f}x"
+                )
+        finally:
+            kernel()
+
+
+if __name__ == "__main__":
+    unittest.main()
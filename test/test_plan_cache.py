@@ -0,0 +1,165 @@
+"""
+Plan cache of converted and optimized cutcode.
+
+Verifies that:
+1. Planning unchanged operations again reuses cutcode and optimization, with identical results
+2. Changing a setting or the geometry of one operation only converts that operation again
+3. The cache is bounded by the number of cuts and evicts the least recently used entries
+4. Cached cutcode is cloned, modifications of a plan do not reach the cache
+"""
+
+import unittest
+
+from meerk40t.core.cutcode.cutcode import CutCode
+from meerk40t.core.cutcode.cutgroup import CutGroup
+from meerk40t.core.cutcode.linecut import LineCut
+from meerk40t.core.plancache import PlanCache, clone_cutcode
+from test import bootstrap
+
+
+def line_cutcode(count, settings=None):
+    if settings is None:
+        settings = dict(speed=10)
+    cutcode = CutCode(settings=settings)
+    group = CutGroup(cutcode, closed=False)
+    for i in range(count):
+        group.append(LineCut((i, 0), (i + 1, 0), settings=settings, parent=group))
+    for a, b in zip(group, group[1:]):
+        a.next = b
+        b.previous = a
+    cutcode.append(group)
+    return cutcode
+
+
+def plan_cuts(kernel):
+    kernel.console("plan clear copy preprocess validate blob preopt optimize\n")
+    return [
+        (
+            type(cut).__name__,
+            cut.start,
+            cut.end,
+            cut.passes,
+            str(cut.color),
+            cut.settings.get("speed"),
+        )
+        for cutcode in kernel.planner.default_plan.plan
+        for cut in cutcode.flat()
+    ]
+
+
+class TestPlanCache(unittest.TestCase):
+    def setUp(self):
+        self.kernel = bootstrap.bootstrap(profile="MeerK40t_TEST_plancache")
+        kernel = self.kernel
+        kernel.console("element* delete\noperation* delete\n")
+        for i in range(5):
+            kernel.console(f"circle {i}cm 1cm 4mm\n")
+        kernel.console("element* engrave\n")
+        self.rect = kernel.elements.elem_branch.add(
+            type="elem rect", x=0, y=50000, width=40000, height=40000
+        )
+        self.cut_op = kernel.elements.op_branch.add(type="op cut", speed=15)
+        self.cut_op.add_reference(self.rect)
+        self.operations = len(list(kernel.elements.ops()))
+        kernel.console("plan-cache clear\n")
+
+    def tearDown(self):
+        self.kernel()
+
+    def test_replan_hits(self):
+        cache = self.kernel.planner.plan_cache
+        first = plan_cuts(self.kernel)
+        self.assertEqual(cache.hits, 0)
+        stores = cache.stores
+        self.assertGreaterEqual(stores, 3)
+        second = plan_cuts(self.kernel)
+        self.assertEqual(first, second)
+        # All operations and the optimized plan.
+        self.assertEqual(cache.hits, self.operations + 1)
+        self.assertEqual(cache.stores, stores)
+
+    def test_changed_operation_misses(self):
+        kernel = self.kernel
+        cache = kernel.planner.plan_cache
+        plan_cuts(kernel)
+        self.cut_op.speed = 20
+        hits = cache.hits
+        cuts = plan_cuts(kernel)
+        # Only the unchanged engrave operations are reused.
+        self.assertEqual(cache.hits, hits + self.operations - 1)
+        self.assertIn(20, [cut[5] for cut in cuts])
+
+    def test_changed_geometry_misses(self):
+        kernel = self.kernel
+        cache = kernel.planner.plan_cache
+        before = plan_cuts(kernel)
+        self.rect.matrix.post_translate(1000, 0)
+        self.rect.altered()
+        hits = cache.hits
+        after = plan_cuts(kernel)
+        self.assertEqual(cache.hits, hits + self.operations - 1)
+        self.assertNotEqual(before, after)
+
+    def test_disabled(self):
+        kernel = self.kernel
+        kernel.planner.opt_plan_cache_size = 0
+        try:
+            cache = kernel.planner.plan_cache
+            first = plan_cuts(kernel)
+            second = plan_cuts(kernel)
+            self.assertEqual(first, second)
+            self.assertEqual(cache.hits + cache.misses + cache.stores, 0)
+        finally:
+            kernel.planner.opt_plan_cache_size = 250000
+
+
+class TestPlanCacheStorage(unittest.TestCase):
+    def test_lru_bound(self):
+        cache = PlanCache(max_cuts=25)
+        self.assertTrue(cache.put("a", [line_cutcode(10)]))
+        self.assertTrue(cache.put("b", [line_cutcode(10)]))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertTrue(cache.put("c", [line_cutcode(10)]))
+        # b was the least recently used.
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.cuts, 20)
+        self.assertEqual(cache.evictions, 1)
+        self.assertFalse(cache.put("d", [line_cutcode(30)]))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_clone_independent(self):
+        settings = dict(speed=10)
+        cutcode = line_cutcode(5, settings)
+        group = cutcode[0]
+        clone = clone_cutcode(cutcode)
+        cloned_group = clone[0]
+        self.assertIsNot(cloned_group, group)
+        self.assertIs(cloned_group.parent, clone)
+        for original, cut in zip(group, cloned_group):
+            self.assertIsNot(original, cut)
+            self.assertIs(cut.parent, cloned_group)
+            self.assertEqual(cut.start, original.start)
+        self.assertIs(cloned_group[0].next, cloned_group[1])
+        self.assertIs(cloned_group[1].previous, cloned_group[0])
+        # Settings are copied, once for all cuts sharing them.
+        self.assertIsNot(clone.settings, settings)
+        self.assertIs(cloned_group[0].settings, clone.settings)
+        cloned_group[0].reverse()
+        cloned_group[1].burns_done = 1
+        self.assertTrue(group[0].normal)
+        self.assertEqual(group[1].burns_done, 0)
+
+    def test_get_replaces_settings(self):
+        cache = PlanCache()
+        cache.put("a", [line_cutcode(3)])
+        settings = dict(speed=10)
+        cutcode = cache.get("a", settings)[0]
+        self.assertIs(cutcode.settings, settings)
+        self.assertTrue(all(cut.settings is settings for cut in cutcode.flat()))
+
+
+if __name__ == "__main__":
+    unittest.main()
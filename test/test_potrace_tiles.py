@@ -0,0 +1,272 @@
+"""
+Tiled bitmap tracing.
+
+Verifies that:
+1. The decomposition, continuing the pixel search from the last path found, gives the
+   paths of a search from the bottom row for every path
+2. Tiled tracing gives the curves of trace() for the black, white, left and right turn
+   policies, and covers the same area for the minority, majority and random policies
+3. A single tile gives the curves of trace() for every turn policy, worker processes give
+   the curves of the serial tiles, using a single pool
+4. render-op/make_vector_tiles yields the Geomstr of every tile, together with the
+   bounds of render-op/make_vector
+5. Benchmark: tracing large line art, whole and in tiles
+"""
+
+import os
+import time
+import unittest
+from random import Random
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from meerk40t.core import parallel
+from meerk40t.core.geomstr import Geomstr
+from meerk40t.extra import mk_potrace, potrace
+from test.bootstrap import bootstrap
+
+
+def blobs(width, height, seed=0, count=None):
+    """
+    Overlapping rectangles, giving components which cross tiles, holes and islands.
+    """
+    random = Random(seed)
+    data = np.zeros((height, width), dtype=bool)
+    if count is None:
+        count = width * height // 150
+    for _ in range(count):
+        x = random.randrange(width)
+        y = random.randrange(height)
+        data[y : y + random.randrange(1, 25), x : x + random.randrange(1, 25)] ^= True
+    return data
+
+
+def line_art(width, height, seed=0):
+    """
+    Rings, strokes and letters on white, as in scanned artwork.
+    """
+    random = Random(seed)
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for _ in range(width * height // 4000):
+        x = random.randrange(width)
+        y = random.randrange(height)
+        r = random.randrange(4, 30)
+        kind = random.randrange(3)
+        if kind == 0:
+            draw.ellipse(
+                (x - r, y - r, x + r, y + r), outline=0, width=random.randrange(1, 5)
+            )
+        elif kind == 1:
+            end = (x + random.randrange(-60, 60), y + random.randrange(-60, 60))
+            draw.line((x, y) + end, fill=0, width=random.randrange(1, 6))
+        else:
+            draw.text((x, y), random.choice("ABCDEFGHIJK"), fill=0)
+    return image
+
+
+def bitmap(data):
+    # Bitmap inverts the data, True is white.
+    return mk_potrace.Bitmap(~data)
+
+
+def curve_key(curve):
+    key = []
+    for segment in curve.segments:
+        if segment.is_corner:
+            controls = (segment.c.x, segment.c.y)
+        else:
+            controls = (segment.c1.x, segment.c1.y, segment.c2.x, segment.c2.y)
+        key.append((segment.is_corner, controls, segment.end_point.x, segment.end_point.y))
+    return tuple(key)
+
+
+def traced_curves(data, **kwargs):
+    return sorted(curve_key(c) for c in bitmap(data).trace(**kwargs))
+
+
+def tiled_curves(data, **kwargs):
+    return sorted(
+        curve_key(c) for plist in bitmap(data).trace_tiles(**kwargs) for c in plist
+    )
+
+
+def covered_area(curves):
+    """
+    Area within the decomposition points of the curves, holes subtracted.
+    """
+    total = 0
+    for curve in curves:
+        points = curve.decomposition_points
+        area = 0
+        for i in range(len(points)):
+            p = points[i - 1]
+            q = points[i]
+            area += p.x * q.y - q.x * p.y
+        total += area / 2 if curve._path.sign else -area / 2
+    return total
+
+
+def pathlist_from_bottom(bm, turdsize, turnpolicy):
+    """
+    bm_to_pathlist, searching the next pixel from the bottom row for every path.
+    """
+    plist = []
+    original = bm.copy()
+    while True:
+        n = mk_potrace.findnext(bm)
+        if n is None:
+            break
+        y, x = n
+        path = mk_potrace.findpath(bm, x, y + 1, original[y][x], turnpolicy)
+        mk_potrace.xor_path(bm, path)
+        if path.area > turdsize:
+            plist.append(path)
+    return plist
+
+
+class TestPotraceTiles(unittest.TestCase):
+    def test_findnext_continues(self):
+        for seed in range(4):
+            bm = np.pad(blobs(90, 70, seed), [(0, 1), (0, 1)], mode="constant")
+            for turnpolicy in range(7):
+                expected = pathlist_from_bottom(bm.copy(), 2, turnpolicy)
+                plist = mk_potrace.bm_to_pathlist(bm.copy(), 2, turnpolicy)
+                self.assertEqual(
+                    [[(n.x, n.y) for n in p.pt] for p in plist],
+                    [[(n.x, n.y) for n in p.pt] for p in expected],
+                )
+        empty = np.zeros((1, 1), dtype=bool)
+        self.assertEqual(mk_potrace.bm_to_pathlist(empty), [])
+
+    def test_tiles_match_trace(self):
+        for seed, (width, height, tile_size) in enumerate(
+            ((120, 90, 16), (200, 140, 64), (64, 64, 30))
+        ):
+            data = blobs(width, height, seed)
+            for turnpolicy in (
+                mk_potrace.POTRACE_TURNPOLICY_BLACK,
+                mk_potrace.POTRACE_TURNPOLICY_WHITE,
+                mk_potrace.POTRACE_TURNPOLICY_LEFT,
+                mk_potrace.POTRACE_TURNPOLICY_RIGHT,
+            ):
+                for opticurve in (True, False):
+                    options = dict(turnpolicy=turnpolicy, opticurve=opticurve)
+                    self.assertEqual(
+                        tiled_curves(data, tile_size=tile_size, **options),
+                        traced_curves(data, **options),
+                        (seed, options),
+                    )
+
+    def test_tiles_cover_trace(self):
+        data = blobs(200, 140, 7)
+        for turnpolicy in (
+            mk_potrace.POTRACE_TURNPOLICY_MINORITY,
+            mk_potrace.POTRACE_TURNPOLICY_MAJORITY,
+            mk_potrace.POTRACE_TURNPOLICY_RANDOM,
+        ):
+            traced = covered_area(bitmap(data).trace(turnpolicy=turnpolicy))
+            tiled = covered_area(
+                [
+                    c
+                    for plist in bitmap(data).trace_tiles(
+                        turnpolicy=turnpolicy, tile_size=48
+                    )
+                    for c in plist
+                ]
+            )
+            # Only diagonal junctions next to the seams may be resolved otherwise.
+            self.assertAlmostEqual(tiled, traced, delta=40)
+            self.assertAlmostEqual(tiled, data.sum(), delta=80)
+
+    def test_single_tile(self):
+        data = blobs(100, 80, 9)
+        for turnpolicy in range(7):
+            plists = list(bitmap(data).trace_tiles(turnpolicy=turnpolicy))
+            self.assertEqual(len(plists), 1)
+            self.assertEqual(
+                sorted(curve_key(c) for c in plists[0]),
+                traced_curves(data, turnpolicy=turnpolicy),
+            )
+        self.assertEqual(list(bitmap(np.zeros((20, 30), dtype=bool)).trace_tiles()), [])
+
+    def test_worker_processes(self):
+        data = blobs(120, 90, 11)
+        executors = []
+
+        def get_executor(jobs):
+            executors.append(get_shared_executor(jobs))
+            return executors[-1]
+
+        get_shared_executor = parallel.get_executor
+        try:
+            # Small seam chunks, so the components at the seams go to the pool as well.
+            with patch.object(parallel, "get_executor", get_executor), patch.object(
+                mk_potrace, "SEAM_CHUNK", 100
+            ):
+                self.assertEqual(
+                    tiled_curves(data, tile_size=32, jobs=2),
+                    tiled_curves(data, tile_size=32, jobs=1),
+                )
+            # The 12 tiles and the components at the seams share one pool.
+            self.assertGreater(len(executors), 12)
+            for executor in executors:
+                self.assertIs(executor, executors[0])
+        finally:
+            parallel.shutdown()
+
+    def test_make_vector_tiles(self):
+        kernel = bootstrap(plugins=[potrace.plugin])
+        try:
+            make_vector = kernel.lookup("render-op/make_vector")
+            make_vector_tiles = kernel.lookup("render-op/make_vector_tiles")
+            image = line_art(300, 200, 1)
+            geometries = list(make_vector_tiles(image, tile_size=64))
+            self.assertGreater(len(geometries), 1)
+            for geometry in geometries:
+                self.assertIsInstance(geometry, Geomstr)
+            combined = Geomstr()
+            for geometry in geometries:
+                combined.append(geometry)
+            expected = Geomstr.svg(make_vector(image))
+            np.testing.assert_allclose(combined.bbox(), expected.bbox())
+        finally:
+            kernel()
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestPotraceTilesBenchmark(unittest.TestCase):
+    def tearDown(self):
+        parallel.shutdown()
+
+    def test_benchmark_line_art(self):
+        image = line_art(1600, 1200)
+        print()
+        t = time.perf_counter()
+        traced = bitmap(~np.asarray(image.convert("1"))).trace()
+        whole = time.perf_counter() - t
+        print(f"potrace {image.width}x{image.height}: whole {whole:.2f}s, {len(traced)} curves")
+        cpus = parallel.available_cpus()
+        for jobs in sorted({1, min(cpus, 4)}):
+            t = time.perf_counter()
+            first = None
+            count = 0
+            for plist in bitmap(~np.asarray(image.convert("1"))).trace_tiles(
+                tile_size=256, jobs=jobs
+            ):
+                if first is None:
+                    first = time.perf_counter() - t
+                count += len(plist)
+            tiled = time.perf_counter() - t
+            print(
+                f"tiles of 256, {jobs} job(s): {tiled:.2f}s, first tile after "
+                f"{first:.2f}s, {count} curves, {whole / tiled:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
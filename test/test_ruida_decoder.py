@@ -0,0 +1,336 @@
+"""
+Ruida decoder.
+
+Verifies that:
+1. The bytes.translate (un)swizzle tables equal the swizzle lookup tables
+2. parse_commands and the magic histogram give the results of the per-byte versions
+3. RDJob.process describes and plots the commands of a job through the command table
+4. RdDecoder fed in packets split at any byte gives the records of the complete data
+5. The emulator spools commands which are split over two packets
+6. Benchmark: decoding a large .rd file, per-byte and table driven
+"""
+
+import os
+import time
+import unittest
+from random import Random
+
+from meerk40t.ruida.emulator import RuidaEmulator
+from meerk40t.ruida.exceptions import RuidaCommandError
+from meerk40t.ruida.rddecoder import (
+    RdDecoder,
+    decode_bytes,
+    decode_command,
+    determine_magic_via_histogram,
+    encode_bytes,
+    lookup,
+    parse_commands,
+    swizzle_tables,
+    swizzles_lut,
+)
+from meerk40t.ruida.rdjob import FREQUENCY_PART, RDJob, encode32
+from meerk40t.svgelements import Matrix
+
+
+def per_byte_unswizzle(data, magic):
+    lut_swizzle, lut_unswizzle = swizzles_lut(magic)
+    return bytes([lut_unswizzle[b] for b in data])
+
+
+def per_byte_parse_commands(data):
+    mark = 0
+    for i, b in enumerate(data):
+        if b >= 0x80 and mark != i:
+            yield data[mark:i]
+            mark = i
+    if mark != len(data):
+        yield data[mark:]
+
+
+def per_byte_histogram(data):
+    histogram = [0] * 256
+    prev = -1
+    for d in data:
+        histogram[d] += 5 if prev == d else 1
+        prev = d
+    m = 0
+    magic = None
+    for i in range(len(histogram)):
+        if histogram[i] > m:
+            m = histogram[i]
+            magic = i - 1
+    return magic
+
+
+def random_job(count, seed=0):
+    """
+    Unswizzled Ruida job: layer settings followed by moves and cuts.
+    """
+    random = Random(seed)
+
+    def relative():
+        return random.randrange(-8000, 8000)
+
+    def absolute():
+        return random.randrange(100000)
+
+    job = RDJob()
+    data = list()
+    out = data.append
+    job.ref_point_2(output=out)
+    job.set_absolute(output=out)
+    job.process_top_left(100000, 0, output=out)
+    job.process_bottom_right(0, 100000, output=out)
+    job.document_min_point(100000, 0, output=out)
+    job.process_repeat(1, 1, 0, 0, 0, 0, 0, output=out)
+    for i in range(count):
+        r = random.random()
+        if r < 0.01:
+            job.layer_color(random.randrange(0xFFFFFF), output=out)
+            job.speed_laser_1(random.uniform(10, 500), output=out)
+            job.min_power_1(random.uniform(0, 100), output=out)
+            job.max_power_1(random.uniform(0, 100), output=out)
+            # The frequency_part encoder is disabled.
+            out(FREQUENCY_PART + b"\x00\x00" + encode32(20000))
+            job.element_name("x", output=out)
+        elif r < 0.45:
+            job.cut_rel_xy(relative(), relative(), output=out)
+        elif r < 0.55:
+            job.move_rel_xy(relative(), relative(), output=out)
+        elif r < 0.7:
+            job.cut_abs_xy(absolute(), absolute(), output=out)
+        elif r < 0.75:
+            job.move_abs_xy(absolute(), absolute(), output=out)
+        elif r < 0.85:
+            job.cut_rel_x(relative(), output=out)
+        elif r < 0.9:
+            job.cut_rel_y(relative(), output=out)
+        else:
+            job.imd_power_1(random.uniform(0, 100), output=out)
+    job.block_end(output=out)
+    job.end_of_file(output=out)
+    return b"".join(data)
+
+
+class PlotDriver:
+    def __init__(self):
+        self.plots = list()
+        self.starts = 0
+
+    def plot(self, plot):
+        self.plots.append(list(plot.plot))
+
+    def plot_start(self):
+        self.starts += 1
+
+
+class TestRuidaSwizzle(unittest.TestCase):
+    def test_translate_tables(self):
+        for magic in (-1, 0x11, 0x38, 0x88, 0xFF):
+            lut_swizzle, lut_unswizzle = swizzles_lut(magic)
+            table_swizzle, table_unswizzle = swizzle_tables(magic)
+            self.assertEqual(table_swizzle, bytes(lut_swizzle))
+            self.assertEqual(table_unswizzle, bytes(lut_unswizzle))
+            data = bytes(range(256))
+            self.assertEqual(decode_bytes(data, magic), per_byte_unswizzle(data, magic))
+            self.assertEqual(decode_bytes(encode_bytes(data, magic), magic), data)
+
+    def test_parse_commands(self):
+        random = Random(1)
+        for size in (0, 1, 2, 50, 1000):
+            data = bytes(random.randrange(256) for _ in range(size))
+            self.assertEqual(parse_commands(data), list(per_byte_parse_commands(data)))
+        data = random_job(200)
+        self.assertEqual(parse_commands(data), list(per_byte_parse_commands(data)))
+
+    def test_histogram(self):
+        random = Random(2)
+        self.assertIsNone(determine_magic_via_histogram(b""))
+        for size in (1, 2, 10, 1000):
+            data = bytes(random.randrange(256) for _ in range(size))
+            self.assertEqual(
+                determine_magic_via_histogram(data), per_byte_histogram(data)
+            )
+        data = random_job(500)
+        for magic in (0x11, 0x88):
+            self.assertEqual(
+                determine_magic_via_histogram(encode_bytes(data, magic)), magic
+            )
+
+
+class TestRuidaProcess(unittest.TestCase):
+    def test_describe(self):
+        job = RDJob()
+        lines = list()
+        job.channel = lines.append
+        expected = (
+            (job.move_abs_xy, (1000, 2000), "Move Absolute (1000μm, 2000μm)"),
+            (job.move_rel_xy, (-10, 20), "Move Relative (-10μm, +20μm)"),
+            (job.cut_rel_x, (-300,), "Cut Horizontal Relative (-300μm)"),
+            (job.imd_power_1, (50,), "Imd Power 1 (49.993896484375)"),
+            (job.min_power_1, (25,), "Power 1 min=24.993896484375"),
+            (job.speed_laser_1, (100,), "Speed Laser 1 100.0mm/s"),
+            (job.laser_device_1, (), "Layer Device 1"),
+            (job.layer_number_part, (3,), "3, Layer Number"),
+            (job.document_min_point, (10, 20), "Document Min Point(10μm, 20μm)"),
+            (
+                job.rapid_move_xyu,
+                (1, 2, 3),
+                "Rapid move XYU (1μm, 2μm, 3μm)",
+            ),
+            (job.set_setting, (b"\x00\x26", 7), None),
+            (job.element_name, ("ab",), "Element Name (b'ab\\x00')"),
+            (job.end_of_file, (), "End Of File"),
+        )
+        for method, args, desc in expected:
+            commands = list()
+            method(*args, output=commands.append)
+            job.process(commands[0], offset=0)
+            if desc is not None:
+                self.assertEqual(
+                    lines[-1], f"000000-**-> {commands[0].hex()}\t({desc})"
+                )
+        self.assertIn("(mem: 0026)= 7 (0x00000007) 7 (0x00000007)", lines[-3])
+        job.process(b"\xFE\x01")
+        self.assertEqual(lines[-1], "-**-> fe01\t(Unknown Command!)")
+        job.process(b"\x89")
+        self.assertEqual(lines[-1], "-**-> 89\t(Move Relative (no coords))")
+
+    def test_errors(self):
+        job = RDJob()
+        with self.assertRaises(RuidaCommandError):
+            job.process(b"\x01\x02")
+        with self.assertRaises(IndexError):
+            job.process(b"\x88\x00\x00")
+
+    def test_execute_plots(self):
+        data = random_job(2000)
+        driver = PlotDriver()
+        lines = list()
+        job = RDJob(
+            driver=driver, channel=lines.append, units_to_device_matrix=Matrix()
+        )
+        job.write_blob(encode_bytes(data, 0x88))
+        count = len(job.buffer)
+        while not job.execute():
+            pass
+        self.assertEqual(len(lines), count)
+        self.assertEqual(job.buffer, [])
+        self.assertEqual(job.offset, len(data))
+        self.assertEqual(driver.starts, 1)
+        self.assertGreater(len(driver.plots), 1)
+        self.assertIsNotNone(job.speed)
+        self.assertIsNotNone(job.power)
+        self.assertEqual(job.frequency, 20000)
+
+
+class TestRdDecoder(unittest.TestCase):
+    def test_records(self):
+        data = random_job(500)
+        records = RdDecoder().decode(data)
+        self.assertEqual([bytes(r.data) for r in records], parse_commands(data))
+        offset = 0
+        for record in records:
+            self.assertEqual(record.offset, offset)
+            self.assertIsInstance(record.data, memoryview)
+            self.assertIs(record.command, lookup(record.data))
+            self.assertIsNotNone(record.values)
+            offset += len(record.data)
+        record = decode_command(b"\xa9\x00\x10\x7f\x70")
+        self.assertEqual(record.name, "CUT_REL_XY")
+        self.assertEqual(record.values, (16, -16))
+
+    def test_feed(self):
+        random = Random(3)
+        data = random_job(500)
+        swizzled = encode_bytes(data, 0x11)
+        expected = [
+            (r.offset, r.name, r.values) for r in RdDecoder(0x11).decode(swizzled)
+        ]
+        for trial in range(20):
+            decoder = RdDecoder(0x11)
+            records = list()
+            i = 0
+            while i < len(swizzled):
+                size = random.choice((1, 2, 3, 7, 100, 1000))
+                records.extend(decoder.feed(swizzled[i : i + size]))
+                i += size
+            records.extend(decoder.flush())
+            self.assertEqual([(r.offset, r.name, r.values) for r in records], expected)
+
+
+class TestRuidaEmulatorPackets(unittest.TestCase):
+    def emulate(self, packets, magic=0x88):
+        class Spooler:
+            def send(self, job, prevent_duplicate=False):
+                pass
+
+        class Device:
+            driver = None
+            spooler = Spooler()
+            current = (0, 0)
+
+        emulator = RuidaEmulator(Device(), None)
+        emulator.job.channel = None
+        for packet in packets:
+            data = encode_bytes(packet, magic)
+            checksum = sum(data) & 0xFFFF
+            emulator.checksum_write(bytes([checksum >> 8, checksum & 0xFF]) + data)
+        return emulator.job.buffer
+
+    def test_split_packets(self):
+        data = random_job(500)
+        commands = parse_commands(data)
+        whole = self.emulate(commands)
+        self.assertEqual(whole, commands)
+        random = Random(4)
+        packets = list()
+        i = 0
+        while i < len(data):
+            size = random.randrange(1, 300)
+            packets.append(data[i : i + size])
+            i += size
+        self.assertEqual(self.emulate(packets), commands)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestRdDecoderBenchmark(unittest.TestCase):
+    def test_benchmark_decode(self):
+        data = encode_bytes(random_job(200000), 0x88)
+        megabytes = len(data) / 1e6
+
+        t = time.perf_counter()
+        commands = list(per_byte_parse_commands(per_byte_unswizzle(data, 0x88)))
+        per_byte = time.perf_counter() - t
+
+        t = time.perf_counter()
+        split = parse_commands(decode_bytes(data, 0x88))
+        translate = time.perf_counter() - t
+        self.assertEqual(split, commands)
+
+        t = time.perf_counter()
+        records = RdDecoder(0x88).decode(data)
+        table = time.perf_counter() - t
+        self.assertEqual(len(records), len(commands))
+
+        lines = list()
+        job = RDJob(channel=lines.append, units_to_device_matrix=Matrix())
+        t = time.perf_counter()
+        job.write_blob(data)
+        while not job.execute():
+            pass
+        replay = time.perf_counter() - t
+        print()
+        print(
+            f"{megabytes:.2f}MB, {len(records)} commands: unswizzle and split per byte "
+            f"{megabytes / per_byte:.2f}MB/s, translate and regex "
+            f"{megabytes / translate:.2f}MB/s, "
+            f"decoded records {megabytes / table:.2f}MB/s, "
+            f"RDJob replay {megabytes / replay:.2f}MB/s"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
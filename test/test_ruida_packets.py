@@ -0,0 +1,332 @@
+"""
+Ruida job packets.
+
+Verifies that:
+1. The packets of a packed job equal the chunks swizzled and checksummed one by one
+2. Packets end at command boundaries and only exceed the packet size for a single
+   long command
+3. The emulator rebuilds the job from the packets
+4. The session counts the bytes of the job packets it sends, not of the other messages
+5. The controller sends the packets through the session and reports bytes/s and
+   retransmits, or sends the unswizzled chunks when the pipe is not a session
+6. Benchmark: dividing and packaging each chunk on send against packing once
+"""
+
+import os
+import struct
+import threading
+import time
+import unittest
+
+from meerk40t.ruida.controller import RuidaController
+from meerk40t.ruida.emulator import RuidaEmulator
+from meerk40t.ruida.rddecoder import encode_bytes, parse_commands
+from meerk40t.ruida.rdjob import ACK, GET_SETTING, MEM_MACHINE_STATUS, RDJob
+from meerk40t.ruida.ruidasession import RuidaSession
+from meerk40t.ruida.ruidatransport import TransportTimeout
+from test.test_ruida_decoder import random_job
+
+
+def load_job(data, magic=0x88):
+    job = RDJob()
+    job.set_magic(magic)
+    job.buffer.extend(parse_commands(data))
+    return job
+
+
+def divided_chunks(job):
+    """
+    Chunks as divided by the controller before the job was packed.
+    """
+    chunks = []
+    last = 0
+    total = 0
+    data = job.buffer
+    for i, command in enumerate(data):
+        total += len(command)
+        if total > 1000:
+            chunks.append(job.get_contents(last, i))
+            last = i
+            total = 0
+    if last != len(data):
+        chunks.append(job.get_contents(last))
+    return chunks
+
+
+def package(chunk, magic, checksum=True):
+    """
+    Packet as built by the session for every chunk it sends.
+    """
+    data = encode_bytes(chunk, magic)
+    if checksum:
+        return struct.pack(">H", sum(data) & 0xFFFF) + data
+    return data
+
+
+class TestPackedJob(unittest.TestCase):
+    def test_packets_match_package(self):
+        data = random_job(3000)
+        for magic in (0x11, 0x88):
+            job = load_job(data, magic)
+            for checksum in (True, False):
+                packed = job.pack(checksum=checksum)
+                chunks = [bytes(c) for c in packed.chunks()]
+                self.assertEqual(b"".join(chunks), data)
+                packets = [bytes(p) for p in packed.packets()]
+                self.assertEqual(len(packets), len(packed))
+                self.assertEqual(
+                    packets, [package(c, magic, checksum) for c in chunks]
+                )
+                self.assertEqual(bytes(packed.packet(3)), packets[3])
+                self.assertEqual(b"".join(packets), bytes(packed.data))
+                self.assertEqual(
+                    packed.checksums,
+                    [sum(encode_bytes(c, magic)) & 0xFFFF for c in chunks],
+                )
+
+    def test_boundaries(self):
+        data = random_job(3000)
+        job = load_job(data)
+        long_command = b"\xe7\x00" + b"\x01" * 300
+        job.buffer.insert(40, long_command)
+        commands = job.buffer
+        raw = job.get_contents()
+        boundaries = set()
+        offset = 0
+        for command in commands:
+            boundaries.add(offset)
+            offset += len(command)
+        boundaries.add(offset)
+        for size in (100, 500, 1000):
+            packed = job.pack(packet_size=size)
+            chunks = [bytes(c) for c in packed.chunks()]
+            self.assertEqual(b"".join(chunks), b"".join(commands))
+            for start, end in zip(packed.payload_bounds, packed.payload_bounds[1:]):
+                self.assertIn(start, boundaries)
+                self.assertIn(end, boundaries)
+                self.assertGreater(end, start)
+                if end - start > size:
+                    self.assertEqual(raw[start:end], long_command)
+        self.assertEqual(len(RDJob().pack()), 0)
+
+    def test_emulator_rebuilds_job(self):
+        class Spooler:
+            def send(self, job, prevent_duplicate=False):
+                pass
+
+        class Device:
+            driver = None
+            spooler = Spooler()
+            current = (0, 0)
+
+        data = random_job(2000)
+        job = load_job(data)
+        emulator = RuidaEmulator(Device(), None)
+        emulator.job.channel = None
+        for packet in job.pack().packets():
+            emulator.checksum_write(bytes(packet))
+        self.assertEqual(emulator.job.buffer, job.buffer)
+
+
+class FakeService:
+    safe_label = "ruida"
+    interface = "udp"
+    connected = False
+    is_busy = False
+
+    def __init__(self):
+        self.messages = []
+        self.active_session = None
+
+    def channel(self, name):
+        return self.messages.append
+
+    def setting(self, setting_type, key, default):
+        return default
+
+    def connect(self):
+        pass
+
+
+class FakeSession:
+    """
+    Session acknowledging every packet, with a NAK on every tenth packet.
+    """
+
+    connected = True
+
+    def __init__(self):
+        self.packets = []
+        self.sent_bytes = 0
+        self.naks = 0
+
+    def write(self, data):
+        self.packets.append(bytes(data))
+
+    def write_packet(self, packet):
+        self.packets.append(bytes(packet))
+        if len(self.packets) % 10 == 0:
+            self.naks += 1
+        self.sent_bytes += len(packet)
+
+
+class FakeTransport:
+    """
+    UDP transport of a controller acknowledging every message, replying to memory reads.
+    """
+
+    is_open = True
+    connected = True
+
+    def __init__(self):
+        self.written = []
+        self.reads = []
+
+    def set_timeout(self, seconds):
+        pass
+
+    def write(self, data):
+        self.written.append(bytes(data))
+        self.reads.append(ACK)
+        if bytes(data[2:4]) == GET_SETTING:
+            self.reads.append(GET_SETTING + bytes(7))
+
+    def read(self, length):
+        if not self.reads:
+            raise TransportTimeout
+        return self.reads.pop(0)
+
+    def purge(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class TestSessionSentBytes(unittest.TestCase):
+    def test_only_job_bytes(self):
+        class Service(FakeService):
+            def channel(self, name, pure=False):
+                return self.messages.append
+
+            def signal(self, *args):
+                pass
+
+        session = RuidaSession(Service())
+        transport = FakeTransport()
+        session.transport = transport
+        session.set_swizzles(bytes, bytes)
+        try:
+            for _ in range(100):
+                if session.connected:
+                    break
+                time.sleep(0.05)
+            session.write(GET_SETTING + MEM_MACHINE_STATUS)
+            data = random_job(3000)
+            packed = load_job(data).pack()
+            for packet in packed.packets():
+                session.write_packet(packet)
+            session.write(GET_SETTING + MEM_MACHINE_STATUS)
+            for _ in range(100):
+                if session.send_q.empty() and not session.is_busy:
+                    break
+                time.sleep(0.05)
+        finally:
+            session.shutdown()
+        # The connect and primed ENQ, the two status queries and the packets.
+        self.assertEqual(len(transport.written), 4 + len(packed))
+        self.assertEqual(session.sent_bytes, len(packed.data))
+
+
+class TestControllerSend(unittest.TestCase):
+    def send(self, service, pipe, data):
+        controller = RuidaController(service, pipe, magic=0x88)
+        controller.job = load_job(data)
+        controller.resume_monitor()
+        started = threading.Event()
+        sender = controller._data_sender
+
+        def data_sender():
+            started.wait()
+            sender()
+
+        controller._data_sender = data_sender
+        controller.start_sending()
+        thread = controller._send_thread
+        started.set()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        return controller
+
+    def test_send_packets(self):
+        service = FakeService()
+        session = FakeSession()
+        service.active_session = session
+        data = random_job(3000)
+        controller = self.send(service, session.write, data)
+        packed = controller.job.pack()
+        self.assertEqual(session.packets, [bytes(p) for p in packed.packets()])
+        self.assertEqual(service.messages[0], "Sending File...")
+        self.assertEqual(service.messages[1], f"File in {len(packed)} chunk(s)")
+        sent = service.messages[2]
+        self.assertTrue(sent.startswith(f"File Sent. {len(packed.data)} bytes in "))
+        self.assertIn("bytes/s", sent)
+        self.assertTrue(sent.endswith(f", {len(packed) // 10} retransmit(s)"))
+
+    def test_send_unswizzled_chunks(self):
+        service = FakeService()
+        chunks = []
+        data = random_job(3000)
+        controller = self.send(service, lambda chunk: chunks.append(bytes(chunk)), data)
+        packed = controller.job.pack()
+        self.assertEqual(chunks, [bytes(c) for c in packed.chunks()])
+        self.assertTrue(service.messages[2].startswith("File Sent."))
+
+    def test_send_failure(self):
+        service = FakeService()
+        session = FakeSession()
+        session.connected = False
+        session.write_packet = lambda packet: None
+        service.active_session = session
+        self.send(service, session.write, random_job(100))
+        self.assertTrue(
+            service.messages[2].startswith("File send failed, not connected. 0 bytes")
+        )
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestPackedJobBenchmark(unittest.TestCase):
+    def test_benchmark_pack(self):
+        data = random_job(200000)
+        job = load_job(data)
+        megabytes = len(data) / 1e6
+
+        t = time.perf_counter()
+        chunks = divided_chunks(job)
+        divide = time.perf_counter() - t
+
+        t = time.perf_counter()
+        packets = [package(chunk, 0x88) for chunk in chunks]
+        per_chunk = time.perf_counter() - t
+
+        t = time.perf_counter()
+        packed = job.pack()
+        pack = time.perf_counter() - t
+
+        t = time.perf_counter()
+        sliced = list(packed.packets())
+        send = time.perf_counter() - t
+        self.assertEqual(sum(len(p) for p in packets), len(data) + 2 * len(packets))
+        self.assertEqual(sum(len(p) for p in sliced), len(data) + 2 * len(sliced))
+        print()
+        print(
+            f"{megabytes:.2f}MB, {len(packed)} packets: divide {divide:.3f}s and "
+            f"package each chunk on send {per_chunk:.3f}s, pack once {pack:.3f}s and "
+            f"slice each packet on send {send * 1000:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
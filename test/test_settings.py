@@ -1,5 +1,6 @@
 import os
 import tempfile
+import time
 import unittest
 
 from meerk40t.kernel.settings import Settings
@@ -620,5 +621,174 @@ class TestSettings(unittest.TestCase):
         self.assertNotIn('method', settings._config_dict['section1'])
 
 
+class TestSettingsPersistence(unittest.TestCase):
+    """Tests the dirty tracking, atomic and background writes of the Settings class."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, "test_settings.cfg")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def serialized_sections(self, settings):
+        """Records the sections serialized by the settings."""
+        sections = []
+        serialize = settings._section_to_text
+
+        def section_to_text(section_key, section):
+            sections.append(section_key)
+            return serialize(section_key, section)
+
+        settings._section_to_text = section_to_text
+        return sections
+
+    def test_write_read_roundtrip(self):
+        """Test written values read back, including percent signs and new lines."""
+        settings = Settings(None, self.config_file, ignore_settings=True)
+        settings.write_persistent("section1", "percent", "100%")
+        settings.write_persistent("section1", "lines", "first\nsecond")
+        settings.write_persistent("section2 0001", "list", [1, 2, 3])
+        settings.write_persistent("empty", "key", "value")
+        settings.delete_persistent("empty", "key")
+        settings.write_configuration()
+
+        loaded = Settings(None, self.config_file)
+        self.assertEqual(loaded._config_dict, {
+            "section1": {"percent": "100%", "lines": "first\nsecond"},
+            "section2 0001": {"list": "[1, 2, 3]"},
+        })
+        self.assertEqual(os.listdir(self.temp_dir.name), ["test_settings.cfg"])
+
+    def test_only_changed_sections_serialized(self):
+        """Test a write serializes the changed sections only and skips unchanged files."""
+        settings = Settings(None, self.config_file, ignore_settings=True)
+        for i in range(10):
+            settings.write_persistent(f"section {i:04d}", "value", i)
+        serialized = self.serialized_sections(settings)
+        settings.write_configuration()
+        self.assertEqual(len(serialized), 10)
+
+        serialized.clear()
+        settings.write_persistent("section 0003", "value", 3)  # Unchanged value
+        settings.write_persistent("section 0005", "value", 50)
+        settings.write_configuration()
+        self.assertEqual(serialized, ["section 0005"])
+        self.assertEqual(Settings(None, self.config_file).read_persistent(
+            int, "section 0005", "value"), 50)
+
+        # Without changes the file is not written.
+        with open(self.config_file, "w") as f:
+            f.write("[marker]\nkey = value\n")
+        settings.write_configuration()
+        self.assertIn("marker", Settings(None, self.config_file))
+
+        # Cleared sections and direct changes are written.
+        settings.clear_persistent("section 0001")
+        settings._config_dict["section 0002"]["value"] = "20"
+        settings.mark_dirty("section 0002")
+        serialized.clear()
+        settings.write_configuration()
+        self.assertEqual(serialized, ["section 0002"])
+        loaded = Settings(None, self.config_file)
+        self.assertNotIn("marker", loaded)
+        self.assertNotIn("section 0001", loaded)
+        self.assertEqual(loaded.read_persistent(int, "section 0002", "value"), 20)
+        self.assertEqual(len(list(loaded.derivable("section"))), 9)
+
+    def test_export_keeps_own_file_pending(self):
+        """Test writing to another file does not count as writing the own file."""
+        settings = Settings(None, self.config_file, ignore_settings=True)
+        settings.write_persistent("section1", "key", "value")
+        settings.write_configuration()
+        settings.write_persistent("section1", "key", "changed")
+        export = os.path.join(self.temp_dir.name, "export.cfg")
+        settings.write_configuration(export)
+        self.assertEqual(Settings(None, export).read_persistent(str, "section1", "key"), "changed")
+        settings.write_configuration()
+        self.assertEqual(
+            Settings(None, self.config_file).read_persistent(str, "section1", "key"), "changed"
+        )
+
+    def test_backup_once_per_session(self):
+        """Test backups are rotated once per session rather than on every write."""
+        settings = Settings(None, self.config_file, ignore_settings=True, create_backup=True)
+        settings.write_persistent("section1", "key", "first")
+        settings.write_configuration()
+        settings = Settings(None, self.config_file, create_backup=True)
+        for value in ("second", "third", "fourth"):
+            settings.write_persistent("section1", "key", value)
+            settings.write_configuration()
+        backup = os.path.join(self.temp_dir.name, "test_settings.bak")
+        self.assertEqual(Settings(None, backup).read_persistent(str, "section1", "key"), "first")
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir.name)), ["test_settings.bak", "test_settings.cfg"]
+        )
+
+    def test_write_configuration_later(self):
+        """Test background writes collect the changes made within the delay."""
+        settings = Settings(None, self.config_file, ignore_settings=True)
+        writes = []
+        write = settings.write_configuration
+
+        def write_configuration(targetfile=None):
+            writes.append(targetfile)
+            write(targetfile)
+
+        settings.write_configuration = write_configuration
+        for i in range(20):
+            settings.write_persistent("section1", f"key{i}", i)
+            settings.write_configuration_later(0.05)
+        self.assertFalse(os.path.exists(self.config_file))
+        time.sleep(0.3)
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(len(list(Settings(None, self.config_file).keylist("section1"))), 20)
+
+        # A direct write replaces the pending one.
+        settings.write_persistent("section1", "key0", "direct")
+        settings.write_configuration_later(0.05)
+        write()
+        time.sleep(0.2)
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(
+            Settings(None, self.config_file).read_persistent(str, "section1", "key0"), "direct"
+        )
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestSettingsBenchmark(unittest.TestCase):
+    """Benchmark: writing a large configuration after changing one section."""
+
+    def test_benchmark_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings = Settings(directory, "operations.cfg", ignore_settings=True)
+            for material in range(500):
+                for op in range(8):
+                    section = f"material{material:04d} {op:06d}"
+                    for key in range(10):
+                        settings.write_persistent(section, f"key{key}", f"{material}.{op}.{key}")
+            keys = sum(len(section) for section in settings._config_dict.values())
+            start = time.perf_counter()
+            settings.write_configuration()
+            full = time.perf_counter() - start
+            count = 20
+            start = time.perf_counter()
+            for i in range(count):
+                settings.write_persistent("material0007 000003", "key1", i)
+                settings.write_configuration()
+            incremental = (time.perf_counter() - start) / count
+            start = time.perf_counter()
+            for i in range(count):
+                settings.write_configuration()
+            unchanged = (time.perf_counter() - start) / count
+            print(
+                f"\n{keys} keys, full write {full * 1000:.1f}ms, "
+                f"one section changed {incremental * 1000:.1f}ms, unchanged {unchanged * 1000:.2f}ms"
+            )
+            self.assertLess(incremental, full)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,221 @@
+"""
+Vectorized horizontal and vertical rastering of RasterPlotter.
+
+Verifies that:
+1. With a pixels array the plot equals the plot of _plot_horizontal / _plot_vertical,
+   for every direction, start corner, bidirectional and overscan setting, with
+   travel and burn distances
+2. Inverted, thresholding and absent filters, and mode "1" images plot the same
+3. Overlap, legacy and the path optimizing methods keep the per pixel plot, crossover
+   takes its matrix from the pixels array
+4. Benchmark: dithered image plotted per pixel and vectorized
+"""
+
+import itertools
+import os
+import time
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from meerk40t.constants import (
+    RASTER_B2T,
+    RASTER_CROSSOVER,
+    RASTER_GREEDY_H,
+    RASTER_HATCH,
+    RASTER_L2R,
+    RASTER_R2L,
+    RASTER_SPIRAL,
+    RASTER_T2B,
+)
+from meerk40t.core.cutcode.rastercut import RasterCut
+from meerk40t.tools.rasterplotter import RasterPlotter
+
+
+def burn_filter(pixel):
+    return (255 - pixel) / 255.0
+
+
+def random_pixels(seed):
+    rng = np.random.default_rng(seed)
+    width, height = (int(v) for v in rng.integers(1, 16, 2))
+    kind = seed % 4
+    if kind == 0:
+        pixels = rng.choice([0, 255], (height, width), p=[0.3, 0.7])
+    elif kind == 1:
+        pixels = rng.integers(0, 256, (height, width))
+    elif kind == 2:
+        pixels = np.full((height, width), 255)
+        pixels[rng.integers(0, height), rng.integers(0, width)] = 0
+    else:
+        pixels = rng.choice([0, 128, 255], (height, width))
+    return pixels.astype(np.uint8)
+
+
+def plotters(pixels, **kwargs):
+    """
+    Plotter of the pixel access of the image and plotter of the pixels array.
+    """
+    height, width = pixels.shape
+    image = Image.fromarray(pixels, "L").copy()
+    per_pixel = RasterPlotter(image.load(), width, height, **kwargs)
+    image = Image.fromarray(pixels, "L").copy()
+    vectorized = RasterPlotter(image.load(), width, height, pixels=pixels, **kwargs)
+    return per_pixel, vectorized
+
+
+class TestRasterPlotterRuns(unittest.TestCase):
+    def assertSamePlot(self, per_pixel, vectorized):
+        self.assertEqual(
+            (per_pixel.initial_x, per_pixel.initial_y, per_pixel.final_x, per_pixel.final_y),
+            (vectorized.initial_x, vectorized.initial_y, vectorized.final_x, vectorized.final_y),
+        )
+        expected = list(per_pixel.plot())
+        actual = list(vectorized.plot())
+        self.assertEqual(expected, actual)
+        self.assertEqual(
+            [type(v) for p in expected for v in p], [type(v) for p in actual for v in p]
+        )
+        self.assertAlmostEqual(per_pixel.distance_burn, vectorized.distance_burn, places=6)
+        self.assertAlmostEqual(
+            per_pixel.distance_travel, vectorized.distance_travel, places=6
+        )
+
+    def test_matches_per_pixel(self):
+        settings = itertools.product(
+            (RASTER_T2B, RASTER_B2T, RASTER_L2R, RASTER_R2L, RASTER_HATCH),
+            (True, False),  # horizontal
+            (True, False),  # bidirectional
+            (True, False),  # start_minimum_x
+            (True, False),  # start_minimum_y
+            (0, 3),  # overscan
+        )
+        for seed, setting in itertools.product(range(12), settings):
+            direction, horizontal, bidirectional, min_x, min_y, overscan = setting
+            for use_integers in (True, False):
+                self.assertSamePlot(
+                    *plotters(
+                        random_pixels(seed),
+                        direction=direction,
+                        horizontal=horizontal,
+                        bidirectional=bidirectional,
+                        start_minimum_x=min_x,
+                        start_minimum_y=min_y,
+                        overscan=overscan,
+                        use_integers=use_integers,
+                        filter=burn_filter,
+                        offset_x=100,
+                        offset_y=7,
+                        step_x=2.5,
+                        step_y=3,
+                    )
+                )
+
+    def test_filters(self):
+        filters = (
+            (lambda pixel: pixel / 255.0, 255),
+            (None, 0),
+            (None, 255),
+            (lambda pixel: 255 if pixel >= 100 else 0, 255),
+        )
+        for seed in range(10):
+            pixels = random_pixels(seed)
+            for (pixel_filter, skip_pixel), horizontal, bidirectional in itertools.product(
+                filters, (True, False), (True, False)
+            ):
+                self.assertSamePlot(
+                    *plotters(
+                        pixels,
+                        horizontal=horizontal,
+                        bidirectional=bidirectional,
+                        filter=pixel_filter,
+                        skip_pixel=skip_pixel,
+                        overscan=2,
+                    )
+                )
+
+    def test_raster_cut_bilevel(self):
+        for seed in range(10):
+            image = Image.fromarray(random_pixels(seed), "L").convert("1")
+            # The bytes of the image's bool array are 0 and 255, those of a computed one 0 and 1.
+            for pixels in (image, np.asarray(image.convert("L")) > 0):
+                per_pixel, vectorized = (
+                    RasterPlotter(
+                        image.copy().load(),
+                        image.width,
+                        image.height,
+                        pixels=array,
+                        filter=burn_filter,
+                        offset_x=10,
+                        offset_y=20,
+                        step_x=2,
+                        step_y=2,
+                    )
+                    for array in (None, pixels)
+                )
+                self.assertIsNotNone(vectorized._pixels)
+                self.assertSamePlot(per_pixel, vectorized)
+            cut = RasterCut(image.copy(), 10, 20, 2, 2)
+            self.assertIsNotNone(cut.plot._pixels)
+            self.assertSamePlot(per_pixel, cut.plot)
+
+    def test_per_pixel_methods(self):
+        pixels = random_pixels(4)
+        height, width = pixels.shape
+        for kwargs in (
+            {"laserspot": 3},
+            {"special": {"legacy": True}},
+            {"direction": RASTER_GREEDY_H},
+            {"direction": RASTER_CROSSOVER},
+            {"direction": RASTER_SPIRAL},
+        ):
+            plotter = RasterPlotter(
+                None, width, height, pixels=pixels, filter=burn_filter, **kwargs
+            )
+            self.assertIsNone(plotter._plot_runs())
+        for seed in range(10):
+            self.assertSamePlot(
+                *plotters(
+                    random_pixels(seed), direction=RASTER_CROSSOVER, filter=burn_filter
+                )
+            )
+        # Filters giving values that cannot be tabled disable the vectorized plot.
+        plotter = RasterPlotter(
+            Image.fromarray(pixels).load(), width, height, pixels=pixels, filter=lambda p: [p]
+        )
+        self.assertIsNone(plotter._pixels)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestRasterPlotterRunsBenchmark(unittest.TestCase):
+    def test_benchmark_dithered(self):
+        rng = np.random.default_rng(1)
+        gray = np.clip(
+            np.linspace(0, 255, 1200)[np.newaxis, :] + rng.normal(0, 30, (800, 1200)),
+            0,
+            255,
+        ).astype(np.uint8)
+        image = Image.fromarray(gray, "L").convert("1")
+        for horizontal in (True, False):
+            results = []
+            for vectorized in (False, True):
+                cut = RasterCut(image.copy(), 0, 0, 1, 1, horizontal=horizontal)
+                if not vectorized:
+                    cut.plot._pixels = None
+                start = time.perf_counter()
+                plot = list(cut.plot.plot())
+                elapsed = time.perf_counter() - start
+                results.append(plot)
+                print(
+                    f"\n{'horizontal' if horizontal else 'vertical'} "
+                    f"{'vectorized' if vectorized else 'per pixel'} {image.width}x{image.height}: "
+                    f"{len(plot)} moves in {elapsed:.3f}s"
+                )
+            self.assertEqual(results[0], results[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,247 @@
+"""
+Tests for the incremental undo snapshots in meerk40t.core.undos.
+
+Verifies that:
+1. Unchanged nodes and subtrees are shared between consecutive snapshots
+2. Changed nodes (announced, rebound attributes, settings) are copied
+3. References are relinked to the restored elements
+4. Restoring a state does not hand out the stored records
+5. Benchmark: 100 marks on a 10k node tree, time and memory per mark
+"""
+
+import os
+import time
+import tracemalloc
+import unittest
+
+from meerk40t.core.geomstr import Geomstr
+from meerk40t.core.undos import UndoSnapshots
+from test.bootstrap import bootstrap
+
+
+class TestUndoSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.kernel = bootstrap()
+        self.elements = self.kernel.elements
+        self.tree = self.elements._tree
+
+    def tearDown(self):
+        self.kernel()
+
+    def _snapshots(self):
+        snapshots = UndoSnapshots()
+        self.tree.listen(snapshots)
+        return snapshots
+
+    def _branch_record(self, state, branch_type):
+        for record in state:
+            if record.type == branch_type:
+                return record
+        return None
+
+    def test_unchanged_tree_is_shared(self):
+        for i in range(10):
+            self.elements.elem_branch.add(
+                type="elem rect", x=i, y=0, width=10, height=10
+            )
+        snapshots = self._snapshots()
+        first = snapshots.snapshot(self.tree)
+        second = snapshots.snapshot(self.tree)
+        self.assertEqual(snapshots.copied, 0)
+        for a, b in zip(first, second):
+            self.assertIs(a, b)
+
+    def test_modified_node_is_copied(self):
+        nodes = [
+            self.elements.elem_branch.add(
+                type="elem rect", x=i, y=0, width=10, height=10
+            )
+            for i in range(10)
+        ]
+        snapshots = self._snapshots()
+        first = snapshots.snapshot(self.tree)
+        nodes[3].matrix.post_translate(100, 0)
+        nodes[3].translated(100, 0)
+        second = snapshots.snapshot(self.tree)
+        self.assertEqual(snapshots.copied, 1)
+        elems_first = self._branch_record(first, "branch elems")
+        elems_second = self._branch_record(second, "branch elems")
+        self.assertIsNot(elems_first, elems_second)
+        for idx, (a, b) in enumerate(
+            zip(elems_first.children, elems_second.children)
+        ):
+            if idx == 3:
+                self.assertIsNot(a, b)
+                self.assertEqual(a.key, b.key)
+                self.assertNotEqual(a.node.matrix, b.node.matrix)
+            else:
+                self.assertIs(a, b)
+        # The ops branch was not touched at all.
+        self.assertIs(
+            self._branch_record(first, "branch ops"),
+            self._branch_record(second, "branch ops"),
+        )
+
+    def test_operation_settings_change_is_detected(self):
+        op = self.elements.op_branch.children[0]
+        snapshots = self._snapshots()
+        snapshots.snapshot(self.tree)
+        op.speed = (op.speed or 10) + 5
+        snapshots.snapshot(self.tree)
+        self.assertEqual(snapshots.copied, 1)
+
+    def test_rebound_attribute_is_detected(self):
+        rect = self.elements.elem_branch.add(
+            type="elem rect", x=0, y=0, width=10, height=10
+        )
+        snapshots = self._snapshots()
+        snapshots.snapshot(self.tree)
+        rect.label = "Renamed"
+        state = snapshots.snapshot(self.tree)
+        self.assertEqual(snapshots.copied, 1)
+        stored = self._branch_record(state, "branch elems").children[-1].node
+        self.assertEqual(stored.label, "Renamed")
+
+    def test_cached_values_do_not_copy(self):
+        rect = self.elements.elem_branch.add(
+            type="elem rect", x=0, y=0, width=10, height=10
+        )
+        snapshots = self._snapshots()
+        snapshots.snapshot(self.tree)
+        rect.set_dirty_bounds()
+        self.assertIsNotNone(rect.bounds)
+        snapshots.snapshot(self.tree)
+        self.assertEqual(snapshots.copied, 0)
+
+    def test_restore_relinks_references(self):
+        rect = self.elements.elem_branch.add(
+            type="elem rect", x=0, y=0, width=10, height=10
+        )
+        op = self.elements.op_branch.children[0]
+        op.add_reference(rect)
+        snapshots = self._snapshots()
+        state = snapshots.snapshot(self.tree)
+        rect.matrix.post_scale(2, 2)
+        rect.modified()
+        snapshots.snapshot(self.tree)
+        snapshots.restore(self.tree, state)
+
+        elem_branch = self.tree.get(type="branch elems")
+        op_branch = self.tree.get(type="branch ops")
+        restored = elem_branch.children[-1]
+        self.assertIsNot(restored, rect)
+        self.assertEqual(restored.matrix.value_scale_x(), 1)
+        ref = op_branch.children[0].children[-1]
+        self.assertIs(ref.node, restored)
+        self.assertIn(ref, restored._references)
+        self.assertEqual(self.tree.tree_integrity_errors(), [])
+
+    def test_restore_does_not_expose_records(self):
+        rect = self.elements.elem_branch.add(
+            type="elem rect", x=0, y=0, width=10, height=10
+        )
+        snapshots = self._snapshots()
+        state = snapshots.snapshot(self.tree)
+        snapshots.restore(self.tree, state)
+        restored = self.tree.get(type="branch elems").children[-1]
+        stored = self._branch_record(state, "branch elems").children[-1].node
+        self.assertIsNot(restored, stored)
+        restored.matrix.post_translate(50, 50)
+        self.assertEqual(stored.matrix.value_trans_x(), 0)
+        self.assertIsNot(rect, restored)
+        # Restored nodes are recognised again, nothing needs copying.
+        snapshots.restore(self.tree, state)
+        snapshots.snapshot(self.tree)
+        self.assertEqual(snapshots.copied, 0)
+
+    def test_undo_redo_roundtrip(self):
+        rect = self.elements.elem_branch.add(
+            type="elem rect", x=0, y=0, width=10, height=10
+        )
+        undo = self.elements.undo
+        undo.mark("add")
+        undo.mark("move")
+        rect.matrix.post_translate(20, 0)
+        rect.translated(20, 0)
+        self.assertTrue(undo.undo())
+        restored = self.elements.elem_branch.children[-1]
+        self.assertEqual(restored.matrix.value_trans_x(), 0)
+        self.assertTrue(undo.redo())
+        while undo.has_redo():
+            undo.redo()
+        restored = self.elements.elem_branch.children[-1]
+        self.assertEqual(restored.matrix.value_trans_x(), 20)
+
+
+@unittest.skipUnless(
+    os.environ.get("MEERK40T_BENCHMARKS"), "set MEERK40T_BENCHMARKS to run benchmarks"
+)
+class TestUndoSnapshotBenchmark(unittest.TestCase):
+    NODES = 10000
+    EDITS = 100
+    # Tracing allocations is slow, memory is sampled over fewer marks.
+    TRACED_EDITS = 10
+
+    def test_benchmark_marks(self):
+        kernel = bootstrap()
+        try:
+            elements = kernel.elements
+            elements.undo.active = False
+            tree = elements._tree
+            nodes = []
+            for i in range(self.NODES // 2):
+                nodes.append(
+                    elements.elem_branch.add(
+                        type="elem rect", x=i, y=0, width=10, height=10
+                    )
+                )
+                nodes.append(
+                    elements.elem_branch.add(
+                        type="elem path", geometry=Geomstr.circle(5, i, 10)
+                    )
+                )
+
+            snapshots = UndoSnapshots()
+            tree.listen(snapshots)
+            states = [snapshots.snapshot(tree)]
+            t0 = time.perf_counter()
+            for i in range(self.EDITS):
+                node = nodes[(i * 89) % len(nodes)]
+                node.matrix.post_translate(1, 0)
+                node.translated(1, 0)
+                snapshots.snapshot(tree)
+            elapsed = time.perf_counter() - t0
+
+            # Memory is measured in a separate run, tracing slows down marks.
+            tracemalloc.start()
+            for i in range(self.TRACED_EDITS):
+                node = nodes[(i * 97) % len(nodes)]
+                node.matrix.post_translate(1, 0)
+                node.translated(1, 0)
+                states.append(snapshots.snapshot(tree))
+            memory, _peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            t0 = time.perf_counter()
+            full = tree.backup_tree()
+            full_elapsed = time.perf_counter() - t0
+            tracemalloc.start()
+            full = tree.backup_tree()
+            full_memory, _peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"Undo benchmark {self.NODES} nodes: incremental mark "
+                f"{1000 * elapsed / self.EDITS:.2f}ms, "
+                f"{memory / self.TRACED_EDITS / 1024:.1f}KiB per mark; "
+                f"full backup {1000 * full_elapsed:.2f}ms, "
+                f"{full_memory / 1024:.1f}KiB"
+            )
+            self.assertEqual(snapshots.copied, 1)
+            self.assertEqual(len(states), self.TRACED_EDITS + 1)
+            self.assertIsNotNone(full)
+        finally:
+            kernel()
+
+
+if __name__ == "__main__":
+    unittest.main()